@@ -263,6 +263,9 @@ REST_FRAMEWORK = {
         # comfortable for real users while throttling crawlers that hammer the
         # large geometry endpoints from a whole network block.
         "geojson_anon": "60/minute",
+        # Per-subnet limit for anonymous vector tile requests, of which every
+        # map view issues a few dozen.
+        "mvt_anon": "1200/minute",
     },
 }
 
@@ -317,11 +320,24 @@ CELERY_REDIS_BACKEND_USE_SSL = _redis_ssl_settings(REDIS_URL)
 # are removed from storage.
 FILE_EXPORT_RETENTION_DAYS = int(os.environ.get("FILE_EXPORT_RETENTION_DAYS", "7"))
 
+# Number of tiles of the catchment that partitionable inventory algorithms are
+# run in, each as a separate Celery task. 1 runs every algorithm as one task.
+INVENTORY_PARTITIONS = int(os.environ.get("INVENTORY_PARTITIONS", "1"))
+
+# Number of days stored Waste Atlas change overlays are kept without being read.
+WASTE_ATLAS_CHANGE_OVERLAY_RETENTION_DAYS = int(
+    os.environ.get("WASTE_ATLAS_CHANGE_OVERLAY_RETENTION_DAYS", "30")
+)
+
 CELERY_BEAT_SCHEDULE = {
     "cleanup-expired-user-exports": {
         "task": "utils.file_export.generic_tasks.cleanup_expired_exports",
         "schedule": timedelta(hours=24),
     },
+    "prune-waste-atlas-change-overlays": {
+        "task": "prune_waste_atlas_change_overlays",
+        "schedule": timedelta(hours=24),
+    },
 }
 
 GEO_BORDER_TOLERANCE = 0.005  # Tolerance for border detection in degrees for EPSG 4326
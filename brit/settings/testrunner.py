@@ -60,6 +60,9 @@ CELERY_TASK_EAGER_PROPAGATES = True
 CELERY_BROKER_USE_SSL = None
 CELERY_REDIS_BACKEND_USE_SSL = None
 
+# Bump dataset versions inside the never committed test transactions
+DATASET_VERSION_ALWAYS_EAGER = True
+
 _test_cache_redis_url = _test_redis_database_url(_test_redis_url, 14)
 
 CACHES = {
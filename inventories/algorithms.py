@@ -1,14 +1,54 @@
+from django.contrib.gis.db.models.functions import PointOnSurface
 from django.contrib.gis.geos import GEOSGeometry
+from django.core.exceptions import EmptyResultSet
 from django.db import connection
-from django.db.models import QuerySet
+from django.db.models import FloatField, Func, QuerySet, Value
 
 from maps.models import Catchment
 
 from .exceptions import EmptyQueryset
+from .progress import is_reporting_progress, report_progress
+
+# Number of clipped features fetched from the database at a time
+CLIP_CHUNK_SIZE = 2000
+
+
+def partitionable(function):
+    """
+    Marks an algorithm that can be run in partitions (see inventories.tasks.run_inventory): it restricts its source
+    features with InventoryAlgorithmsBase.in_partition and all of its aggregated values and distribution shares are
+    sums over the features, so that the results of the partitions add up to the result of a single run.
+    """
+    function.partitionable = True
+    return function
+
+
+def reads_inputs(input_state):
+    """
+    Marks an algorithm whose results also depend on rows other than the features of its source dataset and its
+    parameters. input_state is called with the keyword arguments of an execution and returns a JSON serializable state
+    of these rows that changes whenever they do. It is part of the input hash that decides whether a result layer is
+    reused (see inventories.models.Scenario.reusable_result_layers).
+    """
+
+    def decorator(function):
+        function.input_state = input_state
+        return function
+
+    return decorator
+
+
+def not_reusable(function):
+    """
+    Marks an algorithm whose results are never reused, as they depend on rows whose changes are not tracked.
+    """
+    function.reusable = False
+    return function
 
 
 class InventoryAlgorithmsBase:
     @staticmethod
+    @partitionable
     def avg_point_yield(**kwargs):
         """
         Assignes a global average and standard deviation to all points that are found within the scenario catchment.
@@ -19,13 +59,18 @@ class InventoryAlgorithmsBase:
         """
         catchment = Catchment.objects.get(id=kwargs.get("catchment_id"))
         model = kwargs.get("source_model")
-        clipped = model.objects.filter(geom__intersects=catchment.geom)
+        clipped = InventoryAlgorithmsBase.in_partition(
+            model.objects.filter(geom__intersects=catchment.geom),
+            catchment.geom,
+            kwargs.get("partition"),
+        )
         count = clipped.count()
+        report_progress("select", count, count, force=True)
         point_yield = kwargs.get("point_yield")
         total_production = point_yield["value"] * count
 
-        # If result is a gis layer, it must have a list of features under key ['features']. Each feature must have
-        # an entry for the key 'geom'
+        # If result is a gis layer, it must have a list of features under key ['features'] or a set-based
+        # ['feature_query'] (see feature_query). Each feature must have an entry for the key 'geom'
         result = {
             "aggregated_values": [],
             "aggregated_distributions": [],
@@ -44,19 +89,17 @@ class InventoryAlgorithmsBase:
             }
         )
 
-        for feature in clipped:
-            result["features"].append(
-                {
-                    "geom": feature.geom,
-                    "point_yield_average": point_yield["value"],
-                    "point_yield_standard_deviation": point_yield["standard_deviation"],
-                }
-            )
-        result["aggregated_distributions"] = []
+        # The features are inserted set-based, without loading them into Python
+        result["feature_query"] = InventoryAlgorithmsBase.feature_query(
+            clipped,
+            point_yield_average=point_yield["value"],
+            point_yield_standard_deviation=point_yield["standard_deviation"],
+        )
 
         return result
 
     @staticmethod
+    @partitionable
     def avg_area_yield(**kwargs):
         """
         Assignes a global average and standard deviation to park areas that where found in the scenario catchment.
@@ -68,7 +111,9 @@ class InventoryAlgorithmsBase:
         """
         model = kwargs.get("source_model")
         catchment = Catchment.objects.get(id=kwargs.get("catchment_id"))
-        input_qs = model.objects.all()
+        input_qs = InventoryAlgorithmsBase.in_partition(
+            model.objects.all(), catchment.geom, kwargs.get("partition")
+        )
         keep_columns = kwargs.get("keep_columns")
         clipped_polygons = InventoryAlgorithmsBase.clip_polygons(
             input_qs, catchment.geom, keep_columns=keep_columns
@@ -89,27 +134,37 @@ class InventoryAlgorithmsBase:
         )
 
         area_yield = kwargs.get("area_yield")
-        for polygon in clipped_polygons:
-            result["aggregated_values"][0]["value"] += polygon["area"]
-            result["aggregated_values"][1]["value"] += (
-                polygon["area"] * area_yield["value"]
-            )
-            result["features"].append(
-                {
+        total_area, total_production = result["aggregated_values"]
+
+        # The features are streamed into the result layer. The totals are
+        # complete once they have been consumed, which the layer manager does
+        # before it stores the aggregated values.
+        def features():
+            for polygon in clipped_polygons:
+                total_area["value"] += polygon["area"]
+                total_production["value"] += polygon["area"] * area_yield["value"]
+                yield {
                     "geom": polygon["geom"],
                     "area": polygon["area"],
                     "yield_average": polygon["area"] * area_yield["value"],
                 }
-            )
+
+        result["features"] = features()
 
         return result
 
     @staticmethod
+    @partitionable
     def nantes_greenhouse_yield(**kwargs):
         catchment = Catchment.objects.get(id=kwargs.get("catchment_id"))
         model = kwargs.get("source_model")
-        clipped = model.objects.filter(geom__intersects=catchment.geom)
+        clipped = InventoryAlgorithmsBase.in_partition(
+            model.objects.filter(geom__intersects=catchment.geom),
+            catchment.geom,
+            kwargs.get("partition"),
+        )
         count = clipped.count()
+        report_progress("select", count, count, force=True)
 
         point_yield = kwargs.get("point_yield")
         total_production = point_yield["value"] * count
@@ -128,14 +183,11 @@ class InventoryAlgorithmsBase:
             {"name": "Total production", "value": total_production, "unit": "kg"}
         )
 
-        for feature in clipped:
-            result["features"].append(
-                {
-                    "geom": feature.geom,
-                    "point_yield_average": point_yield["value"],
-                    "point_yield_standard_deviation": point_yield["standard_deviation"],
-                }
-            )
+        result["feature_query"] = InventoryAlgorithmsBase.feature_query(
+            clipped,
+            point_yield_average=point_yield["value"],
+            point_yield_standard_deviation=point_yield["standard_deviation"],
+        )
 
         component_list = kwargs.get("materialcomponent-list")
         distribution = kwargs.get("seasonal_distribution")
@@ -147,65 +199,181 @@ class InventoryAlgorithmsBase:
 
         return result
 
+    @staticmethod
+    def partition_bounds(mask_geom: GEOSGeometry, srid: int, partition: dict):
+        """
+        Returns the bounds (xmin, ymin, xmax, ymax) of tile partition['index'] of partition['count'] tiles that split
+        the extent of mask_geom in the given SRID into strips of equal width along its longer side. The outer bounds
+        of the first and the last tile are None, so that the tiles cover the whole plane without overlapping.
+        """
+        index, count = partition["index"], partition["count"]
+        if mask_geom.srid and srid and mask_geom.srid != srid:
+            mask_geom = mask_geom.transform(srid, clone=True)
+        extent = mask_geom.extent
+        bounds = [None, None, None, None]
+        # Split along x (0) or along y (1), whichever side of the extent is longer
+        axis = 0 if extent[2] - extent[0] >= extent[3] - extent[1] else 1
+        low, high = extent[axis], extent[axis + 2]
+        step = (high - low) / count
+        if index > 0:
+            bounds[axis] = low + index * step
+        if index < count - 1:
+            bounds[axis + 2] = low + (index + 1) * step
+        return tuple(bounds)
+
+    @staticmethod
+    def in_partition(
+        queryset: QuerySet, mask_geom: GEOSGeometry, partition: dict = None
+    ):
+        """
+        Restricts queryset to the features of one partition of a partitioned run (see partition_bounds), or returns
+        it unchanged if partition is None. Each feature belongs to the tile that contains a point on its surface, the
+        lower bounds of a tile being inclusive and the upper bounds exclusive, so that every feature is processed by
+        exactly one partition, even if its geometry crosses the borders of the tiles.
+        """
+        if partition is None:
+            return queryset
+        srid = queryset.model._meta.get_field("geom").srid
+        xmin, ymin, xmax, ymax = InventoryAlgorithmsBase.partition_bounds(
+            mask_geom, srid, partition
+        )
+        queryset = queryset.annotate(
+            partition_x=Func(
+                PointOnSurface("geom"), function="ST_X", output_field=FloatField()
+            ),
+            partition_y=Func(
+                PointOnSurface("geom"), function="ST_Y", output_field=FloatField()
+            ),
+        )
+        lookups = {
+            "partition_x__gte": xmin,
+            "partition_y__gte": ymin,
+            "partition_x__lt": xmax,
+            "partition_y__lt": ymax,
+        }
+        return queryset.filter(
+            **{lookup: value for lookup, value in lookups.items() if value is not None}
+        )
+
+    @staticmethod
+    def feature_query(queryset: QuerySet, **values):
+        """
+        Describes the features of a result layer as SQL instead of a list: the geometries in the queryset, each with
+        the given constant attribute values. LayerManager.create_or_replace inserts them with a single
+        INSERT ... SELECT, so that large layers are never loaded into Python. Attributes whose value is None are
+        omitted, as they are from lists of features.
+        """
+        fields = {
+            name: type(value).__name__
+            for name, value in values.items()
+            if value is not None
+        }
+        query = (
+            queryset.annotate(**{name: Value(values[name]) for name in fields})
+            .order_by()
+            .values_list("geom", *fields)
+            .query
+        )
+        # Select the geometries as they are rather than as bytea for Python.
+        query.subquery = True
+        try:
+            sql, params = query.get_compiler(connection=connection).as_sql()
+        except EmptyResultSet:
+            sql, params = "SELECT NULL WHERE FALSE", ()
+        geom_field = queryset.model._meta.get_field("geom")
+        return {
+            "sql": sql,
+            "params": list(params),
+            "geom_type": type(geom_field).__name__.removesuffix("Field"),
+            "fields": fields,
+        }
+
     @staticmethod
     def clip_polygons(
-        input_qs: QuerySet, mask_geom: GEOSGeometry, keep_columns: [str] = None
+        input_qs: QuerySet,
+        mask_geom: GEOSGeometry,
+        keep_columns: [str] = None,
+        chunk_size: int = CLIP_CHUNK_SIZE,
     ):
-        if not input_qs:
+        """
+        Clips the polygons of input_qs with mask_geom. Returns an iterator over the clipped features, dicts of the
+        kept columns, 'geom' and 'area' (m²). The intersection is computed once per polygon in the database and the
+        features are streamed from a server-side cursor in chunks of chunk_size, so memory use is bounded by the
+        chunk size instead of the size of the input.
+        """
+        if not mask_geom:
             raise EmptyQueryset
 
-        if not mask_geom:
+        if not input_qs.exists():
             raise EmptyQueryset
 
         # Clean up column names and remove any non existing column names
         # noinspection PyProtectedMember
-        input_fields_names = [field.name for field in input_qs.model._meta.get_fields()]
+        opts = input_qs.model._meta
+        input_fields_names = [field.name for field in opts.get_fields()]
+        qn = connection.ops.quote_name
         columns = []
         if keep_columns is not None:
             for column_name in keep_columns:
                 if column_name in input_fields_names:
                     columns.append(column_name)
-
-        if columns:
-            columns_str = ", ".join(["input." + name for name in columns]) + ","
-        else:
-            columns_str = ""
-
-        # noinspection PyProtectedMember
-        input_table_name = input_qs.model._meta.db_table
-        input_pk_name = input_qs.model._meta.pk.attname
-        input_ids = (
-            "("
-            + ", ".join(
-                str(id_) for id_ in input_qs.values_list(input_pk_name, flat=True)
-            )
-            + ")"
+        columns_str = "".join(
+            f"input.{qn(opts.get_field(name).column)} AS {qn(name)}, "
+            for name in columns
+        )
+        kept_columns_str = "".join(f"clipped.{qn(name)}, " for name in columns)
+
+        # The input is selected by a subquery, however large it is
+        input_pk_column = qn(opts.pk.column)
+        input_ids_sql, input_ids_params = (
+            input_qs.order_by()
+            .values_list("pk")
+            .query.get_compiler(connection=connection)
+            .as_sql()
         )
 
         # Query based on: https://postgis.net/docs/ST_Intersection.html
+        # The materialized CTE keeps the planner from computing the intersection
+        # again for the emptiness check.
         query = f"""-- noinspection SqlResolve
-                        WITH mask AS (SELECT ST_GeomFromEWKT(%s) AS geom)
-                        SELECT clipped.*, ST_Area(clipped.geom::geography) AS area
-                        FROM (
-                            SELECT
-                                {columns_str}
-                                ST_Multi(
-                                    ST_Buffer(ST_Intersection(mask.geom, input.geom), 0.0)
-                                ) AS geom
-                            FROM (SELECT * FROM {input_table_name} WHERE {input_pk_name} IN {input_ids}) AS input
-                            CROSS JOIN mask
-                            WHERE ST_Intersects(mask.geom, input.geom)
-                            AND NOT ST_IsEmpty(ST_Buffer(ST_Intersection(mask.geom, input.geom), 0.0))) clipped;
-                    """
-
-        with connection.cursor() as cursor:
-            cursor.execute(query, [mask_geom.ewkt])
-            columns = [column[0] for column in cursor.description]
-            features = [
-                dict(zip(columns, row, strict=False)) for row in cursor.fetchall()
-            ]
-        # The cursor gets the geometry only as string representation. Create a geometry objects from it with GEOS API
-        for feature in features:
-            feature["geom"] = GEOSGeometry(feature["geom"])
-
-        return features
+            WITH mask AS (SELECT ST_GeomFromEWKB(%s) AS geom),
+            clipped AS MATERIALIZED (
+                SELECT
+                    {columns_str}
+                    ST_Multi(
+                        ST_Buffer(ST_Intersection(mask.geom, input.geom), 0.0)
+                    ) AS geom
+                FROM {qn(opts.db_table)} AS input
+                CROSS JOIN mask
+                WHERE input.{input_pk_column} IN ({input_ids_sql})
+                AND ST_Intersects(mask.geom, input.geom)
+            )
+            SELECT
+                {kept_columns_str}
+                ST_AsEWKB(clipped.geom) AS geom,
+                ST_Area(clipped.geom::geography) AS area
+            FROM clipped
+            WHERE NOT ST_IsEmpty(clipped.geom)
+        """
+        params = [bytes(mask_geom.ewkb), *input_ids_params]
+
+        def iter_features():
+            # The number of polygons to clip is only counted if anyone listens
+            total = None
+            if is_reporting_progress():
+                total = input_qs.filter(geom__intersects=mask_geom).count()
+            clipped = 0
+            with connection.chunked_cursor() as cursor:
+                cursor.execute(query, params)
+                while rows := cursor.fetchmany(chunk_size):
+                    names = [column[0] for column in cursor.description]
+                    for row in rows:
+                        feature = dict(zip(names, row, strict=True))
+                        # Geometries arrive as EWKB
+                        feature["geom"] = GEOSGeometry(feature["geom"])
+                        yield feature
+                    clipped += len(rows)
+                    report_progress("clip", clipped, total)
+            report_progress("clip", clipped, clipped, force=True)
+
+        return iter_features()
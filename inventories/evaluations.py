@@ -1,15 +1,32 @@
 import logging
 
+from django.db.models import Prefetch
+
 from distributions.models import TemporalDistribution, Timestep
 from distributions.plots import BarChart, DataSet
-from layer_manager.models import LayerAggregatedDistribution
+from layer_manager.models import (
+    LayerAggregatedDistribution,
+    LayerAggregatedValue,
+    serialize_aggregated_distributions,
+)
 from materials.models import MaterialComponentGroup
 from utils.exceptions import UnitMismatchError
 
+from .models import Scenario, ScenarioStatus
+
 logger = logging.getLogger(__name__)
 
+# Version of the layout stored in Scenario.result_summary. Snapshots of another
+# version are recomputed when they are read.
+RESULT_SUMMARY_VERSION = 1
+
 
 class ScenarioResult:
+    """
+    Evaluates the result layers of a scenario. All layers are loaded up front with their aggregated values and
+    distributions, so the summaries and charts cost a constant number of queries regardless of the number of layers.
+    """
+
     scenario = None
     layers = None
     feedstocks = None
@@ -17,16 +34,31 @@ class ScenarioResult:
 
     def __init__(self, scenario):
         self.scenario = scenario
-        self.layers = scenario.layer_set.all()
+        self.layers = list(
+            scenario.layer_set.filter(partition__isnull=True)
+            .select_related("feedstock", "algorithm__geodataset")
+            .prefetch_related(
+                Prefetch(
+                    "layeraggregatedvalue_set",
+                    queryset=LayerAggregatedValue.objects.order_by("pk"),
+                ),
+                Prefetch(
+                    "layeraggregateddistribution_set",
+                    queryset=LayerAggregatedDistribution.objects.select_related(
+                        "distribution"
+                    ).order_by("pk"),
+                ),
+            )
+        )
         self.feedstocks = scenario.feedstocks()
         self.timesteps = self.homogenize_timesteps()
 
     def homogenize_timesteps(self):
-        if not self.layers.exists():
+        if not self.layers:
             return []
-        timestep_ids = set()
+        distribution_ids = set()
         for layer in self.layers:
-            agg_dist = layer.layeraggregateddistribution_set.first()
+            agg_dist = next(iter(layer.layeraggregateddistribution_set.all()), None)
             if agg_dist is None:
                 logger.warning(
                     "Layer %s (pk=%s) has no aggregated distribution.",
@@ -41,39 +73,60 @@ class ScenarioResult:
                     layer.pk,
                 )
                 continue
-            timestep_ids.update(
-                agg_dist.distribution.timestep_set.values_list("id", flat=True)
+            distribution_ids.add(agg_dist.distribution_id)
+        if not distribution_ids:
+            return []
+        return list(Timestep.objects.filter(distribution_id__in=distribution_ids))
+
+    @staticmethod
+    def aggregated_value(layer, name):
+        """
+        Returns the prefetched aggregated value of the layer with the given name. Raises like a get() on the related
+        manager would.
+        """
+        matches = [
+            agg_value
+            for agg_value in layer.layeraggregatedvalue_set.all()
+            if agg_value.name == name
+        ]
+        if not matches:
+            raise LayerAggregatedValue.DoesNotExist(
+                f"Layer {layer.pk} has no aggregated value '{name}'."
+            )
+        if len(matches) > 1:
+            raise LayerAggregatedValue.MultipleObjectsReturned(
+                f"Layer {layer.pk} has {len(matches)} aggregated values '{name}'."
             )
-        return list(Timestep.objects.filter(id__in=timestep_ids))
+        return matches[0]
 
     def material_component_groups(self):
         group_settings = []
+        default_group = None
         material_settings = self.scenario.feedstocks()
         for material_setting in material_settings:
             for (
                 group_setting
             ) in material_setting.materialcomponentgroupsettings_set.all():
-                if not group_setting.group == MaterialComponentGroup.objects.default():
+                if default_group is None:
+                    default_group = MaterialComponentGroup.objects.default()
+                if not group_setting.group == default_group:
                     group_settings.append(group_setting)
         return list(set(group_settings))
 
     def distributions(self):
         return TemporalDistribution.objects.filter(
-            id__in=[
-                ad["distribution"]
-                for ad in LayerAggregatedDistribution.objects.filter(
-                    layer__in=self.layers
-                )
-                .values("distribution")
-                .distinct()
-            ]
+            id__in={
+                agg_dist.distribution_id
+                for layer in self.layers
+                for agg_dist in layer.layeraggregateddistribution_set.all()
+            }
         )
 
     def total_production(self):
         production_value = 0
         unit = None
         for layer in self.layers:
-            agg_value = layer.layeraggregatedvalue_set.get(name="Total production")
+            agg_value = self.aggregated_value(layer, "Total production")
             if unit is None:
                 unit = agg_value.unit
             if agg_value.unit != unit:
@@ -88,7 +141,7 @@ class ScenarioResult:
         data = {}
         unit = None
         for layer in self.layers:
-            agg_value = layer.layeraggregatedvalue_set.get(name="Total production")
+            agg_value = self.aggregated_value(layer, "Total production")
             unit = agg_value.unit
             data[layer.feedstock.name] = agg_value.value
         production = DataSet(
@@ -159,14 +212,16 @@ class ScenarioResult:
     #     return components
 
     def seasonal_production_per_component(self):
-        datasets = []
+        agg_dists = {}
         for layer in self.layers:
-            agg_dist = layer.layeraggregateddistribution_set.filter(
-                name="Seasonal production per component"
-            ).first()
-            if agg_dist is None:
-                continue
-            for d in agg_dist.serialized:
+            for agg_dist in layer.layeraggregateddistribution_set.all():
+                if agg_dist.name == "Seasonal production per component":
+                    agg_dists[layer] = agg_dist
+                    break
+        serialized = serialize_aggregated_distributions(agg_dists.values())
+        datasets = []
+        for layer, agg_dist in agg_dists.items():
+            for d in serialized[agg_dist.pk]:
                 d["label"] = f"{layer.feedstock.name}: {d['label']}"
                 datasets.append(DataSet(**d))
         return datasets
@@ -183,6 +238,7 @@ class ScenarioResult:
         return layer_summaries
 
     def summary_dict(self):
+        production_per_feedstock = self.total_production_per_feedstock()
         summary = {
             "scenario": {
                 "name": self.scenario.name,
@@ -194,7 +250,7 @@ class ScenarioResult:
                     "composition": {
                         "materials": [
                             {"name": feedstock, "amount": amount, "unit": "Mg/a"}
-                            for feedstock, amount in self.total_production_per_feedstock().items()
+                            for feedstock, amount in production_per_feedstock.items()
                         ]
                     },
                 }
@@ -202,3 +258,65 @@ class ScenarioResult:
             ],
         }
         return summary
+
+    def layer_dicts(self):
+        """
+        JSON-serializable counterpart of Layer.as_dict with the entries the result page renders.
+        """
+        return [
+            {
+                "name": layer.name,
+                "geom_type": layer.geom_type,
+                "table_name": layer.table_name,
+                "feedstock": {"id": layer.feedstock_id, "name": layer.feedstock.name},
+                "inventory_algorithm": {
+                    "id": layer.algorithm_id,
+                    "name": layer.algorithm.name,
+                    "geodataset": str(layer.algorithm.geodataset),
+                },
+                "aggregated_results": [
+                    {
+                        "name": aggregate.name,
+                        "value": int(aggregate.value),
+                        "unit": aggregate.unit,
+                    }
+                    for aggregate in layer.layeraggregatedvalue_set.all()
+                ],
+            }
+            for layer in self.layers
+        ]
+
+    def snapshot(self):
+        """
+        Returns everything the result page and the summary download show, as stored in Scenario.result_summary.
+        """
+        return {
+            "version": RESULT_SUMMARY_VERSION,
+            "layers": self.layer_dicts(),
+            "charts": self.get_charts(),
+            "summary": self.summary_dict(),
+        }
+
+
+def store_scenario_result_summary(scenario):
+    """
+    Computes the result snapshot of a scenario and stores it in Scenario.result_summary. Returns the snapshot.
+    """
+    snapshot = ScenarioResult(scenario).snapshot()
+    Scenario.objects.filter(pk=scenario.pk).update(result_summary=snapshot)
+    scenario.result_summary = snapshot
+    return snapshot
+
+
+def get_scenario_result_summary(scenario):
+    """
+    Returns the stored result snapshot of a scenario. Finished scenarios evaluated before snapshots existed, or with an
+    outdated snapshot layout, get theirs computed and stored on first access. Results of unfinished evaluations are
+    computed but not stored.
+    """
+    snapshot = scenario.result_summary
+    if snapshot and snapshot.get("version") == RESULT_SUMMARY_VERSION:
+        return snapshot
+    if scenario.status != ScenarioStatus.Status.FINISHED:
+        return ScenarioResult(scenario).snapshot()
+    return store_scenario_result_summary(scenario)
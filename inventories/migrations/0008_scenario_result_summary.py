@@ -0,0 +1,17 @@
+# Generated by Django 6.0.5 on 2026-10-17 14:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inventories", "0007_scenariostatus_failed_algorithm_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scenario",
+            name="result_summary",
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
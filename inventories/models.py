@@ -1,9 +1,12 @@
+import hashlib
 import importlib
+import json
 import pkgutil
 
 from celery.result import AsyncResult
 from celery.states import READY_STATES
 from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
 from django.core.validators import RegexValidator
 from django.db import models, transaction
 from django.db.models.query import QuerySet
@@ -158,10 +161,55 @@ class InventoryAlgorithm(models.Model):
     def import_module(self):
         return importlib.import_module(self.module_path)
 
+    def source_dataset_version(self):
+        """
+        Returns a string that changes whenever the data of the geodataset of this algorithm changes: the change time of
+        the geodataset record and, if the model holding its features can be resolved, the change counter of that model.
+        Returns None if that model has no change counter (see maps.versioning), as neither its row count nor its
+        highest id change with edits in place; results of such algorithms are not reused.
+        """
+        from maps.runtime_adapters import get_dataset_runtime_adapter
+        from maps.versioning import get_dataset_version_state, versioned_keys_for
+
+        geodataset = self.geodataset
+        parts = [str(geodataset.pk), str(geodataset.lastmodified_at)]
+        try:
+            model = getattr(get_dataset_runtime_adapter(geodataset), "model", None)
+        except (ImproperlyConfigured, LookupError):
+            model = None
+        if model is not None:
+            keys = versioned_keys_for(model)
+            if not keys:
+                return None
+            parts.append(get_dataset_version_state(keys)[0])
+        return ":".join(parts)
+
+    def execution_input_state(self, kwargs):
+        """
+        Returns the state of the rows the algorithm reads besides its source dataset and parameters (see
+        inventories.algorithms.reads_inputs), or None if its results are not reused (see
+        inventories.algorithms.not_reusable).
+        """
+        module = self.import_module()
+        function = getattr(module.InventoryAlgorithms, self.function_name, None)
+        if not getattr(function, "reusable", True):
+            return None
+        input_state = getattr(function, "input_state", None)
+        return input_state(**kwargs) if input_state else {}
+
     def execute(self, **kwargs):
         module = self.import_module()
         return getattr(module.InventoryAlgorithms, self.function_name)(**kwargs)
 
+    def is_partitionable(self):
+        """
+        Returns True if the algorithm can be run in partitions of the catchment (see
+        inventories.algorithms.partitionable).
+        """
+        module = self.import_module()
+        function = getattr(module.InventoryAlgorithms, self.function_name, None)
+        return getattr(function, "partitionable", False)
+
     def default_values(self):
         """
         Returns a queryset of all default values of parameters of this algorithm.
@@ -319,6 +367,8 @@ class Scenario(NamedUserCreatedObject):
     catchment = models.ForeignKey(
         Catchment, on_delete=models.CASCADE, null=True, related_name="scenarios"
     )  # TODO: make many-to-many?
+    # Snapshot of the evaluated results, see inventories.evaluations.ScenarioResult.snapshot
+    result_summary = models.JSONField(blank=True, null=True, editable=False)
 
     # TODO: Add duplicate functionality
 
@@ -525,9 +575,15 @@ class Scenario(NamedUserCreatedObject):
     #     self.delete_configuration()  # TODO: Does this happen automatically through cascading?
     #     super().delete()
 
-    def delete_result_layers(self):
-        for layer in self.layer_set.all():
+    def delete_result_layers(self, keep=()):
+        """
+        Deletes the result layers of this scenario, except the layers given in keep.
+        """
+        keep_ids = {layer.pk for layer in keep}
+        for layer in self.layer_set.exclude(pk__in=keep_ids):
             layer.delete()
+        self.result_summary = None
+        Scenario.objects.filter(pk=self.pk).update(result_summary=None)
 
     def delete_configuration(self):
         """
@@ -630,6 +686,78 @@ class Scenario(NamedUserCreatedObject):
             for execution in feedstock_config.values()
         ]
 
+    def catchment_geometry_version(self):
+        """
+        Returns a string that changes whenever the geometry of the catchment of this scenario changes. Changes of the
+        borders of a region touch the region (see maps.signals).
+        """
+        state = (
+            Catchment.objects.filter(pk=self.catchment_id)
+            .values_list(
+                "lastmodified_at",
+                "region_id",
+                "region__lastmodified_at",
+                "region__borders_id",
+            )
+            .first()
+        )
+        return f"{self.catchment_id}:" + ":".join(str(part) for part in state or ())
+
+    @staticmethod
+    def execution_input_hash(
+        execution, catchment_version, source_version, input_state=None
+    ):
+        """
+        Content address of an execution of the execution plan. Executions with the same hash produce the same result
+        layer.
+        """
+        payload = json.dumps(
+            {
+                "task_reference": execution["algorithm"].task_reference,
+                "kwargs": execution["kwargs"],
+                "catchment": catchment_version,
+                "source": source_version,
+                "inputs": input_state or {},
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def reusable_result_layers(self, execution_plan):
+        """
+        Adds the input_hash of each execution to the execution plan and returns the existing result layers that were
+        computed from the same input, i.e. that do not need to be computed again, by (algorithm id, feedstock id). The
+        input covers the catchment, the source dataset, the parameters and the further rows the algorithm reads.
+        """
+        catchment_version = self.catchment_geometry_version()
+        source_versions = {}
+        layers = {
+            (layer.algorithm_id, layer.feedstock_id): layer
+            for layer in self.layer_set.filter(partition__isnull=True).exclude(
+                input_hash=""
+            )
+        }
+        reusable = {}
+        for execution in execution_plan:
+            algorithm = execution["algorithm"]
+            if algorithm.id not in source_versions:
+                source_versions[algorithm.id] = algorithm.source_dataset_version()
+            input_state = None
+            if source_versions[algorithm.id] is not None:
+                input_state = algorithm.execution_input_state(execution["kwargs"])
+            if input_state is None:
+                execution["input_hash"] = ""
+                continue
+            execution["input_hash"] = self.execution_input_hash(
+                execution, catchment_version, source_versions[algorithm.id], input_state
+            )
+            key = (algorithm.id, execution["kwargs"]["feedstock_id"])
+            layer = layers.get(key)
+            if layer is not None and layer.input_hash == execution["input_hash"]:
+                reusable[key] = layer
+        return reusable
+
     def serialize_inventory_execution_plan(self, execution_plan):
         inventory_config = {}
         for execution in execution_plan:
@@ -0,0 +1,85 @@
+"""
+Progress reporting of inventory algorithm runs.
+
+``run_inventory_algorithm`` activates a reporter for the duration of a run.
+The algorithms and the layer writer call ``report_progress`` with the stage
+they are in and how many features of how many they have processed, without
+knowing about Celery. The reporter publishes this as the ``PROGRESS`` state of
+the task, like ``export_user_created_object_to_file`` does, where
+``get_evaluation_status`` picks it up. Outside of a run, e.g. in tests or the
+shell, ``report_progress`` does nothing.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+# Minimum number of seconds between two updates of the task state, so that
+# reporting per chunk does not flood the result backend.
+PROGRESS_REPORT_INTERVAL = 1.0
+
+_active = threading.local()
+
+
+class ProgressReporter:
+    """Publishes the progress of one algorithm run as the state of its task."""
+
+    def __init__(self, task, algorithm_name="", interval=PROGRESS_REPORT_INTERVAL):
+        self.task = task
+        self.algorithm_name = algorithm_name
+        self.interval = interval
+        self._last_report = None
+
+    def __call__(self, stage, current, total=None, force=False):
+        if not self.task.request.id:
+            # Run synchronously, e.g. with Task.run, so there is no state to set
+            return
+        now = time.monotonic()
+        if (
+            not force
+            and self._last_report is not None
+            and now - self._last_report < self.interval
+        ):
+            return
+        self._last_report = now
+        percent = None
+        if total:
+            percent = min(int(current / total * 100), 100)
+        self.task.update_state(
+            state="PROGRESS",
+            meta={
+                "algorithm": self.algorithm_name,
+                "stage": stage,
+                "current": current,
+                "total": total,
+                "percent": percent,
+            },
+        )
+
+
+@contextmanager
+def progress_reporting(reporter):
+    """Route ``report_progress`` calls of the current thread to ``reporter``."""
+    previous = getattr(_active, "reporter", None)
+    _active.reporter = reporter
+    try:
+        yield reporter
+    finally:
+        _active.reporter = previous
+
+
+def is_reporting_progress():
+    """Return True if a reporter is active, e.g. to skip counting totals otherwise."""
+    return getattr(_active, "reporter", None) is not None
+
+
+def report_progress(stage, current, total=None, force=False):
+    """Report that ``current`` of ``total`` features of ``stage`` are processed.
+
+    ``total`` is ``None`` if it is not known, e.g. while streaming features.
+    Reports are throttled to one per ``PROGRESS_REPORT_INTERVAL`` unless
+    ``force`` is set, which stages use for their last report.
+    """
+    reporter = getattr(_active, "reporter", None)
+    if reporter is not None:
+        reporter(stage, current, total, force=force)
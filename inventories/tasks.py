@@ -1,11 +1,21 @@
+import logging
+import time
+
 from celery import chord
+from django.conf import settings
 from django.db import transaction
 
 from brit.celery import app
+from inventories.evaluations import store_scenario_result_summary
+from inventories.exceptions import EmptyQueryset
 from inventories.models import InventoryAlgorithm, RunningTask, Scenario, ScenarioStatus
+from inventories.progress import ProgressReporter, progress_reporting
+from layer_manager.exceptions import NoFeaturesProvided
 from layer_manager.models import Layer
 from materials.models import SampleSeries
 
+logger = logging.getLogger(__name__)
+
 
 @app.task
 def mark_inventory_failed(scenario_id, algorithm_id=None, failure_message=""):
@@ -34,31 +44,60 @@ def mark_inventory_failed(scenario_id, algorithm_id=None, failure_message=""):
 
 
 @app.task
-def run_inventory(scenario_id):
+def run_inventory(scenario_id, partitions=None):
+    """
+    Evaluates the scenario with one chord member per execution of its execution plan. With more than one partition
+    (default: settings.INVENTORY_PARTITIONS), partitionable algorithms (see inventories.algorithms.partitionable) are
+    run per tile of the catchment instead, as separate chord members, so that a large catchment is processed by
+    several workers at once. finalize_inventory merges the partial layers of the tiles into the result layer.
+    """
+    if partitions is None:
+        partitions = getattr(settings, "INVENTORY_PARTITIONS", 1)
     scenario = Scenario.objects.get(id=scenario_id)
 
     scenario.set_status(ScenarioStatus.Status.RUNNING)
 
     try:
-        scenario.delete_result_layers()
-
+        # Executions whose input did not change since the last evaluation keep
+        # their result layer instead of being computed again.
         execution_plan = scenario.inventory_execution_plan()
+        reusable_layers = scenario.reusable_result_layers(execution_plan)
+        scenario.delete_result_layers(keep=reusable_layers.values())
+
+        executions = [
+            execution
+            for execution in execution_plan
+            if (execution["algorithm"].id, execution["kwargs"]["feedstock_id"])
+            not in reusable_layers
+        ]
         signatures = []
-        for execution in execution_plan:
-            signatures.append(
-                run_inventory_algorithm.s(
-                    execution["algorithm"].id,
-                    **execution["kwargs"],
+        task_executions = []
+        for execution in executions:
+            count = 1
+            if partitions > 1 and execution["algorithm"].is_partitionable():
+                count = partitions
+            for index in range(count):
+                kwargs = execution["kwargs"]
+                if count > 1:
+                    kwargs = {**kwargs, "partition": {"index": index, "count": count}}
+                signatures.append(
+                    run_inventory_algorithm.s(
+                        execution["algorithm"].id,
+                        input_hash=execution["input_hash"],
+                        **kwargs,
+                    )
                 )
-            )
+                task_executions.append(execution)
 
         callback = finalize_inventory.s(scenario.id)
         callback.on_error(mark_inventory_failed.si(scenario.id))
+        if not signatures:
+            return callback.delay([])
         task_chord = chord(signatures, callback)
         result = task_chord.delay()
 
         # store uuids of running tasks in the database, so we can track the progress from anywhere
-        for task, execution in zip(task_chord.tasks, execution_plan, strict=False):
+        for task, execution in zip(task_chord.tasks, task_executions, strict=False):
             RunningTask.objects.create(
                 scenario=scenario,
                 uuid=task.id,
@@ -75,27 +114,83 @@ def run_inventory(scenario_id):
 
 
 @app.task(bind=True)
-def run_inventory_algorithm(self, algorithm_id, **kwargs):
+def run_inventory_algorithm(self, algorithm_id, input_hash="", **kwargs):
     algorithm = InventoryAlgorithm.objects.get(id=algorithm_id)
     scenario_id = kwargs["scenario_id"]
+    partition = kwargs.get("partition")
+    started = time.perf_counter()
     try:
-        results = algorithm.execute(**kwargs)
-        layer_values = {
-            "name": algorithm.function_name,
-            "scenario": Scenario.objects.get(id=scenario_id),
-            "feedstock": SampleSeries.objects.get(id=kwargs["feedstock_id"]),
-            "algorithm": algorithm,
-            "results": results,
-        }
-        Layer.objects.create_or_replace(**layer_values)
+        # The algorithm and the layer writer report their progress as the
+        # state of this task, see get_evaluation_status.
+        with progress_reporting(ProgressReporter(self, algorithm.name)):
+            results = algorithm.execute(**kwargs)
+            layer_values = {
+                "name": algorithm.function_name,
+                "scenario": Scenario.objects.get(id=scenario_id),
+                "feedstock": SampleSeries.objects.get(id=kwargs["feedstock_id"]),
+                "algorithm": algorithm,
+                "results": results,
+                "input_hash": input_hash,
+                "partition": partition["index"] if partition else None,
+            }
+            layer, _feature_collection = Layer.objects.create_or_replace(**layer_values)
     except Exception as error:
-        mark_inventory_failed.run(
-            scenario_id,
-            algorithm.id,
-            str(error),
+        if partition is not None and isinstance(
+            error, (EmptyQueryset, NoFeaturesProvided)
+        ):
+            # A tile without features adds nothing to the merged result layer
+            layer = None
+        else:
+            mark_inventory_failed.run(
+                scenario_id,
+                algorithm.id,
+                str(error),
+            )
+            raise
+    evaluation_seconds = time.perf_counter() - started
+    # Truthy result for finalize_inventory, reporting the cost of the run.
+    result = {"algorithm": algorithm.id, "layer": None}
+    if layer is not None:
+        layer.evaluation_seconds = evaluation_seconds
+        layer.save(update_fields=["evaluation_seconds"])
+        result.update(layer=layer.id, **layer.write_stats.as_dict())
+    result["evaluation_seconds"] = round(evaluation_seconds, 3)
+    if partition is not None:
+        result.update(
+            feedstock=kwargs["feedstock_id"],
+            partition=partition["index"],
+            input_hash=input_hash,
         )
-        raise
-    return True
+    return result
+
+
+def merge_partitioned_results(results):
+    """
+    Merges the partial layers of the partitioned executions among the results of run_inventory_algorithm into their
+    result layers. The wall time of the merged layer is the sum of the wall times of its partitions.
+    """
+    partitioned = {}
+    for result in results:
+        if result.get("partition") is not None:
+            key = (result["algorithm"], result["feedstock"])
+            partitioned.setdefault(key, []).append(result)
+
+    for partition_results in partitioned.values():
+        layers = list(
+            Layer.objects.filter(
+                pk__in=[result["layer"] for result in partition_results]
+            )
+        )
+        if not layers:
+            raise NoFeaturesProvided(partition_results)
+        with transaction.atomic():
+            layer, _feature_collection = Layer.objects.merge_partitions(
+                layers, input_hash=partition_results[0]["input_hash"]
+            )
+            layer.evaluation_seconds = sum(
+                result["evaluation_seconds"] for result in partition_results
+            )
+            layer.save(update_fields=["evaluation_seconds"])
 
 
 @app.task
@@ -103,7 +198,16 @@ def finalize_inventory(results, scenario_id):
     if not all(results):
         raise Exception
 
+    merge_partitioned_results(results)
+
     # remove finished tasks from db
     RunningTask.objects.filter(scenario=scenario_id).delete()
     scenario = Scenario.objects.get(id=scenario_id)
+    try:
+        store_scenario_result_summary(scenario)
+    except Exception:
+        # The result page computes the snapshot itself if it is missing.
+        logger.exception(
+            "Could not store the result summary of scenario %s", scenario_id
+        )
     scenario.set_status(ScenarioStatus.Status.FINISHED)
@@ -0,0 +1,115 @@
+from django.contrib.gis.geos import MultiPolygon, Polygon
+from django.test import TestCase
+
+from sources.urban_green_spaces.models import HamburgGreenAreas
+
+from ..algorithms import InventoryAlgorithmsBase
+from ..exceptions import EmptyQueryset
+
+
+class ClipPolygonsTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for name, offset in (("Inside", 0), ("Partial", 2), ("Outside", 10)):
+            HamburgGreenAreas.objects.create(
+                anlagenname=name,
+                geom=MultiPolygon(
+                    Polygon(
+                        (
+                            (offset, 0),
+                            (offset, 1),
+                            (offset + 1, 1),
+                            (offset + 1, 0),
+                            (offset, 0),
+                        )
+                    ),
+                    srid=4326,
+                ),
+            )
+        cls.mask = Polygon(((0, 0), (0, 1), (2.5, 1), (2.5, 0), (0, 0)), srid=4326)
+
+    def test_streams_clipped_features_in_chunks(self):
+        features = InventoryAlgorithmsBase.clip_polygons(
+            HamburgGreenAreas.objects.all(),
+            self.mask,
+            keep_columns=["anlagenname", "not_a_column"],
+            chunk_size=1,
+        )
+
+        features = {feature["anlagenname"]: feature for feature in features}
+
+        self.assertEqual(set(features), {"Inside", "Partial"})
+        self.assertEqual(set(features["Inside"]), {"anlagenname", "geom", "area"})
+        self.assertEqual(features["Partial"]["geom"].geom_type, "MultiPolygon")
+        self.assertAlmostEqual(features["Partial"]["geom"].area, 0.5)
+        self.assertAlmostEqual(
+            features["Partial"]["area"] * 2, features["Inside"]["area"], delta=1e6
+        )
+
+    def test_only_clips_the_input_queryset(self):
+        features = list(
+            InventoryAlgorithmsBase.clip_polygons(
+                HamburgGreenAreas.objects.filter(anlagenname="Partial"), self.mask
+            )
+        )
+
+        self.assertEqual(len(features), 1)
+
+    def test_empty_input_raises(self):
+        with self.assertRaises(EmptyQueryset):
+            InventoryAlgorithmsBase.clip_polygons(
+                HamburgGreenAreas.objects.none(), self.mask
+            )
+
+
+class InPartitionTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for name, offset in (("West", 0), ("Border", 1.2), ("East", 3)):
+            HamburgGreenAreas.objects.create(
+                anlagenname=name,
+                geom=MultiPolygon(
+                    Polygon(
+                        (
+                            (offset, 0),
+                            (offset, 1),
+                            (offset + 1, 1),
+                            (offset + 1, 0),
+                            (offset, 0),
+                        )
+                    ),
+                    srid=4326,
+                ),
+            )
+        cls.mask = Polygon(((0, 0), (0, 1), (4, 1), (4, 0), (0, 0)), srid=4326)
+
+    def test_partition_bounds_split_the_longer_side_into_open_ended_strips(self):
+        bounds = [
+            InventoryAlgorithmsBase.partition_bounds(
+                self.mask, 4326, {"index": index, "count": 2}
+            )
+            for index in range(2)
+        ]
+
+        self.assertEqual(bounds, [(None, None, 2.0, None), (2.0, None, None, None)])
+
+    def test_every_feature_belongs_to_exactly_one_partition(self):
+        names = [
+            set(
+                InventoryAlgorithmsBase.in_partition(
+                    HamburgGreenAreas.objects.all(),
+                    self.mask,
+                    {"index": index, "count": 2},
+                ).values_list("anlagenname", flat=True)
+            )
+            for index in range(2)
+        ]
+
+        self.assertEqual(names, [{"West", "Border"}, {"East"}])
+
+    def test_without_partition_the_queryset_is_unchanged(self):
+        queryset = HamburgGreenAreas.objects.all()
+
+        self.assertIs(
+            InventoryAlgorithmsBase.in_partition(queryset, self.mask, None), queryset
+        )
@@ -14,14 +14,20 @@ from materials.models import SampleSeries
 from sources.greenhouses.inventory.algorithms import (
     InventoryAlgorithms as GreenhouseInventoryAlgorithms,
 )
+from sources.roadside_trees.models import HamburgRoadsideTrees
 
-from ..evaluations import ScenarioResult
+from ..evaluations import (
+    ScenarioResult,
+    get_scenario_result_summary,
+    store_scenario_result_summary,
+)
 from ..exceptions import BlockedRunningScenario
 from ..models import (
     GeoDataset,
     InventoryAlgorithm,
     InventoryAlgorithmParameter,
     InventoryAlgorithmParameterValue,
+    InventoryAmountShare,
     Material,
     RunningTask,
     Scenario,
@@ -640,3 +646,196 @@ class ScenarioResultHomogenizeTimestepsTestCase(TestCase):
 
         result = ScenarioResult(self.scenario)
         self.assertEqual(result.timesteps, [])
+
+
+class ScenarioResultSnapshotTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        region = Region.objects.create(name="Snapshot Region")
+        catchment = Catchment.objects.create(name="Snapshot Catchment", region=region)
+        cls.scenario = Scenario.objects.create(
+            name="Snapshot Scenario", region=region, catchment=catchment
+        )
+        cls.geodataset = GeoDataset.objects.create(
+            name="Snapshot Dataset", region=region
+        )
+        cls.material = Material.objects.create(name="Snapshot Feedstock")
+
+    def add_layer(self, index):
+        algorithm = InventoryAlgorithm.objects.create(
+            name=f"Snapshot Algorithm {index}", geodataset=self.geodataset
+        )
+        feedstock = SampleSeries.objects.create(
+            name=f"Snapshot Series {index}", material=self.material
+        )
+        layer = Layer.objects.create(
+            name=f"L{index}",
+            geom_type="Point",
+            table_name=f"test_snapshot_layer{index}",
+            scenario=self.scenario,
+            feedstock=feedstock,
+            algorithm=algorithm,
+        )
+        layer.add_aggregated_values(
+            [{"name": "Total production", "value": 10.0 * index, "unit": "Mg/a"}]
+        )
+        return layer
+
+    def count_snapshot_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            ScenarioResult(self.scenario).snapshot()
+        return len(queries)
+
+    def test_snapshot_queries_do_not_grow_with_the_number_of_layers(self):
+        self.add_layer(1)
+        queries_for_one_layer = self.count_snapshot_queries()
+        self.add_layer(2)
+        self.add_layer(3)
+
+        self.assertEqual(self.count_snapshot_queries(), queries_for_one_layer)
+
+    def test_finished_scenario_is_rendered_from_the_stored_snapshot(self):
+        self.add_layer(1)
+        self.scenario.set_status(ScenarioStatus.Status.FINISHED)
+        store_scenario_result_summary(self.scenario)
+        scenario = Scenario.objects.get(pk=self.scenario.pk)
+
+        with self.assertNumQueries(0):
+            snapshot = get_scenario_result_summary(scenario)
+
+        self.assertEqual(
+            snapshot["layers"][0]["aggregated_results"],
+            [{"name": "Total production", "value": 10, "unit": "Mg/a"}],
+        )
+        self.assertEqual(
+            snapshot["charts"]["productionPerFeedstockBarChart"]["data"][0]["data"],
+            [10.0],
+        )
+
+    def test_deleting_the_result_layers_discards_the_snapshot(self):
+        self.add_layer(1)
+        store_scenario_result_summary(self.scenario)
+
+        self.scenario.delete_result_layers()
+
+        self.assertIsNone(Scenario.objects.get(pk=self.scenario.pk).result_summary)
+
+
+class ScenarioReusableResultLayersTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        region = Region.objects.create(name="Reuse Region")
+        catchment = Catchment.objects.create(name="Reuse Catchment", region=region)
+        cls.scenario = Scenario.objects.create(
+            name="Reuse Scenario", region=region, catchment=catchment
+        )
+        cls.algorithm = InventoryAlgorithm.objects.create(
+            name="Reuse Algorithm",
+            source_module="flexibi_hamburg",
+            function_name="avg_point_yield",
+            geodataset=GeoDataset.objects.create(name="Reuse Dataset", region=region),
+        )
+        cls.feedstock = SampleSeries.objects.create(
+            name="Reuse Series", material=Material.objects.create(name="Reuse")
+        )
+
+    def tearDown(self):
+        apps.all_models["layer_manager"].pop("test_reuse_layer", None)
+
+    def execution_plan(self, point_yield=1.0):
+        return [
+            {
+                "algorithm": self.algorithm,
+                "kwargs": {
+                    "catchment_id": self.scenario.catchment_id,
+                    "scenario_id": self.scenario.id,
+                    "feedstock_id": self.feedstock.id,
+                    "point_yield": {"value": point_yield, "standard_deviation": 0},
+                },
+            }
+        ]
+
+    def test_layers_computed_from_the_same_input_are_reused(self):
+        execution_plan = self.execution_plan()
+        self.assertEqual(self.scenario.reusable_result_layers(execution_plan), {})
+        layer = Layer.objects.create(
+            name="Reuse",
+            geom_type="Point",
+            table_name="test_reuse_layer",
+            scenario=self.scenario,
+            feedstock=self.feedstock,
+            algorithm=self.algorithm,
+            input_hash=execution_plan[0]["input_hash"],
+        )
+
+        self.assertEqual(
+            self.scenario.reusable_result_layers(self.execution_plan()),
+            {(self.algorithm.id, self.feedstock.id): layer},
+        )
+        self.assertEqual(
+            self.scenario.reusable_result_layers(self.execution_plan(2.0)), {}
+        )
+
+        self.scenario.catchment.save()
+        self.assertEqual(
+            self.scenario.reusable_result_layers(self.execution_plan()), {}
+        )
+
+    def test_edits_in_place_change_the_source_dataset_version(self):
+        tree = HamburgRoadsideTrees.objects.create(baumid=1, stammumfang=100)
+        adapter = SimpleNamespace(model=HamburgRoadsideTrees)
+        with patch(
+            "maps.runtime_adapters.get_dataset_runtime_adapter", return_value=adapter
+        ):
+            before = self.algorithm.source_dataset_version()
+            tree.stammumfang = 120
+            tree.save()
+
+            self.assertNotEqual(self.algorithm.source_dataset_version(), before)
+
+    def test_layers_of_unversioned_sources_are_not_reused(self):
+        adapter = SimpleNamespace(model=InventoryAlgorithmParameter)
+        execution_plan = self.execution_plan()
+        with patch(
+            "maps.runtime_adapters.get_dataset_runtime_adapter", return_value=adapter
+        ):
+            reusable = self.scenario.reusable_result_layers(execution_plan)
+
+        self.assertEqual(reusable, {})
+        self.assertEqual(execution_plan[0]["input_hash"], "")
+
+    def test_layers_are_not_reused_after_an_edit_of_the_amount_shares(self):
+        self.algorithm.function_name = "hamburg_roadside_tree_production"
+        self.algorithm.save()
+        share = InventoryAmountShare.objects.create(
+            scenario=self.scenario, feedstock=self.feedstock, average=0.5
+        )
+        execution_plan = self.execution_plan()
+        self.scenario.reusable_result_layers(execution_plan)
+        Layer.objects.create(
+            name="Reuse",
+            geom_type="Point",
+            table_name="test_reuse_layer",
+            scenario=self.scenario,
+            feedstock=self.feedstock,
+            algorithm=self.algorithm,
+            input_hash=execution_plan[0]["input_hash"],
+        )
+        self.assertEqual(
+            len(self.scenario.reusable_result_layers(self.execution_plan())), 1
+        )
+        share.average = 0.7
+        share.save()
+
+        self.assertEqual(
+            self.scenario.reusable_result_layers(self.execution_plan()), {}
+        )
+
+    def test_layers_of_not_reusable_algorithms_are_not_reused(self):
+        self.algorithm.source_module = "sources.greenhouses.inventory.algorithms"
+        self.algorithm.function_name = "nantes_greenhouse_production"
+        self.algorithm.save()
+        execution_plan = self.execution_plan()
+
+        self.assertEqual(self.scenario.reusable_result_layers(execution_plan), {})
+        self.assertEqual(execution_plan[0]["input_hash"], "")
@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from django.test import SimpleTestCase
+
+from ..progress import ProgressReporter, progress_reporting, report_progress
+
+
+class ProgressReportingTests(SimpleTestCase):
+    def setUp(self):
+        self.task = Mock(request=SimpleNamespace(id="task-1"))
+
+    def test_reports_go_to_the_active_reporter_as_task_state(self):
+        with progress_reporting(ProgressReporter(self.task, "Trees")):
+            report_progress("write", 250, 1000)
+
+        self.task.update_state.assert_called_once_with(
+            state="PROGRESS",
+            meta={
+                "algorithm": "Trees",
+                "stage": "write",
+                "current": 250,
+                "total": 1000,
+                "percent": 25,
+            },
+        )
+
+    def test_reports_are_throttled_unless_forced(self):
+        with progress_reporting(ProgressReporter(self.task, interval=60)):
+            report_progress("clip", 1)
+            report_progress("clip", 2)
+            report_progress("clip", 3, 3, force=True)
+
+        self.assertEqual(self.task.update_state.call_count, 2)
+        self.assertIsNone(
+            self.task.update_state.call_args_list[0].kwargs["meta"]["percent"]
+        )
+
+    def test_reports_without_reporter_or_task_id_are_dropped(self):
+        report_progress("write", 1, 1)
+        self.task.request.id = None
+
+        with progress_reporting(ProgressReporter(self.task)):
+            report_progress("write", 1, 1)
+
+        self.task.update_state.assert_not_called()
@@ -1,13 +1,20 @@
+import json
 from types import SimpleNamespace
 from unittest.mock import Mock, patch
 from uuid import uuid4
 
+from django.apps import apps
+from django.conf import settings
 from django.contrib.auth.models import AnonymousUser, Permission
 from django.contrib.contenttypes.models import ContentType
+from django.contrib.gis.geos import Point
+from django.core.cache import caches
 from django.test import SimpleTestCase, TestCase
 from django.urls import reverse
 
+from layer_manager.models import Layer
 from maps.models import Catchment, GeoDataset, Region
+from maps.pyramid import GEOMETRY_PYRAMID_TOLERANCES
 from materials.models import Material, SampleSeries
 from utils.object_management.models import User
 from utils.object_management.views import (
@@ -16,6 +23,7 @@ from utils.object_management.views import (
     get_tomselect_filter_value,
 )
 from utils.tests.testcases import AbstractTestCases
+from utils.tests.testrunner import serial_test
 
 from ..models import (
     InventoryAlgorithm,
@@ -25,6 +33,7 @@ from ..models import (
 )
 from ..views import (
     InventoryAlgorithmAutocompleteView,
+    ResultMapAPI,
     ScenarioGeoDataSetAutocompleteView,
     ScenarioInventoryAlgorithmAutocompleteView,
 )
@@ -491,3 +500,124 @@ class ScenarioAddAlgorithmAuthBypassTests(TestCase):
             reverse("scenario-detail", kwargs={"pk": self.scenario_a.pk}),
         )
         mock_add.assert_called_once()
+
+
+# ----------- Result layer GeoJSON -------------------------------------------------------------------------------------
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class ResultMapAPIToleranceTestCase(SimpleTestCase):
+    layer = SimpleNamespace(geom_type="MultiPolygon")
+
+    def tolerance(self, value):
+        request = SimpleNamespace(query_params={"tolerance": value})
+        return ResultMapAPI.get_tolerance(request, self.layer)
+
+    def test_tolerance_is_snapped_down_to_the_pyramid_levels(self):
+        levels = GEOMETRY_PYRAMID_TOLERANCES
+        self.assertEqual(self.tolerance(str(levels[1])), levels[1])
+        self.assertEqual(self.tolerance(str((levels[1] + levels[2]) / 2)), levels[1])
+        self.assertEqual(self.tolerance("1000"), levels[-1])
+
+    def test_tolerance_finer_than_every_level_is_ignored(self):
+        self.assertIsNone(self.tolerance("0.0000001"))
+        self.assertIsNone(self.tolerance("nan"))
+        self.assertIsNone(self.tolerance("-1"))
+
+
+@serial_test
+class ResultMapAPITestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user(username="owner")
+        region = Region.objects.create(name="R", publication_status="published")
+        catchment = Catchment.objects.create(name="C", region=region)
+        cls.scenario = Scenario.objects.create(
+            name="S", owner=owner, region=region, catchment=catchment
+        )
+        material = Material.objects.create(name="M", owner=owner)
+        cls.feedstock = SampleSeries.objects.create(
+            name="F", owner=owner, material=material
+        )
+        geodataset = GeoDataset.objects.create(name="G", owner=owner, region=region)
+        cls.algorithm = InventoryAlgorithm.objects.create(
+            name="A", function_name="avg_point_yield", geodataset=geodataset
+        )
+
+    def setUp(self):
+        caches[getattr(settings, "GEOJSON_CACHE", "default")].clear()
+        self.layer = self.write_layer([Point(1, 1), Point(5, 5)])
+        self.url = reverse("data-result-layer", args=[self.layer.table_name])
+
+    def tearDown(self):
+        caches[getattr(settings, "GEOJSON_CACHE", "default")].clear()
+        apps.all_models["layer_manager"].pop(self.layer.table_name, None)
+
+    def write_layer(self, points):
+        with self.captureOnCommitCallbacks(execute=True):
+            layer, _ = Layer.objects.create_or_replace(
+                name="Result",
+                scenario=self.scenario,
+                feedstock=self.feedstock,
+                algorithm=self.algorithm,
+                results={
+                    "features": [
+                        {"geom": Point(p.x, p.y, srid=4326), "yield": 1.5}
+                        for p in points
+                    ]
+                },
+            )
+        return layer
+
+    def test_response_is_cached_until_the_layer_is_written_again(self):
+        first = self.client.get(self.url)
+        second = self.client.get(self.url)
+        self.layer = self.write_layer([Point(1, 1)])
+        third = self.client.get(self.url)
+
+        self.assertEqual(first["X-Cache-Status"], "MISS")
+        self.assertEqual(second["X-Cache-Status"], "HIT")
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(len(second.json()["geoJson"]["features"]), 2)
+        self.assertEqual(second.json()["region_id"], self.scenario.region_id)
+        self.assertEqual(third["X-Cache-Status"], "MISS")
+        self.assertEqual(len(third.json()["geoJson"]["features"]), 1)
+        self.assertNotEqual(first["ETag"], third["ETag"])
+
+    def test_revalidation_with_current_etag_returns_not_modified(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_bbox_returns_only_intersecting_features(self):
+        response = self.client.get(self.url, {"bbox": "0,0,2,2"})
+
+        features = response.json()["geoJson"]["features"]
+        self.assertEqual(len(features), 1)
+        self.assertEqual(features[0]["geometry"]["coordinates"], [1.0, 1.0])
+
+    @patch("inventories.views.STREAMING_THRESHOLD", 1)
+    def test_large_layers_are_streamed_and_cached(self):
+        streamed = self.client.get(self.url)
+        body = b"".join(streamed.streaming_content)
+        cached = self.client.get(self.url)
+
+        self.assertEqual(streamed["X-Cache-Status"], "STREAM")
+        self.assertEqual(cached["X-Cache-Status"], "HIT")
+        self.assertEqual(json.loads(body), cached.json())
+        self.assertEqual(len(cached.json()["geoJson"]["features"]), 2)
+
+    @patch("inventories.views.STREAMING_THRESHOLD", 1)
+    @patch("inventories.views.GEOJSON_STREAM_CACHE_MAX_SIZE", 16)
+    def test_streamed_layers_too_big_to_cache_are_streamed_again(self):
+        first = self.client.get(self.url)
+        body = b"".join(first.streaming_content)
+        second = self.client.get(self.url)
+
+        self.assertEqual(first["X-Cache-Status"], "STREAM")
+        self.assertEqual(second["X-Cache-Status"], "STREAM")
+        self.assertEqual(
+            json.loads(body), json.loads(b"".join(second.streaming_content))
+        )
@@ -1,22 +1,49 @@
 import io
 import json
+import math
 
 from celery.result import AsyncResult
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.http import Http404, HttpResponse, HttpResponseForbidden, JsonResponse
+from django.core.cache import caches
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseForbidden,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import redirect, render
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, DetailView, TemplateView, View
 from django.views.generic.base import TemplateResponseMixin
 from django.views.generic.edit import ModelFormMixin
 from django_tomselect.autocompletes import AutocompleteModelView
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from layer_manager.models import Layer
+from maps.cache_tags import object_tag, tag_cache_entry
+from maps.db_functions import SimplifyPreserveTopology
+from maps.mixins import (
+    STREAMING_ENABLED,
+    STREAMING_THRESHOLD,
+    encoded_geojson_response,
+    get_not_modified_response,
+    parse_bbox,
+    set_conditional_headers,
+)
 from maps.models import GeoDataset
+from maps.pyramid import GEOMETRY_PYRAMID_TOLERANCES, pyramid_level_for_tolerance
 from maps.serializers import BaseResultMapSerializer
+from maps.utils import (
+    GEOJSON_STREAM_CACHE_MAX_SIZE,
+    GeoJSONBodyEncoder,
+    encode_geojson_body,
+    single_flight_cache,
+)
 from maps.views import GeoDataSetAutocompleteView, MapMixin
 from materials.models import Material, SampleSeries
 from utils.object_management.permissions import get_object_policy
@@ -32,7 +59,7 @@ from utils.object_management.views import (
 )
 from utils.views import BreadcrumbContextMixin
 
-from .evaluations import ScenarioResult
+from .evaluations import get_scenario_result_summary
 from .filters import ScenarioFilterSet
 from .forms import (
     ScenarioInventoryConfigurationAddForm,
@@ -51,6 +78,10 @@ from .models import (
 )
 from .tasks import run_inventory
 
+# Result layers only change when their algorithm runs again, which changes the
+# cache key, so their cached GeoJSON may live long.
+RESULT_LAYER_CACHE_TIMEOUT = getattr(settings, "GEOJSON_CACHE_TIMEOUT", 86400)
+
 
 class InventoriesExplorerView(BreadcrumbContextMixin, TemplateView):
     template_name = "inventories_explorer.html"
@@ -179,6 +210,8 @@ def get_evaluation_status(request, task_id=None):
         "task_status": task_result.status,
         "task_result": task_result.result,
         "task_info": task_result.info,
+        # Stage, features processed and total of a running algorithm, see inventories.progress
+        "progress": task_result.info if task_result.status == "PROGRESS" else None,
     }
     return JsonResponse(result, status=200)
 
@@ -467,29 +500,154 @@ class ResultMapAPI(APIView):
 
     Returns GeoJSON feature collection for Leaflet map rendering.
     The layer_name parameter identifies the dynamically generated result table.
+
+    Accepts ``bbox=minLng,minLat,maxLng,maxLat`` to only return intersecting
+    features and ``tolerance`` to simplify non-point geometries, snapped down
+    to the levels of the geometry pyramid. Unfiltered responses are cached per
+    layer version (see ``Layer.result_version``), so they are replaced
+    whenever the algorithm writes the layer again. Layers
+    with more than ``STREAMING_THRESHOLD`` features are streamed and cached
+    once the stream is complete, unless they are too big to cache.
     """
 
+    cache_timeout = RESULT_LAYER_CACHE_TIMEOUT
+
     def get(self, request, layer_name):
         try:
             layer = Layer.objects.select_related("scenario").get(table_name=layer_name)
         except Layer.DoesNotExist:
             return Response({"error": "Layer not found"}, status=404)
 
-        feature_collection = layer.get_feature_collection()
-        features = feature_collection.objects.all()
+        version = layer.result_version
+        not_modified = get_not_modified_response(request, version)
+        if not_modified is not None:
+            return not_modified
 
-        # Dynamically configure serializer for the result table model
-        serializer_class = BaseResultMapSerializer
-        serializer_class.Meta.model = feature_collection
+        feature_collection = layer.get_feature_collection()
+        serializer_class = BaseResultMapSerializer.for_model(feature_collection)
+        queryset = feature_collection.objects.order_by("pk")
+
+        bbox = parse_bbox(request.query_params.get("bbox"))
+        if bbox is not None:
+            bbox.srid = 4326
+            queryset = queryset.filter(geom__intersects=bbox)
+
+        tolerance = self.get_tolerance(request, layer)
+        if tolerance is not None:
+            queryset = queryset.annotate(
+                simplified_geom=SimplifyPreserveTopology("geom", tolerance)
+            )
 
-        serializer = serializer_class(features, many=True)
-        data = {
+        envelope = {
             "catchment_id": layer.scenario.catchment_id,
             "region_id": layer.scenario.region_id,
-            "geoJson": serializer.data,
         }
+        if bbox is not None:
+            serializer = serializer_class(queryset, many=True)
+            response = Response({**envelope, "geoJson": serializer.data})
+            response["X-Cache-Status"] = "MISS"
+            return response
+
+        cache = caches[getattr(settings, "GEOJSON_CACHE", "default")]
+        cache_key = f"result_layer_geojson:{version}:tolerance:{tolerance or 0}"
+        cached = cache.get(cache_key)
+        if cached is not None:
+            response = encoded_geojson_response(request, cached, version)
+            response["Content-Type"] = "application/json"
+            set_conditional_headers(response, version)
+            response["X-Cache-Status"] = "HIT"
+            return response
+
+        count = queryset.count()
+        if STREAMING_ENABLED and count > STREAMING_THRESHOLD:
+            response = StreamingHttpResponse(
+                self.stream_features(
+                    queryset, serializer_class, envelope, cache_key, layer, count
+                ),
+                content_type="application/json",
+            )
+            response["X-Cache-Status"] = "STREAM"
+        else:
+            generated = {}
+
+            def generate():
+                generated["data"] = {
+                    **envelope,
+                    "geoJson": serializer_class(queryset, many=True).data,
+                }
+                return encode_geojson_body(
+                    JSONRenderer().render(generated["data"]), feature_count=count
+                )
+
+            result = single_flight_cache(
+                cache_key,
+                generate,
+                timeout=self.cache_timeout,
+                tags=lambda: [object_tag(Layer, layer.pk)],
+            )
+            if "data" in generated:
+                response = Response(generated["data"])
+            else:
+                response = encoded_geojson_response(request, result.data, version)
+                response["Content-Type"] = "application/json"
+            response["X-Cache-Status"] = result.status
+        set_conditional_headers(response, version)
+        response["X-Total-Count"] = str(count)
+        return response
 
-        return Response(data)
+    @staticmethod
+    def get_tolerance(request, layer):
+        """Return the requested simplification tolerance, if it applies to the layer.
+
+        The tolerance is snapped down to the levels of the geometry pyramid, as
+        it is part of the cache key.
+        """
+        if "Point" in layer.geom_type:
+            return None
+        try:
+            tolerance = float(request.query_params.get("tolerance", ""))
+        except ValueError:
+            return None
+        if not math.isfinite(tolerance):
+            return None
+        level = pyramid_level_for_tolerance(tolerance)
+        return None if level is None else GEOMETRY_PYRAMID_TOLERANCES[level]
+
+    def stream_features(
+        self, queryset, serializer_class, envelope, cache_key, layer, count
+    ):
+        """Yield the response body feature by feature and cache it once complete.
+
+        The body is compressed for the cache while it is streamed; bodies
+        whose encoded size exceeds ``GEOJSON_STREAM_CACHE_MAX_SIZE`` are not
+        cached. The model instances and serialized features of the whole
+        layer are never held in memory.
+        """
+        encoder = GeoJSONBodyEncoder(max_size=GEOJSON_STREAM_CACHE_MAX_SIZE)
+        chunk = (
+            json.dumps(envelope)[:-1].encode()
+            + b', "geoJson": {"type": "FeatureCollection", "features": ['
+        )
+        encoder.write(chunk)
+        yield chunk
+        for index, feature in enumerate(queryset.iterator(chunk_size=500)):
+            chunk = JSONRenderer().render(serializer_class(feature).data)
+            if index:
+                chunk = b"," + chunk
+            encoder.write(chunk)
+            yield chunk
+        encoder.write(b"]}}")
+        yield b"]}}"
+
+        entry = encoder.entry(feature_count=count)
+        if entry is None:
+            return
+        caches[getattr(settings, "GEOJSON_CACHE", "default")].set(
+            cache_key, entry, timeout=self.cache_timeout
+        )
+        tag_cache_entry(
+            cache_key, [object_tag(Layer, layer.pk)], timeout=self.cache_timeout
+        )
 
 
 class ScenarioResultView(MapMixin, UserCreatedObjectDetailView):
@@ -502,10 +660,9 @@ class ScenarioResultView(MapMixin, UserCreatedObjectDetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        scenario = self.object
-        result = ScenarioResult(scenario)
-        context["layers"] = [layer.as_dict() for layer in result.layers]
-        context["charts"] = result.get_charts()
+        snapshot = get_scenario_result_summary(self.object)
+        context["layers"] = snapshot["layers"]
+        context["charts"] = snapshot["charts"]
         return context
 
     def get(self, request, *args, **kwargs):
@@ -554,7 +711,10 @@ class ScenarioResultDetailMapView(MapMixin, DetailView):
         algorithm = InventoryAlgorithm.objects.get(id=self.kwargs.get("algorithm_pk"))
         feedstock = SampleSeries.objects.get(id=self.kwargs.get("feedstock_pk"))
         return Layer.objects.get(
-            scenario=scenario, algorithm=algorithm, feedstock=feedstock
+            scenario=scenario,
+            algorithm=algorithm,
+            feedstock=feedstock,
+            partition__isnull=True,
         )
 
     def get_region_feature_id(self):
@@ -581,8 +741,8 @@ def download_scenario_result_summary(request, scenario_pk):
         or policy["is_moderator"]
     ):
         return HttpResponseForbidden()
-    result = ScenarioResult(scenario)
-    with io.StringIO(json.dumps(result.summary_dict(), indent=4)) as file:
+    summary = get_scenario_result_summary(scenario)["summary"]
+    with io.StringIO(json.dumps(summary, indent=4)) as file:
         response = HttpResponse(file, content_type="application/json")
         response["Content-Disposition"] = (
             f"attachment; filename=scenario_{scenario_pk}_result_summary.json"
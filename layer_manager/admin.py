@@ -12,6 +12,9 @@ class LayerAdmin(admin.ModelAdmin):
         "scenario",
         "feedstock",
         "algorithm",
+        "rows_written",
+        "write_seconds",
+        "evaluation_seconds",
     )
     search_fields = ("name", "table_name")
     list_filter = ("geom_type",)
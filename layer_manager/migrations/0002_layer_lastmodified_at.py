@@ -0,0 +1,17 @@
+# Generated by Django 6.0.5 on 2026-10-17 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("layer_manager", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="layer",
+            name="lastmodified_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.5 on 2026-10-17 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("layer_manager", "0002_layer_lastmodified_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="layer",
+            name="input_hash",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.5 on 2026-10-17 15:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("layer_manager", "0003_layer_input_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="layer",
+            name="rows_written",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="layer",
+            name="write_seconds",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="layer",
+            name="evaluation_seconds",
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.5 on 2026-10-17 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("layer_manager", "0004_layer_evaluation_metrics"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="layer",
+            name="partition",
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
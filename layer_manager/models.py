@@ -1,13 +1,45 @@
+import csv
+import io
+import itertools
+import time
+from dataclasses import dataclass
+
 import django.contrib.gis.db.models as gis_models
-from django.apps import apps
+from django.contrib.gis.geos import GEOSGeometry
 from django.db import connection, models
 from django.urls import reverse
 
 from distributions.models import TemporalDistribution, Timestep
 from inventories.models import InventoryAlgorithm, Scenario
+from inventories.progress import report_progress
+from maps.cache_tags import invalidate_cache_tags_on_commit, object_tag
 from materials.models import MaterialComponent, SampleSeries
 
 from .exceptions import InvalidGeometryType, NoFeaturesProvided, TableAlreadyExists
+from .registry import LayerTable, layer_model_registry
+
+# Number of features streamed into a feature table per COPY statement. Bounds
+# the size of the buffer that is built in memory for each statement.
+FEATURE_COPY_CHUNK_SIZE = 10000
+
+
+@dataclass(frozen=True)
+class LayerWriteStats:
+    """Rows written into a result layer and the time it took."""
+
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else float(self.rows)
+
+    def as_dict(self):
+        return {
+            "rows": self.rows,
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+        }
 
 
 class LayerField(models.Model):
@@ -46,18 +78,40 @@ class LayerManager(models.Manager):
     ]
 
     def create_or_replace(self, **kwargs):
+        """
+        Creates the result layer of an algorithm run or replaces its previous version. The features are either given
+        under results['features'], as a list or any iterable that is then streamed into the layer, or set-based, as
+        results['feature_query'] (see InventoryAlgorithmsBase.feature_query), which is inserted without loading any
+        geometry into Python. The features are written before the aggregated values are read, so algorithms may
+        accumulate those while the features are consumed.
+        """
         results = kwargs.pop("results")
+        input_hash = kwargs.pop("input_hash", "")
+        feature_query = results.get("feature_query")
 
-        if "features" not in results or len(results["features"]) == 0:
-            raise NoFeaturesProvided(results)
+        if feature_query is not None:
+            if not feature_query_has_rows(feature_query):
+                raise NoFeaturesProvided(results)
+            fields = {"geom": feature_query["geom_type"], **feature_query["fields"]}
         else:
-            features = results["features"]
+            features = results.get("features")
+            if features is None:
+                raise NoFeaturesProvided(results)
+            if isinstance(features, list):
+                sample = features
+            else:
+                # Streamed features: detect the fields from the first chunk
+                features = iter(features)
+                sample = list(itertools.islice(features, FEATURE_COPY_CHUNK_SIZE))
+                features = itertools.chain(sample, features)
+            if not sample:
+                raise NoFeaturesProvided(results)
             fields = {}
             # The data types of the fields are detected from their content. Any column that has only null values
             # will be omitted completely
-            if features:
-                fields_with_unknown_datatype = list(features[0].keys())
-                for feature in features:
+            if sample:
+                fields_with_unknown_datatype = list(sample[0].keys())
+                for feature in sample:
                     if not fields_with_unknown_datatype:
                         break
                     for key, value in feature.items():
@@ -69,50 +123,188 @@ class LayerManager(models.Manager):
             # data type could be detected. They should be omitted but this information should be logged
             # TODO: add omitted columns info to log
 
-            kwargs["geom_type"] = fields.pop("geom")
-            if kwargs["geom_type"] not in self.supported_geometry_types:
-                raise InvalidGeometryType(kwargs["geom_type"])
-
-            kwargs["table_name"] = (
-                "result_of_scenario_"
-                + str(kwargs["scenario"].id)
-                + "_algorithm_"
-                + str(kwargs["algorithm"].id)
-                + "_feedstock_"
-                + str(kwargs["feedstock"].id)
-            )
+        kwargs["geom_type"] = fields.pop("geom")
+        if kwargs["geom_type"] not in self.supported_geometry_types:
+            raise InvalidGeometryType(kwargs["geom_type"])
+
+        kwargs["table_name"] = (
+            "result_of_scenario_"
+            + str(kwargs["scenario"].id)
+            + "_algorithm_"
+            + str(kwargs["algorithm"].id)
+            + "_feedstock_"
+            + str(kwargs["feedstock"].id)
+        )
+        if kwargs.get("partition") is not None:
+            kwargs["table_name"] += "_partition_" + str(kwargs["partition"])
 
-            layer, created = super().get_or_create(
-                table_name=kwargs["table_name"], defaults=kwargs
-            )
+        layer, created = super().get_or_create(
+            table_name=kwargs["table_name"], defaults=kwargs
+        )
 
-            if created:
+        if created:
+            layer.add_layer_fields(fields)
+            feature_collection = layer.update_or_create_feature_collection()
+            layer.create_feature_table()
+        else:
+            if layer.is_defined_by(fields=fields, **kwargs):
+                feature_collection = layer.get_feature_collection()
+                feature_collection.objects.all().delete()
+            else:
+                layer.delete()
+                layer = super().create(**kwargs)
                 layer.add_layer_fields(fields)
                 feature_collection = layer.update_or_create_feature_collection()
                 layer.create_feature_table()
-            else:
-                if layer.is_defined_by(fields=fields, **kwargs):
-                    feature_collection = layer.get_feature_collection()
-                    feature_collection.objects.all().delete()
-                else:
-                    layer.delete()
-                    layer = super().create(**kwargs)
-                    layer.add_layer_fields(fields)
-                    feature_collection = layer.update_or_create_feature_collection()
-                    layer.create_feature_table()
 
-                layer.delete_aggregated_values()
+            layer.delete_aggregated_values()
 
-            for feature in features:
-                feature_collection.objects.create(**feature)
+        started = time.perf_counter()
+        if feature_query is not None:
+            rows = layer.insert_features_from_query(feature_query)
+        else:
+            rows = layer.copy_features(features)
 
         if "aggregated_values" in results:
-            layer.add_aggregated_values(results["aggregated_values"])
+            rows += layer.add_aggregated_values(results["aggregated_values"])
         if "aggregated_distributions" in results:
-            layer.add_aggregated_distributions(results["aggregated_distributions"])
+            rows += layer.add_aggregated_distributions(
+                results["aggregated_distributions"]
+            )
+        layer.write_stats = LayerWriteStats(rows, time.perf_counter() - started)
+        layer.input_hash = input_hash
+        layer.rows_written = layer.write_stats.rows
+        layer.write_seconds = layer.write_stats.seconds
+        layer.save(
+            update_fields=[
+                "input_hash",
+                "rows_written",
+                "write_seconds",
+                "lastmodified_at",
+            ]
+        )
+        layer.invalidate_cached_features()
 
         return layer, feature_collection
 
+    def merge_partitions(self, partitions, input_hash=""):
+        """
+        Merges the partial layers of a partitioned algorithm run (see inventories.tasks.run_inventory) into the result
+        layer of the algorithm and deletes them. The features are copied set-based from all partition tables with a
+        single INSERT ... SELECT, columns that a partition omitted because they only held null values are filled with
+        nulls. Aggregated values and distribution shares are sums over the features and are added up.
+        """
+        partitions = sorted(partitions, key=lambda layer: layer.partition)
+        first = partitions[0]
+        qn = connection.ops.quote_name
+
+        partition_fields = []
+        fields = {}
+        for layer in partitions:
+            layer_fields = {
+                field.field_name: field.data_type for field in layer.layer_fields.all()
+            }
+            partition_fields.append(layer_fields)
+            for field_name, data_type in layer_fields.items():
+                fields.setdefault(field_name, data_type)
+
+        selects = []
+        for layer, layer_fields in zip(partitions, partition_fields, strict=True):
+            columns = ["geom"]
+            for field_name, data_type in fields.items():
+                if field_name in layer_fields:
+                    columns.append(qn(field_name))
+                else:
+                    db_type = LayerField.model_field_type(data_type).db_type(connection)
+                    columns.append(f"NULL::{db_type}")
+            table = layer.feature_table().quoted_name
+            selects.append(f"SELECT {', '.join(columns)} FROM {table}")
+
+        aggregated_values = {}
+        for name, unit, value in (
+            LayerAggregatedValue.objects.filter(layer__in=partitions)
+            .order_by("layer__partition", "pk")
+            .values_list("name", "unit", "value")
+        ):
+            aggregate = aggregated_values.setdefault(
+                (name, unit), {"name": name, "value": 0, "unit": unit}
+            )
+            aggregate["value"] += value
+
+        aggregated_distributions = {}
+        for aggregated_distribution in LayerAggregatedDistribution.objects.filter(
+            layer__in=partitions
+        ).order_by("layer__partition", "pk"):
+            aggregated_distributions.setdefault(
+                (aggregated_distribution.name, aggregated_distribution.distribution_id),
+                {},
+            )
+        shares = DistributionShare.objects.filter(
+            distribution_set__aggregated_distribution__layer__in=partitions
+        ).values_list(
+            "distribution_set__aggregated_distribution__name",
+            "distribution_set__aggregated_distribution__distribution_id",
+            "distribution_set__timestep_id",
+            "component_id",
+            "average",
+        )
+        for name, distribution_id, timestep_id, component_id, average in shares:
+            timestep_shares = aggregated_distributions[
+                (name, distribution_id)
+            ].setdefault(timestep_id, {})
+            timestep_shares[component_id] = (
+                timestep_shares.get(component_id, 0) + average
+            )
+
+        results = {
+            "feature_query": {
+                "sql": " UNION ALL ".join(selects),
+                "params": [],
+                "geom_type": first.geom_type,
+                "fields": fields,
+            },
+            "aggregated_values": list(aggregated_values.values()),
+            "aggregated_distributions": [
+                {
+                    "name": name,
+                    "distribution": distribution_id,
+                    "sets": [
+                        {
+                            "timestep": timestep_id,
+                            "shares": [
+                                {"component": component_id, "average": average}
+                                for component_id, average in timestep_shares.items()
+                            ],
+                        }
+                        for timestep_id, timestep_shares in sets.items()
+                    ],
+                }
+                for (name, distribution_id), sets in aggregated_distributions.items()
+            ],
+        }
+        layer, feature_collection = self.create_or_replace(
+            name=first.name,
+            scenario=first.scenario,
+            feedstock=first.feedstock,
+            algorithm=first.algorithm,
+            results=results,
+            input_hash=input_hash,
+        )
+        for partition in partitions:
+            partition.delete()
+        return layer, feature_collection
+
+
+def feature_query_has_rows(feature_query):
+    """
+    Checks whether a set-based feature query selects any features, without fetching them.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT EXISTS ({feature_query['sql']})", feature_query["params"]
+        )
+        return cursor.fetchone()[0]
+
 
 class Layer(models.Model):
     """
@@ -130,41 +322,170 @@ class Layer(models.Model):
     feedstock = models.ForeignKey(SampleSeries, on_delete=models.CASCADE)
     algorithm = models.ForeignKey(InventoryAlgorithm, on_delete=models.CASCADE)
     layer_fields = models.ManyToManyField(LayerField)
+    lastmodified_at = models.DateTimeField(auto_now=True)
+    # Content address of the algorithm run that produced the layer, see Scenario.reusable_result_layers
+    input_hash = models.CharField(max_length=64, blank=True, default="")
+    # Cost of the algorithm run that produced the layer: rows written (features and aggregates), the time it took to
+    # write them and the wall time of the whole run, including the algorithm itself.
+    rows_written = models.PositiveIntegerField(null=True, blank=True)
+    write_seconds = models.FloatField(null=True, blank=True)
+    evaluation_seconds = models.FloatField(null=True, blank=True)
+    # Index of the tile of a partitioned algorithm run that the layer holds the partial result of, until
+    # LayerManager.merge_partitions merges it into the result layer of the run. Null for result layers.
+    partition = models.PositiveSmallIntegerField(null=True, blank=True)
 
     objects = LayerManager()
 
+    # Set by LayerManager.create_or_replace to the LayerWriteStats of the write.
+    write_stats = None
+
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=["table_name"], name="unique table_name")
         ]
 
     def add_aggregated_values(self, aggregates: []):
-        for aggregate in aggregates:
-            LayerAggregatedValue.objects.create(
-                name=aggregate["name"],
-                value=aggregate["value"],
-                unit=aggregate["unit"],
-                layer=self,
+        """Store the aggregated values of the layer. Returns the number of rows."""
+        return len(
+            LayerAggregatedValue.objects.bulk_create(
+                [
+                    LayerAggregatedValue(
+                        name=aggregate["name"],
+                        value=aggregate["value"],
+                        unit=aggregate["unit"],
+                        layer=self,
+                    )
+                    for aggregate in aggregates
+                ]
             )
+        )
 
     def add_aggregated_distributions(self, distributions):
-        for distribution in distributions:
-            dist = TemporalDistribution.objects.get(id=distribution["distribution"])
-            aggdist = LayerAggregatedDistribution.objects.create(
-                name=distribution["name"], distribution=dist, layer=self
+        """
+        Store the aggregated distributions of the layer with one bulk insert per table. Returns the number of
+        rows.
+        """
+        temporal_distributions = TemporalDistribution.objects.in_bulk(
+            {distribution["distribution"] for distribution in distributions}
+        )
+        missing = {
+            distribution["distribution"] for distribution in distributions
+        } - temporal_distributions.keys()
+        if missing:
+            raise TemporalDistribution.DoesNotExist(
+                f"TemporalDistribution matching query does not exist: {sorted(missing)}"
             )
 
-            for dset in distribution["sets"]:
-                distset = DistributionSet.objects.create(
+        aggregated_distributions = LayerAggregatedDistribution.objects.bulk_create(
+            [
+                LayerAggregatedDistribution(
+                    name=distribution["name"],
+                    distribution=temporal_distributions[distribution["distribution"]],
+                    layer=self,
+                )
+                for distribution in distributions
+            ]
+        )
+        distribution_sets = DistributionSet.objects.bulk_create(
+            [
+                DistributionSet(
                     aggregated_distribution=aggdist, timestep_id=dset["timestep"]
                 )
-                for share in dset["shares"]:
-                    DistributionShare.objects.create(
-                        component_id=share["component"],
-                        average=share["average"],
-                        standard_deviation=0.0,  # TODO
-                        distribution_set=distset,
+                for aggdist, distribution in zip(
+                    aggregated_distributions, distributions, strict=True
+                )
+                for dset in distribution["sets"]
+            ]
+        )
+        all_sets = [
+            dset for distribution in distributions for dset in distribution["sets"]
+        ]
+        shares = DistributionShare.objects.bulk_create(
+            [
+                DistributionShare(
+                    component_id=share["component"],
+                    average=share["average"],
+                    standard_deviation=0.0,  # TODO
+                    distribution_set=distset,
+                )
+                for distset, dset in zip(distribution_sets, all_sets, strict=True)
+                for share in dset["shares"]
+            ],
+            batch_size=FEATURE_COPY_CHUNK_SIZE,
+        )
+        return len(aggregated_distributions) + len(distribution_sets) + len(shares)
+
+    def insert_features_from_query(self, feature_query):
+        """
+        Inserts the features selected by a set-based feature query (see InventoryAlgorithmsBase.feature_query) into
+        the feature table with a single INSERT ... SELECT, transformed into the SRID of the table. Returns the
+        number of features written.
+        """
+        table = self.feature_table()
+        columns = ["geom", *feature_query["fields"]]
+        qn = connection.ops.quote_name
+        column_list = ", ".join(qn(column) for column in columns)
+        select_list = ", ".join(
+            ["ST_Transform(features.geom, %s)"]
+            + [f"features.{qn(column)}" for column in columns[1:]]
+        )
+        sql = (
+            f"INSERT INTO {table.quoted_name} ({column_list}) "
+            f"SELECT {select_list} "
+            f"FROM ({feature_query['sql']}) AS features ({column_list})"
+        )
+        report_progress("write", 0, force=True)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table.srid, *feature_query["params"]])
+            rows = cursor.rowcount
+        report_progress("write", rows, rows, force=True)
+        return rows
+
+    def copy_features(self, features):
+        """
+        Streams features (any iterable) into the feature table with PostgreSQL COPY, in chunks of
+        FEATURE_COPY_CHUNK_SIZE.
+        Geometries are sent as hex EWKB in the SRID of the table. Feature keys without a layer field (columns
+        that only held null values) are skipped. Returns the number of features written.
+        """
+        table = self.feature_table()
+        columns = table.columns
+        qn = connection.ops.quote_name
+        sql = (
+            f"COPY {table.quoted_name} "
+            f"({', '.join(qn(column) for column in columns)}) "
+            "FROM STDIN WITH (FORMAT csv)"
+        )
+
+        def to_ewkb(geom):
+            if not isinstance(geom, GEOSGeometry):
+                geom = GEOSGeometry(geom)
+            if geom.srid is None:
+                geom = geom.clone()
+                geom.srid = table.srid
+            elif geom.srid != table.srid:
+                geom = geom.transform(table.srid, clone=True)
+            return geom.hexewkb.decode()
+
+        # The total is only known for lists, not for streamed features
+        total = len(features) if isinstance(features, list) else None
+        written = 0
+        features = iter(features)
+        with connection.cursor() as cursor:
+            while chunk := list(itertools.islice(features, FEATURE_COPY_CHUNK_SIZE)):
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                for feature in chunk:
+                    writer.writerow(
+                        [to_ewkb(feature["geom"])]
+                        + [feature.get(column) for column in columns[1:]]
                     )
+                buffer.seek(0)
+                cursor.copy_expert(sql, buffer)
+                written += len(chunk)
+                report_progress("write", written, total)
+        report_progress("write", written, written, force=True)
+        return written
 
     def add_layer_fields(self, fields: dict):
         for field_name, data_type in fields.items():
@@ -172,6 +493,8 @@ class Layer(models.Model):
                 field_name=field_name, data_type=data_type
             )
             self.layer_fields.add(field)
+        # Gives the layer a new model in every process (see LayerModelRegistry.version)
+        self.save(update_fields=["lastmodified_at"])
 
     def as_dict(self):
         return {
@@ -195,14 +518,16 @@ class Layer(models.Model):
     def update_or_create_feature_collection(self):
         """
         Dynamically creates model connected to this layer instance that is used to handle its features and store them
-        in a separate custom database table.
+        in a separate custom database table. Replaces any model of a previous version of the layer in the registry.
         """
+        return layer_model_registry.get_model(self, rebuild=True)
 
-        # Empty app registry from any previous version of this model
+    def build_feature_collection(self):
+        """
+        Builds the model class of the feature table of the layer, which registers it in the app registry. Only called
+        by the layer model registry, which unregisters any previous version of the model first.
+        """
         model_name = self.table_name
-        if model_name in apps.all_models["layer_manager"]:
-            del apps.all_models["layer_manager"][model_name]
-
         attrs = {
             "__module__": "layer_manager.models",
             "geom": getattr(gis_models, self.geom_type + "Field")(srid=4326),
@@ -228,10 +553,8 @@ class Layer(models.Model):
         feature_collection = self.get_feature_collection()
 
         # Check if any table of the name already exists
-        with connection.cursor() as cursor:
-            cursor.execute(f"SELECT to_regclass('{feature_collection._meta.db_table}')")
-            if cursor.fetchone()[0]:
-                raise TableAlreadyExists
+        if self.feature_table().exists():
+            raise TableAlreadyExists
 
         # After cleanup, now create the new version of the result table
         with connection.schema_editor() as schema_editor:
@@ -243,39 +566,53 @@ class Layer(models.Model):
             kwargs={"pk": self.scenario.id, "algo_pk": self.algorithm.id},
         )
 
+    @property
+    def rows_per_second(self):
+        if self.rows_written is None or not self.write_seconds:
+            return None
+        return self.rows_written / self.write_seconds
+
+    @property
+    def result_version(self):
+        """
+        Identifies the current features of the layer. Changes whenever create_or_replace writes the layer again.
+        """
+        return f"{self.pk}-{self.lastmodified_at.strftime('%Y%m%d%H%M%S%f')}"
+
+    def invalidate_cached_features(self):
+        """
+        Drops the cached GeoJSON of the layer (see inventories.views.ResultMapAPI) once the transaction commits.
+        """
+        invalidate_cache_tags_on_commit(object_tag(Layer, self.pk))
+
     def delete(self, **kwargs):
+        self.invalidate_cached_features()
         self.delete_feature_table()
-        del apps.all_models["layer_manager"][self.table_name]
+        layer_model_registry.discard(self.table_name)
         super().delete()
 
     def delete_feature_table(self):
         """
-        Deletes a table from a given model
-        :return:
+        Deletes the feature table of the layer, if it exists, without building its model.
         """
-        feature_collection = self.get_feature_collection()
-
-        with connection.cursor() as cursor:
-            cursor.execute(f"SELECT to_regclass('{feature_collection._meta.db_table}')")
-            if cursor.fetchone()[0] is None:
-                return
-
-        with connection.schema_editor() as schema_editor:
-            schema_editor.delete_model(feature_collection)
+        self.feature_table().drop()
 
     def delete_aggregated_values(self):
         LayerAggregatedValue.objects.filter(layer=self).delete()
 
     def get_feature_collection(self):
         """
-        Returns the feature collection model that is used to manage the features connected to this layer.
+        Returns the feature collection model that is used to manage the features connected to this layer. The model
+        is built once per process and version of the layer (see layer_manager.registry).
         """
+        return layer_model_registry.get_model(self)
 
-        # If the model is already registered, return original model
-        if self.table_name in apps.all_models["layer_manager"]:
-            return apps.all_models["layer_manager"][self.table_name]
-        else:
-            return self.update_or_create_feature_collection()
+    def feature_table(self):
+        """
+        Returns a LayerTable that describes the feature table of this layer, for reads and writes with raw SQL that
+        do not need its model.
+        """
+        return LayerTable.for_layer(self)
 
     def is_defined_by(self, **kwargs):
         fields = {
@@ -338,21 +675,61 @@ class LayerAggregatedDistribution(models.Model):
 
     @property
     def serialized(self):
+        return serialize_aggregated_distributions([self])[self.pk]
+
+
+def serialize_aggregated_distributions(aggregated_distributions):
+    """
+    Serializes aggregated distributions like LayerAggregatedDistribution.serialized, with two queries for any number of
+    them instead of one per component and timestep of each. Returns the serializations by aggregated distribution id.
+    """
+    aggregated_distributions = list(aggregated_distributions)
+    if not aggregated_distributions:
+        return {}
+
+    timesteps = {}
+    for timestep in Timestep.objects.filter(
+        distribution_id__in={ad.distribution_id for ad in aggregated_distributions}
+    ).order_by("order", "pk"):
+        timesteps.setdefault(timestep.distribution_id, []).append(timestep)
+
+    components = {ad.pk: {} for ad in aggregated_distributions}
+    averages = {}
+    for ad_id, component_id, component_name, timestep_id, average in (
+        DistributionShare.objects.filter(
+            distribution_set__aggregated_distribution__in=aggregated_distributions,
+            component__isnull=False,
+        )
+        .order_by("component__name", "component_id", "pk")
+        .values_list(
+            "distribution_set__aggregated_distribution_id",
+            "component_id",
+            "component__name",
+            "distribution_set__timestep_id",
+            "average",
+        )
+    ):
+        components[ad_id][component_id] = component_name
+        key = (ad_id, component_id, timestep_id)
+        if key in averages:
+            raise DistributionShare.MultipleObjectsReturned(
+                f"Aggregated distribution {ad_id} has several shares of component {component_id} in timestep "
+                f"{timestep_id}."
+            )
+        averages[key] = average
+
+    serialized = {}
+    for ad in aggregated_distributions:
         dist = []
-        for component in self.components:
-            component_dist = {"label": component.name, "data": {}, "unit": "Mg/a"}
-            # data = {}
-            for timestep in self.distribution.timestep_set.all():
-                try:
-                    share = self.shares.get(
-                        component=component, distribution_set__timestep=timestep
-                    )
-                    component_dist["data"][timestep.name] = share.average
-                except DistributionShare.DoesNotExist:
-                    pass
-            # component_dist['data'].append(data)
+        for component_id, component_name in components[ad.pk].items():
+            component_dist = {"label": component_name, "data": {}, "unit": "Mg/a"}
+            for timestep in timesteps.get(ad.distribution_id, []):
+                key = (ad.pk, component_id, timestep.pk)
+                if key in averages:
+                    component_dist["data"][timestep.name] = averages[key]
             dist.append(component_dist)
-        return dist
+        serialized[ad.pk] = dist
+    return serialized
 
 
 class DistributionSet(models.Model):
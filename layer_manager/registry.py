@@ -0,0 +1,141 @@
+"""
+Registry of the dynamic models of the feature tables of result layers.
+
+Each result layer stores its features in a table of its own (see
+``Layer.create_feature_table``), handled by a model class that is built at
+runtime from the layer fields and registered in
+``apps.all_models["layer_manager"]``. The registry builds these classes once
+per process and version of the layer, guards the app registry with a lock so
+that threads of a worker do not build or unregister the same class at once,
+and bounds the number of classes a long-running process keeps to
+``LAYER_MODEL_REGISTRY_SIZE``, unregistering the least recently used ones.
+
+Writes that only need the table name and columns, like the set-based
+inserts of the layer manager, and the creation checks and drops of feature
+tables use a ``LayerTable`` descriptor with raw SQL instead and never build a
+model class.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from django.apps import apps
+from django.db import connection
+
+# Maximum number of layer model classes kept registered per process
+LAYER_MODEL_REGISTRY_SIZE = 256
+
+APP_LABEL = "layer_manager"
+
+
+@dataclass(frozen=True)
+class LayerTable:
+    """Describes the feature table of a layer: its name, geometry and attribute columns."""
+
+    table_name: str
+    geom_type: str
+    fields: tuple  # (field_name, data_type) pairs in the order of the columns
+    srid: int = 4326
+
+    @classmethod
+    def for_layer(cls, layer):
+        return cls(
+            table_name=layer.table_name,
+            geom_type=layer.geom_type,
+            fields=layer_fields_of(layer),
+        )
+
+    @property
+    def columns(self):
+        return ["geom", *(field_name for field_name, _data_type in self.fields)]
+
+    @property
+    def quoted_name(self):
+        return connection.ops.quote_name(self.table_name)
+
+    def exists(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s)", [self.quoted_name])
+            return cursor.fetchone()[0] is not None
+
+    def drop(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.quoted_name}")
+
+
+def layer_fields_of(layer):
+    return tuple(
+        (field.field_name, field.data_type) for field in layer.layer_fields.all()
+    )
+
+
+class LayerModelRegistry:
+    """Thread-safe LRU registry of the feature collection models of layers."""
+
+    def __init__(self, maxsize=LAYER_MODEL_REGISTRY_SIZE):
+        self.maxsize = maxsize
+        self._lock = threading.RLock()
+        self._models = OrderedDict()  # table_name -> (version, model)
+
+    @staticmethod
+    def version(layer):
+        """
+        Identifies the shape of the feature table of a layer from the loaded layer alone, without a query. A layer
+        that was replaced or written again, or whose fields changed in another process, gets a new model: adding
+        fields touches the layer (see Layer.add_layer_fields).
+        """
+        return layer.pk, layer.geom_type, layer.lastmodified_at
+
+    def get_model(self, layer, rebuild=False):
+        """
+        Returns the feature collection model of the layer, building it if it is not registered, if it was built for
+        another version of the layer or if rebuild is set.
+        """
+        version = self.version(layer)
+        table_name = layer.table_name
+        with self._lock:
+            entry = self._models.get(table_name)
+            if (
+                not rebuild
+                and entry is not None
+                and entry[0] == version
+                # The model may have been removed from the app registry directly
+                and apps.all_models[APP_LABEL].get(table_name) is entry[1]
+            ):
+                self._models.move_to_end(table_name)
+                return entry[1]
+
+            self._unregister(table_name)
+            model = layer.build_feature_collection()
+            self._models[table_name] = (version, model)
+            self._models.move_to_end(table_name)
+            while len(self._models) > self.maxsize:
+                evicted, _entry = self._models.popitem(last=False)
+                self._unregister(evicted)
+            return model
+
+    def discard(self, table_name):
+        """Forgets and unregisters the model of a table, if there is one."""
+        with self._lock:
+            self._models.pop(table_name, None)
+            self._unregister(table_name)
+
+    def clear(self):
+        with self._lock:
+            for table_name in list(self._models):
+                self.discard(table_name)
+
+    def __contains__(self, table_name):
+        return table_name in self._models
+
+    def __len__(self):
+        return len(self._models)
+
+    @staticmethod
+    def _unregister(table_name):
+        if apps.all_models[APP_LABEL].pop(table_name, None) is not None:
+            apps.clear_cache()
+
+
+layer_model_registry = LayerModelRegistry()
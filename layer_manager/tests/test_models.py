@@ -5,7 +5,9 @@ from django.db.models.query import QuerySet
 from django.test import TestCase
 
 from distributions.models import TemporalDistribution, Timestep
+from inventories.algorithms import InventoryAlgorithmsBase
 from inventories.models import InventoryAlgorithm, Scenario
+from layer_manager.exceptions import NoFeaturesProvided
 from layer_manager.models import (
     DistributionSet,
     DistributionShare,
@@ -148,6 +150,147 @@ class LayerTestCase(TestCase):
         )
         del apps.all_models["layer_manager"][table_name]
 
+    def test_create_or_replace_copies_features_and_reports_write_stats(self):
+        distribution = TemporalDistribution.objects.default()
+        results = {
+            "aggregated_values": [
+                {"name": "Total production", "value": 10000, "unit": "kg"}
+            ],
+            "aggregated_distributions": [
+                {
+                    "name": "Seasonal production",
+                    "distribution": distribution.id,
+                    "sets": [
+                        {
+                            "timestep": Timestep.objects.default().id,
+                            "shares": [
+                                {
+                                    "component": MaterialComponent.objects.default().id,
+                                    "average": 2.5,
+                                }
+                            ],
+                        }
+                    ],
+                }
+            ],
+            "features": [
+                {"geom": area.geom, "yield": 12.5, "label": None}
+                for area in HamburgGreenAreas.objects.all()
+            ],
+        }
+        algorithm = InventoryAlgorithm.objects.get(function_name="avg_area_yield")
+
+        layer, feature_collection = Layer.objects.create_or_replace(
+            name="copied layer",
+            scenario=self.scenario,
+            feedstock=self.feedstock_sample_series,
+            algorithm=algorithm,
+            results=results,
+        )
+
+        self.assertEqual(
+            list(feature_collection.objects.values_list("yield", flat=True)), [12.5]
+        )
+        self.assertEqual(
+            feature_collection.objects.get().geom, HamburgGreenAreas.objects.get().geom
+        )
+        self.assertEqual(layer.layeraggregatedvalue_set.get().value, 10000)
+        self.assertEqual(
+            layer.layeraggregateddistribution_set.get().serialized[0]["data"],
+            {"Average": 2.5},
+        )
+        self.assertEqual(layer.write_stats.rows, 5)
+        self.assertGreater(layer.write_stats.rows_per_second, 0)
+        layer.refresh_from_db()
+        self.assertEqual(layer.rows_written, 5)
+        self.assertEqual(layer.write_seconds, layer.write_stats.seconds)
+        del apps.all_models["layer_manager"][layer.table_name]
+
+    def test_create_or_replace_inserts_feature_query(self):
+        results = {
+            "aggregated_values": [],
+            "feature_query": InventoryAlgorithmsBase.feature_query(
+                HamburgGreenAreas.objects.all(), yield_average=12.5, label=None
+            ),
+        }
+        algorithm = InventoryAlgorithm.objects.get(function_name="avg_area_yield")
+
+        layer, feature_collection = Layer.objects.create_or_replace(
+            name="set-based layer",
+            scenario=self.scenario,
+            feedstock=self.feedstock_sample_series,
+            algorithm=algorithm,
+            results=results,
+        )
+
+        self.assertEqual(layer.geom_type, "MultiPolygon")
+        self.assertEqual(
+            {field.field_name: field.data_type for field in layer.layer_fields.all()},
+            {"yield_average": "float"},
+        )
+        feature = feature_collection.objects.get()
+        self.assertEqual(feature.yield_average, 12.5)
+        self.assertTrue(feature.geom.equals(HamburgGreenAreas.objects.get().geom))
+        self.assertEqual(layer.write_stats.rows, 1)
+        del apps.all_models["layer_manager"][layer.table_name]
+
+    def test_merge_partitions_adds_up_partial_layers(self):
+        algorithm = InventoryAlgorithm.objects.get(function_name="avg_area_yield")
+        geom = HamburgGreenAreas.objects.get().geom
+        partitions = []
+        for index, features in enumerate(
+            (
+                [{"geom": geom, "yield": 1.5, "label": "first"}],
+                [{"geom": geom, "yield": 2.5, "label": None}],
+            )
+        ):
+            layer, _ = Layer.objects.create_or_replace(
+                name="partitioned layer",
+                scenario=self.scenario,
+                feedstock=self.feedstock_sample_series,
+                algorithm=algorithm,
+                partition=index,
+                results={
+                    "aggregated_values": [
+                        {"name": "Total production", "value": 10, "unit": "kg"}
+                    ],
+                    "features": features,
+                },
+            )
+            partitions.append(layer)
+        partition_tables = [layer.table_name for layer in partitions]
+
+        layer, feature_collection = Layer.objects.merge_partitions(
+            partitions, input_hash="abc"
+        )
+
+        self.assertIsNone(layer.partition)
+        self.assertEqual(layer.input_hash, "abc")
+        self.assertEqual(
+            sorted(feature_collection.objects.values_list("yield", "label")),
+            [(1.5, "first"), (2.5, None)],
+        )
+        self.assertEqual(layer.layeraggregatedvalue_set.get().value, 20)
+        self.assertFalse(Layer.objects.filter(table_name__in=partition_tables).exists())
+        del apps.all_models["layer_manager"][layer.table_name]
+
+    def test_create_or_replace_rejects_empty_feature_query(self):
+        results = {
+            "feature_query": InventoryAlgorithmsBase.feature_query(
+                HamburgGreenAreas.objects.none(), yield_average=12.5
+            ),
+        }
+        with self.assertRaises(NoFeaturesProvided):
+            Layer.objects.create_or_replace(
+                name="empty layer",
+                scenario=self.scenario,
+                feedstock=self.feedstock_sample_series,
+                algorithm=InventoryAlgorithm.objects.get(
+                    function_name="avg_area_yield"
+                ),
+                results=results,
+            )
+
     def test_get_feature_collection(self):
         results = {
             "avg_area_yield": {
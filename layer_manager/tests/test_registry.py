@@ -0,0 +1,114 @@
+from django.apps import apps
+from django.contrib.gis.geos import Point
+from django.db import connection
+from django.test import TestCase
+
+from inventories.models import InventoryAlgorithm, Scenario
+from layer_manager.models import Layer
+from layer_manager.registry import LayerModelRegistry, layer_model_registry
+from maps.models import Catchment, GeoDataset, Region
+from materials.models import Material, SampleSeries
+
+
+class LayerModelRegistryTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        region = Region.objects.create(name="Registry Region")
+        scenario = Scenario.objects.create(
+            name="Registry Scenario",
+            region=region,
+            catchment=Catchment.objects.create(
+                name="Registry Catchment", region=region
+            ),
+        )
+        algorithm = InventoryAlgorithm.objects.create(
+            name="Registry Algorithm",
+            function_name="avg_point_yield",
+            geodataset=GeoDataset.objects.create(
+                name="Registry Dataset", region=region
+            ),
+        )
+        feedstock = SampleSeries.objects.create(
+            name="Registry Feedstock",
+            material=Material.objects.create(name="Registry Material"),
+        )
+        cls.layers = []
+        for index in range(3):
+            layer = Layer.objects.create(
+                name=f"registry layer {index}",
+                geom_type="Point",
+                table_name=f"registry_test_layer_{index}",
+                scenario=scenario,
+                algorithm=algorithm,
+                feedstock=feedstock,
+            )
+            layer.add_layer_fields({"value": "float"})
+            cls.layers.append(layer)
+
+    def setUp(self):
+        self.registry = LayerModelRegistry(maxsize=2)
+
+    def tearDown(self):
+        self.registry.clear()
+
+    def test_returns_the_same_model_until_the_layer_changes(self):
+        layer = self.layers[0]
+        model = self.registry.get_model(layer)
+
+        self.assertIs(self.registry.get_model(layer), model)
+        self.assertIs(apps.all_models["layer_manager"][layer.table_name], model)
+
+        layer.add_layer_fields({"label": "str"})
+        rebuilt = self.registry.get_model(layer)
+
+        self.assertIsNot(rebuilt, model)
+        self.assertEqual(
+            [field.name for field in rebuilt._meta.fields],
+            ["id", "geom", "value", "label"],
+        )
+
+    def test_rebuilds_models_that_were_removed_from_the_app_registry(self):
+        layer = self.layers[0]
+        model = self.registry.get_model(layer)
+        del apps.all_models["layer_manager"][layer.table_name]
+
+        self.assertIsNot(self.registry.get_model(layer), model)
+
+    def test_evicts_the_least_recently_used_model(self):
+        first, second, third = self.layers
+        self.registry.get_model(first)
+        self.registry.get_model(second)
+        self.registry.get_model(first)
+
+        self.registry.get_model(third)
+
+        self.assertEqual(len(self.registry), 2)
+        self.assertNotIn(second.table_name, self.registry)
+        self.assertNotIn(second.table_name, apps.all_models["layer_manager"])
+        self.assertIn(first.table_name, self.registry)
+
+    def test_discard_ignores_unknown_tables(self):
+        self.registry.discard("not_a_layer_table")
+
+    def test_cached_models_are_returned_without_queries(self):
+        layer = Layer.objects.get(pk=self.layers[0].pk)
+        model = self.registry.get_model(layer)
+
+        with self.assertNumQueries(0):
+            self.assertIs(self.registry.get_model(layer), model)
+
+    def test_feature_table_writes_without_a_model(self):
+        layer = self.layers[0]
+        layer.create_feature_table()
+        layer_model_registry.discard(layer.table_name)
+        table = layer.feature_table()
+        layer.copy_features([{"geom": Point(1, 2, srid=4326), "value": 1.5}])
+
+        self.assertEqual(table.columns, ["geom", "value"])
+        self.assertNotIn(layer.table_name, layer_model_registry)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT value FROM {table.quoted_name}")
+            self.assertEqual(cursor.fetchall(), [(1.5,)])
+
+        layer.delete_feature_table()
+        self.assertFalse(table.exists())
@@ -0,0 +1,170 @@
+"""
+Tag-based invalidation of the GeoJSON cache.
+
+Every cached GeoJSON response is registered in tag sets when it is written:
+
+* the dataset tag of its key namespace, e.g. ``region_geojson``;
+* the list tag ``<namespace>:list``, unless the response is an ``id`` lookup,
+  because a change may move any object in or out of a filtered list;
+* one object tag per served or requested object, e.g. ``maps.region:42``.
+
+Signal handlers invalidate the tags of the objects they changed, which deletes
+exactly the entries containing them instead of scanning the whole keyspace for
+a ``<namespace>:*`` pattern. Tags collected during a transaction are
+invalidated together once it commits.
+
+On django-redis the tag sets are Redis sets; other backends store them as
+plain cache values, which is not atomic but good enough for local caches.
+"""
+
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+TAG_KEY_PREFIX = "tag:"
+
+_pending = threading.local()
+
+
+def _get_cache():
+    return caches[getattr(settings, "GEOJSON_CACHE", "default")]
+
+
+def _get_redis_client(cache):
+    """Return the raw Redis client of a django-redis cache, else ``None``."""
+    get_client = getattr(getattr(cache, "client", None), "get_client", None)
+    if not callable(get_client):
+        return None
+    return get_client(write=True)
+
+
+def get_cache_key_namespace(cache_key):
+    """Return the namespace of a GeoJSON cache key, e.g. ``region_geojson``."""
+    return cache_key.split(":", 1)[0]
+
+
+def dataset_tag(namespace):
+    """Tag of all entries of a namespace."""
+    return namespace
+
+
+def list_tag(namespace):
+    """Tag of the entries of a namespace that are not ``id`` lookups."""
+    return f"{namespace}:list"
+
+
+def object_tag(model, pk):
+    """Tag of the entries containing one object, e.g. ``maps.region:42``."""
+    return f"{model._meta.concrete_model._meta.label_lower}:{pk}"
+
+
+def get_tag_key(tag):
+    return f"{TAG_KEY_PREFIX}{tag}"
+
+
+def tag_cache_entry(cache_key, tags, timeout=None):
+    """Register ``cache_key`` in the sets of ``tags``.
+
+    The sets expire with the newest entry registered in them, so they do not
+    outlive what they point to.
+    """
+    tags = set(tags)
+    if not tags:
+        return
+    cache = _get_cache()
+    try:
+        redis = _get_redis_client(cache)
+        if redis is None:
+            for tag in tags:
+                tag_key = get_tag_key(tag)
+                members = cache.get(tag_key) or set()
+                members.add(cache_key)
+                cache.set(tag_key, members, timeout=timeout)
+            return
+
+        pipeline = redis.pipeline(transaction=False)
+        for tag in tags:
+            tag_key = cache.make_key(get_tag_key(tag))
+            pipeline.sadd(tag_key, cache_key)
+            if timeout:
+                pipeline.expire(tag_key, timeout)
+        pipeline.execute()
+    except Exception:
+        logger.exception("Error tagging cache key '%s'", cache_key)
+
+
+def invalidate_cache_tags(*tags):
+    """Delete all cache entries registered in ``tags``, and the tags.
+
+    Returns the number of entries deleted.
+    """
+    tag_keys = [get_tag_key(tag) for tag in sorted(set(tags))]
+    if not tag_keys:
+        return 0
+    cache = _get_cache()
+    try:
+        redis = _get_redis_client(cache)
+        if redis is None:
+            cache_keys = set()
+            for members in cache.get_many(tag_keys).values():
+                cache_keys.update(members)
+            cache.delete_many([*tag_keys, *cache_keys])
+        else:
+            raw_keys = [cache.make_key(tag_key) for tag_key in tag_keys]
+            # Read and drop the sets atomically, so an entry registered
+            # meanwhile is neither lost nor deleted without its tag.
+            pipeline = redis.pipeline(transaction=True)
+            for raw_key in raw_keys:
+                pipeline.smembers(raw_key)
+            pipeline.delete(*raw_keys)
+            *member_sets, _deleted = pipeline.execute()
+            cache_keys = {
+                member.decode() if isinstance(member, bytes) else member
+                for members in member_sets
+                for member in members
+            }
+            if cache_keys:
+                cache.delete_many(list(cache_keys))
+        logger.debug(
+            "Invalidated %d cache keys tagged %s", len(cache_keys), sorted(tags)
+        )
+        return len(cache_keys)
+    except Exception:
+        logger.exception("Error invalidating cache tags %s", sorted(tags))
+        return 0
+
+
+def flush_pending_cache_tags():
+    """Invalidate the tags collected by ``invalidate_cache_tags_on_commit``."""
+    tags = getattr(_pending, "tags", None)
+    if not tags:
+        return
+    _pending.tags = set()
+    invalidate_cache_tags(*tags)
+
+
+def invalidate_cache_tags_on_commit(*tags, using=None):
+    """Invalidate ``tags`` once the current transaction commits.
+
+    All tags of a transaction are invalidated in one go, so saving thousands
+    of objects costs one round trip per transaction instead of one per save.
+    Outside of a transaction the tags are invalidated immediately.
+    """
+    if not hasattr(_pending, "tags"):
+        _pending.tags = set()
+    _pending.tags.update(tags)
+
+    connection = transaction.get_connection(using)
+    if connection.in_atomic_block and any(
+        callback is flush_pending_cache_tags
+        for _sids, callback, _robust in connection.run_on_commit
+    ):
+        return
+    # Tags left over from a rolled back transaction are flushed with the next
+    # one, which only costs a few extra cache misses.
+    transaction.on_commit(flush_pending_cache_tags, using=using)
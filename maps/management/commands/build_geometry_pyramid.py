@@ -0,0 +1,58 @@
+"""
+Management command to (re)build the GeoPolygon simplification pyramid.
+
+Usage:
+    # Rebuild the pyramid of every GeoPolygon
+    python manage.py build_geometry_pyramid
+
+    # Rebuild only selected GeoPolygons
+    python manage.py build_geometry_pyramid --ids 12 13 14
+
+    # Run asynchronously via Celery
+    python manage.py build_geometry_pyramid --async
+"""
+
+from django.core.management.base import BaseCommand
+
+from maps.pyramid import GEOMETRY_PYRAMID_TOLERANCES
+
+
+class Command(BaseCommand):
+    help = "Precompute simplified GeoPolygon geometries for zoom-dependent GeoJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ids",
+            nargs="+",
+            type=int,
+            default=None,
+            help="GeoPolygon ids to rebuild (default: all)",
+        )
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="run_async",
+            help="Run asynchronously via Celery (non-blocking)",
+        )
+
+    def handle(self, *args, **options):
+        from maps.tasks import refresh_geometry_pyramid_task
+
+        geopolygon_ids = options["ids"]
+        if options["run_async"]:
+            refresh_geometry_pyramid_task.delay(geopolygon_ids)
+            self.stdout.write(
+                self.style.SUCCESS("Task queued. Check Celery logs for progress.")
+            )
+            return
+
+        self.stdout.write(
+            "Building geometry pyramid with tolerances "
+            f"{', '.join(str(t) for t in GEOMETRY_PYRAMID_TOLERANCES)}..."
+        )
+        result = refresh_geometry_pyramid_task.apply(args=(geopolygon_ids,)).get()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Geometry pyramid built for {result['geopolygons']:,} GeoPolygons"
+            )
+        )
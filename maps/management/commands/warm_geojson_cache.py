@@ -26,13 +26,18 @@ from django.contrib.gis.db.models.functions import NumPoints
 from django.core.cache import caches
 from django.core.management.base import BaseCommand
 
+from maps.cache_tags import dataset_tag, list_tag, object_tag, tag_cache_entry
 from maps.models import NutsRegion, NutsVintage, Region
 from maps.registry import get_source_domain_geojson_cache_warmers
 from maps.serializers import (
     NutsRegionGeometrySerializer,
     RegionGeoFeatureModelSerializer,
 )
-from maps.utils import get_nuts_region_cache_key, get_region_cache_key
+from maps.utils import (
+    encode_geojson_payload,
+    get_nuts_region_cache_key,
+    get_region_cache_key,
+)
 
 # Number of largest regions to warm by default. The H27 "Client Request
 # Interrupted" warnings come almost entirely from crawlers fetching the few
@@ -209,15 +214,28 @@ class Command(BaseCommand):
             if limit:
                 queryset = queryset[:limit]
 
+            region_tags = set()
             for region in queryset:
                 cache_key = get_nuts_region_cache_key(nuts_id=region.id, version=year)
                 serializer = NutsRegionGeometrySerializer([region], many=True)
-                geojson_cache.set(cache_key, serializer.data)
+                geojson_cache.set(cache_key, encode_geojson_payload(serializer.data))
+                region_tag = object_tag(Region, region.id)
+                region_tags.add(region_tag)
+                tag_cache_entry(
+                    cache_key,
+                    {dataset_tag("nuts_geojson"), region_tag},
+                    timeout=geojson_cache.default_timeout,
+                )
 
             # Also cache the collection
             cache_key = get_nuts_region_cache_key(level=level, version=year)
             serializer = NutsRegionGeometrySerializer(queryset, many=True)
-            geojson_cache.set(cache_key, serializer.data)
+            geojson_cache.set(cache_key, encode_geojson_payload(serializer.data))
+            tag_cache_entry(
+                cache_key,
+                {dataset_tag("nuts_geojson"), list_tag("nuts_geojson"), *region_tags},
+                timeout=geojson_cache.default_timeout,
+            )
 
         self.stdout.write("NUTS cache warmup complete!")
 
@@ -250,7 +268,14 @@ class Command(BaseCommand):
         for region in queryset:
             cache_key = get_region_cache_key(region_id=region.id)
             serializer = RegionGeoFeatureModelSerializer([region], many=True)
-            geojson_cache.set(cache_key, serializer.data, timeout=timeout)
+            geojson_cache.set(
+                cache_key, encode_geojson_payload(serializer.data), timeout=timeout
+            )
+            tag_cache_entry(
+                cache_key,
+                {dataset_tag("region_geojson"), object_tag(Region, region.id)},
+                timeout=timeout,
+            )
             warmed += 1
 
         self.stdout.write(
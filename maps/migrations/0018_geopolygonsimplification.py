@@ -0,0 +1,52 @@
+# Generated by Django 6.0.5 on 2026-10-17 09:12
+
+import django.contrib.gis.db.models.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("maps", "0017_catchment_revisions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GeoPolygonSimplification",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("level", models.PositiveSmallIntegerField()),
+                ("tolerance", models.FloatField()),
+                (
+                    "geom",
+                    django.contrib.gis.db.models.fields.GeometryField(
+                        blank=True, null=True, srid=4326
+                    ),
+                ),
+                (
+                    "geopolygon",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="simplifications",
+                        to="maps.geopolygon",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("geopolygon", "level"),
+                        name="unique_geopolygon_simplification_level",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,22 +1,50 @@
 import hashlib
 import json
+import math
 
 from django.conf import settings
 from django.contrib.gis.geos import Polygon
 from django.core.cache import caches
 from django.core.exceptions import ValidationError as DjangoValidationError
-from django.db.models import Count, Max, Min
-from django.http import StreamingHttpResponse
+from django.db import connection, models
+from django.db.models import Count, F, Max, Min
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.renderers import BaseRenderer
 from rest_framework.response import Response
 
+from .cache_tags import dataset_tag, get_cache_key_namespace, list_tag, object_tag
+from .pyramid import pyramid_geometry, pyramid_level_from_params
+from .utils import (
+    GEOJSON_CONTENT_TYPE,
+    decode_geojson_payload,
+    encode_geojson_payload,
+    get_stale_cache_key,
+    is_encoded_geojson_payload,
+    single_flight_cache,
+)
+from .versioning import dataset_version_key, get_dataset_version_state
+
 # Threshold for switching to streaming response (number of features)
 STREAMING_THRESHOLD = 1000
 
 # Enable streaming for large uncached requests
 STREAMING_ENABLED = True
 
+# Mapbox vector tile parameters (see ST_AsMVTGeom). The extent is the tile's
+# internal grid size; the buffer keeps strokes continuous across tile edges.
+MVT_CONTENT_TYPE = "application/vnd.mapbox-vector-tile"
+MVT_EXTENT = 4096
+MVT_BUFFER = 64
+MVT_MAX_ZOOM = 22
+
+# Response headers the map frontend reads from cross-origin GeoJSON responses
+GEOJSON_EXPOSE_HEADERS = "X-Total-Count, X-Cache-Status, X-Data-Version, ETag"
+
 MAX_UNBOUNDED_GEOJSON_FEATURES = getattr(
     settings, "GEOJSON_MAX_UNBOUNDED_FEATURES", 5000
 )
@@ -28,6 +56,8 @@ GEOJSON_CONTROL_QUERY_PARAMS = {
     "page",
     "scope",
     "stream",
+    "tolerance",
+    "zoom",
 }
 
 
@@ -118,16 +148,211 @@ def get_unbounded_geojson_rejection_response(
     return response
 
 
+def parse_bbox(bbox_str):
+    """Parse a ``minLng,minLat,maxLng,maxLat`` string into a Polygon.
+
+    Returns ``None`` if the string is empty or invalid.
+    """
+    if not bbox_str:
+        return None
+    try:
+        coords = [float(x) for x in bbox_str.split(",")]
+        if len(coords) != 4:
+            return None
+        min_lng, min_lat, max_lng, max_lat = coords
+        return Polygon.from_bbox((min_lng, min_lat, max_lng, max_lat))
+    except (ValueError, TypeError):
+        return None
+
+
+def tile_envelope(z, x, y):
+    """Return the WGS84 bounding polygon of the XYZ (web mercator) tile.
+
+    Raises ``NotFound`` for tile coordinates outside the tile pyramid.
+    """
+    if z > MVT_MAX_ZOOM:
+        raise NotFound(f"Zoom level must not exceed {MVT_MAX_ZOOM}.")
+    n = 2**z
+    if x >= n or y >= n:
+        raise NotFound(f"Tile {z}/{x}/{y} is outside the tile grid.")
+
+    def tile_lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    min_lng = x / n * 360.0 - 180.0
+    max_lng = (x + 1) / n * 360.0 - 180.0
+    envelope = Polygon.from_bbox((min_lng, tile_lat(y + 1), max_lng, tile_lat(y)))
+    envelope.srid = 4326
+    return envelope
+
+
+def accepts_gzip(request):
+    """Return True if the client advertises gzip in Accept-Encoding."""
+    accept_encoding = request.META.get("HTTP_ACCEPT_ENCODING", "")
+    return any(
+        part.split(";")[0].strip().lower() == "gzip"
+        for part in accept_encoding.split(",")
+    )
+
+
+def encoded_geojson_response(request, payload, data_version=None):
+    """Serve a pre-encoded geojson cache entry without re-serializing it.
+
+    Gzip bodies are passed through to clients that accept gzip and are
+    decompressed for the others. The strong ETag is derived from the dataset
+    version and differs per content coding, as the representations differ.
+    """
+    body = payload["body"]
+    response = HttpResponse(content_type=GEOJSON_CONTENT_TYPE)
+    etag = data_version
+    if payload["encoding"] == "gzip":
+        if accepts_gzip(request):
+            response["Content-Encoding"] = "gzip"
+            etag = f"{data_version}-gzip" if data_version else None
+        else:
+            body = decode_geojson_payload(payload)
+        patch_vary_headers(response, ("Accept-Encoding",))
+    response.content = body
+    if etag:
+        response["ETag"] = quote_etag(etag)
+    if payload.get("feature_count") is not None:
+        response["X-Total-Count"] = str(payload["feature_count"])
+    return response
+
+
+def get_queryset_state(queryset, timestamp_fields=("lastmodified_at",), prefix=None):
+    """Return ``(version, last_modified)`` of a queryset from one aggregate query.
+
+    The version is a short hash of the row count, the ID range and the latest
+    of ``timestamp_fields``; ``last_modified`` is that latest timestamp, or
+    ``None`` if no row has one. ``prefix`` namespaces the hash, e.g. by scope.
+    """
+    agg = queryset.aggregate(
+        cnt=Count("pk"),
+        min_id=Min("pk"),
+        max_id=Max("pk"),
+        **{f"max_mod_{i}": Max(field) for i, field in enumerate(timestamp_fields)},
+    )
+    timestamps = [
+        agg[f"max_mod_{i}"]
+        for i in range(len(timestamp_fields))
+        if agg[f"max_mod_{i}"] is not None
+    ]
+    last_modified = max(timestamps, default=None)
+    ts = int(last_modified.timestamp()) if last_modified else 0
+    base = f"{agg['cnt'] or 0}:{ts}:{agg['min_id'] or 0}:{agg['max_id'] or 0}"
+    if prefix:
+        base = f"{prefix}:{base}"
+    return hashlib.sha1(base.encode("utf-8")).hexdigest()[:12], last_modified
+
+
+def is_not_modified(request, data_version, last_modified=None):
+    """Return True if the request's validators match the current dataset state.
+
+    If-None-Match takes precedence over If-Modified-Since. Both content codings
+    of a version (see ``encoded_geojson_response``) count as a match, as they
+    carry the same features.
+    """
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match:
+        if not data_version:
+            return False
+        etags = parse_etags(if_none_match)
+        if "*" in etags:
+            return True
+        current = {data_version, f"{data_version}-gzip"}
+        return any(etag.removeprefix("W/").strip('"') in current for etag in etags)
+
+    if_modified_since = request.META.get("HTTP_IF_MODIFIED_SINCE")
+    if if_modified_since and last_modified is not None:
+        since = parse_http_date_safe(if_modified_since)
+        return since is not None and int(last_modified.timestamp()) <= since
+    return False
+
+
+def set_conditional_headers(response, data_version, last_modified=None):
+    """Add ETag/Last-Modified validators and require clients to revalidate."""
+    if data_version and not response.has_header("ETag"):
+        response["ETag"] = quote_etag(data_version)
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def get_not_modified_response(request, data_version, last_modified=None):
+    """Return a 304 response if the client's copy is current, else ``None``.
+
+    Called before any cache fetch or serialization, so a revalidation costs no
+    more than computing the dataset version.
+    """
+    if not is_not_modified(request, data_version, last_modified):
+        return None
+    response = HttpResponseNotModified()
+    set_conditional_headers(response, data_version, last_modified)
+    patch_vary_headers(response, ("Accept-Encoding",))
+    response["X-Data-Version"] = data_version or ""
+    response["Access-Control-Expose-Headers"] = GEOJSON_EXPOSE_HEADERS
+    return response
+
+
+class MVTRenderer(BaseRenderer):
+    """Pass pre-encoded vector tile bytes through unchanged.
+
+    Error payloads raised inside the tile action are dicts; those are rendered
+    as JSON so clients still get a readable message.
+    """
+
+    media_type = MVT_CONTENT_TYPE
+    format = "mvt"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if isinstance(data, bytes | bytearray | memoryview):
+            return bytes(data)
+        return json.dumps(data).encode("utf-8")
+
+
 class CachedGeoJSONMixin:
     """
-    Mixin to add caching to GeoJSON endpoints using the get_or_set_cache helper.
+    Mixin to add caching to GeoJSON endpoints using the single_flight_cache helper.
     Requires the ViewSet to implement `get_cache_key(self, request)`
     and `get_geojson_serializer_class(self)`.
 
     Supports optional bounding box filtering via `bbox` query parameter.
     For large datasets, uses streaming response to reduce memory pressure.
+
+    ViewSets that set `mvt_geometry_field` additionally serve Mapbox vector
+    tiles at `tiles/{z}/{x}/{y}.mvt`, rendered by PostGIS from the same
+    (scope-filtered) queryset as the GeoJSON action.
+
+    ViewSets that set `pyramid_geopolygon_field` accept `zoom` or `tolerance`
+    query params and then serve the matching precomputed simplification of
+    the geometry (annotated as `simplified_geom`) instead of the full one.
     """
 
+    # Models whose change counters (see maps.versioning) version the dataset.
+    # Without them the version is aggregated over the served queryset.
+    dataset_version_models = None
+
+    # Objects a cached GeoJSON response is tagged with (see maps.cache_tags),
+    # as lookup on the served queryset -> model. Saving one of them only
+    # invalidates the responses that contain it.
+    geojson_cache_tag_fields = {}
+
+    # Lookup path to the GeoPolygon holding the served geometry, e.g.
+    # "region__borders". Enables zoom-dependent geometry pyramid levels.
+    pyramid_geopolygon_field = None
+
+    # Lookup path of the geometry rendered into vector tiles. Tiles are only
+    # served by ViewSets that set this.
+    mvt_geometry_field = None
+    # Feature attributes written into vector tiles: tile attribute -> lookup.
+    mvt_properties = {"id": "pk"}
+
     # Default cache timeout for this mixin - can be overridden in ViewSet
     max_unbounded_geojson_features = MAX_UNBOUNDED_GEOJSON_FEATURES
     cache_timeout = (
@@ -136,16 +361,19 @@ class CachedGeoJSONMixin:
         .get("TIMEOUT", 3600)
     )  # Default 1 hour fallback
 
-    # Throttle classes applied only to the (expensive, public) `geojson` action.
-    # ViewSets opt in by setting this; other actions keep their normal throttles.
+    # Throttle classes applied only to the (expensive, public) `geojson` and
+    # `tiles` actions. ViewSets opt in by setting these; other actions keep
+    # their normal throttles.
     geojson_throttle_classes = None
+    mvt_throttle_classes = None
 
     def get_throttles(self):
-        if (
-            getattr(self, "action", None) == "geojson"
-            and self.geojson_throttle_classes is not None
-        ):
-            return [throttle() for throttle in self.geojson_throttle_classes]
+        throttle_classes = {
+            "geojson": self.geojson_throttle_classes,
+            "tiles": self.mvt_throttle_classes,
+        }.get(getattr(self, "action", None))
+        if throttle_classes is not None:
+            return [throttle() for throttle in throttle_classes]
         return super().get_throttles()
 
     def _parse_bbox(self, request):
@@ -154,17 +382,7 @@ class CachedGeoJSONMixin:
         Expected format: bbox=minLng,minLat,maxLng,maxLat
         Returns a Polygon or None if not provided/invalid.
         """
-        bbox_str = request.query_params.get("bbox")
-        if not bbox_str:
-            return None
-        try:
-            coords = [float(x) for x in bbox_str.split(",")]
-            if len(coords) != 4:
-                return None
-            min_lng, min_lat, max_lng, max_lat = coords
-            return Polygon.from_bbox((min_lng, min_lat, max_lng, max_lat))
-        except (ValueError, TypeError):
-            return None
+        return parse_bbox(request.query_params.get("bbox"))
 
     def _apply_bbox_filter(self, queryset, bbox):
         """Apply bounding box filter to queryset if bbox is provided."""
@@ -202,9 +420,56 @@ class CachedGeoJSONMixin:
         except (DjangoValidationError, TypeError, ValueError):
             return queryset.none()
 
+    def get_pyramid_level(self, request):
+        """Return the geometry pyramid level requested via `zoom`/`tolerance`."""
+        if self.pyramid_geopolygon_field is None:
+            return None
+        params = getattr(request, "query_params", None) or getattr(request, "GET", {})
+        return pyramid_level_from_params(params)
+
+    def apply_geometry_pyramid(self, queryset, request):
+        """Annotate the requested pyramid geometry as `simplified_geom`."""
+        level = self.get_pyramid_level(request)
+        if level is None:
+            return queryset
+        return queryset.annotate(
+            simplified_geom=pyramid_geometry(self.pyramid_geopolygon_field, level)
+        )
+
+    def get_geojson_cache_key(self, request):
+        """Return the cache key of the GeoJSON response, per pyramid level."""
+        cache_key = self.get_cache_key(request)
+        level = self.get_pyramid_level(request)
+        if level is not None:
+            cache_key = f"{cache_key}:lvl:{level}"
+        return cache_key
+
+    def get_geojson_cache_tags(self, request, cache_key, queryset):
+        """Return the cache tags of the GeoJSON response of ``queryset``.
+
+        ``id`` lookups are tagged with the requested objects as well, so that
+        they are invalidated when an object they missed becomes visible. All
+        other responses are list responses whose members may change with any
+        save.
+        """
+        namespace = get_cache_key_namespace(cache_key)
+        tags = {dataset_tag(namespace)}
+        params = getattr(request, "query_params", None) or getattr(request, "GET", {})
+        requested_ids = params.getlist("id") if hasattr(params, "getlist") else []
+        requested_ids = [value for value in requested_ids if str(value).strip()]
+        if not requested_ids:
+            tags.add(list_tag(namespace))
+        for lookup, model in self.geojson_cache_tag_fields.items():
+            values = set(queryset.order_by().values_list(lookup, flat=True).distinct())
+            if lookup == "pk":
+                values.update(requested_ids)
+            tags.update(object_tag(model, value) for value in values if value)
+        return tags
+
     def get_geojson_data(self):
         """Generates the GeoJSON data. Expected to be called on cache miss."""
         queryset = self.get_geojson_queryset_with_bbox(self.request)
+        queryset = self.apply_geometry_pyramid(queryset, self.request)
         serializer_class = getattr(
             self, "get_geojson_serializer_class", self.get_serializer_class
         )
@@ -213,39 +478,46 @@ class CachedGeoJSONMixin:
         )
         return serializer.data
 
-    def get_dataset_version(self, request):
-        """Return a short hash representing the current dataset state.
+    def get_dataset_state(self, request):
+        """Return ``(version, last_modified)`` of the current dataset state.
 
-        Computes a version based on count, max lastmodified_at, and ID range.
-        ViewSets may override this to include additional dependencies (e.g.,
-        related model timestamps).
+        With ``dataset_version_models`` set, the version combines the change
+        counters of those models, which is a single indexed lookup. Otherwise
+        it is computed from count, max lastmodified_at, and ID range of the
+        served queryset. ViewSets may override this to include additional
+        dependencies.
 
-        Falls back to get_cache_key if the model lacks lastmodified_at.
+        Returns ``(None, None)`` if neither is available, as such a dataset
+        cannot be versioned and must not be answered with a 304.
         """
+        if self.dataset_version_models:
+            return get_dataset_version_state(
+                dataset_version_key(model) for model in self.dataset_version_models
+            )
+
         queryset = self.get_geojson_queryset_with_bbox(request)
         model = queryset.model
 
         # Check if model has lastmodified_at field
         field_names = [f.name for f in model._meta.get_fields()]
         if "lastmodified_at" not in field_names:
-            # Fallback to cache key for models without timestamp
-            if hasattr(self, "get_cache_key"):
-                return self.get_cache_key(request)
-            return "unknown"
-
-        agg = queryset.aggregate(
-            cnt=Count("pk"),
-            max_mod=Max("lastmodified_at"),
-            min_id=Min("pk"),
-            max_id=Max("pk"),
-        )
-        cnt = agg.get("cnt") or 0
-        max_mod = agg.get("max_mod")
-        ts = int(max_mod.timestamp()) if max_mod else 0
-        min_id = agg.get("min_id") or 0
-        max_id = agg.get("max_id") or 0
-        base = f"{cnt}:{ts}:{min_id}:{max_id}"
-        return hashlib.sha1(base.encode("utf-8")).hexdigest()[:12]
+            return None, None
+        return get_queryset_state(queryset)
+
+    def get_dataset_version(self, request):
+        """Return a short hash representing the current dataset state.
+
+        Falls back to get_cache_key if the model lacks lastmodified_at.
+        """
+        version, _last_modified = self.get_dataset_state(request)
+        return self._dataset_version_or_fallback(request, version)
+
+    def _dataset_version_or_fallback(self, request, version):
+        if version is not None:
+            return version
+        if hasattr(self, "get_cache_key"):
+            return self.get_cache_key(request)
+        return "unknown"
 
     def _stream_geojson(self, queryset):
         """Generator that streams GeoJSON features to reduce memory usage.
@@ -281,6 +553,113 @@ class CachedGeoJSONMixin:
 
         yield "]}"
 
+    def get_mvt_layer_name(self):
+        """Name of the layer inside the vector tile, e.g. ``region``."""
+        return self.get_queryset().model._meta.model_name
+
+    def get_mvt_cache_key(self, request, z, x, y, data_version):
+        """Derive the tile cache key from the GeoJSON cache key.
+
+        Sharing the prefix means the existing pattern-based invalidation of the
+        GeoJSON keys also drops the tiles of the same dataset.
+        """
+        return f"{self.get_cache_key(request)}:mvt:{z}:{x}:{y}:dv:{data_version}"
+
+    def render_mvt(self, queryset, z, x, y):
+        """Render one tile of ``queryset`` with ST_AsMVT and return its bytes."""
+        envelope = tile_envelope(z, x, y)
+        geometry_field = self.mvt_geometry_field
+        queryset = (
+            queryset.filter(**{f"{geometry_field}__intersects": envelope})
+            .order_by()
+            .values(
+                mvt_geom=F(geometry_field),
+                **{
+                    f"mvt_{name}": F(lookup)
+                    for name, lookup in self.mvt_properties.items()
+                },
+            )
+        )
+        source_sql, source_params = queryset.query.sql_with_params()
+        qn = connection.ops.quote_name
+        columns = ", ".join(
+            f"src.{qn(f'mvt_{name}')} AS {qn(name)}" for name in self.mvt_properties
+        )
+        sql = f"""
+            WITH bounds AS (SELECT ST_TileEnvelope(%s, %s, %s) AS geom)
+            SELECT ST_AsMVT(tile.*, %s, %s, 'geom')
+            FROM (
+                SELECT
+                    ST_AsMVTGeom(
+                        ST_Transform(src.mvt_geom, 3857), bounds.geom, %s, %s, true
+                    ) AS geom,
+                    {columns}
+                FROM ({source_sql}) AS src, bounds
+            ) AS tile
+            WHERE tile.geom IS NOT NULL
+        """
+        params = [
+            z,
+            x,
+            y,
+            self.get_mvt_layer_name(),
+            MVT_EXTENT,
+            MVT_EXTENT,
+            MVT_BUFFER,
+            *source_params,
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+        return bytes(row[0]) if row and row[0] is not None else b""
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path=r"tiles/(?P<z>\d+)/(?P<x>\d+)/(?P<y>\d+)\.mvt",
+        renderer_classes=[MVTRenderer],
+    )
+    def tiles(self, request, z, x, y, *args, **kwargs):
+        """Return a Mapbox vector tile of the layer's geometries.
+
+        Tiles honour the same filtering and scope as the GeoJSON action and are
+        cached per dataset version, so clients only fetch the features in view
+        at a precision matching the zoom level.
+        """
+        if self.mvt_geometry_field is None:
+            raise NotFound("Vector tiles are not available for this layer.")
+        z, x, y = int(z), int(x), int(y)
+        tile_envelope(z, x, y)
+
+        version, last_modified = self.get_dataset_state(request)
+        not_modified = get_not_modified_response(request, version, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        data_version = self._dataset_version_or_fallback(request, version)
+        cache_key = self.get_mvt_cache_key(request, z, x, y, data_version)
+        result = single_flight_cache(
+            cache_key,
+            lambda: self.render_mvt(
+                self.get_geojson_queryset_with_bbox(request), z, x, y
+            ),
+            timeout=getattr(self, "cache_timeout", None),
+        )
+        tile, cache_status = result.data, result.status
+
+        response = Response(
+            tile,
+            status=status.HTTP_200_OK if tile else status.HTTP_204_NO_CONTENT,
+            content_type=MVT_CONTENT_TYPE,
+        )
+        set_conditional_headers(response, version, last_modified)
+        response["X-Cache-Status"] = cache_status
+        response["X-Data-Version"] = data_version
+        response["Access-Control-Expose-Headers"] = (
+            "X-Cache-Status, X-Data-Version, ETag"
+        )
+        return response
+
     @action(detail=False, methods=["get", "head"])
     def version(self, request, *args, **kwargs):
         """Return the current dataset version for client-side cache validation.
@@ -309,24 +688,33 @@ class CachedGeoJSONMixin:
         # Check for streaming preference
         use_stream = request.query_params.get("stream", "").lower() == "true"
         bbox = self._parse_bbox(request)
-        cache_key = self.get_cache_key(request)
+
+        # Answer revalidations before touching the cache or the serializer
+        version, last_modified = self.get_dataset_state(request)
+        not_modified = get_not_modified_response(request, version, last_modified)
+        if not_modified is not None:
+            return not_modified
+        data_version = self._dataset_version_or_fallback(request, version)
+
+        cache_key = self.get_geojson_cache_key(request)
 
         # Try cache first (unless streaming is explicitly requested)
         if not use_stream and not bbox:
             data = caches[getattr(settings, "GEOJSON_CACHE", "default")].get(cache_key)
 
             if data is not None:
-                data_version = self.get_dataset_version(request)
-                response = Response(data)
+                if is_encoded_geojson_payload(data):
+                    response = encoded_geojson_response(request, data, version)
+                else:
+                    response = Response(data)
+                    # Add feature count for frontend progress
+                    if isinstance(data, dict) and "features" in data:
+                        response["X-Total-Count"] = str(len(data["features"]))
+                set_conditional_headers(response, version, last_modified)
                 response["X-Cache-Status"] = "HIT"
-                # Add feature count for frontend progress
-                if isinstance(data, dict) and "features" in data:
-                    response["X-Total-Count"] = str(len(data["features"]))
                 # Add version header for client-side cache validation
                 response["X-Data-Version"] = data_version
-                response["Access-Control-Expose-Headers"] = (
-                    "X-Total-Count, X-Cache-Status, X-Data-Version"
-                )
+                response["Access-Control-Expose-Headers"] = GEOJSON_EXPOSE_HEADERS
                 return response
 
         # Cache miss or streaming requested - get queryset
@@ -342,7 +730,8 @@ class CachedGeoJSONMixin:
         if rejection_response is not None:
             return rejection_response
 
-        data_version = self.get_dataset_version(request)
+        tagged_queryset = queryset
+        queryset = self.apply_geometry_pyramid(queryset, request)
 
         # Use streaming for large datasets to prevent memory issues
         if STREAMING_ENABLED and count > STREAMING_THRESHOLD:
@@ -350,42 +739,81 @@ class CachedGeoJSONMixin:
                 self._stream_geojson(queryset),
                 content_type="application/geo+json",
             )
+            set_conditional_headers(response, version, last_modified)
             response["X-Cache-Status"] = "STREAM"
             response["X-Total-Count"] = str(count)
             response["X-Data-Version"] = data_version
             # Allow CORS to read custom headers
-            response["Access-Control-Expose-Headers"] = (
-                "X-Total-Count, X-Cache-Status, X-Data-Version"
-            )
+            response["Access-Control-Expose-Headers"] = GEOJSON_EXPOSE_HEADERS
             return response
 
         # Small dataset - serialize normally and cache
         serializer_class = getattr(
             self, "get_geojson_serializer_class", self.get_serializer_class
         )
-        serializer = serializer_class()(
-            queryset, many=True, context={"request": request}
-        )
-        data = serializer.data
 
-        # Cache the result if no bbox filter
-        if not bbox:
-            cache_key = self.get_cache_key(request)
-            timeout = getattr(self, "cache_timeout", None)
-            cache_alias = getattr(settings, "GEOJSON_CACHE", "default")
-            caches[cache_alias].set(cache_key, data, timeout=timeout)
+        def serialize():
+            return serializer_class()(
+                queryset, many=True, context={"request": request}
+            ).data
 
-        response = Response(data)
-        response["X-Cache-Status"] = "MISS"
+        if bbox:
+            response = Response(serialize())
+            cache_status = "MISS"
+        else:
+            # Cache the rendered body, so hits skip encoding. Concurrent misses
+            # of the same key wait for one serialization instead of each
+            # running their own.
+            generated = {}
+
+            def generate():
+                generated["data"] = serialize()
+                return encode_geojson_payload(generated["data"])
+
+            result = single_flight_cache(
+                cache_key,
+                generate,
+                timeout=getattr(self, "cache_timeout", None),
+                stale_key=self.get_geojson_stale_cache_key(request, cache_key),
+                version=data_version,
+                tags=lambda: self.get_geojson_cache_tags(
+                    request, cache_key, tagged_queryset
+                ),
+            )
+            cache_status = result.status
+            if "data" in generated:
+                response = Response(generated["data"])
+            elif is_encoded_geojson_payload(result.data):
+                # Bodies waited for on a miss carry the gzip ETag like hits
+                response = encoded_geojson_response(
+                    request, result.data, None if cache_status == "STALE" else version
+                )
+            else:
+                response = Response(result.data)
+            if cache_status == "STALE":
+                # The previous dataset state: no validators, and the version
+                # it was generated for, so clients refetch it later.
+                response["X-Cache-Status"] = cache_status
+                response["X-Total-Count"] = str(count)
+                response["X-Data-Version"] = result.version or ""
+                response["Access-Control-Expose-Headers"] = GEOJSON_EXPOSE_HEADERS
+                return response
+
+        set_conditional_headers(response, version, last_modified)
+        response["X-Cache-Status"] = cache_status
         response["X-Total-Count"] = str(count)
-        # Use cache_key if available for version, otherwise generate one
-        version_key = data_version
-        response["X-Data-Version"] = version_key
-        response["Access-Control-Expose-Headers"] = (
-            "X-Total-Count, X-Cache-Status, X-Data-Version"
-        )
+        response["X-Data-Version"] = data_version
+        response["Access-Control-Expose-Headers"] = GEOJSON_EXPOSE_HEADERS
         return response
 
+    def get_geojson_stale_cache_key(self, request, cache_key):
+        """Return the key of the previous GeoJSON served while regenerating.
+
+        Only requests that may see the same data may share it; ViewSets whose
+        cache keys do not fully encode visibility must override this.
+        """
+        return get_stale_cache_key(cache_key)
+
     def get_geojson_serializer_class(self):
         """
         ViewSets using this mixin should implement this method to specify
@@ -424,8 +852,31 @@ class GeoJSONMixin:
         # Apply standard filtering (search, ordering, etc.)
         queryset = self.filter_queryset(queryset)
 
+        version, last_modified = self.get_geojson_state(queryset)
+        not_modified = get_not_modified_response(request, version, last_modified)
+        if not_modified is not None:
+            return not_modified
+
         serializer = self.get_geojson_serializer(queryset, many=True)
-        return Response(serializer.data)
+        response = Response(serializer.data)
+        if version is not None:
+            set_conditional_headers(response, version, last_modified)
+            response["X-Data-Version"] = version
+            response["Access-Control-Expose-Headers"] = GEOJSON_EXPOSE_HEADERS
+        return response
+
+    def get_geojson_state(self, queryset):
+        """Return ``(version, last_modified)`` validators of the GeoJSON response.
+
+        Returns ``(None, None)``, disabling conditional requests, unless the
+        queryset's model tracks ``lastmodified_at``.
+        """
+        model = getattr(queryset, "model", None)
+        if not (isinstance(model, type) and issubclass(model, models.Model)):
+            return None, None
+        if "lastmodified_at" not in {f.name for f in model._meta.get_fields()}:
+            return None, None
+        return get_queryset_state(queryset)
 
     def get_geojson_serializer(self, *args, **kwargs):
         """
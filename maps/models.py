@@ -4,7 +4,7 @@ import re
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
-from django.contrib.gis.db.models import MultiPolygonField, PointField
+from django.contrib.gis.db.models import GeometryField, MultiPolygonField, PointField
 from django.contrib.gis.geos import GEOSGeometry, MultiPolygon
 from django.contrib.postgres.constraints import ExclusionConstraint
 from django.contrib.postgres.fields import DateRangeField, RangeOperators
@@ -312,6 +312,49 @@ class GeoPolygon(models.Model):
     geom = MultiPolygonField(blank=True, null=True)
 
 
+class GeoPolygonSimplification(models.Model):
+    """One level of the precomputed simplification pyramid of a GeoPolygon.
+
+    GeoJSON endpoints read these by ``(geopolygon, level)`` instead of
+    simplifying the full geometry on every request. Rows are maintained by
+    ``maps.pyramid.refresh_geometry_pyramid``.
+    """
+
+    geopolygon = models.ForeignKey(
+        GeoPolygon, on_delete=models.CASCADE, related_name="simplifications"
+    )
+    level = models.PositiveSmallIntegerField()
+    tolerance = models.FloatField()
+    geom = GeometryField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["geopolygon", "level"],
+                name="unique_geopolygon_simplification_level",
+            )
+        ]
+
+    def __str__(self):
+        return f"GeoPolygon {self.geopolygon_id} level {self.level}"
+
+
+class DatasetVersion(models.Model):
+    """Monotonic change counter of one dataset (model, optionally per scope).
+
+    Bumped by the signals in ``maps.signals`` once the writing transaction commits,
+    so GeoJSON endpoints can version their responses with one indexed lookup
+    instead of aggregating over the served queryset. See ``maps.versioning``.
+    """
+
+    key = models.CharField(max_length=255, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.key} v{self.version}"
+
+
 class Region(NamedUserCreatedObject):
     country = models.CharField(max_length=56, null=False)
     type = models.CharField(max_length=14, choices=TYPES, default="custom")
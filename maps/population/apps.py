@@ -1,3 +1,5 @@
+import importlib
+
 from django.apps import AppConfig
 
 
@@ -6,3 +8,6 @@ class PopulationConfig(AppConfig):
     name = "maps.population"
     label = "population"
     verbose_name = "Population"
+
+    def ready(self):
+        importlib.import_module("maps.population.signals")
@@ -17,6 +17,7 @@ from maps.models import LauRegion, NutsRegion, NutsVintage
 
 from .contracts import UNIT_TO_PERSONS
 from .models import PopulationDataset, PopulationImportRun, PopulationObservation
+from .services import batched_estimate_refresh
 
 
 @dataclass
@@ -164,70 +165,73 @@ def import_population_payload(payload, *, user=None, dry_run=False):
         classification_version = payload["dataset"].get("classification_version", "")
         resolver = VintageResolver()
 
-        for index, observation in enumerate(payload["observations"]):
-            requested_version = observation.get("region_version", "")
-            match = _match_region(
-                observation["region_scheme"],
-                observation["region_code"],
-                region_version=requested_version,
-                classification_version=classification_version,
-                resolver=resolver,
-            )
-            if match.error is not None:
-                report.errors.append(
-                    {
-                        "index": index,
-                        "region_scheme": observation["region_scheme"],
-                        "region_code": observation["region_code"],
-                        "reason": match.error,
-                    }
+        # Estimates of custom regions depending on the imported observations are
+        # recomputed once per import instead of once per observation
+        with batched_estimate_refresh():
+            for index, observation in enumerate(payload["observations"]):
+                requested_version = observation.get("region_version", "")
+                match = _match_region(
+                    observation["region_scheme"],
+                    observation["region_code"],
+                    region_version=requested_version,
+                    classification_version=classification_version,
+                    resolver=resolver,
                 )
-                continue
-
-            region = match.region
-            report.resolutions[match.resolution] = (
-                report.resolutions.get(match.resolution, 0) + 1
-            )
-            if match.resolution == "fallback_vintage":
-                report.warnings.append(
-                    {
-                        "index": index,
-                        "region_scheme": observation["region_scheme"],
-                        "region_code": observation["region_code"],
-                        "requested_version": requested_version
-                        or classification_version,
-                        "matched_version": match.matched_version,
-                        "resolution": "fallback_vintage",
-                    }
-                )
-
-            value = _value_in_persons(observation["value"], observation["unit"])
-            year = observation["reference_period"]
-            defaults = {
-                "value": value,
-                "source_status": observation["source_status"],
-                "flags": observation.get("flags", ""),
-                "import_run": run,
-            }
-            existing = PopulationObservation.objects.filter(
-                dataset=dataset, region=region, year=year
-            ).first()
-            if existing is None:
-                PopulationObservation.objects.create(
-                    dataset=dataset, region=region, year=year, **defaults
+                if match.error is not None:
+                    report.errors.append(
+                        {
+                            "index": index,
+                            "region_scheme": observation["region_scheme"],
+                            "region_code": observation["region_code"],
+                            "reason": match.error,
+                        }
+                    )
+                    continue
+
+                region = match.region
+                report.resolutions[match.resolution] = (
+                    report.resolutions.get(match.resolution, 0) + 1
                 )
-                report.created += 1
-            elif (
-                existing.value == value
-                and existing.source_status == observation["source_status"]
-                and existing.flags == observation.get("flags", "")
-            ):
-                report.unchanged += 1
-            else:
-                for field_name, field_value in defaults.items():
-                    setattr(existing, field_name, field_value)
-                existing.save()
-                report.updated += 1
+                if match.resolution == "fallback_vintage":
+                    report.warnings.append(
+                        {
+                            "index": index,
+                            "region_scheme": observation["region_scheme"],
+                            "region_code": observation["region_code"],
+                            "requested_version": requested_version
+                            or classification_version,
+                            "matched_version": match.matched_version,
+                            "resolution": "fallback_vintage",
+                        }
+                    )
+
+                value = _value_in_persons(observation["value"], observation["unit"])
+                year = observation["reference_period"]
+                defaults = {
+                    "value": value,
+                    "source_status": observation["source_status"],
+                    "flags": observation.get("flags", ""),
+                    "import_run": run,
+                }
+                existing = PopulationObservation.objects.filter(
+                    dataset=dataset, region=region, year=year
+                ).first()
+                if existing is None:
+                    PopulationObservation.objects.create(
+                        dataset=dataset, region=region, year=year, **defaults
+                    )
+                    report.created += 1
+                elif (
+                    existing.value == value
+                    and existing.source_status == observation["source_status"]
+                    and existing.flags == observation.get("flags", "")
+                ):
+                    report.unchanged += 1
+                else:
+                    for field_name, field_value in defaults.items():
+                        setattr(existing, field_name, field_value)
+                    existing.save()
+                    report.updated += 1
 
         has_errors = bool(report.errors)
         if dry_run or has_errors:
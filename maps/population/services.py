@@ -5,13 +5,16 @@ Missing observations stay missing: callers receive ``None`` instead of a
 forward-filled, backfilled, or latest-year value.
 """
 
-from dataclasses import dataclass
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
 from decimal import Decimal
 
 from django.utils import timezone
 
-from maps.models import RegionAttributeValue
-from maps.validation import validate_region_composition
+from maps.models import Region, RegionAttributeValue
+from maps.validation import RegionCompositionError, validate_region_composition
 
 from .models import (
     PopulationEstimate,
@@ -26,6 +29,8 @@ METHOD_LEGACY_ATTRIBUTE = "legacy_attribute"
 
 TEMPORAL_BASIS_MIXED = "mixed"
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass(frozen=True)
 class PopulationResult:
@@ -90,6 +95,19 @@ def _summed_result(observations, year):
     )
 
 
+def _legacy_result(value, year):
+    return PopulationResult(
+        value=Decimal(str(value)),
+        year=year,
+        method=METHOD_LEGACY_ATTRIBUTE,
+        temporal_basis=None,
+        datasets=(),
+        observations=(),
+        is_provisional=False,
+        is_mixed_provenance=False,
+    )
+
+
 def _legacy_exact_year_value(region_id, year, legacy_attribute_id):
     """Exact-year compatibility adapter for legacy ``RegionAttributeValue`` rows.
 
@@ -108,16 +126,32 @@ def _legacy_exact_year_value(region_id, year, legacy_attribute_id):
     )
     if value is None:
         return None
-    return PopulationResult(
-        value=Decimal(str(value)),
-        year=year,
-        method=METHOD_LEGACY_ATTRIBUTE,
-        temporal_basis=None,
-        datasets=(),
-        observations=(),
-        is_provisional=False,
-        is_mixed_provenance=False,
+    return _legacy_result(value, year)
+
+
+def _estimate_results(region_ids, year):
+    """Read the materialized estimates of the given regions, with their components."""
+    estimates = {}
+    observations = {}
+    links = (
+        PopulationEstimateComponent.objects.filter(
+            estimate__region_id__in=region_ids, estimate__year=year
+        )
+        .select_related("estimate", "observation__dataset")
+        .order_by("observation__region__name", "observation__region_id")
     )
+    for link in links:
+        estimates[link.estimate.region_id] = link.estimate
+        observations.setdefault(link.estimate.region_id, []).append(link.observation)
+    return {
+        region_id: replace(
+            _summed_result(observations[region_id], year),
+            value=estimate.value,
+            is_provisional=estimate.is_provisional,
+            is_mixed_provenance=estimate.is_mixed_provenance,
+        )
+        for region_id, estimate in estimates.items()
+    }
 
 
 def resolve_composed_population(region, year):
@@ -149,6 +183,7 @@ def resolve_population(region, year, *, legacy_attribute_id=None):
     1. a direct observation for the region and year (canonical datasets
        preferred),
     2. the exact-year sum over the region's ``composed_of`` components,
+       read from its materialized :class:`PopulationEstimate` if there is one,
     3. optionally, a legacy ``RegionAttributeValue`` row dated in the
        requested year when ``legacy_attribute_id`` is provided.
 
@@ -166,6 +201,10 @@ def resolve_population(region, year, *, legacy_attribute_id=None):
     if observation is not None:
         return _direct_result(observation)
 
+    estimate = _estimate_results([region.pk], year).get(region.pk)
+    if estimate is not None:
+        return estimate
+
     composed = resolve_composed_population(region, year)
     if composed is not None:
         return composed
@@ -244,3 +283,338 @@ def population_values_by_region(region_ids, year, *, legacy_attribute_id=None):
                 values[region_id] = Decimal(str(value))
 
     return values
+
+
+class PopulationResolver:
+    """Memoized exact-year population lookups for many regions at once.
+
+    Follows the resolution order of :func:`resolve_population`, but loads
+    the data for a whole set of regions and one year with a fixed number of
+    queries. Composed regions are read from their materialized
+    :class:`PopulationEstimate` (see :func:`refresh_dependent_estimates`);
+    only regions without one are summed over their components, which costs
+    the composition links, the component observations and the components for
+    validation. Results are kept for the lifetime of the resolver, so create
+    one per request or task and share it between the lookups of that unit
+    of work.
+
+    Unlike :func:`resolve_population`, invalid compositions do not raise.
+    The region resolves to ``None`` and the error is kept in
+    ``invalid_compositions``.
+    """
+
+    def __init__(self, *, legacy_attribute_id=None, use_estimates=True):
+        self.legacy_attribute_id = legacy_attribute_id
+        self.use_estimates = use_estimates
+        self.invalid_compositions = {}  # region_id -> RegionCompositionError
+        self._results = {}  # (region_id, year) -> PopulationResult | None
+        self._members = {}  # region_id -> tuple of component region ids
+        self._validated = set()  # ids of composed regions with a valid composition
+
+    def prefetch(self, region_ids, year):
+        """Resolve all given regions for ``year`` that are not resolved yet."""
+        region_ids = {
+            region_id
+            for region_id in region_ids
+            if region_id is not None and (region_id, year) not in self._results
+        }
+        if not region_ids or year is None:
+            return
+
+        best = _best_observation_per_region(region_ids, year)
+        results = {
+            region_id: _direct_result(observation)
+            for region_id, observation in best.items()
+        }
+        unresolved = region_ids - results.keys()
+        if unresolved and self.use_estimates:
+            results.update(_estimate_results(unresolved, year))
+            unresolved -= results.keys()
+        if unresolved:
+            results.update(self.composed_results(unresolved, year))
+            unresolved -= results.keys() | self.invalid_compositions.keys()
+
+        if unresolved and self.legacy_attribute_id is not None:
+            legacy_qs = (
+                RegionAttributeValue.objects.filter(
+                    region_id__in=unresolved,
+                    property_id=self.legacy_attribute_id,
+                    date__year=year,
+                )
+                .order_by("region_id", "-date")
+                .distinct("region_id")
+                .values_list("region_id", "value")
+            )
+            for region_id, value in legacy_qs:
+                results[region_id] = _legacy_result(value, year)
+
+        for region_id in region_ids:
+            self._results[(region_id, year)] = results.get(region_id)
+
+    def resolve(self, region_id, year):
+        """Return the :class:`PopulationResult` of a region or ``None``."""
+        if region_id is None or year is None:
+            return None
+        self.prefetch([region_id], year)
+        return self._results[(region_id, year)]
+
+    def values(self, region_ids, year):
+        """Return ``{region_id: Decimal}`` for the regions that have a population."""
+        region_ids = list(region_ids)
+        self.prefetch(region_ids, year)
+        values = {}
+        for region_id in region_ids:
+            result = self._results.get((region_id, year))
+            if result is not None:
+                values[region_id] = result.value
+        return values
+
+    def composed_results(self, region_ids, year):
+        """Sum the component observations of the composed regions among ``region_ids``.
+
+        Returns ``{region_id: PopulationResult}`` for the regions with a
+        valid composition whose components all have an exact-year
+        observation, like :func:`resolve_composed_population`.
+        """
+        self._load_members(region_ids)
+        composed = [region_id for region_id in region_ids if self._members[region_id]]
+        if not composed:
+            return {}
+        best = _best_observation_per_region(
+            {
+                member_id
+                for region_id in composed
+                for member_id in self._members[region_id]
+            },
+            year,
+        )
+        self._validate_compositions(composed)
+        results = {}
+        for region_id in composed:
+            if region_id in self.invalid_compositions:
+                continue
+            members = self._members[region_id]
+            if all(member_id in best for member_id in members):
+                results[region_id] = _summed_result(
+                    [best[member_id] for member_id in members], year
+                )
+        return results
+
+    def _load_members(self, region_ids):
+        unknown = [
+            region_id for region_id in region_ids if region_id not in self._members
+        ]
+        if not unknown:
+            return
+        members = {region_id: [] for region_id in unknown}
+        links = (
+            Region.composed_of.through.objects.filter(from_region_id__in=unknown)
+            # Same order as region.composed_of.all(), i.e. the Region ordering
+            .order_by("to_region__name", "to_region_id")
+            .values_list("from_region_id", "to_region_id")
+        )
+        for region_id, member_id in links:
+            members[region_id].append(member_id)
+        for region_id, member_ids in members.items():
+            self._members[region_id] = tuple(member_ids)
+
+    def _validate_compositions(self, region_ids):
+        region_ids = [
+            region_id
+            for region_id in region_ids
+            if region_id not in self._validated
+            and region_id not in self.invalid_compositions
+        ]
+        if not region_ids:
+            return
+        # NUTS regions have at most three ancestors, so the parent chains that
+        # the validation walks are covered by these joins.
+        members = Region.objects.select_related(
+            "borders",
+            "nutsregion__parent__parent__parent",
+            "lauregion__nuts_parent__parent__parent__parent",
+        ).in_bulk(
+            {
+                member_id
+                for region_id in region_ids
+                for member_id in self._members[region_id]
+            }
+        )
+        for region_id in region_ids:
+            try:
+                validate_region_composition(
+                    [members[member_id] for member_id in self._members[region_id]],
+                    region=Region(pk=region_id),
+                )
+            except RegionCompositionError as error:
+                logger.warning(
+                    "Invalid region composition for region id=%s; no population resolved.",
+                    region_id,
+                )
+                self.invalid_compositions[region_id] = error
+            else:
+                self._validated.add(region_id)
+
+
+def refresh_estimates(region_ids, year, *, resolver=None):
+    """Recompute the materialized estimates of custom regions for one year, in bulk.
+
+    Regions without a complete, valid composition lose their estimate.
+    ``resolver`` may be shared between calls to reuse the composition links
+    and validations. Returns the number of estimates written.
+    """
+    region_ids = set(region_ids)
+    if not region_ids:
+        return 0
+    if resolver is None:
+        resolver = PopulationResolver(use_estimates=False)
+    results = resolver.composed_results(region_ids, year)
+
+    existing = {
+        estimate.region_id: estimate
+        for estimate in PopulationEstimate.objects.filter(
+            region_id__in=region_ids, year=year
+        )
+    }
+    outdated = [
+        estimate.pk
+        for region_id, estimate in existing.items()
+        if region_id not in results
+    ]
+    if outdated:
+        PopulationEstimate.objects.filter(pk__in=outdated).delete()
+    if not results:
+        return 0
+
+    now = timezone.now()
+    to_create = []
+    to_update = []
+    for region_id, result in results.items():
+        estimate = existing.get(region_id)
+        if estimate is None:
+            estimate = PopulationEstimate(region_id=region_id, year=year)
+            to_create.append(estimate)
+        else:
+            to_update.append(estimate)
+        estimate.value = result.value
+        estimate.is_mixed_provenance = result.is_mixed_provenance
+        estimate.is_provisional = result.is_provisional
+        # See materialize_estimate
+        estimate.calculated_at = max(
+            now, *(observation.updated_at for observation in result.observations)
+        )
+    PopulationEstimate.objects.bulk_create(to_create)
+    PopulationEstimate.objects.bulk_update(
+        to_update,
+        ["value", "is_mixed_provenance", "is_provisional", "calculated_at"],
+    )
+    if to_update:
+        PopulationEstimateComponent.objects.filter(estimate__in=to_update).delete()
+    PopulationEstimateComponent.objects.bulk_create(
+        PopulationEstimateComponent(estimate=estimate, observation=observation)
+        for estimate in to_create + to_update
+        for observation in results[estimate.region_id].observations
+    )
+    return len(results)
+
+
+def refresh_dependent_estimates(region_years):
+    """Recompute the estimates that depend on changed observations.
+
+    ``region_years`` are the ``(region_id, year)`` pairs of the created,
+    changed or deleted observations. The estimates of all custom regions
+    composed of these regions are recomputed for these years, with a fixed
+    number of queries per year. Returns the number of estimates written.
+    """
+    region_ids_by_year = {}
+    for region_id, year in region_years:
+        region_ids_by_year.setdefault(year, set()).add(region_id)
+    if not region_ids_by_year:
+        return 0
+
+    composing = {}  # component region_id -> ids of the regions composed of it
+    links = Region.composed_of.through.objects.filter(
+        to_region_id__in=set().union(*region_ids_by_year.values())
+    ).values_list("to_region_id", "from_region_id")
+    for member_id, region_id in links:
+        composing.setdefault(member_id, set()).add(region_id)
+    if not composing:
+        return 0
+
+    resolver = PopulationResolver(use_estimates=False)
+    written = 0
+    for year, region_ids in sorted(region_ids_by_year.items()):
+        written += refresh_estimates(
+            {
+                composed_id
+                for region_id in region_ids
+                for composed_id in composing.get(region_id, ())
+            },
+            year,
+            resolver=resolver,
+        )
+    return written
+
+
+def refresh_region_estimates(region_ids):
+    """Recompute all estimates of custom regions whose composition changed.
+
+    Covers every year in which a component has an observation or the
+    region has an estimate. Returns the number of estimates written.
+    """
+    region_ids = set(region_ids)
+    years = set(
+        PopulationObservation.objects.filter(
+            region__composing_regions__in=region_ids
+        ).values_list("year", flat=True)
+    ) | set(
+        PopulationEstimate.objects.filter(region_id__in=region_ids).values_list(
+            "year", flat=True
+        )
+    )
+    resolver = PopulationResolver(use_estimates=False)
+    return sum(
+        refresh_estimates(region_ids, year, resolver=resolver) for year in sorted(years)
+    )
+
+
+_batch = threading.local()
+
+
+@contextmanager
+def batched_estimate_refresh():
+    """Refresh the estimates depending on the observations saved in the block at once.
+
+    Inside the block the signal handlers only collect the changed
+    ``(region_id, year)`` pairs (see :func:`queue_estimate_refresh`). When
+    the outermost block exits without an error, the dependent estimates are
+    recomputed by :func:`refresh_dependent_estimates`, within the
+    transaction the block runs in.
+    """
+    depth = getattr(_batch, "depth", 0)
+    if depth == 0:
+        _batch.pending = set()
+    _batch.depth = depth + 1
+    try:
+        yield
+    except BaseException:
+        if depth == 0:
+            _batch.pending = set()
+        raise
+    finally:
+        _batch.depth = depth
+    if depth == 0:
+        pending, _batch.pending = _batch.pending, set()
+        refresh_dependent_estimates(pending)
+
+
+def queue_estimate_refresh(region_id, year):
+    """Refresh the estimates depending on an observation of ``region_id`` and ``year``.
+
+    Inside :func:`batched_estimate_refresh` the pair is collected for the
+    batch, otherwise the estimates are refreshed right away.
+    """
+    if getattr(_batch, "depth", 0) > 0:
+        _batch.pending.add((region_id, year))
+        return
+    refresh_dependent_estimates([(region_id, year)])
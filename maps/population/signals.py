@@ -0,0 +1,50 @@
+"""Keep materialized population estimates in step with their inputs.
+
+Saving or deleting a :class:`PopulationObservation` recomputes the estimates
+of the custom regions composed of its region for its year. Changing the
+composition of a custom region recomputes all of its estimates. Bulk
+imports collect the changes with
+:func:`maps.population.services.batched_estimate_refresh` and refresh the
+affected estimates once at the end.
+
+Observations are versioned datasets as well (see ``maps.versioning``), so
+responses derived from populations can key their caches on them.
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from maps.models import Region
+from maps.versioning import register_versioned_model
+
+from .models import PopulationObservation
+from .services import queue_estimate_refresh, refresh_region_estimates
+
+register_versioned_model(PopulationObservation)
+
+
+@receiver(post_save, sender=PopulationObservation)
+@receiver(post_delete, sender=PopulationObservation)
+def refresh_estimates_of_observation(sender, instance, **kwargs):
+    queue_estimate_refresh(instance.region_id, instance.year)
+
+
+@receiver(m2m_changed, sender=Region.composed_of.through)
+def refresh_estimates_of_composition(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            refresh_region_estimates([instance.pk])
+        return
+    # The instance is a component; the changed custom regions are on the other side
+    if action == "pre_clear":
+        instance._cleared_composing_region_ids = list(
+            instance.composing_regions.values_list("pk", flat=True)
+        )
+    elif action == "post_clear":
+        refresh_region_estimates(
+            instance.__dict__.pop("_cleared_composing_region_ids", [])
+        )
+    elif action in ("post_add", "post_remove"):
+        refresh_region_estimates(pk_set)
@@ -18,7 +18,10 @@ from maps.population.services import (
     METHOD_DIRECT,
     METHOD_SUMMED,
     TEMPORAL_BASIS_MIXED,
+    PopulationResolver,
+    batched_estimate_refresh,
     materialize_estimate,
+    resolve_composed_population,
     resolve_population,
 )
 from maps.validation import RegionCompositionError
@@ -299,6 +302,77 @@ class ComposedResolutionTestCase(PopulationServiceTestCaseBase):
         self.assertTrue(estimate.is_provisional)
 
 
+class PopulationResolverTestCase(PopulationServiceTestCaseBase):
+    def test_resolves_direct_and_composed_regions_like_resolve_population(self):
+        self.observe(self.nuts_dataset, self.nuts3, 2021, "330000")
+        self.observe(self.nuts_dataset, self.nuts3_sibling, 2021, "140000")
+        self.observe(self.lau_dataset, self.lau1, 2021, "55000")
+        composed = self.custom_region(
+            "Emsland+Bentheim", [self.nuts3, self.nuts3_sibling]
+        )
+        mixed = self.custom_region("Mixed", [self.nuts3_sibling, self.lau1])
+        incomplete = self.custom_region("Incomplete", [self.lau1, self.lau2])
+        regions = [self.nuts3, self.lau1, composed, mixed, incomplete, self.nuts2]
+
+        resolver = PopulationResolver()
+        for region in regions:
+            self.assertEqual(
+                resolver.resolve(region.pk, 2021), resolve_population(region, 2021)
+            )
+        self.assertEqual(
+            resolver.values([region.pk for region in regions], 2021),
+            {
+                self.nuts3.pk: Decimal("330000"),
+                self.lau1.pk: Decimal("55000"),
+                composed.pk: Decimal("470000"),
+                mixed.pk: Decimal("195000"),
+            },
+        )
+
+    def test_query_count_does_not_grow_with_the_number_of_regions(self):
+        regions = []
+        for index in range(5):
+            self.observe(self.lau_dataset, self.lau1, 2000 + index, "55000")
+            self.observe(self.lau_dataset, self.lau2, 2000 + index, "35000")
+        for index in range(5):
+            regions.append(
+                self.custom_region(f"Lingen+Meppen {index}", [self.lau1, self.lau2])
+            )
+        region_ids = [region.pk for region in regions] + [self.lau1.pk]
+
+        resolver = PopulationResolver()
+        # Direct observations, materialized estimates with their components
+        with self.assertNumQueries(2):
+            values = resolver.values(region_ids, 2000)
+        self.assertEqual(len(values), 6)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                resolver.resolve(regions[0].pk, 2000).value, Decimal("90000")
+            )
+
+        resolver = PopulationResolver(use_estimates=False)
+        # Direct observations, composition links, component observations,
+        # components for validation
+        with self.assertNumQueries(4):
+            self.assertEqual(resolver.values(region_ids, 2000), values)
+        # Links and validity of the compositions are kept across years
+        with self.assertNumQueries(2):
+            resolver.values(region_ids, 2001)
+
+    def test_invalid_composition_resolves_to_none_without_raising(self):
+        self.observe(self.nuts_dataset, self.nuts2, 2021, "2521000")
+        self.observe(self.nuts_dataset, self.nuts3, 2021, "330000")
+        region = self.custom_region("Overlap", [self.nuts2, self.nuts3])
+
+        resolver = PopulationResolver()
+        with self.assertLogs("maps.population.services", level="WARNING"):
+            self.assertIsNone(resolver.resolve(region.pk, 2021))
+        self.assertIsInstance(
+            resolver.invalid_compositions[region.pk], RegionCompositionError
+        )
+        self.assertIn("DE949", resolver.invalid_compositions[region.pk].conflicts)
+
+
 class EstimateMaterializationTestCase(PopulationServiceTestCaseBase):
     def test_source_revision_makes_dependent_estimates_identifiable(self):
         obs1 = self.observe(self.lau_dataset, self.lau1, 2021, "55000")
@@ -315,17 +389,22 @@ class EstimateMaterializationTestCase(PopulationServiceTestCaseBase):
 
         obs1.value = Decimal("56000")
         obs1.save()
-        self.assertIn(estimate, PopulationEstimate.objects.stale())
+        estimate.refresh_from_db()
+        self.assertEqual(estimate.value, Decimal("91000"))
+        self.assertFalse(PopulationEstimate.objects.stale().exists())
 
-        # A source timestamp can be slightly ahead of the application clock
-        # (or an import can preserve an upstream revision time). Rebuilding an
-        # estimate must still mark it current relative to every component.
+        # Writes that bypass the signals, like queryset updates, leave the
+        # estimate stale. A source timestamp can also be slightly ahead of the
+        # application clock (or an import can preserve an upstream revision
+        # time). Rebuilding an estimate must still mark it current relative to
+        # every component.
         PopulationObservation.objects.filter(pk=obs1.pk).update(
-            updated_at=timezone.now() + timedelta(seconds=1)
+            value=Decimal("57000"), updated_at=timezone.now() + timedelta(seconds=1)
         )
+        self.assertIn(estimate, PopulationEstimate.objects.stale())
         refreshed = materialize_estimate(region, 2021)
         self.assertEqual(refreshed.pk, estimate.pk)
-        self.assertEqual(refreshed.value, Decimal("91000"))
+        self.assertEqual(refreshed.value, Decimal("92000"))
         self.assertFalse(PopulationEstimate.objects.stale().exists())
 
     def test_materialize_returns_none_for_incomplete_composition(self):
@@ -334,6 +413,71 @@ class EstimateMaterializationTestCase(PopulationServiceTestCaseBase):
         self.assertIsNone(materialize_estimate(region, 2021))
 
 
+class EstimateMaintenanceTestCase(PopulationServiceTestCaseBase):
+    def estimate_value(self, region, year):
+        return (
+            PopulationEstimate.objects.filter(region=region, year=year)
+            .values_list("value", flat=True)
+            .first()
+        )
+
+    def test_observation_changes_refresh_dependent_estimates(self):
+        region = self.custom_region("Lingen+Meppen", [self.lau1, self.lau2])
+        obs1 = self.observe(self.lau_dataset, self.lau1, 2021, "55000")
+        self.assertIsNone(self.estimate_value(region, 2021))
+
+        obs2 = self.observe(self.lau_dataset, self.lau2, 2021, "35000")
+        self.assertEqual(self.estimate_value(region, 2021), Decimal("90000"))
+
+        obs1.value = Decimal("56000")
+        obs1.save()
+        self.assertEqual(self.estimate_value(region, 2021), Decimal("91000"))
+        estimate = PopulationEstimate.objects.get(region=region, year=2021)
+        self.assertCountEqual(
+            estimate.components.values_list("pk", flat=True), [obs1.pk, obs2.pk]
+        )
+
+        obs2.delete()
+        self.assertIsNone(self.estimate_value(region, 2021))
+
+    def test_composition_changes_refresh_estimates(self):
+        self.observe(self.lau_dataset, self.lau1, 2021, "55000")
+        self.observe(self.lau_dataset, self.lau2, 2021, "35000")
+        self.observe(self.lau_dataset, self.lau2, 2022, "36000")
+        region = self.custom_region("Lingen", [self.lau1])
+        self.assertEqual(self.estimate_value(region, 2021), Decimal("55000"))
+
+        region.composed_of.add(self.lau2)
+        self.assertEqual(self.estimate_value(region, 2021), Decimal("90000"))
+        self.assertIsNone(self.estimate_value(region, 2022))
+
+        self.lau1.composing_regions.clear()
+        self.assertEqual(self.estimate_value(region, 2021), Decimal("35000"))
+        self.assertEqual(self.estimate_value(region, 2022), Decimal("36000"))
+
+    def test_batched_refresh_recomputes_estimates_once_at_the_end(self):
+        region = self.custom_region("Lingen+Meppen", [self.lau1, self.lau2])
+        with batched_estimate_refresh():
+            for year in (2020, 2021):
+                self.observe(self.lau_dataset, self.lau1, year, "55000")
+                self.observe(self.lau_dataset, self.lau2, year, "35000")
+            self.assertFalse(PopulationEstimate.objects.exists())
+        self.assertEqual(self.estimate_value(region, 2020), Decimal("90000"))
+        self.assertEqual(self.estimate_value(region, 2021), Decimal("90000"))
+
+    def test_resolution_reads_the_materialized_estimate(self):
+        self.observe(self.lau_dataset, self.lau1, 2021, "55000")
+        self.observe(self.lau_dataset, self.lau2, 2021, "35000")
+        region = self.custom_region("Lingen+Meppen", [self.lau1, self.lau2])
+        expected = resolve_composed_population(region, 2021)
+
+        # Direct observation, estimate with its components
+        with self.assertNumQueries(2):
+            result = resolve_population(region, 2021)
+        self.assertEqual(result, expected)
+        self.assertEqual(result.method, METHOD_SUMMED)
+
+
 class RegionDeletionCascadeTestCase(PopulationServiceTestCaseBase):
     def test_deleting_region_cascades_its_observations(self):
         self.observe(self.nuts_dataset, self.nuts3_sibling, 2021, "330000")
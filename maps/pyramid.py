@@ -0,0 +1,150 @@
+"""
+Multi-resolution simplification pyramid for GeoPolygon geometries.
+
+Every GeoPolygon gets one precomputed ``GeoPolygonSimplification`` row per
+tolerance in ``GEOMETRY_PYRAMID_TOLERANCES``. GeoJSON endpoints pick a level
+from the requested ``zoom`` or ``tolerance`` and read the stored geometry by
+indexed lookup instead of running ST_SimplifyPreserveTopology per row and
+request.
+"""
+
+import math
+
+from django.conf import settings
+from django.contrib.gis.db.models import GeometryField
+from django.db import connection, transaction
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .db_functions import SimplifyPreserveTopology
+
+# Tolerances in degrees (SRID 4326), finest first. The list index is the
+# pyramid level stored on GeoPolygonSimplification.
+GEOMETRY_PYRAMID_TOLERANCES = tuple(
+    getattr(
+        settings,
+        "GEOMETRY_PYRAMID_TOLERANCES",
+        (0.0001, 0.001, 0.005, 0.02, 0.1),
+    )
+)
+
+# Width of a 256px web map tile in degrees at zoom level 0.
+_DEGREES_PER_PIXEL_AT_ZOOM_0 = 360.0 / 256
+
+REFRESH_CHUNK_SIZE = 500
+
+
+def tolerance_for_zoom(zoom):
+    """Return the width of one screen pixel in degrees at the given zoom."""
+    return _DEGREES_PER_PIXEL_AT_ZOOM_0 / math.pow(2, zoom)
+
+
+def pyramid_level_for_tolerance(tolerance):
+    """Return the coarsest pyramid level not exceeding ``tolerance``.
+
+    Returns ``None`` if the tolerance is finer than every level, in which case
+    callers should fall back to the full geometry.
+    """
+    level = None
+    for index, level_tolerance in enumerate(GEOMETRY_PYRAMID_TOLERANCES):
+        if level_tolerance <= tolerance:
+            level = index
+    return level
+
+
+def pyramid_level_from_params(params):
+    """Resolve a pyramid level from ``zoom`` or ``tolerance`` query params.
+
+    Returns ``None`` if neither parameter is present or valid.
+    """
+    zoom = params.get("zoom")
+    if zoom not in (None, ""):
+        try:
+            zoom = float(zoom)
+        except (TypeError, ValueError):
+            return None
+        if 0 <= zoom <= 30:
+            return pyramid_level_for_tolerance(tolerance_for_zoom(zoom))
+        return None
+
+    tolerance = params.get("tolerance")
+    if tolerance not in (None, ""):
+        try:
+            tolerance = float(tolerance)
+        except (TypeError, ValueError):
+            return None
+        if tolerance > 0:
+            return pyramid_level_for_tolerance(tolerance)
+    return None
+
+
+def pyramid_geometry(geopolygon_field, level):
+    """Return an expression selecting the stored geometry of ``level``.
+
+    ``geopolygon_field`` is the lookup path from the queried model to the
+    GeoPolygon, e.g. ``"catchment__region__borders"``. Rows whose pyramid has
+    not been built yet fall back to simplifying on the fly with the level's
+    tolerance. A ``level`` of ``None`` selects the full geometry.
+    """
+    from .models import GeoPolygonSimplification
+
+    full_geometry = F(f"{geopolygon_field}__geom")
+    if level is None:
+        return full_geometry
+
+    stored = Subquery(
+        GeoPolygonSimplification.objects.filter(
+            geopolygon_id=OuterRef(geopolygon_field), level=level
+        ).values("geom")[:1],
+        output_field=GeometryField(),
+    )
+    return Coalesce(
+        stored,
+        SimplifyPreserveTopology(full_geometry, GEOMETRY_PYRAMID_TOLERANCES[level]),
+        output_field=GeometryField(),
+    )
+
+
+def refresh_geometry_pyramid(geopolygon_ids=None):
+    """(Re)build the simplification pyramid for the given GeoPolygons.
+
+    Simplifies in the database with one set-based upsert per chunk, so no
+    geometry is loaded into Python. Without ``geopolygon_ids`` every GeoPolygon
+    is refreshed. Levels above the configured tolerances are removed.
+
+    Returns the number of GeoPolygons processed.
+    """
+    from .models import GeoPolygon, GeoPolygonSimplification
+
+    if geopolygon_ids is None:
+        geopolygon_ids = GeoPolygon.objects.order_by("pk").values_list("pk", flat=True)
+    geopolygon_ids = list(geopolygon_ids)
+    if not geopolygon_ids:
+        return 0
+
+    qn = connection.ops.quote_name
+    simplification_table = qn(GeoPolygonSimplification._meta.db_table)
+    polygon_table = qn(GeoPolygon._meta.db_table)
+    levels = list(range(len(GEOMETRY_PYRAMID_TOLERANCES)))
+    tolerances = list(GEOMETRY_PYRAMID_TOLERANCES)
+    sql = f"""
+        INSERT INTO {simplification_table} (geopolygon_id, level, tolerance, geom)
+        SELECT gp.fid, lvl.level, lvl.tolerance,
+               ST_SimplifyPreserveTopology(gp.geom, lvl.tolerance)
+        FROM {polygon_table} AS gp
+        CROSS JOIN unnest(%s::integer[], %s::double precision[])
+            AS lvl(level, tolerance)
+        WHERE gp.fid = ANY(%s)
+        ON CONFLICT (geopolygon_id, level)
+        DO UPDATE SET tolerance = EXCLUDED.tolerance, geom = EXCLUDED.geom
+    """
+
+    for start in range(0, len(geopolygon_ids), REFRESH_CHUNK_SIZE):
+        chunk = geopolygon_ids[start : start + REFRESH_CHUNK_SIZE]
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(sql, [levels, tolerances, chunk])
+            GeoPolygonSimplification.objects.filter(
+                geopolygon_id__in=chunk, level__gte=len(levels)
+            ).delete()
+
+    return len(geopolygon_ids)
@@ -4,6 +4,7 @@ from rest_framework.serializers import (
     ModelSerializer,
     SerializerMethodField,
 )
+from rest_framework_gis.fields import GeometrySerializerMethodField
 from rest_framework_gis.serializers import GeoFeatureModelSerializer
 
 from utils.serializers import FieldLabelModelSerializer
@@ -138,6 +139,14 @@ class MapConfigurationSerializer(ModelSerializer):
         return map_config
 
 
+def get_served_geometry(instance):
+    """Return the pyramid geometry annotated by the viewset, else the full one."""
+    simplified = getattr(instance, "simplified_geom", None)
+    if simplified:
+        return simplified
+    return getattr(instance, "geom", None)
+
+
 class PolygonSerializer(GeoFeatureModelSerializer):
     class Meta:
         model = GeoPolygon
@@ -178,23 +187,44 @@ class RegionModelSerializer(ModelSerializer):
 
 class RegionGeoFeatureModelSerializer(GeoFeatureModelSerializer):
     id = IntegerField(source="pk")
+    geom = GeometrySerializerMethodField()
 
     class Meta:
         model = GeoreferencedRegion
         geo_field = "geom"
         fields = ["id", "name", "country", "description"]
 
+    @staticmethod
+    def get_geom(instance):
+        return get_served_geometry(instance)
+
 
 class BaseResultMapSerializer(GeoFeatureModelSerializer):
     """
     This is a base class that can be used to serialize features from automatically generated tables that have their own
-    models. The base initially has no model attached to it. This must me done manually before it can be instantiated.
+    models. The base has no model attached to it. Use for_model to get a serializer for the model of a table. A
+    simplified geometry annotated as simplified_geom is served instead of the full one.
     """
 
+    geom = GeometrySerializerMethodField()
+
     class Meta:
         geo_field = "geom"
         fields = "__all__"
 
+    @classmethod
+    def for_model(cls, model):
+        """
+        Returns a subclass bound to the given feature collection model. The base class itself is never modified, so
+        concurrent requests for different layers do not interfere.
+        """
+        meta = type("Meta", (cls.Meta,), {"model": model})
+        return type(f"{model.__name__}ResultMapSerializer", (cls,), {"Meta": meta})
+
+    @staticmethod
+    def get_geom(instance):
+        return get_served_geometry(instance)
+
 
 class GeoreferencedCatchment(GeoPolygon, Catchment):
     pass
@@ -208,12 +238,17 @@ class CatchmentModelSerializer(ModelSerializer):
 
 class CatchmentGeoFeatureModelSerializer(GeoFeatureModelSerializer):
     level = IntegerField()
+    geom = GeometrySerializerMethodField()
 
     class Meta:
         model = GeoreferencedCatchment
         geo_field = "geom"
         fields = ["id", "name", "type", "description", "level"]
 
+    @staticmethod
+    def get_geom(instance):
+        return get_served_geometry(instance)
+
 
 class CatchmentQuerySerializer(ModelSerializer):
     class Meta:
@@ -259,6 +294,7 @@ class GeoreferencedNutsRegion(GeoPolygon, NutsRegion):
 
 class NutsRegionGeometrySerializer(GeoFeatureModelSerializer):
     level = IntegerField(source="levl_code")
+    geom = GeometrySerializerMethodField()
 
     class Meta:
         model = GeoreferencedNutsRegion
@@ -269,6 +305,10 @@ class NutsRegionGeometrySerializer(GeoFeatureModelSerializer):
             "nuts_id",
         )
 
+    @staticmethod
+    def get_geom(instance):
+        return get_served_geometry(instance)
+
 
 class NutsRegionOptionSerializer(ModelSerializer):
     class Meta:
@@ -2,19 +2,29 @@ import logging
 
 from django.conf import settings
 from django.core.cache import caches
-from django.db.models.signals import post_delete, post_save
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 from django.utils import timezone
 
+from .cache_tags import invalidate_cache_tags_on_commit, list_tag, object_tag
 from .models import (
     Catchment,
+    CatchmentRevision,
     GeoPolygon,
     LauRegion,
     NutsRegion,
+    NutsVintage,
     Region,
     RegionAttributeTextValue,
     RegionAttributeValue,
 )
+from .versioning import (
+    bump_dataset_version,
+    dataset_version_key,
+    register_versioned_model,
+    versioned_keys_for,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -68,25 +78,59 @@ def safe_cache_delete(cache, key: str) -> None:
         logger.exception(f"Error deleting cache key '{key}': {e}")
 
 
+# NutsRegion and LauRegion changes bump their Region parent's counter.
+register_versioned_model(Catchment, CatchmentRevision, GeoPolygon, NutsVintage, Region)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_versioned_model_dataset_version(sender, **kwargs):
+    """Bump the dataset version counters of registered models on any change."""
+    keys = versioned_keys_for(sender)
+    if keys:
+        bump_dataset_version(*keys, using=kwargs.get("using"))
+
+
+@receiver(m2m_changed)
+def bump_versioned_model_dataset_version_on_m2m(sender, instance, action, **kwargs):
+    """Bump the counters of both sides of a changed many-to-many relation."""
+    if not action.startswith("post_"):
+        return
+    keys = versioned_keys_for(type(instance))
+    if kwargs.get("model") is not None:
+        keys += versioned_keys_for(kwargs["model"])
+    if keys:
+        bump_dataset_version(*keys, using=kwargs.get("using"))
+
+
+@receiver(post_save, sender=RegionAttributeValue)
+@receiver(post_delete, sender=RegionAttributeValue)
+@receiver(post_save, sender=RegionAttributeTextValue)
+@receiver(post_delete, sender=RegionAttributeTextValue)
+def bump_region_dataset_version_for_attribute(sender, instance, **kwargs):
+    """Attribute values are rendered into region features, so version them."""
+    bump_dataset_version(dataset_version_key(Region), using=kwargs.get("using"))
+
+
 @receiver(post_save, sender=Region)
 @receiver(post_delete, sender=Region)
 def invalidate_region_cache(sender, instance, **kwargs):
     """
-    Invalidate region cache when a Region instance is saved or deleted.
-    Clears both the specific region cache and any broad region filters.
-    """
-    geojson_cache = get_geojson_cache()
-    safe_cache_delete(geojson_cache, f"region_geojson:id:{instance.id}")
-
-    # Broad invalidation for any keys using the region namespace.
-    clear_geojson_cache_pattern("region_geojson:*")
-
-    # Catchment geometries depend on the underlying region geometries.
-    clear_geojson_cache_pattern("catchment_geojson:*")
+    Invalidate the cached GeoJSON containing a Region when it is saved or deleted.
 
-    # Invalidate NUTS cache if the region has an associated NUTS region.
+    Any change may also move the region in or out of filtered lists, so the
+    list responses of the namespaces serving regions are invalidated as well.
+    Catchment responses are tagged with their region, too.
+    """
+    tags = [
+        object_tag(Region, instance.pk),
+        list_tag("region_geojson"),
+        list_tag("catchment_geojson"),
+    ]
+    # Invalidate NUTS lists if the region has an associated NUTS region.
     if hasattr(instance, "nutsregion"):
-        clear_geojson_cache_pattern("nuts_geojson:*")
+        tags.append(list_tag("nuts_geojson"))
+    invalidate_cache_tags_on_commit(*tags)
 
 
 @receiver(post_save, sender=RegionAttributeValue)
@@ -95,12 +139,13 @@ def invalidate_region_cache(sender, instance, **kwargs):
 @receiver(post_delete, sender=RegionAttributeTextValue)
 def invalidate_region_attribute_cache(sender, instance, **kwargs):
     """
-    Invalidate cached Region GeoJSON when values rendered for a region change.
+    Invalidate cached GeoJSON containing a region whose rendered values change.
+
+    Attribute values do not decide which regions are listed, so only the
+    responses tagged with the region itself are affected.
     """
-    geojson_cache = get_geojson_cache()
     if instance.region_id:
-        safe_cache_delete(geojson_cache, f"region_geojson:id:{instance.region_id}")
-    clear_geojson_cache_pattern("region_geojson:*")
+        invalidate_cache_tags_on_commit(object_tag(Region, instance.region_id))
 
 
 @receiver(post_save, sender=GeoPolygon)
@@ -112,16 +157,37 @@ def invalidate_related_region_caches_for_geopolygon(sender, instance, **kwargs):
     related Region(s) lastmodified timestamp to ensure dataset versions change.
     """
 
-    now = timezone.now()
-    updated = Region.objects.filter(borders_id=instance.pk).update(lastmodified_at=now)
-    if not updated:
+    region_ids = list(
+        Region.objects.filter(borders_id=instance.pk).values_list("pk", flat=True)
+    )
+    if not region_ids:
         return
+    Region.objects.filter(pk__in=region_ids).update(lastmodified_at=timezone.now())
+
+    # Only the cached responses containing these regions hold the geometry.
+    invalidate_cache_tags_on_commit(
+        *(object_tag(Region, region_id) for region_id in region_ids)
+    )
+
+
+@receiver(post_save, sender=GeoPolygon)
+def schedule_geometry_pyramid_refresh(sender, instance, **kwargs):
+    """Rebuild the simplification pyramid of a GeoPolygon once it is committed."""
+    geopolygon_id = instance.pk
+
+    def enqueue():
+        from .tasks import refresh_geometry_pyramid_task
+
+        try:
+            refresh_geometry_pyramid_task.delay([geopolygon_id])
+        except Exception as e:
+            logger.warning(
+                "Failed to schedule geometry pyramid refresh for GeoPolygon %s: %s",
+                geopolygon_id,
+                e,
+            )
 
-    # Ensure any existing cached geojson responses are invalidated.
-    clear_geojson_cache_pattern("region_geojson:*")
-    clear_geojson_cache_pattern("catchment_geojson:*")
-    clear_geojson_cache_pattern("nuts_geojson:*")
-    clear_geojson_cache_pattern("lau_geojson:*")
+    transaction.on_commit(enqueue)
 
 
 @receiver(post_save, sender=Catchment)
@@ -130,9 +196,9 @@ def invalidate_catchment_cache(sender, instance, **kwargs):
     """
     Invalidate catchment cache when a Catchment instance is saved or deleted.
     """
-    geojson_cache = get_geojson_cache()
-    safe_cache_delete(geojson_cache, f"catchment_geojson:id:{instance.id}")
-    clear_geojson_cache_pattern("catchment_geojson:*")
+    invalidate_cache_tags_on_commit(
+        object_tag(Catchment, instance.pk), list_tag("catchment_geojson")
+    )
 
 
 @receiver(post_save, sender=NutsRegion)
@@ -140,14 +206,15 @@ def invalidate_catchment_cache(sender, instance, **kwargs):
 def invalidate_nuts_region_cache(sender, instance, **kwargs):
     """
     Invalidate NUTS region cache when a NutsRegion instance is saved or deleted.
-    """
-    geojson_cache = get_geojson_cache()
-    safe_cache_delete(geojson_cache, f"nuts_geojson:id:{instance.id}")
-    clear_geojson_cache_pattern("nuts_geojson:*")
 
-    # Invalidate caches for any parent relationships.
-    if instance.parent_id:
-        clear_geojson_cache_pattern(f"nuts_geojson:parent:{instance.parent_id}:*")
+    NUTS regions are listed by level and parent, and as plain regions, so both
+    namespaces' lists are invalidated along with the entries containing it.
+    """
+    invalidate_cache_tags_on_commit(
+        object_tag(Region, instance.pk),
+        list_tag("nuts_geojson"),
+        list_tag("region_geojson"),
+    )
 
 
 @receiver(post_save, sender=Catchment)
@@ -236,15 +303,9 @@ def warn_custom_catchment_parent_mismatch(sender, instance, **kwargs):
 @receiver(post_delete, sender=LauRegion)
 def invalidate_lau_region_cache(sender, instance, **kwargs):
     """
-    Invalidate LAU region cache when a LauRegion instance is saved or deleted.
-
-    For LAU regions, this example assumes separate cache keys (e.g., 'lau_geojson:*').
-    Adjust the key patterns if LAU regions should also trigger invalidation of related NUTS caches.
+    Invalidate the cached GeoJSON of a LauRegion and of its NUTS parent.
     """
-    # Invalidate the LAU-specific cache keys.
-    clear_geojson_cache_pattern("lau_geojson:*")
-
-    # If a LAU region is linked to a parent NUTS region, invalidate its caches as well.
-    if hasattr(instance, "nuts_parent") and instance.nuts_parent:
-        clear_geojson_cache_pattern(f"nuts_geojson:id:{instance.nuts_parent.id}")
-        clear_geojson_cache_pattern(f"nuts_geojson:parent:{instance.nuts_parent.id}:*")
+    tags = [object_tag(Region, instance.pk), list_tag("region_geojson")]
+    if instance.nuts_parent_id:
+        tags.append(object_tag(Region, instance.nuts_parent_id))
+    invalidate_cache_tags_on_commit(*tags)
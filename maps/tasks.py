@@ -1,13 +1,15 @@
 """
 Celery tasks for maps app.
 
-Provides orchestration for GeoJSON cache warming.
+Provides orchestration for GeoJSON cache warming and maintenance of the
+GeoPolygon simplification pyramid.
 """
 
 import logging
 
 from celery import shared_task
 
+from maps.pyramid import refresh_geometry_pyramid
 from maps.registry import get_source_domain_geojson_cache_warmers
 
 logger = logging.getLogger(__name__)
@@ -29,3 +31,38 @@ def warm_all_geojson_caches(self):
             results[slug] = {"status": "error", "error": str(e)}
 
     return results
+
+
+@shared_task(bind=True, name="refresh_geometry_pyramid")
+def refresh_geometry_pyramid_task(self, geopolygon_ids=None):
+    """
+    Rebuild the simplification pyramid of the given GeoPolygons.
+
+    GeoJSON responses that were cached while the pyramid was being rebuilt
+    may still carry the previous simplification, so the GeoPolygon dataset
+    version is bumped once more after the refresh and the responses
+    containing the refreshed geometries are invalidated. Collection
+    responses carry the dataset version in their keys and are thus replaced
+    without scanning the keyspace.
+    """
+    from maps.cache_tags import dataset_tag, invalidate_cache_tags, object_tag
+    from maps.models import GeoPolygon, Region
+    from maps.versioning import bump_dataset_version, dataset_version_key
+
+    count = refresh_geometry_pyramid(geopolygon_ids)
+    if count:
+        # Responses read between a GeoPolygon save and this refresh were
+        # built from the previous pyramid under the version of the save
+        bump_dataset_version(dataset_version_key(GeoPolygon))
+        if geopolygon_ids is None:
+            tags = [
+                dataset_tag(namespace)
+                for namespace in ("region_geojson", "catchment_geojson", "nuts_geojson")
+            ]
+        else:
+            region_ids = Region.objects.filter(
+                borders_id__in=geopolygon_ids
+            ).values_list("pk", flat=True)
+            tags = [object_tag(Region, region_id) for region_id in region_ids]
+        invalidate_cache_tags(*tags)
+    return {"status": "success", "geopolygons": count}
@@ -0,0 +1,66 @@
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase
+
+from maps.cache_tags import (
+    invalidate_cache_tags,
+    invalidate_cache_tags_on_commit,
+    list_tag,
+    object_tag,
+    tag_cache_entry,
+)
+from maps.models import NutsRegion, Region
+from utils.tests.testrunner import serial_test
+
+
+@serial_test
+class CacheTagTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = caches[getattr(settings, "GEOJSON_CACHE", "default")]
+        self.cache.clear()
+
+    def tearDown(self):
+        self.cache.clear()
+
+    def test_object_tags_use_the_concrete_model(self):
+        self.assertEqual(object_tag(Region, 42), "maps.region:42")
+        self.assertEqual(object_tag(NutsRegion, 42), "maps.nutsregion:42")
+        self.assertEqual(list_tag("region_geojson"), "region_geojson:list")
+
+    def test_invalidation_deletes_only_tagged_entries(self):
+        self.cache.set("region_geojson:id:1", "one")
+        self.cache.set("region_geojson:id:2", "two")
+        self.cache.set("region_geojson:filter:all", "all")
+        tag_cache_entry("region_geojson:id:1", ["maps.region:1"])
+        tag_cache_entry("region_geojson:id:2", ["maps.region:2"])
+        tag_cache_entry(
+            "region_geojson:filter:all",
+            ["maps.region:1", "maps.region:2", "region_geojson:list"],
+        )
+
+        deleted = invalidate_cache_tags("maps.region:1")
+
+        self.assertEqual(deleted, 2)
+        self.assertIsNone(self.cache.get("region_geojson:id:1"))
+        self.assertIsNone(self.cache.get("region_geojson:filter:all"))
+        self.assertEqual(self.cache.get("region_geojson:id:2"), "two")
+        self.assertEqual(invalidate_cache_tags("maps.region:1"), 0)
+
+
+class InvalidateCacheTagsOnCommitTests(TestCase):
+    def test_tags_of_a_transaction_are_invalidated_together(self):
+        with (
+            patch("maps.cache_tags.invalidate_cache_tags") as invalidate,
+            self.captureOnCommitCallbacks(execute=True) as callbacks,
+        ):
+            invalidate_cache_tags_on_commit("maps.region:1")
+            invalidate_cache_tags_on_commit("maps.region:2", "maps.region:1")
+            invalidate.assert_not_called()
+
+        self.assertEqual(len(callbacks), 1)
+        invalidate.assert_called_once()
+        self.assertEqual(
+            sorted(invalidate.call_args.args), ["maps.region:1", "maps.region:2"]
+        )
@@ -1,4 +1,5 @@
 import io
+import json
 from unittest.mock import Mock, patch
 
 from django.conf import settings
@@ -18,7 +19,12 @@ from ..models import (
     RegionAttributeValue,
     RegionProperty,
 )
-from ..utils import get_nuts_region_cache_key, get_region_cache_key
+from ..utils import (
+    decode_geojson_payload,
+    get_nuts_region_cache_key,
+    get_region_cache_key,
+    is_encoded_geojson_payload,
+)
 
 
 class RegionAttributeValueUnitBackfillCommandTests(TestCase):
@@ -230,8 +236,10 @@ class WarmGeojsonCacheRegionsTests(TestCase):
         call_command("warm_geojson_cache", regions=True, regions_limit=10, stdout=out)
 
         cached = self.geojson_cache.get(get_region_cache_key(region_id=region.id))
-        self.assertIsNotNone(cached)
-        self.assertEqual(len(cached["features"]), 1)
+        self.assertTrue(is_encoded_geojson_payload(cached))
+        self.assertEqual(cached["feature_count"], 1)
+        body = json.loads(decode_geojson_payload(cached))
+        self.assertEqual(len(body["features"]), 1)
         self.assertIn("Region cache warmup complete!", out.getvalue())
 
     def test_regions_limit_only_warms_largest_regions(self):
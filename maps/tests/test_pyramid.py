@@ -0,0 +1,151 @@
+from django.conf import settings
+from django.contrib.gis.geos import MultiPolygon, Polygon
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from maps.models import GeoPolygon, GeoPolygonSimplification, Region
+from maps.pyramid import (
+    GEOMETRY_PYRAMID_TOLERANCES,
+    pyramid_level_for_tolerance,
+    pyramid_level_from_params,
+    refresh_geometry_pyramid,
+    tolerance_for_zoom,
+)
+from maps.tasks import refresh_geometry_pyramid_task
+from utils.tests.testrunner import serial_test
+
+
+def _jagged_polygon(points=200):
+    """A closed ring with many nearly collinear vertices along its edges."""
+    coords = [(0.0, 0.0)]
+    coords += [(i / points, 0.00001 * (i % 2)) for i in range(1, points)]
+    coords += [(1.0, 0.0), (1.0, 1.0), (0.0, 1.0), (0.0, 0.0)]
+    return MultiPolygon(Polygon(coords))
+
+
+class PyramidLevelSelectionTests(SimpleTestCase):
+    def test_tolerance_halves_with_each_zoom_level(self):
+        self.assertAlmostEqual(tolerance_for_zoom(1), tolerance_for_zoom(0) / 2)
+
+    def test_coarsest_level_not_exceeding_tolerance_is_selected(self):
+        self.assertEqual(pyramid_level_for_tolerance(GEOMETRY_PYRAMID_TOLERANCES[1]), 1)
+        self.assertEqual(
+            pyramid_level_for_tolerance(GEOMETRY_PYRAMID_TOLERANCES[-1] * 10),
+            len(GEOMETRY_PYRAMID_TOLERANCES) - 1,
+        )
+
+    def test_tolerance_finer_than_every_level_selects_full_geometry(self):
+        self.assertIsNone(
+            pyramid_level_for_tolerance(GEOMETRY_PYRAMID_TOLERANCES[0] / 2)
+        )
+
+    def test_zoom_takes_precedence_over_tolerance(self):
+        level = pyramid_level_from_params({"zoom": "0", "tolerance": "0.000001"})
+
+        self.assertEqual(level, len(GEOMETRY_PYRAMID_TOLERANCES) - 1)
+
+    def test_invalid_params_select_no_level(self):
+        self.assertIsNone(pyramid_level_from_params({}))
+        self.assertIsNone(pyramid_level_from_params({"zoom": "far"}))
+        self.assertIsNone(pyramid_level_from_params({"tolerance": "-1"}))
+
+
+class RefreshGeometryPyramidTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.polygon = GeoPolygon.objects.create(geom=_jagged_polygon())
+
+    def test_refresh_creates_one_row_per_level(self):
+        refresh_geometry_pyramid([self.polygon.pk])
+
+        levels = GeoPolygonSimplification.objects.filter(
+            geopolygon=self.polygon
+        ).order_by("level")
+        self.assertEqual(
+            [(row.level, row.tolerance) for row in levels],
+            list(enumerate(GEOMETRY_PYRAMID_TOLERANCES)),
+        )
+        self.assertLess(levels.last().geom.num_coords, self.polygon.geom.num_coords)
+
+    def test_refresh_is_idempotent(self):
+        refresh_geometry_pyramid([self.polygon.pk])
+        refresh_geometry_pyramid([self.polygon.pk])
+
+        self.assertEqual(
+            GeoPolygonSimplification.objects.filter(geopolygon=self.polygon).count(),
+            len(GEOMETRY_PYRAMID_TOLERANCES),
+        )
+
+    def test_refresh_drops_levels_no_longer_configured(self):
+        GeoPolygonSimplification.objects.create(
+            geopolygon=self.polygon,
+            level=len(GEOMETRY_PYRAMID_TOLERANCES),
+            tolerance=1.0,
+            geom=self.polygon.geom,
+        )
+
+        refresh_geometry_pyramid([self.polygon.pk])
+
+        self.assertFalse(
+            GeoPolygonSimplification.objects.filter(
+                geopolygon=self.polygon, level__gte=len(GEOMETRY_PYRAMID_TOLERANCES)
+            ).exists()
+        )
+
+
+@serial_test
+class RegionGeoJSONPyramidTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.region = Region.objects.create(
+            name="Pyramid Region",
+            borders=GeoPolygon.objects.create(geom=_jagged_polygon()),
+        )
+        refresh_geometry_pyramid([cls.region.borders_id])
+
+    def setUp(self):
+        self.geojson_cache = caches[settings.GEOJSON_CACHE]
+        self.geojson_cache.clear()
+
+    def tearDown(self):
+        self.geojson_cache.clear()
+
+    def _coordinate_count(self, params):
+        response = self.client.get(reverse("api-region-geojson"), params)
+        self.assertEqual(response.status_code, 200)
+        geometry = response.json()["features"][0]["geometry"]
+        return sum(len(ring) for polygon in geometry["coordinates"] for ring in polygon)
+
+    def test_low_zoom_serves_coarser_geometry_than_default(self):
+        full = self._coordinate_count({"id": self.region.pk})
+        coarse = self._coordinate_count({"id": self.region.pk, "zoom": 2})
+
+        self.assertLess(coarse, full)
+
+    def test_pyramid_levels_are_cached_separately(self):
+        response_full = self.client.get(
+            reverse("api-region-geojson"), {"id": self.region.pk}
+        )
+        response_coarse = self.client.get(
+            reverse("api-region-geojson"), {"id": self.region.pk, "zoom": 2}
+        )
+
+        self.assertEqual(response_coarse["X-Cache-Status"], "MISS")
+        self.assertNotEqual(response_full.content, response_coarse.content)
+
+    def test_layer_read_before_a_targeted_refresh_is_replaced_by_it(self):
+        params = {"id": self.region.pk, "zoom": 2}
+        borders = self.region.borders
+        borders.geom = MultiPolygon(Polygon(((0, 0), (2, 0), (2, 2), (0, 2), (0, 0))))
+        borders.save()
+        before = self.client.get(reverse("api-region-geojson"), params)
+
+        refresh_geometry_pyramid_task.apply(args=([borders.pk],))
+        response = self.client.get(
+            reverse("api-region-geojson"), params, HTTP_IF_NONE_MATCH=before["ETag"]
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], before["ETag"])
+        self.assertNotEqual(response.content, before.content)
@@ -1,12 +1,14 @@
-from unittest.mock import Mock, call, patch
+from unittest.mock import call, patch
 
 from django.db.models.signals import post_delete, post_save
 from django.test import SimpleTestCase
 
 from maps.models import (
+    Region,
     RegionAttributeTextValue,
     RegionAttributeValue,
 )
+from maps.signals import bump_versioned_model_dataset_version
 
 
 class RegionAttributeGeoJSONCacheInvalidationTests(SimpleTestCase):
@@ -17,22 +19,17 @@ class RegionAttributeGeoJSONCacheInvalidationTests(SimpleTestCase):
             owner_id=1,
             value=12.5,
         )
-        geojson_cache = Mock()
 
         with (
-            patch("maps.signals.get_geojson_cache", return_value=geojson_cache),
-            patch("maps.signals.clear_geojson_cache_pattern") as clear_pattern,
+            patch("maps.signals.bump_dataset_version"),
+            patch("maps.signals.invalidate_cache_tags_on_commit") as invalidate,
         ):
             post_save.send(sender=RegionAttributeValue, instance=value)
             post_delete.send(sender=RegionAttributeValue, instance=value)
 
         self.assertEqual(
-            geojson_cache.delete.call_args_list,
-            [call("region_geojson:id:123"), call("region_geojson:id:123")],
-        )
-        self.assertEqual(
-            clear_pattern.call_args_list,
-            [call("region_geojson:*"), call("region_geojson:*")],
+            invalidate.call_args_list,
+            [call("maps.region:123"), call("maps.region:123")],
         )
 
     def test_text_attribute_save_and_delete_invalidate_region_geojson_cache(self):
@@ -42,20 +39,25 @@ class RegionAttributeGeoJSONCacheInvalidationTests(SimpleTestCase):
             owner_id=1,
             value="urban",
         )
-        geojson_cache = Mock()
 
         with (
-            patch("maps.signals.get_geojson_cache", return_value=geojson_cache),
-            patch("maps.signals.clear_geojson_cache_pattern") as clear_pattern,
+            patch("maps.signals.bump_dataset_version"),
+            patch("maps.signals.invalidate_cache_tags_on_commit") as invalidate,
         ):
             post_save.send(sender=RegionAttributeTextValue, instance=value)
             post_delete.send(sender=RegionAttributeTextValue, instance=value)
 
         self.assertEqual(
-            geojson_cache.delete.call_args_list,
-            [call("region_geojson:id:123"), call("region_geojson:id:123")],
-        )
-        self.assertEqual(
-            clear_pattern.call_args_list,
-            [call("region_geojson:*"), call("region_geojson:*")],
+            invalidate.call_args_list,
+            [call("maps.region:123"), call("maps.region:123")],
         )
+
+
+class DatasetVersionDatabaseAliasTests(SimpleTestCase):
+    def test_counters_are_bumped_in_the_database_of_the_write(self):
+        with patch("maps.signals.bump_dataset_version") as bump:
+            bump_versioned_model_dataset_version(
+                sender=Region, instance=Region(pk=1), using="replica"
+            )
+
+        bump.assert_called_once_with("maps.region", using="replica")
@@ -7,29 +7,24 @@ from maps.utils import compute_collection_dataset_version
 
 
 class GeoJSONCacheDependencyBoundaryTests(SimpleTestCase):
+    @patch("maps.versioning.get_dataset_version_state", return_value=("abc", None))
     @patch("maps.utils.import_module")
     def test_compute_collection_dataset_version_uses_sources_collection_adapter(
-        self, mock_import_module
+        self, mock_import_module, mock_get_dataset_version_state
     ):
         mock_collection = Mock()
-        base_qs = Mock()
-        published_qs = Mock()
-        mock_collection.objects.all.return_value = base_qs
-        base_qs.filter.return_value = published_qs
-        published_qs.aggregate.return_value = {
-            "cnt": 3,
-            "max_mod": None,
-            "min_id": 4,
-            "max_id": 9,
-        }
+        mock_collection._meta.concrete_model._meta.label_lower = (
+            "waste_collection.collection"
+        )
         mock_import_module.return_value = Mock(Collection=mock_collection)
 
         version = compute_collection_dataset_version(scope="published")
 
-        self.assertEqual(len(version), 12)
-        mock_collection.objects.all.assert_called_once_with()
-        base_qs.filter.assert_called_once_with(publication_status="published")
-        published_qs.aggregate.assert_called_once()
+        self.assertEqual(version, "abc")
+        mock_get_dataset_version_state.assert_called_once_with(
+            ["waste_collection.collection:published", "maps.geopolygon"],
+            prefix="published",
+        )
 
     @patch(
         "maps.utils.import_module",
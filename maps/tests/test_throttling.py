@@ -83,3 +83,19 @@ class GeoJSONThrottleTests(APITestCase):
 
         self.assertNotEqual(first.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
         self.assertNotEqual(second.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_vector_tiles_have_their_own_throttle_bucket(self):
+        tile_url = reverse("api-region-tiles", kwargs={"z": 0, "x": 0, "y": 0})
+        with patch(
+            "rest_framework.throttling.SimpleRateThrottle.THROTTLE_RATES",
+            {"geojson_anon": "1/minute", "mvt_anon": "1/minute"},
+        ):
+            geojson = self.client.get(
+                reverse("api-region-geojson"), REMOTE_ADDR="202.46.62.65"
+            )
+            first = self.client.get(tile_url, REMOTE_ADDR="202.46.62.65")
+            second = self.client.get(tile_url, REMOTE_ADDR="202.46.62.117")
+
+        self.assertNotEqual(geojson.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertNotEqual(first.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(second.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
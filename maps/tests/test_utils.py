@@ -0,0 +1,124 @@
+from unittest.mock import Mock, patch
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from maps.utils import (
+    GeoJSONBodyEncoder,
+    decode_geojson_payload,
+    get_stale_cache_key,
+    single_flight_cache,
+    single_flight_lock,
+)
+from utils.tests.testrunner import serial_test
+
+
+@serial_test
+class SingleFlightCacheTests(SimpleTestCase):
+    cache_key = "region_geojson:single_flight_test"
+
+    def setUp(self):
+        self.cache = caches[getattr(settings, "GEOJSON_CACHE", "default")]
+        self.cache.clear()
+
+    def tearDown(self):
+        self.cache.clear()
+
+    def test_miss_generates_once_and_keeps_a_stale_copy(self):
+        generate = Mock(return_value={"features": []})
+        stale_key = get_stale_cache_key(self.cache_key)
+
+        first = single_flight_cache(
+            self.cache_key, generate, stale_key=stale_key, version="v1"
+        )
+        second = single_flight_cache(self.cache_key, generate, stale_key=stale_key)
+
+        self.assertEqual(first.status, "MISS")
+        self.assertEqual(second.status, "HIT")
+        generate.assert_called_once_with()
+        self.assertEqual(
+            self.cache.get(stale_key), {"data": {"features": []}, "version": "v1"}
+        )
+        self.assertIsNone(self.cache.get(f"lock:{self.cache_key}"))
+
+    def test_follower_serves_stale_value_while_leader_regenerates(self):
+        stale_key = get_stale_cache_key(self.cache_key)
+        self.cache.set(stale_key, {"data": "previous", "version": "v0"})
+        self.cache.add(f"lock:{self.cache_key}", "leader")
+        generate = Mock(return_value="fresh")
+
+        result = single_flight_cache(self.cache_key, generate, stale_key=stale_key)
+
+        self.assertEqual((result.data, result.status), ("previous", "STALE"))
+        self.assertEqual(result.version, "v0")
+        generate.assert_not_called()
+
+    @patch("maps.utils.GEOJSON_CACHE_LOCK_WAIT", 0.3)
+    def test_follower_without_stale_value_generates_after_waiting(self):
+        self.cache.add(f"lock:{self.cache_key}", "leader")
+        generate = Mock(return_value="fresh")
+
+        result = single_flight_cache(self.cache_key, generate)
+
+        self.assertEqual((result.data, result.status), ("fresh", "MISS"))
+        # The leader still owns its lock.
+        self.assertEqual(self.cache.get(f"lock:{self.cache_key}"), "leader")
+
+    def test_lock_is_released_when_generation_fails(self):
+        generate = Mock(side_effect=RuntimeError)
+
+        with self.assertRaises(RuntimeError):
+            single_flight_cache(self.cache_key, generate)
+
+        self.assertIsNone(self.cache.get(f"lock:{self.cache_key}"))
+
+
+@serial_test
+class SingleFlightLockTests(SimpleTestCase):
+    lock_name = "single_flight_lock_test"
+
+    def setUp(self):
+        self.cache = caches[getattr(settings, "GEOJSON_CACHE", "default")]
+        self.cache.clear()
+
+    def tearDown(self):
+        self.cache.clear()
+
+    def test_leader_holds_the_lock_until_its_work_is_done(self):
+        with single_flight_lock(self.lock_name) as leader:
+            self.assertTrue(leader)
+            with single_flight_lock(self.lock_name, wait=0) as follower:
+                self.assertFalse(follower)
+
+        self.assertIsNone(self.cache.get(f"lock:{self.lock_name}"))
+
+    def test_follower_does_not_release_the_lock_of_the_leader(self):
+        self.cache.add(f"lock:{self.lock_name}", "leader")
+
+        with single_flight_lock(self.lock_name, wait=0.3) as leader:
+            self.assertFalse(leader)
+
+        self.assertEqual(self.cache.get(f"lock:{self.lock_name}"), "leader")
+
+
+class GeoJSONBodyEncoderTests(SimpleTestCase):
+    def test_entry_holds_the_written_body(self):
+        for encoding in ("gzip", ""):
+            encoder = GeoJSONBodyEncoder(encoding=encoding)
+            for chunk in (b'{"features": [', b"1,", b"2", b"]}"):
+                encoder.write(chunk)
+
+            entry = encoder.entry(feature_count=2)
+
+            self.assertEqual(entry["encoding"], encoding or None)
+            self.assertEqual(entry["feature_count"], 2)
+            self.assertEqual(decode_geojson_payload(entry), b'{"features": [1,2]}')
+
+    def test_body_beyond_max_size_is_dropped(self):
+        encoder = GeoJSONBodyEncoder(max_size=8, encoding="")
+        encoder.write(b'{"features": [')
+        encoder.write(b"]}")
+
+        self.assertTrue(encoder.exceeded)
+        self.assertIsNone(encoder.entry())
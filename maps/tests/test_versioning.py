@@ -0,0 +1,77 @@
+from django.contrib.gis.geos import MultiPolygon, Polygon
+from django.test import TestCase, override_settings
+
+from maps.models import DatasetVersion, GeoPolygon, NutsRegion, NutsVintage, Region
+from maps.versioning import (
+    bump_dataset_version,
+    dataset_version_key,
+    get_dataset_version_state,
+)
+
+
+def _counter(model):
+    return (
+        DatasetVersion.objects.filter(key=dataset_version_key(model))
+        .values_list("version", flat=True)
+        .first()
+        or 0
+    )
+
+
+class DatasetVersionCounterTests(TestCase):
+    def test_bump_creates_and_increments_counters(self):
+        bump_dataset_version("test.dataset")
+        bump_dataset_version("test.dataset", "test.other")
+
+        versions = dict(DatasetVersion.objects.values_list("key", "version"))
+        self.assertEqual(versions["test.dataset"], 2)
+        self.assertEqual(versions["test.other"], 1)
+
+    @override_settings(DATASET_VERSION_ALWAYS_EAGER=False)
+    def test_bumps_are_written_once_per_transaction_on_commit(self):
+        before = _counter(Region)
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_dataset_version("test.dataset")
+            Region.objects.create(name="Deferred Region")
+            bump_dataset_version("test.dataset")
+            self.assertFalse(DatasetVersion.objects.filter(key="test.dataset").exists())
+            self.assertEqual(_counter(Region), before)
+
+        self.assertEqual(DatasetVersion.objects.get(key="test.dataset").version, 1)
+        self.assertEqual(_counter(Region), before + 1)
+
+    def test_state_changes_with_any_counter_and_prefix(self):
+        version, last_modified = get_dataset_version_state(["test.a", "test.b"])
+        self.assertIsNone(last_modified)
+
+        bump_dataset_version("test.b")
+        bumped, last_modified = get_dataset_version_state(["test.b", "test.a"])
+        self.assertNotEqual(bumped, version)
+        self.assertIsNotNone(last_modified)
+        self.assertNotEqual(
+            get_dataset_version_state(["test.a", "test.b"], prefix="staff")[0],
+            bumped,
+        )
+
+    def test_model_changes_bump_their_counter(self):
+        before = _counter(Region)
+        region = Region.objects.create(name="Versioned Region")
+        created = _counter(Region)
+        region.delete()
+        self.assertGreater(created, before)
+        self.assertGreater(_counter(Region), created)
+
+    def test_subclass_changes_bump_registered_parent(self):
+        vintage = NutsVintage.default()
+        before = _counter(Region)
+        NutsRegion.objects.create(
+            name="Versioned NUTS", nuts_id="XX1", levl_code=1, version=vintage
+        )
+        self.assertEqual(_counter(Region), before + 1)
+
+    def test_geometry_changes_bump_geopolygon_counter(self):
+        before = _counter(GeoPolygon)
+        GeoPolygon.objects.create(
+            geom=MultiPolygon(Polygon(((0, 0), (0, 1), (1, 1), (1, 0), (0, 0))))
+        )
+        self.assertEqual(_counter(GeoPolygon), before + 1)
@@ -1,3 +1,4 @@
+import gzip
 import io
 import json
 import os
@@ -16,12 +17,18 @@ from django.core.management import call_command
 from django.test import RequestFactory, TestCase, override_settings
 from django.urls import reverse
 from rest_framework import serializers
+from rest_framework.exceptions import NotFound
 from rest_framework.request import Request
 from rest_framework.test import APIRequestFactory, force_authenticate
 from rest_framework.viewsets import ModelViewSet
 
 from bibliography.models import Source
-from maps.mixins import GeoJSONMixin
+from maps.mixins import (
+    MVT_CONTENT_TYPE,
+    MVT_MAX_ZOOM,
+    GeoJSONMixin,
+    tile_envelope,
+)
 from maps.views import CatchmentCreateMergeLauView
 from utils.properties.models import Unit
 from utils.tests.testcases import (
@@ -47,7 +54,7 @@ from ..models import (
     RegionAttributeValue,
     RegionProperty,
 )
-from ..utils import get_region_cache_key
+from ..utils import CacheResult, encode_geojson_payload, get_region_cache_key
 from ..views import MapMixin
 
 
@@ -1841,6 +1848,59 @@ class GeoJSONCachingTests(TestCase):
         self.assertTrue("X-Cache-Time" in response_hit)
         self.assertEqual(response_miss.content, response_hit.content)
 
+    def test_geojson_cache_hit_serves_gzip_body(self):
+        """Verify a HIT returns the stored gzip body to clients accepting it."""
+        unique_name = f"GzipRegion_{uuid.uuid4()}"
+        Region.objects.create(name=unique_name)
+        url = self.regions_geojson_url + f"?name={unique_name}"
+        self.client.get(url)
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        if response["X-Cache-Status"] != "HIT":
+            self.skipTest("Cache did not return HIT on second request.")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertIn(unique_name, gzip.decompress(response.content).decode())
+
+    def test_geojson_cache_miss_of_encoded_body_serves_gzip_etag(self):
+        """Verify a MISS waiting for another worker's gzip body gets its ETag."""
+        unique_name = f"GzipMissRegion_{uuid.uuid4()}"
+        Region.objects.create(name=unique_name)
+        url = self.regions_geojson_url + f"?name={unique_name}"
+        encoded = encode_geojson_payload({"type": "FeatureCollection"}, encoding="gzip")
+        with patch(
+            "maps.mixins.single_flight_cache",
+            return_value=CacheResult(encoded, "MISS"),
+        ):
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["X-Cache-Status"], "MISS")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertTrue(response["ETag"].endswith('-gzip"'))
+
+    def test_geojson_if_none_match_returns_not_modified(self):
+        """Verify a matching ETag short-circuits to 304 until the data changes."""
+        region = Region.objects.create(name=f"EtagRegion_{uuid.uuid4()}")
+        url = self.regions_geojson_url + f"?name={region.name}"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Last-Modified", response)
+        self.assertIn("no-cache", response["Cache-Control"])
+        etag = response["ETag"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+        Region.objects.create(name=region.name)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
     def test_cache_invalidation_on_save(self):
         """Verify cache is invalidated when a relevant model instance is saved."""
         region = Region.objects.create(name=f"UniqueRegion_{uuid.uuid4()}")
@@ -1857,7 +1917,8 @@ class GeoJSONCachingTests(TestCase):
                 "GeoJSON cache backend did not store entries; skipping invalidation assertions."
             )
         region.name = "UpdatedRegion1"
-        region.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            region.save()
         self.assertIsNone(
             self.geojson_cache.get(detail_key), "Specific detail key not invalidated"
         )
@@ -1865,7 +1926,7 @@ class GeoJSONCachingTests(TestCase):
             getattr(self.geojson_cache, "delete_pattern", None)
         ):
             self.assertIsNone(
-                self.geojson_cache.get(list_key), "List key not invalidated by pattern"
+                self.geojson_cache.get(list_key), "List key not invalidated by tag"
             )
         else:
             self.skipTest(
@@ -1889,13 +1950,14 @@ class GeoJSONCachingTests(TestCase):
                 "GeoJSON cache backend did not store list entry; skipping invalidation assertions."
             )
         region_id_to_delete = region.id
-        region.delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            region.delete()
         self.assertIsNone(
             self.geojson_cache.get(detail_key), "Detail key not invalidated on delete"
         )
         self.assertIsNone(
             self.geojson_cache.get(list_key),
-            "List key not invalidated by pattern on delete",
+            "List key not invalidated by tag on delete",
         )
         response_after_delete = self.client.get(list_url)
         self.assertEqual(response_after_delete["X-Cache-Status"], "MISS")
@@ -2093,3 +2155,87 @@ class StreamingGeoJSONTests(TestCase):
             or "application/geo+json" in content_type,
             f"Unexpected content type: {content_type}",
         )
+
+
+class TileEnvelopeTests(TestCase):
+    def test_world_tile_covers_web_mercator_extent(self):
+        min_lng, min_lat, max_lng, max_lat = tile_envelope(0, 0, 0).extent
+
+        self.assertAlmostEqual(min_lng, -180.0)
+        self.assertAlmostEqual(max_lng, 180.0)
+        self.assertAlmostEqual(min_lat, -85.0511287798, places=6)
+        self.assertAlmostEqual(max_lat, 85.0511287798, places=6)
+
+    def test_tile_outside_grid_is_not_found(self):
+        with self.assertRaises(NotFound):
+            tile_envelope(1, 2, 0)
+
+    def test_zoom_above_maximum_is_not_found(self):
+        with self.assertRaises(NotFound):
+            tile_envelope(MVT_MAX_ZOOM + 1, 0, 0)
+
+
+@serial_test
+class VectorTileTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.region = Region.objects.create(
+            name="Tiled Region",
+            publication_status="published",
+            borders=GeoPolygon.objects.create(
+                geom=MultiPolygon(
+                    Polygon(((9, 53), (9, 54), (10, 54), (10, 53), (9, 53)))
+                )
+            ),
+        )
+
+    def setUp(self):
+        self.geojson_cache = caches[settings.GEOJSON_CACHE]
+        self.geojson_cache.clear()
+
+    def tearDown(self):
+        self.geojson_cache.clear()
+
+    @staticmethod
+    def tile_url(z, x, y, basename="api-region"):
+        return reverse(f"{basename}-tiles", kwargs={"z": z, "x": x, "y": y})
+
+    def test_tile_containing_region_is_rendered_and_cached(self):
+        url = f"{self.tile_url(6, 33, 20)}?id={self.region.pk}"
+
+        response_miss = self.client.get(url)
+        response_hit = self.client.get(url)
+
+        self.assertEqual(response_miss.status_code, 200)
+        self.assertEqual(response_miss["Content-Type"], MVT_CONTENT_TYPE)
+        self.assertEqual(response_miss["X-Cache-Status"], "MISS")
+        self.assertIn(b"Tiled Region", response_miss.content)
+        self.assertEqual(response_hit["X-Cache-Status"], "HIT")
+        self.assertEqual(response_miss.content, response_hit.content)
+        self.assertEqual(
+            response_miss["X-Data-Version"], response_hit["X-Data-Version"]
+        )
+
+    def test_empty_tile_returns_no_content(self):
+        response = self.client.get(f"{self.tile_url(6, 0, 0)}?id={self.region.pk}")
+
+        self.assertEqual(response.status_code, 204)
+
+    def test_tile_outside_grid_returns_not_found(self):
+        response = self.client.get(self.tile_url(1, 5, 0))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_catchment_tile_uses_region_geometry(self):
+        Catchment.objects.create(
+            name="Tiled Catchment",
+            region=self.region,
+            publication_status="published",
+        )
+
+        response = self.client.get(
+            f"{self.tile_url(6, 33, 20, 'api-catchment')}?name=Tiled Catchment"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"Tiled Catchment", response.content)
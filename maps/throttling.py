@@ -70,3 +70,13 @@ class GeoJSONAnonThrottle(AnonRateThrottle):
 
         ident = get_subnet_ident(self.get_ident(request))
         return self.cache_format % {"scope": self.scope, "ident": ident}
+
+
+class MVTAnonThrottle(GeoJSONAnonThrottle):
+    """Subnet-aware anonymous rate limit for vector tile endpoints.
+
+    A map view requests a few dozen tiles at once, so tiles get a budget of
+    their own instead of sharing the much smaller GeoJSON one.
+    """
+
+    scope = "mvt_anon"
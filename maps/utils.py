@@ -1,12 +1,47 @@
+import gzip
 import hashlib
 import json
+import logging
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
 from importlib import import_module
 
 from django.conf import settings
 from django.core.cache import caches
+from rest_framework.renderers import JSONRenderer
+
+from .cache_tags import tag_cache_entry
 
 INITIALIZATION_DEPENDENCIES = ["users", "utils.properties"]
 
+GEOJSON_CONTENT_TYPE = "application/geo+json"
+
+# Content-Encoding applied to GeoJSON bodies stored in the geojson cache
+# ("gzip" or None). Clients that do not accept it get the body decompressed.
+GEOJSON_CACHE_ENCODING = getattr(settings, "GEOJSON_CACHE_ENCODING", "gzip")
+GEOJSON_CACHE_COMPRESSLEVEL = 6
+# Streamed bodies whose encoded size exceeds this many bytes are not cached
+GEOJSON_STREAM_CACHE_MAX_SIZE = getattr(
+    settings, "GEOJSON_STREAM_CACHE_MAX_SIZE", 32 * 1024 * 1024
+)
+
+_ENCODED_GEOJSON_FORMAT = "encoded-geojson"
+
+# Single-flight regeneration of geojson cache entries (see single_flight_cache).
+# The lock outlives the slowest expected generation; followers without a stale
+# value wait at most GEOJSON_CACHE_LOCK_WAIT seconds for the leader.
+GEOJSON_CACHE_LOCK_TIMEOUT = getattr(settings, "GEOJSON_CACHE_LOCK_TIMEOUT", 120)
+GEOJSON_CACHE_LOCK_WAIT = getattr(settings, "GEOJSON_CACHE_LOCK_WAIT", 10)
+GEOJSON_CACHE_STALE_TIMEOUT = getattr(
+    settings, "GEOJSON_CACHE_STALE_TIMEOUT", 7 * 24 * 3600
+)
+_CACHE_LOCK_POLL_INTERVAL = 0.1
+
+logger = logging.getLogger(__name__)
+
 
 def ensure_initial_data(stdout=None):
     """
@@ -238,54 +273,54 @@ def _get_waste_collection_model():
     return getattr(module, "Collection", None)
 
 
-def compute_collection_dataset_version(scope="published", user=None):
-    """Compute a scope-aware dataset version hash for Collections.
+def compute_collection_dataset_state(scope="published", user=None):
+    """Return a scope-aware ``(version, last_modified)`` for Collections.
 
-    This is a shared utility used by both the viewset and cache warm-up task
-    to ensure consistent cache key generation.
+    The version combines the change counters of the scope's Collections and of
+    the geometries they are drawn with (see ``maps.versioning``), so it costs
+    one indexed lookup. Published Collections have a counter of their own;
+    private and review scopes follow every Collection change and are further
+    namespaced by the user whose objects they show.
 
     Args:
         scope: One of "published", "private", or "review"
         user: The requesting user (for scope-based filtering)
-
-    Returns:
-        A 12-character hash string representing the dataset state.
     """
-    from django.db.models import Count, Max, Min
+    from .models import GeoPolygon
+    from .versioning import dataset_version_key, get_dataset_version_state
 
     collection_model = _get_waste_collection_model()
     if collection_model is None:
         base = f"{scope}:0:0:0:0"
-        return hashlib.sha1(base.encode("utf-8")).hexdigest()[:12]
-
-    qs = collection_model.objects.all()
+        return hashlib.sha1(base.encode("utf-8")).hexdigest()[:12], None
 
+    prefix = scope
     if scope == "published":
-        qs = qs.filter(publication_status="published")
-    elif scope == "private":
+        collection_key = dataset_version_key(collection_model, scope="published")
+    else:
+        collection_key = dataset_version_key(collection_model)
         if user and user.is_authenticated and not getattr(user, "is_staff", False):
-            qs = qs.filter(owner=user)
-    elif scope == "review":
-        from django.db.models import Q
+            prefix = f"{scope}:user:{user.pk}"
 
-        if user and user.is_authenticated and not getattr(user, "is_staff", False):
-            qs = qs.filter(Q(owner=user) | Q(publication_status="review"))
-        else:
-            qs = qs.filter(publication_status="review")
-
-    agg = qs.aggregate(
-        cnt=Count("pk"),
-        max_mod=Max("lastmodified_at"),
-        min_id=Min("pk"),
-        max_id=Max("pk"),
+    return get_dataset_version_state(
+        [collection_key, dataset_version_key(GeoPolygon)], prefix=prefix
     )
-    cnt = agg.get("cnt") or 0
-    max_mod = agg.get("max_mod")
-    ts = int(max_mod.timestamp()) if max_mod else 0
-    min_id = agg.get("min_id") or 0
-    max_id = agg.get("max_id") or 0
-    base = f"{scope}:{cnt}:{ts}:{min_id}:{max_id}"
-    return hashlib.sha1(base.encode("utf-8")).hexdigest()[:12]
+
+
+def compute_collection_dataset_version(scope="published", user=None):
+    """Compute a scope-aware dataset version hash for Collections.
+
+    This is a shared utility used by both the viewset and cache warm-up task
+    to ensure consistent cache key generation.
+
+    Args:
+        scope: One of "published", "private", or "review"
+        user: The requesting user (for scope-based filtering)
+
+    Returns:
+        A 12-character hash string representing the dataset state.
+    """
+    return compute_collection_dataset_state(scope, user)[0]
 
 
 def build_collection_cache_key(
@@ -320,28 +355,236 @@ def build_collection_cache_key(
     return f"collection_geojson:filter:{filter_part}:dv:{dv}"
 
 
-def get_or_set_cache(cache_key, data_generator_func, timeout=None):
+def encode_geojson_payload(data, encoding=GEOJSON_CACHE_ENCODING):
+    """Render GeoJSON data once into the entry stored in the geojson cache.
+
+    The body is the exact ``application/geo+json`` response body (rendered
+    with DRF's JSONRenderer), optionally gzip-compressed, so cache hits can be
+    served without re-encoding the feature collection.
+    """
+    feature_count = None
+    if isinstance(data, dict) and "features" in data:
+        feature_count = len(data["features"])
+    return encode_geojson_body(
+        JSONRenderer().render(data), feature_count=feature_count, encoding=encoding
+    )
+
+
+def encode_geojson_body(body, feature_count=None, encoding=GEOJSON_CACHE_ENCODING):
+    """Build a geojson cache entry from an already rendered response body."""
+    if encoding == "gzip":
+        body = gzip.compress(body, compresslevel=GEOJSON_CACHE_COMPRESSLEVEL, mtime=0)
+    else:
+        encoding = None
+    return {
+        "format": _ENCODED_GEOJSON_FORMAT,
+        "body": body,
+        "encoding": encoding,
+        "feature_count": feature_count,
+    }
+
+
+class GeoJSONBodyEncoder:
+    """Build a geojson cache entry while its response body is streamed.
+
+    Chunks are compressed as they are written, so only the encoded body is
+    held in memory. Once it grows beyond ``max_size`` bytes the body is
+    dropped and ``entry`` returns None.
+    """
+
+    def __init__(self, max_size=GEOJSON_STREAM_CACHE_MAX_SIZE, encoding=None):
+        if encoding is None:
+            encoding = GEOJSON_CACHE_ENCODING
+        self.encoding = "gzip" if encoding == "gzip" else None
+        self.max_size = max_size
+        self.size = 0
+        self.chunks = []
+        self.compressor = None
+        if self.encoding == "gzip":
+            self.compressor = zlib.compressobj(
+                GEOJSON_CACHE_COMPRESSLEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+            )
+
+    @property
+    def exceeded(self):
+        return self.chunks is None
+
+    def write(self, chunk):
+        if self.exceeded:
+            return
+        if self.compressor is not None:
+            chunk = self.compressor.compress(chunk)
+        self._append(chunk)
+
+    def entry(self, feature_count=None):
+        """Return the cache entry of the written body, or None if it was too big."""
+        if self.compressor is not None and not self.exceeded:
+            self._append(self.compressor.flush())
+        if self.exceeded:
+            return None
+        return {
+            "format": _ENCODED_GEOJSON_FORMAT,
+            "body": b"".join(self.chunks),
+            "encoding": self.encoding,
+            "feature_count": feature_count,
+        }
+
+    def _append(self, chunk):
+        self.size += len(chunk)
+        if self.max_size is not None and self.size > self.max_size:
+            self.chunks = None
+            self.compressor = None
+        elif chunk:
+            self.chunks.append(chunk)
+
+
+def is_encoded_geojson_payload(entry):
+    """Return True if a geojson cache entry was written by encode_geojson_payload."""
+    return isinstance(entry, dict) and entry.get("format") == _ENCODED_GEOJSON_FORMAT
+
+
+def decode_geojson_payload(entry):
+    """Return the uncompressed response body of an encoded geojson cache entry."""
+    if entry["encoding"] == "gzip":
+        return gzip.decompress(entry["body"])
+    return entry["body"]
+
+
+@dataclass(frozen=True)
+class CacheResult:
+    """Outcome of ``single_flight_cache``.
+
+    ``status`` is ``"HIT"``, ``"MISS"`` (generated by this call) or ``"STALE"``
+    (previous value served while another worker regenerates it). ``version``
+    is the dataset version the data was generated for, if known.
+    """
+
+    data: object
+    status: str
+    version: str | None = None
+
+
+def get_stale_cache_key(cache_key):
+    """Return the key holding the last generated value of ``cache_key``.
+
+    The prefix keeps it out of the ``<namespace>:*`` invalidation patterns, so
+    the previous value outlives the invalidation of the entry itself.
+    """
+    return f"stale:{cache_key}"
+
+
+def _release_cache_lock(cache, lock_key, token):
+    try:
+        if cache.get(lock_key) == token:
+            cache.delete(lock_key)
+    except Exception:
+        logger.exception("Error releasing cache lock '%s'", lock_key)
+
+
+@contextmanager
+def single_flight_lock(lock_name, wait=GEOJSON_CACHE_LOCK_WAIT):
+    """Run work guarded by ``lock_name`` at most once at a time across workers.
+
+    Yields True to the caller that takes the lock, which is released on exit.
+    Other callers wait up to *wait* seconds for it to be released and are
+    yielded False; they re-check whether the work is still needed, see
+    ``single_flight_cache`` for the same pattern on cache entries.
+    """
+    cache = caches[getattr(settings, "GEOJSON_CACHE", "default")]
+    lock_key = f"lock:{lock_name}"
+    token = uuid.uuid4().hex
+    if not cache.add(lock_key, token, timeout=GEOJSON_CACHE_LOCK_TIMEOUT):
+        deadline = time.monotonic() + wait
+        while time.monotonic() < deadline:
+            time.sleep(_CACHE_LOCK_POLL_INTERVAL)
+            if cache.get(lock_key) is None:
+                break
+        yield False
+        return
+    try:
+        yield True
+    finally:
+        _release_cache_lock(cache, lock_key, token)
+
+
+def single_flight_cache(
+    cache_key,
+    data_generator_func,
+    timeout=None,
+    stale_key=None,
+    version=None,
+    tags=None,
+):
+    """Get ``cache_key`` from the geojson cache, generating it at most once.
+
+    On a miss, the first caller takes a lock (an atomic ``add``, i.e. ``SET NX``
+    on Redis) and generates the value; concurrent callers for the same key do
+    not repeat the work. If a previous value is kept under ``stale_key`` they
+    are served that right away (stale-while-revalidate), otherwise they poll
+    the cache for up to ``GEOJSON_CACHE_LOCK_WAIT`` seconds and only generate
+    the value themselves if the leader neither delivered nor holds the lock.
+
+    ``stale_key`` must only be shared by requests allowed to see the same data.
+    ``version`` is stored with the stale value and returned with fresh ones.
+    ``tags`` is called after generating the value and returns the cache tags
+    to register it in, see ``maps.cache_tags``.
+    """
+    cache = caches[getattr(settings, "GEOJSON_CACHE", "default")]
+    cached_data = cache.get(cache_key)
+    if cached_data is not None:
+        return CacheResult(cached_data, "HIT", version)
+
+    lock_key = f"lock:{cache_key}"
+    token = uuid.uuid4().hex
+    if not cache.add(lock_key, token, timeout=GEOJSON_CACHE_LOCK_TIMEOUT):
+        if stale_key:
+            stale = cache.get(stale_key)
+            if stale is not None:
+                return CacheResult(stale["data"], "STALE", stale["version"])
+
+        deadline = time.monotonic() + GEOJSON_CACHE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(_CACHE_LOCK_POLL_INTERVAL)
+            cached_data = cache.get(cache_key)
+            if cached_data is not None:
+                return CacheResult(cached_data, "HIT", version)
+            if cache.get(lock_key) is None:
+                break
+        logger.warning("Generating '%s' without the cache lock", cache_key)
+        token = None
+
+    try:
+        new_data = data_generator_func()
+        cache.set(cache_key, new_data, timeout=timeout)
+        if tags is not None:
+            tag_cache_entry(cache_key, tags(), timeout=timeout)
+        if stale_key:
+            cache.set(
+                stale_key,
+                {"data": new_data, "version": version},
+                timeout=GEOJSON_CACHE_STALE_TIMEOUT,
+            )
+    finally:
+        if token is not None:
+            _release_cache_lock(cache, lock_key, token)
+    return CacheResult(new_data, "MISS", version)
+
+
+def get_or_set_cache(cache_key, data_generator_func, timeout=None, stale_key=None):
     """
     Helper function to abstract the cache get/set pattern.
+
+    Misses are coalesced across workers, see ``single_flight_cache``.
     Args:
         cache_key (str): The key to use for caching.
         data_generator_func (callable): A function that generates the data if not found in cache.
         timeout (int, optional): Specific timeout for this cache entry. Defaults to cache's default.
+        stale_key (str, optional): Key of the previous value to serve while it is regenerated.
     Returns:
         The cached data or newly generated data.
         bool: True if data was retrieved from cache, False otherwise.
     """
-    cache_alias = getattr(settings, "GEOJSON_CACHE", "default")
-    cache = caches[cache_alias]
-    cached_data = cache.get(cache_key)
-
-    if cached_data is not None:
-        return cached_data, True  # Data from cache, Hit=True
-
-    # Cache miss, generate data
-    new_data = data_generator_func()
-
-    # Cache the newly generated data
-    cache.set(cache_key, new_data, timeout=timeout)
-
-    return new_data, False  # Newly generated data, Hit=False
+    result = single_flight_cache(
+        cache_key, data_generator_func, timeout=timeout, stale_key=stale_key
+    )
+    return result.data, result.status != "MISS"
@@ -0,0 +1,131 @@
+"""
+Change counters that version GeoJSON datasets.
+
+Every registered model (and optionally a scope of it, e.g. the published
+Collections) has one ``DatasetVersion`` row whose counter is incremented by
+``post_save``/``post_delete``/``m2m_changed`` handlers. Endpoints derive cache
+keys, ``X-Data-Version`` and ETags from the counters of the models their
+features depend on, which costs one indexed lookup instead of a
+COUNT/MAX aggregate over the served queryset.
+
+Counters are bumped once the writing transaction commits, with one UPSERT
+for all keys of the transaction, so concurrent writers do not queue up on the
+counter rows for as long as their transactions run. Until the bump lands a
+reader may cache the new rows under the old version, which is superseded right
+after; the old rows are never cached under the new version. Writes that bypass
+signals (``QuerySet.update``, ``bulk_create``, raw SQL) must call
+``bump_dataset_version`` themselves.
+
+With ``DATASET_VERSION_ALWAYS_EAGER``, as in the test settings, counters are
+bumped right away inside the transaction instead; test cases run in a
+transaction that never commits.
+"""
+
+import functools
+import hashlib
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+_versioned_models = set()
+
+# Keys bumped by the open transactions of this thread, by database alias
+_pending = threading.local()
+
+
+def register_versioned_model(*models):
+    """Bump the counter of ``models`` (and their subclasses) on every change."""
+    _versioned_models.update(models)
+
+
+def dataset_version_key(model, scope=None):
+    """Return the counter key of a model, e.g. ``"maps.region"``."""
+    key = model._meta.concrete_model._meta.label_lower
+    return f"{key}:{scope}" if scope else key
+
+
+def versioned_keys_for(model):
+    """Return the counter keys a change to an instance of ``model`` bumps.
+
+    Subclasses bump their registered parents as well, so saving a NutsRegion
+    also changes the version of the Region dataset it is part of.
+    """
+    return [
+        dataset_version_key(parent)
+        for parent in model.__mro__
+        if parent in _versioned_models
+    ]
+
+
+def flush_pending_dataset_versions(using=None):
+    """Increment the counters collected by ``bump_dataset_version``."""
+    using = using or DEFAULT_DB_ALIAS
+    keys = sorted(getattr(_pending, "keys", {}).pop(using, ()))
+    if not keys:
+        return
+    from .models import DatasetVersion
+
+    connection = connections[using]
+    table = connection.ops.quote_name(DatasetVersion._meta.db_table)
+    # Sorted keys keep concurrent writers from deadlocking on the rows.
+    sql = f"""
+        INSERT INTO {table} (key, version, updated_at)
+        SELECT key, 1, %s FROM unnest(%s::varchar[]) AS key
+        ON CONFLICT (key)
+        DO UPDATE SET version = {table}.version + 1, updated_at = EXCLUDED.updated_at
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [timezone.now(), keys])
+
+
+def bump_dataset_version(*keys, using=None):
+    """Increment the counters of ``keys`` once the current transaction commits.
+
+    Missing counters are created in the database ``using``, the alias the
+    signal handlers receive. Every key is bumped once per transaction, however
+    often it is passed; outside of a transaction the counters are incremented
+    immediately.
+    """
+    if not keys:
+        return
+    using = using or DEFAULT_DB_ALIAS
+    if not hasattr(_pending, "keys"):
+        _pending.keys = {}
+    _pending.keys.setdefault(using, set()).update(keys)
+    if getattr(settings, "DATASET_VERSION_ALWAYS_EAGER", False):
+        flush_pending_dataset_versions(using)
+        return
+    # Registered on every call, as callbacks of rolled back savepoints are
+    # dropped; all but the first find nothing left to flush. Keys left over
+    # from a rolled back transaction are bumped with the next one, which only
+    # costs a few extra cache misses.
+    transaction.on_commit(
+        functools.partial(flush_pending_dataset_versions, using), using=using
+    )
+
+
+def get_dataset_version_state(keys, prefix=None):
+    """Return ``(version, last_modified)`` of the datasets behind ``keys``.
+
+    The version is a short hash of all counters; ``last_modified`` is the
+    latest bump, or ``None`` if none of the datasets changed yet. ``prefix``
+    namespaces the hash, e.g. by scope or user.
+    """
+    from .models import DatasetVersion
+
+    keys = sorted(set(keys))
+    counters = dict.fromkeys(keys, 0)
+    last_modified = None
+    for key, version, updated_at in DatasetVersion.objects.filter(
+        key__in=keys
+    ).values_list("key", "version", "updated_at"):
+        counters[key] = version
+        if last_modified is None or updated_at > last_modified:
+            last_modified = updated_at
+
+    base = ";".join(f"{key}={version}" for key, version in counters.items())
+    if prefix:
+        base = f"{prefix}:{base}"
+    return hashlib.sha1(base.encode("utf-8")).hexdigest()[:12], last_modified
@@ -19,7 +19,10 @@ from rest_framework.views import APIView, Response
 
 from maps.mixins import (
     GEOJSON_CONTROL_QUERY_PARAMS,
+    GEOJSON_EXPOSE_HEADERS,
+    get_not_modified_response,
     get_unbounded_geojson_rejection_response,
+    set_conditional_headers,
 )
 from maps.runtime_adapters import get_dataset_runtime_adapter
 from maps.serializers import (
@@ -957,6 +960,11 @@ class GeoDataSetRuntimeFeatureGeoJSONView(
         if not getattr(adapter, "uses_local_relation", False):
             raise Http404("Dataset does not use a local relation runtime.")
         feature_id = request.GET.get("id")
+        data_version = adapter.get_data_version(query_params=request.GET, pk=feature_id)
+        not_modified = get_not_modified_response(request, data_version)
+        if not_modified is not None:
+            return not_modified
+
         count = adapter.get_record_count(query_params=request.GET, pk=feature_id)
         rejection_response = get_unbounded_geojson_rejection_response(
             request,
@@ -966,7 +974,6 @@ class GeoDataSetRuntimeFeatureGeoJSONView(
         if rejection_response is not None:
             return rejection_response
 
-        data_version = adapter.get_data_version(query_params=request.GET, pk=feature_id)
         response = StreamingHttpResponse(
             adapter.stream_geojson_feature_collection(
                 query_params=request.GET,
@@ -974,12 +981,11 @@ class GeoDataSetRuntimeFeatureGeoJSONView(
             ),
             content_type="application/geo+json",
         )
+        set_conditional_headers(response, data_version)
         response["X-Cache-Status"] = "STREAM"
         response["X-Total-Count"] = str(count)
         response["X-Data-Version"] = data_version
-        response["Access-Control-Expose-Headers"] = (
-            "X-Total-Count, X-Cache-Status, X-Data-Version"
-        )
+        response["Access-Control-Expose-Headers"] = GEOJSON_EXPOSE_HEADERS
         return response
 
 
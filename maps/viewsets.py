@@ -1,6 +1,4 @@
-import hashlib
-
-from django.db.models import Count, Max, Min
+from django.db.models import Count
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
@@ -8,8 +6,18 @@ from rest_framework.response import Response
 from utils.viewsets import AutoPermModelViewSet
 
 from .filters import CatchmentFilterSet, RegionFilterSet
-from .mixins import CachedGeoJSONMixin, get_unbounded_geojson_rejection_response
-from .models import Catchment, Location, NutsRegion, NutsVintage, Region
+from .mixins import (
+    CachedGeoJSONMixin,
+    get_unbounded_geojson_rejection_response,
+)
+from .models import (
+    Catchment,
+    GeoPolygon,
+    Location,
+    NutsRegion,
+    NutsVintage,
+    Region,
+)
 from .serializers import (
     CatchmentGeoFeatureModelSerializer,
     CatchmentModelSerializer,
@@ -20,7 +28,7 @@ from .serializers import (
     RegionGeoFeatureModelSerializer,
     RegionModelSerializer,
 )
-from .throttling import GeoJSONAnonThrottle
+from .throttling import GeoJSONAnonThrottle, MVTAnonThrottle
 from .utils import (
     get_catchment_cache_key,
     get_nuts_region_cache_key,
@@ -59,10 +67,17 @@ class RegionViewSet(CachedGeoJSONMixin, AutoPermModelViewSet):
     serializer_class = RegionModelSerializer
     filterset_class = RegionFilterSet
     geojson_throttle_classes = (GeoJSONAnonThrottle,)
+    mvt_throttle_classes = (MVTAnonThrottle,)
+    mvt_geometry_field = "borders__geom"
+    mvt_properties = {"id": "pk", "name": "name", "country": "country"}
+    pyramid_geopolygon_field = "borders"
+    dataset_version_models = (Region, GeoPolygon)
+    geojson_cache_tag_fields = {"pk": Region}
     custom_permission_required = {
         "list": None,
         "retrieve": None,
         "geojson": None,
+        "tiles": None,
         "summaries": None,
         "version": None,
     }
@@ -91,10 +106,18 @@ class CatchmentViewSet(CachedGeoJSONMixin, AutoPermModelViewSet):
     serializer_class = CatchmentModelSerializer
     filterset_class = CatchmentFilterSet
     geojson_throttle_classes = (GeoJSONAnonThrottle,)
+    mvt_throttle_classes = (MVTAnonThrottle,)
+    mvt_geometry_field = "region__borders__geom"
+    mvt_properties = {"id": "pk", "name": "name", "type": "type"}
+    pyramid_geopolygon_field = "region__borders"
+    # Catchment geometries are derived from the related Region geometry.
+    dataset_version_models = (Catchment, Region, GeoPolygon)
+    geojson_cache_tag_fields = {"pk": Catchment, "region_id": Region}
     custom_permission_required = {
         "list": None,
         "retrieve": None,
         "geojson": None,
+        "tiles": None,
         "version": None,
     }
 
@@ -103,33 +126,6 @@ class CatchmentViewSet(CachedGeoJSONMixin, AutoPermModelViewSet):
         catchment_id = filters.get("id")
         return get_catchment_cache_key(catchment_id, filters)
 
-    def get_dataset_version(self, request):
-        """Return a short hash representing the current Catchment dataset state.
-
-        Catchment geometries are derived from the related Region geometry, so we
-        include the related Region last-modified timestamp in the version.
-        """
-        queryset = self.get_geojson_queryset_with_bbox(request)
-        agg = queryset.aggregate(
-            cnt=Count("pk"),
-            max_mod=Max("lastmodified_at"),
-            max_region_mod=Max("region__lastmodified_at"),
-            min_id=Min("pk"),
-            max_id=Max("pk"),
-        )
-        cnt = agg.get("cnt") or 0
-        max_mod = agg.get("max_mod")
-        region_mod = agg.get("max_region_mod")
-        ts = 0
-        if max_mod:
-            ts = max(ts, int(max_mod.timestamp()))
-        if region_mod:
-            ts = max(ts, int(region_mod.timestamp()))
-        min_id = agg.get("min_id") or 0
-        max_id = agg.get("max_id") or 0
-        base = f"{cnt}:{ts}:{min_id}:{max_id}"
-        return hashlib.sha1(base.encode("utf-8")).hexdigest()[:12]
-
     def get_serializer_class(self):
         if self.action == "geojson":
             return CatchmentGeoFeatureModelSerializer
@@ -148,10 +144,19 @@ class NutsRegionViewSet(CachedGeoJSONMixin, AutoPermModelViewSet):
     serializer_class = NutsRegionSummarySerializer
     filterset_fields = ("id", "levl_code", "cntr_code", "parent_id")
     geojson_throttle_classes = (GeoJSONAnonThrottle,)
+    mvt_throttle_classes = (MVTAnonThrottle,)
+    mvt_geometry_field = "borders__geom"
+    mvt_properties = {"id": "pk", "level": "levl_code", "nuts_id": "nuts_id"}
+    pyramid_geopolygon_field = "borders"
+    # NutsRegion saves and region attribute values bump the Region counter.
+    dataset_version_models = (Region, GeoPolygon, NutsVintage)
+    # NutsRegion rows share their primary key with the parent Region.
+    geojson_cache_tag_fields = {"pk": Region}
     custom_permission_required = {
         "list": None,
         "retrieve": None,
         "geojson": None,
+        "tiles": None,
         "version": None,
     }
 
@@ -11,3 +11,6 @@ class GreenhousesConfig(AppConfig):
     def ready(self):
         exports = import_module("sources.greenhouses.exports")
         exports.register_exports()
+        # Versions the source data of the inventory algorithms on this dataset
+        versioning = import_module("maps.versioning")
+        versioning.register_versioned_model(self.get_model("NantesGreenhouses"))
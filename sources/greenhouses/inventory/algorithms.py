@@ -2,7 +2,7 @@ from django.db.models import Sum
 
 from distributions.models import TemporalDistribution
 from distributions.plots import Distribution
-from inventories.algorithms import InventoryAlgorithmsBase
+from inventories.algorithms import InventoryAlgorithmsBase, not_reusable
 from inventories.models import Scenario
 from materials.models import SampleSeries
 from sources.greenhouses.models import Greenhouse, NantesGreenhouses
@@ -10,6 +10,7 @@ from sources.greenhouses.models import Greenhouse, NantesGreenhouses
 
 class InventoryAlgorithms(InventoryAlgorithmsBase):
     @classmethod
+    @not_reusable
     def nantes_greenhouse_production(cls, **kwargs):
         """
         Here all the algorithms that are specific to the case study of the greenhouses in Nantes region are implemented.
@@ -11,3 +11,6 @@ class RoadsideTreesConfig(AppConfig):
     def ready(self):
         exports = import_module("sources.roadside_trees.exports")
         exports.register_exports()
+        # Versions the source data of the inventory algorithms on this dataset
+        versioning = import_module("maps.versioning")
+        versioning.register_versioned_model(self.get_model("HamburgRoadsideTrees"))
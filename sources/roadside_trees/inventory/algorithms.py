@@ -1,13 +1,41 @@
 from distributions.plots import Distribution
-from inventories.algorithms import InventoryAlgorithmsBase
-from inventories.models import Scenario
+from inventories.algorithms import (
+    InventoryAlgorithmsBase,
+    partitionable,
+    reads_inputs,
+)
+from inventories.models import InventoryAmountShare, Scenario
 from materials.models import ComponentMeasurement, SampleSeries
 from sources.roadside_trees.models import HamburgRoadsideTrees
 from sources.urban_green_spaces.models import HamburgGreenAreas
 
 
+def seasonal_production_inputs(scenario_id=None, feedstock_id=None, **kwargs):
+    """State of the amount shares and component measurements of the seasonal production."""
+    shares = InventoryAmountShare.objects.filter(
+        scenario_id=scenario_id, feedstock_id=feedstock_id
+    ).order_by("pk")
+    measurements = ComponentMeasurement.objects.filter(
+        sample__series_id=feedstock_id, group__name="Macro Components"
+    ).order_by("pk")
+    return {
+        "shares": list(
+            shares.values_list("pk", "timestep_id", "average", "standard_deviation")
+        ),
+        "measurements": list(
+            measurements.values_list(
+                "pk",
+                "lastmodified_at",
+                "sample__timestep_id",
+                "sample__lastmodified_at",
+            )
+        ),
+    }
+
+
 class InventoryAlgorithms(InventoryAlgorithmsBase):
     @classmethod
+    @partitionable
     def hamburg_park_production(cls, **kwargs):
         keep_columns = ["anlagenname", "belegenheit", "gruenart", "nutzcode"]
 
@@ -16,6 +44,8 @@ class InventoryAlgorithms(InventoryAlgorithmsBase):
         return super().avg_area_yield(**kwargs)
 
     @classmethod
+    @reads_inputs(seasonal_production_inputs)
+    @partitionable
     def hamburg_roadside_tree_production(cls, **kwargs):
         kwargs.update({"source_model": HamburgRoadsideTrees})
         result = super().avg_point_yield(**kwargs)
@@ -12,6 +12,9 @@ distinguished from manually entered data and regenerated at will.
 """
 
 import logging
+import threading
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass
 from decimal import Decimal
 from functools import lru_cache
@@ -19,10 +22,14 @@ from functools import lru_cache
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 from django.db import transaction
+from django.db.models import F, Q
+from django.dispatch import Signal
+from django.utils import timezone
 
 from maps.models import RegionProperty
-from maps.population.services import resolve_population
+from maps.population.services import PopulationResolver, resolve_population
 from maps.validation import RegionCompositionError
+from maps.versioning import bump_dataset_version, dataset_version_key
 from utils.object_management.models import get_default_owner
 from utils.properties.models import Property, Unit
 
@@ -58,6 +65,24 @@ _DEFAULT_POPULATION_ATTRIBUTE_NAME = "Population"
 # Conversion factor: 1 Mg = 1000 kg
 _MG_TO_KG = 1000
 
+# Number of derived records written per bulk statement by backfill_derived_values
+BACKFILL_CHUNK_SIZE = 1000
+
+# Sent after write_derived_values with the ``collection_ids`` of the written
+# records, which are bulk-written without post_save signals.
+derived_values_written = Signal()
+
+_BACKFILL_UPDATE_FIELDS = (
+    "name",
+    "average",
+    "unit",
+    "owner",
+    "publication_status",
+    "submitted_at",
+    "approved_at",
+    "approved_by",
+)
+
 
 def convert_specific_to_total_mg(value, population, ndigits=2):
     """Convert specific waste (kg/cap/a) to total waste (Mg/a)."""
@@ -490,72 +515,369 @@ def delete_derived_cpv(cpv):
     return count
 
 
-def backfill_derived_values(dry_run=False, owner=None, publication_status=None):
-    """Compute derived counterparts for all existing CPV records.
+def _bulk_population(region_years, legacy_attribute_id):
+    """Resolve exact-year populations for many ``(region_id, year)`` pairs.
 
-    Iterates over all non-derived CPV records for the configured
-    specific and total waste properties,
-    creating or updating derived counterparts where the counterpart
-    does not already exist as a manual entry.
+    Uses a :class:`PopulationResolver`, which follows the resolution order
+    of :func:`resolve_population` with a fixed number of queries per year
+    instead of several per pair. Regions with an invalid composition get
+    no population, as in :func:`get_population_for_collection`.
+    Returns ``{(region_id, year): Decimal}``.
+    """
+    region_ids_by_year = {}
+    for region_id, year in region_years:
+        region_ids_by_year.setdefault(year, set()).add(region_id)
 
-    *owner* and *publication_status* are forwarded to
-    ``create_or_update_derived_cpv`` to override the values that would
-    otherwise be copied from each source CPV.
+    resolver = PopulationResolver(legacy_attribute_id=legacy_attribute_id)
+    populations = {}
+    for year, region_ids in region_ids_by_year.items():
+        for region_id, value in resolver.values(region_ids, year).items():
+            populations[(region_id, year)] = value
+    return populations
 
-    Returns a dict with counts: ``{created: int, updated: int, skipped: int}``.
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+@dataclass
+class DerivedValueBatch:
+    """Derived CPV records to write for a batch of source CPVs."""
+
+    stats: dict
+    to_create: list
+    to_update: list
+    delete_ids: set
+
+    @property
+    def pending(self):
+        return len(self.to_create) + len(self.to_update)
+
+
+def _source_cpvs(queryset):
+    return list(
+        queryset.select_related("property").annotate(
+            region_id=F("collection__catchment__region_id")
+        )
+    )
+
+
+def plan_derived_values(sources, *, owner=None, publication_status=None):
+    """Compute the derived counterparts of many source CPVs in memory.
+
+    *sources* are non-derived CPVs of the convertible properties, as
+    returned by :func:`_source_cpvs`. Their populations (see
+    :func:`_bulk_population`), the manual counterparts and the existing
+    derived records are loaded with a constant number of queries. The
+    outcome per source is the one of ``create_or_update_derived_cpv``.
+    Returns a :class:`DerivedValueBatch` for :func:`write_derived_values`.
     """
     stats = {"created": 0, "updated": 0, "skipped": 0}
     cfg = get_derived_value_config()
-    source_qs = (
+    mapping = _counterpart_mapping()
+    property_ids = [cfg.specific_property_id, cfg.total_property_id]
+    populations = _bulk_population(
+        {
+            (cpv.region_id, cpv.year)
+            for cpv in sources
+            if cpv.region_id is not None and cpv.year
+        },
+        cfg.population_attribute_id,
+    )
+    collection_ids = {cpv.collection_id for cpv in sources}
+    manual_keys = set(
         CollectionPropertyValue.objects.filter(
-            property_id__in=[cfg.specific_property_id, cfg.total_property_id],
+            collection_id__in=collection_ids,
+            property_id__in=property_ids,
             is_derived=False,
-        )
-        .exclude(average=0)
-        .select_related("collection__catchment", "property", "unit")
+        ).values_list("collection_id", "property_id", "year")
     )
+    # The newest derived record per key is kept, older duplicates are deleted
+    derived = {}
+    delete_ids = set()
+    for record in CollectionPropertyValue.objects.filter(
+        collection_id__in=collection_ids,
+        property_id__in=property_ids,
+        is_derived=True,
+    ).order_by("-lastmodified_at", "-pk"):
+        key = (record.collection_id, record.property_id, record.year)
+        if key in derived:
+            delete_ids.add(record.pk)
+        else:
+            derived[key] = record
+
+    now = timezone.now()
+    to_create = {}
+    to_update = {}
+    for cpv in sources:
+        target_property_id, target_unit_id = mapping[cpv.property_id]
+        population = populations.get((cpv.region_id, cpv.year))
+        if not cpv.year or not population or population <= 0:
+            stats["skipped"] += 1
+            continue
+        key = (cpv.collection_id, target_property_id, cpv.year)
+        if key in manual_keys:
+            # Manual counterpart takes precedence: remove stale derived values.
+            if key in derived:
+                delete_ids.add(derived.pop(key).pk)
+            stats["skipped"] += 1
+            continue
 
-    total = source_qs.count()
-    logger.info("Backfilling derived values for %d source CPV records...", total)
-
-    for i, cpv in enumerate(source_qs.iterator(), 1):
-        if dry_run:
-            result = compute_counterpart_value(cpv)
-            if result is None:
-                stats["skipped"] += 1
-                continue
+        if cpv.property_id == cfg.specific_property_id:
+            computed = convert_specific_to_total_mg(cpv.average, population, ndigits=2)
+        else:
+            computed = convert_total_to_specific(cpv.average, population, ndigits=2)
 
-            target_property_id, _, _ = result
-            manual_exists = CollectionPropertyValue.objects.filter(
-                collection=cpv.collection,
+        effective_publication_status = (
+            publication_status
+            if publication_status is not None
+            else cpv.publication_status
+        )
+        submitted_at = cpv.submitted_at
+        approved_at = None
+        approved_by_id = None
+        if effective_publication_status in (
+            CollectionPropertyValue.STATUS_PUBLISHED,
+            CollectionPropertyValue.STATUS_ARCHIVED,
+        ):
+            approved_at = cpv.approved_at
+            approved_by_id = cpv.approved_by_id
+        elif effective_publication_status != CollectionPropertyValue.STATUS_REVIEW:
+            submitted_at = None
+
+        values = {
+            "name": f"derived from {cpv.property.name}",
+            "average": computed,
+            "unit_id": target_unit_id,
+            "owner_id": owner.pk if owner is not None else cpv.owner_id,
+            "publication_status": effective_publication_status,
+            "submitted_at": submitted_at,
+            "approved_at": approved_at,
+            "approved_by_id": approved_by_id,
+        }
+        record = derived.get(key) or to_create.get(key)
+        if record is None:
+            record = CollectionPropertyValue(
+                collection_id=cpv.collection_id,
                 property_id=target_property_id,
                 year=cpv.year,
-                is_derived=False,
-            ).exists()
-            if manual_exists:
-                stats["skipped"] += 1
-                continue
-
-            derived_exists = _derived_counterpart_qs(cpv, target_property_id).exists()
-            if derived_exists:
-                stats["updated"] += 1
-            else:
-                stats["created"] += 1
-            continue
+                is_derived=True,
+            )
+            to_create[key] = record
+            stats["created"] += 1
+        else:
+            if key in derived:
+                to_update[key] = record
+            stats["updated"] += 1
+        for field_name, value in values.items():
+            setattr(record, field_name, value)
+        record.lastmodified_at = now
+
+    return DerivedValueBatch(
+        stats=stats,
+        to_create=list(to_create.values()),
+        to_update=list(to_update.values()),
+        delete_ids=delete_ids,
+    )
 
-        with transaction.atomic():
-            _derived, action = create_or_update_derived_cpv(
-                cpv, owner=owner, publication_status=publication_status
+
+def write_derived_values(batch, chunk_size=BACKFILL_CHUNK_SIZE):
+    """Write a :class:`DerivedValueBatch` in chunks, in one transaction."""
+    written = 0
+    with transaction.atomic():
+        if batch.delete_ids:
+            CollectionPropertyValue.objects.filter(pk__in=batch.delete_ids).delete()
+        for chunk in _chunks(batch.to_create, chunk_size):
+            # A counterpart derived by create_or_update_derived_cpv since the
+            # batch was planned comes from the same source, so it is kept
+            CollectionPropertyValue.objects.bulk_create(chunk, ignore_conflicts=True)
+            written += len(chunk)
+            logger.info(
+                "Written %d / %d derived CPV records...", written, batch.pending
+            )
+        for chunk in _chunks(batch.to_update, chunk_size):
+            CollectionPropertyValue.objects.bulk_update(
+                chunk, [*_BACKFILL_UPDATE_FIELDS, "lastmodified_at"]
+            )
+            written += len(chunk)
+            logger.info(
+                "Written %d / %d derived CPV records...", written, batch.pending
             )
-        stats[action] += 1
+        if written:
+            # Bulk writes bypass the signals that bump the dataset version
+            bump_dataset_version(dataset_version_key(CollectionPropertyValue))
+    if batch.delete_ids:
+        logger.info(
+            "Deleted %d stale or duplicate derived CPV records", len(batch.delete_ids)
+        )
+    if batch.to_create or batch.to_update:
+        derived_values_written.send(
+            sender=CollectionPropertyValue,
+            collection_ids={
+                cpv.collection_id for cpv in (*batch.to_create, *batch.to_update)
+            },
+        )
+
 
-        if i % 1000 == 0:
-            logger.info("Processed %d / %d CPV records...", i, total)
+def backfill_derived_values(
+    dry_run=False, owner=None, publication_status=None, chunk_size=BACKFILL_CHUNK_SIZE
+):
+    """Compute derived counterparts for all existing CPV records.
 
+    Considers all non-derived CPV records for the configured
+    specific and total waste properties,
+    creating or updating derived counterparts where the counterpart
+    does not already exist as a manual entry, with the same outcome as
+    calling ``create_or_update_derived_cpv`` for each of them.
+
+    The backfill is set-based: the counterparts are computed in memory by
+    :func:`plan_derived_values` and written with ``bulk_create`` and
+    ``bulk_update`` in chunks of *chunk_size*, in one transaction.
+
+    *owner* and *publication_status* override the values that would
+    otherwise be copied from each source CPV.
+
+    Returns a dict with counts: ``{created: int, updated: int, skipped: int}``.
+    """
+    started = time.perf_counter()
+    cfg = get_derived_value_config()
+    sources = _source_cpvs(
+        CollectionPropertyValue.objects.filter(
+            property_id__in=[cfg.specific_property_id, cfg.total_property_id],
+            is_derived=False,
+        ).exclude(average=0)
+    )
+    total = len(sources)
+    logger.info("Backfilling derived values for %d source CPV records...", total)
+
+    batch = plan_derived_values(
+        sources, owner=owner, publication_status=publication_status
+    )
+    stats = batch.stats
+    if not dry_run:
+        write_derived_values(batch, chunk_size)
+
+    seconds = time.perf_counter() - started
     logger.info(
-        "Backfill complete: %d created, %d updated, %d skipped",
+        "Backfill complete: %d created, %d updated, %d skipped in %.1f s (%.0f source rows/s)",
         stats["created"],
         stats["updated"],
         stats["skipped"],
+        seconds,
+        total / seconds if seconds else 0,
     )
     return stats
+
+
+# ---------------------------------------------------------------------------
+# Deferred maintenance of derived values
+# ---------------------------------------------------------------------------
+
+_deferred = threading.local()
+
+
+@contextmanager
+def deferred_derived_values():
+    """Maintain the derived values of the CPVs saved or deleted in the block in one batch.
+
+    Inside the block the signal handlers only collect the touched source
+    CPVs (see :func:`defer_derived_value_sync`). When the outermost block
+    exits without an error, their derived counterparts are deleted, created
+    or updated set-based by :func:`flush_deferred_derived_values`, within
+    the transaction the block runs in. Bulk imports pay for the population
+    lookups and counterpart checks once per batch instead of once per row.
+    """
+    depth = getattr(_deferred, "depth", 0)
+    if depth == 0:
+        _deferred.saved = set()
+        _deferred.deleted = set()
+    _deferred.depth = depth + 1
+    try:
+        yield
+    except BaseException:
+        if depth == 0:
+            _deferred.saved = set()
+            _deferred.deleted = set()
+        raise
+    finally:
+        _deferred.depth = depth
+    if depth == 0:
+        flush_deferred_derived_values()
+
+
+def derived_values_deferred():
+    """Return whether derived values are maintained in a batch right now."""
+    return getattr(_deferred, "depth", 0) > 0
+
+
+def defer_derived_value_sync(cpv, *, deleted=False):
+    """Collect a saved or deleted source CPV for the current batch.
+
+    Returns ``False`` outside of :func:`deferred_derived_values`, when the
+    caller has to maintain the derived value itself.
+    """
+    if not derived_values_deferred():
+        return False
+    if deleted:
+        mapping = _counterpart_mapping().get(cpv.property_id)
+        if mapping is not None:
+            _deferred.deleted.add((cpv.collection_id, mapping[0], cpv.year))
+        _deferred.saved.discard(cpv.pk)
+    else:
+        _deferred.saved.add(cpv.pk)
+    return True
+
+
+def flush_deferred_derived_values():
+    """Maintain the derived values collected by :func:`deferred_derived_values`."""
+    saved = getattr(_deferred, "saved", set())
+    deleted = getattr(_deferred, "deleted", set())
+    _deferred.saved = set()
+    _deferred.deleted = set()
+    delete_derived_values(deleted)
+    return sync_derived_values(saved)
+
+
+def delete_derived_values(keys, chunk_size=BACKFILL_CHUNK_SIZE):
+    """Delete the derived CPVs of many ``(collection_id, property_id, year)`` keys.
+
+    The batch counterpart of :func:`delete_derived_cpv`. Returns the number
+    of deleted records.
+    """
+    keys = list(keys)
+    count = 0
+    for chunk in _chunks(keys, chunk_size):
+        condition = Q()
+        for collection_id, property_id, year in chunk:
+            condition |= Q(
+                collection_id=collection_id, property_id=property_id, year=year
+            )
+        deleted, _ = CollectionPropertyValue.objects.filter(
+            condition, is_derived=True
+        ).delete()
+        count += deleted
+    if count:
+        logger.debug("Deleted %d derived CPV(s) of deleted source CPVs", count)
+    return count
+
+
+def sync_derived_values(cpv_ids, chunk_size=BACKFILL_CHUNK_SIZE):
+    """Create or update the derived counterparts of many source CPVs.
+
+    The batch counterpart of :func:`create_or_update_derived_cpv`: ids of
+    derived CPVs, of CPVs of other properties or of deleted CPVs are
+    ignored. Returns a dict with counts like :func:`backfill_derived_values`.
+    """
+    if not cpv_ids:
+        return {"created": 0, "updated": 0, "skipped": 0}
+    sources = _source_cpvs(
+        CollectionPropertyValue.objects.filter(
+            pk__in=cpv_ids,
+            property_id__in=get_convertible_property_ids(),
+            is_derived=False,
+        ).order_by("pk")
+    )
+    batch = plan_derived_values(sources)
+    write_derived_values(batch, chunk_size)
+    return batch.stats
@@ -10,6 +10,7 @@ from django.db import transaction
 
 from bibliography.models import Source
 from materials.models import Material
+from sources.waste_collection.derived_values import deferred_derived_values
 from sources.waste_collection.models import (
     BinConfiguration,
     Collection,
@@ -197,6 +198,7 @@ class CollectionImporter:
         self.create_collectors = create_collectors
         self.dry_run = False
         self._lookups_loaded = False
+        self._derived_followups = []
 
     # ------------------------------------------------------------------
     # Public interface
@@ -229,9 +231,14 @@ class CollectionImporter:
             "warnings": [],
         }
 
+        self._derived_followups = []
         with transaction.atomic():
-            for i, record in enumerate(records):
-                self._import_record(record, i, stats)
+            # Derived values of the imported property values are computed in
+            # one batch once all records are imported.
+            with deferred_derived_values():
+                for i, record in enumerate(records):
+                    self._import_record(record, i, stats)
+            self._complete_derived_values(stats)
             if dry_run:
                 transaction.set_rollback(True)
 
@@ -932,24 +939,39 @@ class CollectionImporter:
         stats["cpv_created"] += 1
         self._attach_cpv_sources(cpv, flyer_urls, stats)
 
-        derived = CollectionPropertyValue.objects.filter(
-            collection=collection,
-            year=year,
-            is_derived=True,
-        ).first()
-        if derived is not None:
-            self._attach_cpv_sources(derived, flyer_urls, stats)
+        # The derived counterpart is created with the batch of derived values
+        # at the end of the import, see _complete_derived_values.
+        self._derived_followups.append((collection, year, flyer_urls))
 
         if self.publication_status == "review":
-            # Submit the derived counterpart first (created by the post_save signal
-            # during .create() above).  We must do this before calling
-            # submit_for_review() on the source CPV, because that triggers the
-            # signal a second time and would overwrite the derived CPV's
-            # publication_status to 'review' without setting submitted_at.
-            if derived is not None and derived.submitted_at is None:
-                self._submit_cpv_for_review(derived)
             self._submit_cpv_for_review(cpv)
 
+    def _complete_derived_values(self, stats: dict) -> None:
+        """Attach the flyers of created property values to their derived counterparts.
+
+        The counterparts are created in one batch after all records are
+        imported and take over the publication status and submission time of
+        their source. In review mode their submission is recorded like that
+        of the source.
+        """
+        for collection, year, flyer_urls in self._derived_followups:
+            derived = CollectionPropertyValue.objects.filter(
+                collection=collection,
+                year=year,
+                is_derived=True,
+            ).first()
+            if derived is None:
+                continue
+            self._attach_cpv_sources(derived, flyer_urls, stats)
+            if (
+                self.publication_status == "review"
+                and derived.publication_status == derived.STATUS_REVIEW
+                and not ReviewAction.for_object(derived)
+                .filter(action=ReviewAction.ACTION_SUBMITTED)
+                .exists()
+            ):
+                self._record_submission(derived)
+
     # ------------------------------------------------------------------
     # Lookup helpers
     # ------------------------------------------------------------------
@@ -1542,6 +1564,10 @@ class CollectionImporter:
     def _submit_for_review(self, obj) -> None:
         """Submit any UserCreatedObject for review and create the ReviewAction."""
         obj.submit_for_review()
+        self._record_submission(obj)
+
+    def _record_submission(self, obj) -> None:
+        """Create the ReviewAction of an object submitted for review."""
         ReviewAction.objects.create(
             content_type=ContentType.objects.get_for_model(obj.__class__),
             object_id=obj.pk,
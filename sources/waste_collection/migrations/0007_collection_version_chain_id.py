@@ -0,0 +1,55 @@
+# Generated by Django 6.0.5 on 2026-10-17 14:20
+
+from django.db import migrations, models
+
+
+def backfill_version_chains(apps, schema_editor):
+    Collection = apps.get_model("waste_collection", "Collection")
+    links = Collection.predecessors.through.objects.values_list(
+        "from_collection_id", "to_collection_id"
+    )
+
+    parents = {}
+
+    def find(pk):
+        parents.setdefault(pk, pk)
+        while parents[pk] != pk:
+            parents[pk] = parents[parents[pk]]
+            pk = parents[pk]
+        return pk
+
+    for left_id, right_id in links.iterator():
+        left_root, right_root = find(left_id), find(right_id)
+        if left_root != right_root:
+            parents[max(left_root, right_root)] = min(left_root, right_root)
+
+    chains = {}
+    for pk in list(parents):
+        chains.setdefault(find(pk), []).append(pk)
+    for chain_id, member_ids in chains.items():
+        Collection.objects.filter(pk__in=member_ids).update(version_chain_id=chain_id)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("waste_collection", "0006_rename_connection_type_to_participation_policy"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="collection",
+            name="version_chain_id",
+            field=models.PositiveBigIntegerField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                help_text=(
+                    "Smallest primary key of the collections linked to this one "
+                    "through predecessors or successors; empty for unlinked "
+                    "collections."
+                ),
+                null=True,
+            ),
+        ),
+        migrations.RunPython(backfill_version_chains, migrations.RunPython.noop),
+    ]
@@ -6,7 +6,17 @@ from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, RegexValidator
 from django.db import models, transaction
-from django.db.models import Case, Count, IntegerField, Q, Sum, Value, When
+from django.db.models import (
+    Case,
+    Count,
+    Exists,
+    IntegerField,
+    OuterRef,
+    Q,
+    Sum,
+    Value,
+    When,
+)
 from django.db.models.signals import m2m_changed, post_save, pre_save
 from django.dispatch import receiver
 from django.urls import reverse
@@ -427,6 +437,16 @@ class Collection(NamedUserCreatedObject):
         symmetrical=False,
         related_name="successors",
     )
+    version_chain_id = models.PositiveBigIntegerField(
+        blank=True,
+        null=True,
+        editable=False,
+        db_index=True,
+        help_text=(
+            "Smallest primary key of the collections linked to this one through "
+            "predecessors or successors; empty for unlinked collections."
+        ),
+    )
     bin_configuration = models.ForeignKey(
         BinConfiguration,
         on_delete=models.SET_NULL,
@@ -546,42 +566,44 @@ class Collection(NamedUserCreatedObject):
     def version_chain_ids(self):
         """Return the set of primary keys connected through predecessors/successors."""
 
-        visited = set()
-        stack = [self]
-
-        while stack:
-            current = stack.pop()
-            if not current.pk or current.pk in visited:
-                continue
-
-            visited.add(current.pk)
-
-            stack.extend(current.predecessors.all())
-            stack.extend(current.successors.all())
+        if not self.pk:
+            return set()
 
-        return visited
+        return set(self.all_versions().values_list("pk", flat=True))
 
     def all_versions(self):
         """Return a queryset with every version connected to this collection."""
 
         model = self.__class__
 
-        if not self.version_chain_ids:
+        if not self.pk:
             return model.objects.none()
 
-        return model.objects.filter(pk__in=self.version_chain_ids)
+        # The chain id is read from the database, as linking other versions
+        # updates it without touching this instance
+        chain_id = model.objects.filter(
+            pk=self.pk, version_chain_id__isnull=False
+        ).values("version_chain_id")
+        return model.objects.filter(Q(pk=self.pk) | Q(version_chain_id__in=chain_id))
 
     @cached_property
     def version_anchor(self):
         """Return the canonical version used as anchor for shared statistics."""
 
-        candidate_qs = self.all_versions().order_by("valid_from", "pk")
-
-        for candidate in candidate_qs:
-            if not candidate.predecessors.exists():
-                return candidate
-
-        return candidate_qs.first()
+        # Versions without predecessors first, falling back to the earliest
+        # version of chains that are cycles
+        return (
+            self.all_versions()
+            .annotate(
+                has_predecessors=Exists(
+                    self.predecessors.through.objects.filter(
+                        from_collection_id=OuterRef("pk")
+                    )
+                )
+            )
+            .order_by("has_predecessors", "valid_from", "pk")
+            .first()
+        )
 
     @staticmethod
     def _deduplicate_property_values(values):
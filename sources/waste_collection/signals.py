@@ -3,12 +3,31 @@ import logging
 from django.conf import settings
 from django.core.cache import caches
 from django.core.exceptions import ImproperlyConfigured
-from django.db.models.signals import post_delete, post_save, pre_save
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
 from django.dispatch import receiver
 
 from maps.signals import clear_geojson_cache_pattern
+from maps.versioning import (
+    bump_dataset_version,
+    dataset_version_key,
+    register_versioned_model,
+)
 
-from .models import Collection
+from .models import (
+    AggregatedCollectionPropertyValue,
+    Collection,
+    CollectionCountOptions,
+    CollectionFrequency,
+    CollectionPropertyValue,
+    Collector,
+)
+from .version_chains import link_version_chains, rebuild_version_chains
 
 logger = logging.getLogger(__name__)
 
@@ -97,6 +116,35 @@ def capture_previous_collection_publication_status(sender, instance, **kwargs):
     )
 
 
+register_versioned_model(Collection, Collector)
+# Inputs of the Waste Atlas indicators, which version the cached atlas responses
+register_versioned_model(
+    AggregatedCollectionPropertyValue,
+    CollectionCountOptions,
+    CollectionFrequency,
+    CollectionPropertyValue,
+)
+
+
+@receiver(post_save, sender=Collection)
+@receiver(post_delete, sender=Collection)
+def bump_published_collection_dataset_version(sender, instance, **kwargs):
+    """Bump the published-scope counter when the published dataset may change.
+
+    The counter of all Collections is bumped by ``maps.signals``; this one
+    keeps the public maps' version stable while private drafts are edited.
+    """
+    if _published_cache_might_change(
+        instance,
+        created=kwargs.get("created", False),
+        is_delete="created" not in kwargs,
+    ):
+        bump_dataset_version(
+            dataset_version_key(Collection, scope="published"),
+            using=kwargs.get("using"),
+        )
+
+
 @receiver(post_save, sender=Collection)
 @receiver(post_delete, sender=Collection)
 def invalidate_collection_geojson_cache(sender, instance, **kwargs):
@@ -147,6 +195,40 @@ def invalidate_collection_geojson_cache(sender, instance, **kwargs):
         )
 
 
+# ---------------------------------------------------------------------------
+# Version chains (see version_chains)
+# ---------------------------------------------------------------------------
+
+
+@receiver(m2m_changed, sender=Collection.predecessors.through)
+def update_version_chains(sender, instance, action, pk_set, **kwargs):
+    """Merge or regroup the version chains of collections whose links changed."""
+    if action == "post_add":
+        link_version_chains({instance.pk, *pk_set})
+    elif action == "post_remove":
+        rebuild_version_chains({instance.pk, *pk_set})
+    elif action == "post_clear":
+        # The former partners are still members of the chain of the instance
+        rebuild_version_chains({instance.pk})
+
+
+@receiver(pre_delete, sender=Collection)
+def capture_version_chain(sender, instance, **kwargs):
+    """Store the chain id, as the links of a deleted collection go without signals."""
+    instance._previous_version_chain_id = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list("version_chain_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_delete, sender=Collection)
+def split_version_chain_of_deleted_collection(sender, instance, **kwargs):
+    chain_id = getattr(instance, "_previous_version_chain_id", None)
+    if chain_id is not None:
+        rebuild_version_chains((), chain_ids=[chain_id])
+
+
 # ---------------------------------------------------------------------------
 # Derived CollectionPropertyValue (specific ↔ total waste collected)
 # ---------------------------------------------------------------------------
@@ -157,6 +239,7 @@ def sync_derived_cpv_on_save(sender, instance, **kwargs):
     try:
         from .derived_values import (
             create_or_update_derived_cpv,
+            defer_derived_value_sync,
             is_convertible_property,
         )
 
@@ -164,6 +247,8 @@ def sync_derived_cpv_on_save(sender, instance, **kwargs):
             return
         if not is_convertible_property(instance.property_id):
             return
+        if defer_derived_value_sync(instance):
+            return
 
         create_or_update_derived_cpv(instance)
     except ImproperlyConfigured as exc:
@@ -182,12 +267,18 @@ def sync_derived_cpv_on_save(sender, instance, **kwargs):
 def sync_derived_cpv_on_delete(sender, instance, **kwargs):
     """Delete derived counterparts when a source CPV is deleted."""
     try:
-        from .derived_values import delete_derived_cpv, is_convertible_property
+        from .derived_values import (
+            defer_derived_value_sync,
+            delete_derived_cpv,
+            is_convertible_property,
+        )
 
         if instance.is_derived:
             return
         if not is_convertible_property(instance.property_id):
             return
+        if defer_derived_value_sync(instance, deleted=True):
+            return
 
         delete_derived_cpv(instance)
     except ImproperlyConfigured as exc:
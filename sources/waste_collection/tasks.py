@@ -4,14 +4,13 @@ from types import SimpleNamespace
 from celery import chord
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import F
 from django.utils import timezone
 
 from bibliography.utils import check_url, find_wayback_snapshot_for_year
 from brit.celery import app
-from maps.db_functions import SimplifyPreserveTopology
+from maps.pyramid import pyramid_geometry, pyramid_level_for_tolerance
 from maps.signals import get_geojson_cache
-from maps.utils import build_collection_cache_key
+from maps.utils import build_collection_cache_key, encode_geojson_payload
 from sources.waste_collection.filters import WasteFlyerFilter
 from sources.waste_collection.geojson import (
     GEOMETRY_SIMPLIFY_TOLERANCE,
@@ -35,9 +34,9 @@ def warm_collection_geojson_cache(self):
             "collection_system",
         )
         .annotate(
-            simplified_geom=SimplifyPreserveTopology(
-                F("catchment__region__borders__geom"),
-                GEOMETRY_SIMPLIFY_TOLERANCE,
+            simplified_geom=pyramid_geometry(
+                "catchment__region__borders",
+                pyramid_level_for_tolerance(GEOMETRY_SIMPLIFY_TOLERANCE),
             )
         )
     )
@@ -50,7 +49,7 @@ def warm_collection_geojson_cache(self):
         cache_key = build_collection_cache_key(scope="published")
         cache = get_geojson_cache()
         timeout = getattr(settings, "GEOJSON_CACHE_TIMEOUT", 86400)
-        cache.set(cache_key, data, timeout=timeout)
+        cache.set(cache_key, encode_geojson_payload(data), timeout=timeout)
 
         feature_count = (
             len(data.get("features", [])) if isinstance(data, dict) else len(data)
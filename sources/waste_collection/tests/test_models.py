@@ -27,6 +27,7 @@ from ..models import (
     WasteFlyer,
 )
 from ..utils import ensure_initial_data
+from ..version_chains import collection_version_chains
 from .test_views import (  # noqa: F401
     BinConfigurationModelTestCase,
     CollectionBinConfigurationFieldTestCase,
@@ -558,6 +559,80 @@ class CollectionVersioningHelpersTestCase(TestCase):
         self.assertIn(anchor.pk, {a.pk, b.pk})
         self.assertEqual(anchor.valid_from, min(a.valid_from, b.valid_from))
 
+    def test_linking_merges_version_chains(self):
+        a, b, c, d = (self._mk(year) for year in (2020, 2021, 2022, 2023))
+        b.add_predecessor(a)
+        d.predecessors.add(c)
+        c.successors.add(a)  # c is now a predecessor of a as well
+
+        chain_ids = set(
+            Collection.objects.filter(pk__in=[a.pk, b.pk, c.pk, d.pk]).values_list(
+                "version_chain_id", flat=True
+            )
+        )
+        self.assertSetEqual(chain_ids, {a.pk})
+        with self.assertNumQueries(1):
+            self.assertSetEqual(
+                set(d.all_versions().values_list("pk", flat=True)),
+                {a.pk, b.pk, c.pk, d.pk},
+            )
+
+    def test_unlinking_splits_version_chains(self):
+        a, b, c = (self._mk(year) for year in (2020, 2021, 2022))
+        b.predecessors.add(a)
+        c.predecessors.add(b)
+
+        c.predecessors.remove(b)
+
+        self.assertSetEqual(
+            set(b.all_versions().values_list("pk", flat=True)), {a.pk, b.pk}
+        )
+        c.refresh_from_db()
+        self.assertIsNone(c.version_chain_id)
+        self.assertSetEqual(set(c.all_versions().values_list("pk", flat=True)), {c.pk})
+
+        a.successors.clear()
+
+        self.assertFalse(
+            Collection.objects.filter(
+                pk__in=[a.pk, b.pk], version_chain_id__isnull=False
+            ).exists()
+        )
+
+    def test_deleting_a_version_splits_its_chain(self):
+        a, b, c = (self._mk(year) for year in (2020, 2021, 2022))
+        b.predecessors.add(a)
+        c.predecessors.add(b)
+
+        a.delete()
+
+        self.assertSetEqual(
+            set(
+                Collection.objects.filter(pk__in=[b.pk, c.pk]).values_list(
+                    "version_chain_id", flat=True
+                )
+            ),
+            {b.pk},
+        )
+
+        b.delete()
+
+        c.refresh_from_db()
+        self.assertIsNone(c.version_chain_id)
+
+    def test_collection_version_chains_reads_chains_in_one_query(self):
+        a, b, c, d = (self._mk(year) for year in (2020, 2021, 2022, 2023))
+        b.predecessors.add(a)
+        c.predecessors.add(b)
+
+        with self.assertNumQueries(1):
+            chains = collection_version_chains([a.pk, c.pk, d.pk])
+
+        self.assertEqual(
+            chains,
+            {a.pk: {a.pk, b.pk, c.pk}, c.pk: {a.pk, b.pk, c.pk}, d.pk: {d.pk}},
+        )
+
 
 class CollectionStatisticsAccessorsTestCase(TestCase):
     @classmethod
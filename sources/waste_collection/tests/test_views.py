@@ -15,12 +15,14 @@ from django.contrib.auth.models import Group, Permission, User
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.gis.geos import MultiPolygon, Polygon
 from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db import connection
 from django.db.models import signals
 from django.db.models.signals import post_save
 from django.forms.formsets import BaseFormSet
 from django.http import JsonResponse
 from django.http.request import MultiValueDict, QueryDict
 from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from factory.django import mute_signals
@@ -45,6 +47,7 @@ from materials.models import (
     Sample,
     SampleSeries,
 )
+from sources.waste_collection import derived_values
 from sources.waste_collection.derived_values import (
     backfill_derived_values,
     clear_derived_value_config_cache,
@@ -52,6 +55,7 @@ from sources.waste_collection.derived_values import (
     convert_specific_to_total_mg,
     convert_total_to_specific,
     create_or_update_derived_cpv,
+    deferred_derived_values,
     delete_derived_cpv,
     get_derived_property_config,
     get_population_for_collection,
@@ -6763,6 +6767,127 @@ class DerivedValuesTestCase(TestCase):
         )
         self.assertEqual(derived_specific.average, 25.0)
 
+    def test_backfill_keeps_counterparts_derived_while_it_runs(self):
+        collection, _ = self._create_collection("bf-race", population=1000)
+        self._bulk_create_cpv(
+            name="bf-race-source",
+            collection=collection,
+            property=self.property_specific,
+            unit=self.unit_specific,
+            year=2024,
+            average=10.0,
+            publication_status="published",
+            is_derived=False,
+        )
+        plan = derived_values.plan_derived_values
+
+        def plan_while_a_counterpart_is_derived(*args, **kwargs):
+            batch = plan(*args, **kwargs)
+            self._bulk_create_cpv(
+                name="bf-race-concurrent",
+                collection=collection,
+                property=self.property_total,
+                unit=self.unit_total,
+                year=2024,
+                average=10.0,
+                publication_status="published",
+                is_derived=True,
+            )
+            return batch
+
+        with patch(
+            "sources.waste_collection.derived_values.plan_derived_values",
+            side_effect=plan_while_a_counterpart_is_derived,
+        ):
+            backfill_derived_values(dry_run=False)
+
+        self.assertEqual(
+            CollectionPropertyValue.objects.filter(
+                collection=collection, is_derived=True
+            ).count(),
+            1,
+        )
+
+    def test_backfill_query_count_does_not_grow_with_source_records(self):
+        def backfill_queries(suffix, count):
+            for index in range(count):
+                collection, _ = self._create_collection(
+                    f"bf-bulk-{suffix}-{index}", population=1000
+                )
+                self._bulk_create_cpv(
+                    name=f"bf-bulk-{suffix}-{index}",
+                    collection=collection,
+                    property=self.property_specific,
+                    unit=self.unit_specific,
+                    year=2024,
+                    average=10.0,
+                    publication_status="published",
+                    is_derived=False,
+                )
+            with CaptureQueriesContext(connection) as queries:
+                stats = backfill_derived_values(dry_run=False)
+            self.assertEqual(stats, {"created": count, "updated": 0, "skipped": 0})
+            CollectionPropertyValue.objects.all().delete()
+            return len(queries)
+
+        # Resolve the cached configuration before counting
+        backfill_derived_values(dry_run=True)
+
+        self.assertEqual(backfill_queries("one", 1), backfill_queries("many", 5))
+
+    def test_deferred_derived_values_are_maintained_when_the_block_exits(self):
+        collection, _ = self._create_collection("deferred", population=1000)
+        stale_collection, _ = self._create_collection("deferred-del", population=1000)
+        stale_source = CollectionPropertyValue.objects.create(
+            name="deferred-stale",
+            collection=stale_collection,
+            property=self.property_specific,
+            unit=self.unit_specific,
+            year=2024,
+            average=10.0,
+            publication_status="published",
+        )
+        derived = CollectionPropertyValue.objects.filter(is_derived=True)
+        self.assertTrue(derived.filter(collection=stale_collection).exists())
+
+        with deferred_derived_values():
+            CollectionPropertyValue.objects.create(
+                name="deferred-source",
+                collection=collection,
+                property=self.property_specific,
+                unit=self.unit_specific,
+                year=2024,
+                average=10.0,
+                publication_status="published",
+            )
+            stale_source.delete()
+            self.assertFalse(derived.filter(collection=collection).exists())
+            self.assertTrue(derived.filter(collection=stale_collection).exists())
+
+        self.assertEqual(derived.get(collection=collection).average, 10)
+        self.assertFalse(derived.filter(collection=stale_collection).exists())
+
+    def test_deferred_derived_values_are_discarded_on_error(self):
+        collection, _ = self._create_collection("deferred-error", population=1000)
+
+        with self.assertRaises(RuntimeError), deferred_derived_values():
+            CollectionPropertyValue.objects.create(
+                name="deferred-error",
+                collection=collection,
+                property=self.property_specific,
+                unit=self.unit_specific,
+                year=2024,
+                average=10.0,
+                publication_status="published",
+            )
+            raise RuntimeError
+
+        self.assertFalse(
+            CollectionPropertyValue.objects.filter(
+                collection=collection, is_derived=True
+            ).exists()
+        )
+
     def test_get_population_for_collection_returns_exact_year(self):
         collection, _ = self._create_collection("pop-year", population=None)
         region = collection.catchment.region
@@ -1,7 +1,7 @@
 import json
 import math
 from collections import Counter
-from datetime import date
+from datetime import date, timedelta
 from unittest.mock import patch
 from uuid import uuid4
 
@@ -14,6 +14,7 @@ from django.db import connection
 from django.test import SimpleTestCase, override_settings
 from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.test import APIRequestFactory, APITestCase
@@ -51,6 +52,10 @@ from sources.waste_collection.models import (
 )
 from sources.waste_collection.viewsets import CollectionViewSet
 from sources.waste_collection.waste_atlas import viewsets as atlas_viewsets
+from sources.waste_collection.waste_atlas.models import (
+    AtlasChangeOverlay,
+    AtlasIndicatorFact,
+)
 from utils.object_management.models import ReviewAction, UserCreatedObject
 from utils.properties.models import Property, Unit
 
@@ -2806,6 +2811,9 @@ class WasteAtlasPrimarySelectionTests(APITestCase):
             publication_status="published",
         )
 
+    def setUp(self):
+        caches[getattr(settings, "GEOJSON_CACHE", "default")].clear()
+
     def test_primary_selection_is_consistent_across_map_endpoints(self):
         endpoints = {
             "collection_system": "/waste_collection/api/waste-atlas/collection-system/",
@@ -2865,7 +2873,14 @@ class WasteAtlasPrimarySelectionTests(APITestCase):
         )
 
     def test_primary_selection_query_count_is_bounded(self):
-        with self.assertNumQueries(3):
+        # The first read builds the indicator facts of the scope
+        self.client.get(
+            "/waste_collection/api/waste-atlas/paper-bags/",
+            {"country": "DE", "year": 2024},
+        )
+        caches[getattr(settings, "GEOJSON_CACHE", "default")].clear()
+        # The data version, then the scope marker, stale and current facts
+        with self.assertNumQueries(4):
             response = self.client.get(
                 "/waste_collection/api/waste-atlas/paper-bags/",
                 {"country": "DE", "year": 2024},
@@ -2874,6 +2889,271 @@ class WasteAtlasPrimarySelectionTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 7)
 
+    def test_indicator_facts_are_refreshed_when_collections_change(self):
+        endpoint = "/waste_collection/api/waste-atlas/paper-bags/"
+        params = {"country": "DE", "year": 2024}
+        self.client.get(endpoint, params)
+        self.assertEqual(
+            AtlasIndicatorFact.objects.filter(
+                year=2024, category="biowaste", visibility="public"
+            ).count(),
+            7,
+        )
+
+        collection = Collection.objects.get(name="Primary Selection D2D 0")
+        collection.allowed_materials.remove(self.paper_bags)
+        collection.forbidden_materials.add(self.paper_bags)
+        self.assertTrue(
+            AtlasIndicatorFact.objects.filter(
+                catchment=collection.catchment, is_stale=True
+            ).exists()
+        )
+
+        status_by_catchment = {
+            row["catchment_id"]: row["status"]
+            for row in self.client.get(endpoint, params).data
+        }
+        self.assertEqual(status_by_catchment[collection.catchment_id], "forbidden")
+        self.assertEqual(list(status_by_catchment.values()).count("allowed"), 5)
+        self.assertFalse(AtlasIndicatorFact.objects.filter(is_stale=True).exists())
+
+    def test_indicator_facts_are_refreshed_when_catchments_are_edited(self):
+        self.client.get(
+            "/waste_collection/api/waste-atlas/paper-bags/",
+            {"country": "DE", "year": 2024},
+        )
+        catchment_id = Collection.objects.get(
+            name="Primary Selection D2D 0"
+        ).catchment_id
+
+        catchment = Catchment.objects.get(pk=catchment_id)
+        catchment.region = Region.objects.create(
+            name="Primary Selection Other Region", country="DE"
+        )
+        catchment.save()
+
+        self.assertTrue(
+            AtlasIndicatorFact.objects.filter(
+                catchment_id=catchment_id, is_stale=True
+            ).exists()
+        )
+        self.assertFalse(
+            AtlasIndicatorFact.objects.exclude(catchment_id=catchment_id)
+            .filter(is_stale=True)
+            .exists()
+        )
+
+    def test_indicator_facts_marked_stale_during_a_rebuild_stay_stale(self):
+        endpoint = "/waste_collection/api/waste-atlas/paper-bags/"
+        params = {"country": "DE", "year": 2024}
+        self.client.get(endpoint, params)
+        collection = Collection.objects.get(name="Primary Selection D2D 0")
+        collection.save()
+        compute = atlas_viewsets._compute_atlas_facts
+
+        def compute_while_collection_is_edited(*args, **kwargs):
+            facts = compute(*args, **kwargs)
+            collection.save()
+            return facts
+
+        with patch(
+            "sources.waste_collection.waste_atlas.viewsets._compute_atlas_facts",
+            side_effect=compute_while_collection_is_edited,
+        ):
+            self.client.get(endpoint, params)
+
+        self.assertTrue(
+            AtlasIndicatorFact.objects.filter(
+                catchment_id=collection.catchment_id, year=2024, is_stale=True
+            ).exists()
+        )
+        self.client.get(endpoint, params)
+        self.assertFalse(AtlasIndicatorFact.objects.filter(is_stale=True).exists())
+
+    def test_stale_indicator_facts_are_served_while_a_refresh_is_running(self):
+        endpoint = "/waste_collection/api/waste-atlas/paper-bags/"
+        params = {"country": "DE", "year": 2024}
+        self.client.get(endpoint, params)
+        Collection.objects.get(name="Primary Selection D2D 0").save()
+        geojson_cache = caches[getattr(settings, "GEOJSON_CACHE", "default")]
+        lock_key = "lock:atlas_facts:DE:2024:public"
+        geojson_cache.add(lock_key, "refresh")
+        self.addCleanup(geojson_cache.delete, lock_key)
+
+        with patch(
+            "sources.waste_collection.waste_atlas.viewsets.build_atlas_facts"
+        ) as build:
+            response = self.client.get(endpoint, params)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 7)
+        build.assert_not_called()
+        self.assertTrue(AtlasIndicatorFact.objects.filter(is_stale=True).exists())
+
+    def test_responses_of_stale_indicator_facts_are_not_cached(self):
+        endpoint = "/waste_collection/api/waste-atlas/paper-bags/"
+        params = {"country": "DE", "year": 2024}
+        self.client.get(endpoint, params)
+        Collection.objects.get(name="Primary Selection D2D 0").save()
+        geojson_cache = caches[getattr(settings, "GEOJSON_CACHE", "default")]
+        lock_key = "lock:atlas_facts:DE:2024:public"
+        geojson_cache.add(lock_key, "refresh")
+        stale = self.client.get(endpoint, params)
+        geojson_cache.delete(lock_key)
+
+        refreshed = self.client.get(endpoint, params)
+
+        self.assertNotIn("ETag", stale)
+        self.assertEqual(refreshed.status_code, status.HTTP_200_OK)
+        self.assertIn("ETag", refreshed)
+        self.assertFalse(AtlasIndicatorFact.objects.filter(is_stale=True).exists())
+
+    def test_indicator_facts_pick_up_new_catchments(self):
+        endpoint = "/waste_collection/api/waste-atlas/collection-system/"
+        params = {"country": "DE", "year": 2024}
+        self.assertEqual(len(self.client.get(endpoint, params).data), 7)
+
+        catchment = CollectionCatchment.objects.create(
+            name="Primary Selection Late Catchment", region=self.region
+        )
+        Collection.objects.create(
+            name="Primary Selection Late Collection",
+            catchment=catchment,
+            waste_category=self.bio_category,
+            collection_system=self.bring_point,
+            valid_from=date(2024, 1, 1),
+            publication_status="published",
+        )
+
+        system_by_catchment = {
+            row["catchment_id"]: row["collection_system"]
+            for row in self.client.get(endpoint, params).data
+        }
+        self.assertEqual(len(system_by_catchment), 8)
+        self.assertEqual(system_by_catchment[catchment.id], "Bring point")
+
+    def test_map_set_bundle_holds_the_data_of_the_theme_endpoints(self):
+        response = self.client.get(
+            "/waste_collection/api/waste-atlas/map-set-bundle/",
+            {
+                "map_set": "DE",
+                "year": 2024,
+                "themes": "paper_bags,collection_system,not_a_theme",
+            },
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        bundle = response.json()
+        self.assertEqual(set(bundle["indicators"]), {"paper_bags", "collection_system"})
+        for theme, endpoint in (
+            ("paper_bags", "/waste_collection/api/waste-atlas/paper-bags/"),
+            (
+                "collection_system",
+                "/waste_collection/api/waste-atlas/collection-system/",
+            ),
+        ):
+            with self.subTest(theme=theme):
+                self.assertEqual(
+                    bundle["indicators"][theme],
+                    self.client.get(endpoint, {"country": "DE", "year": 2024}).json(),
+                )
+        self.assertEqual(
+            bundle["catchment_ids"],
+            sorted(
+                CollectionCatchment.objects.filter(
+                    name__startswith="Primary Selection"
+                ).values_list("pk", flat=True)
+            ),
+        )
+
+    def test_map_set_bundle_is_cached_until_atlas_data_changes(self):
+        params = {"map_set": "DE", "year": 2024, "themes": "paper_bags"}
+        with patch(
+            "sources.waste_collection.waste_atlas.viewsets._build_map_set_bundle",
+            wraps=atlas_viewsets._build_map_set_bundle,
+        ) as build:
+            first = self.client.get(
+                "/waste_collection/api/waste-atlas/map-set-bundle/", params
+            )
+            self.client.get("/waste_collection/api/waste-atlas/map-set-bundle/", params)
+            self.assertEqual(build.call_count, 1)
+
+            collection = Collection.objects.get(name="Primary Selection D2D 0")
+            collection.allowed_materials.remove(self.paper_bags)
+            changed = self.client.get(
+                "/waste_collection/api/waste-atlas/map-set-bundle/", params
+            )
+
+        self.assertEqual(build.call_count, 2)
+        self.assertNotEqual(first["ETag"], changed["ETag"])
+        status_by_catchment = {
+            row["catchment_id"]: row["status"]
+            for row in changed.json()["indicators"]["paper_bags"]
+        }
+        self.assertEqual(status_by_catchment[collection.catchment_id], "no_data")
+
+    def test_identical_atlas_requests_are_served_from_the_cache(self):
+        endpoint = "/waste_collection/api/waste-atlas/paper-bags/"
+        with patch(
+            "sources.waste_collection.waste_atlas.viewsets._get_material_status",
+            wraps=atlas_viewsets._get_material_status,
+        ) as compute:
+            first = self.client.get(endpoint, {"country": "DE", "year": "2024"})
+            second = self.client.get(endpoint, {"year": 2024, "country": "DE"})
+            self.assertEqual(compute.call_count, 1)
+            self.assertEqual(first.json(), second.json())
+            self.assertEqual(first["ETag"], second["ETag"])
+
+            revalidated = self.client.get(
+                endpoint,
+                {"country": "DE", "year": 2024},
+                HTTP_IF_NONE_MATCH=first["ETag"],
+            )
+            self.assertEqual(revalidated.status_code, status.HTTP_304_NOT_MODIFIED)
+
+            CollectionPropertyValue.objects.create(
+                collection=Collection.objects.get(name="Primary Selection D2D 0"),
+                property=self.prop,
+                unit=self.unit,
+                year=2024,
+                average=90,
+            )
+            changed = self.client.get(endpoint, {"country": "DE", "year": 2024})
+
+        self.assertEqual(compute.call_count, 2)
+        self.assertNotEqual(first["ETag"], changed["ETag"])
+
+    def test_collector_changes_replace_cached_atlas_responses(self):
+        endpoint = "/waste_collection/api/waste-atlas/collector-orga-level/"
+        params = {"country": "DE", "year": 2024}
+        first = self.client.get(endpoint, params)
+
+        Collector.objects.create(name="Primary Selection Late Collector")
+        changed = self.client.get(endpoint, params, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(first["ETag"], changed["ETag"])
+
+    def test_atlas_requests_with_unknown_params_are_not_cached(self):
+        endpoint = "/waste_collection/api/waste-atlas/paper-bags/"
+        params = {"country": "DE", "year": 2024, "cache_buster": "1"}
+        with patch(
+            "sources.waste_collection.waste_atlas.viewsets._get_material_status",
+            wraps=atlas_viewsets._get_material_status,
+        ) as compute:
+            self.client.get(endpoint, params)
+            response = self.client.get(endpoint, params)
+
+        self.assertEqual(compute.call_count, 2)
+        self.assertFalse(response.has_header("ETag"))
+
+    def test_map_set_bundle_rejects_unknown_map_sets(self):
+        response = self.client.get(
+            "/waste_collection/api/waste-atlas/map-set-bundle/", {"map_set": "XX"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class TargetWasteCategoryViewSetTests(APITestCase):
     endpoint = "/waste_collection/api/waste-atlas/target-waste-category/"
@@ -5510,6 +5790,121 @@ class WasteAtlasTemporalCatchmentGeometryTests(APITestCase):
                 self.assertIn(GeoJSONAnonThrottle, throttles)
                 self.assertIn(ScopedRateThrottle, throttles)
 
+    def _clear_overlay_locks(self):
+        self.addCleanup(caches[getattr(settings, "GEOJSON_CACHE", "default")].clear)
+
+    def test_missing_overlays_are_computed_by_a_worker(self):
+        self._clear_overlay_locks()
+        with (
+            patch(
+                "sources.waste_collection.waste_atlas.tasks."
+                "compute_waste_atlas_change_overlay.delay"
+            ) as delay,
+            patch(
+                "sources.waste_collection.waste_atlas.viewsets._build_change_geometry"
+            ) as build,
+        ):
+            response = self.client.get(
+                "/waste_collection/api/waste-atlas/catchment/"
+                "collection-change-geojson/",
+                {"country": "DE", "from_year": 2022, "to_year": 2024},
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["features"], [])
+        self.assertIn("Retry-After", response)
+        delay.assert_called_once()
+        build.assert_not_called()
+
+    def test_precomputed_overlays_are_served_without_computing(self):
+        self.assertGreater(atlas_viewsets.precompute_change_overlays(), 0)
+
+        with patch(
+            "sources.waste_collection.waste_atlas.viewsets._build_change_geometry"
+        ) as build:
+            response = self.client.get(
+                "/waste_collection/api/waste-atlas/catchment/"
+                "collection-change-geojson/",
+                {"country": "DE", "from_year": 2023, "to_year": 2024},
+            )
+
+        build.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["features"])
+        self.assertIn("ETag", response)
+        self.assertEqual(atlas_viewsets.precompute_change_overlays(), 0)
+
+    def test_outdated_overlay_is_served_while_its_successor_is_computed(self):
+        self._clear_overlay_locks()
+        current = self._change_features()
+        CatchmentRevision.objects.create(
+            catchment=self.catchment,
+            name="Later atlas boundary",
+            effective_from=date(2025, 1, 1),
+            geom=self._polygon(3),
+            publication_status="published",
+        )
+
+        with patch(
+            "sources.waste_collection.waste_atlas.tasks."
+            "compute_waste_atlas_change_overlay.delay"
+        ) as delay:
+            response = self.client.get(
+                "/waste_collection/api/waste-atlas/catchment/"
+                "collection-change-geojson/",
+                {"country": "DE", "from_year": 2022, "to_year": 2024},
+            )
+
+        delay.assert_called_once()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["features"], current)
+        self.assertNotIn("ETag", response)
+
+    def test_approving_a_revision_schedules_the_overlay_precomputation(self):
+        self._clear_overlay_locks()
+        caches[getattr(settings, "GEOJSON_CACHE", "default")].clear()
+        revision = CatchmentRevision.objects.create(
+            catchment=self.catchment,
+            name="Reviewed atlas boundary",
+            effective_from=date(2025, 1, 1),
+            geom=self._polygon(3),
+            publication_status="review",
+        )
+
+        with (
+            patch(
+                "sources.waste_collection.waste_atlas.tasks."
+                "precompute_waste_atlas_change_overlays.apply_async"
+            ) as apply_async,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            revision.approve()
+
+        apply_async.assert_called_once()
+
+    def test_overlays_not_read_within_the_retention_period_are_pruned(self):
+        atlas_viewsets.precompute_change_overlays()
+        unread = AtlasChangeOverlay.objects.first()
+        AtlasChangeOverlay.objects.filter(pk=unread.pk).update(
+            last_read_at=timezone.now()
+            - timedelta(days=atlas_viewsets.CHANGE_OVERLAY_RETENTION_DAYS + 1)
+        )
+
+        self.assertEqual(atlas_viewsets.prune_change_overlays(), 1)
+        self.assertFalse(AtlasChangeOverlay.objects.filter(pk=unread.pk).exists())
+        self.assertTrue(AtlasChangeOverlay.objects.exists())
+
+    def test_least_recently_read_overlays_are_evicted_beyond_the_cap(self):
+        with patch.object(atlas_viewsets, "CHANGE_OVERLAY_MAX_STORED", 1):
+            atlas_viewsets.build_change_overlay(
+                {self.catchment.pk}, 2022, {self.catchment.pk}, 2023, "public"
+            )
+            latest = atlas_viewsets.build_change_overlay(
+                {self.catchment.pk}, 2023, {self.catchment.pk}, 2024, "public"
+            )
+
+        self.assertEqual(list(AtlasChangeOverlay.objects.all()), [latest])
+
 
 class WasteAtlasChangeOverlayPrecisionTests(APITestCase):
     """Change overlays compare boundaries at source precision."""
@@ -0,0 +1,105 @@
+"""Maintain the version chains of collections.
+
+Collections linked through ``Collection.predecessors``, in either direction,
+form a version chain. Every collection of a chain with more than one member
+stores the chain id, the smallest primary key among the members, in the
+indexed ``Collection.version_chain_id``; collections without any links keep
+it empty. All versions of a collection, and the latest of them, are thus read
+with a single indexed query instead of walking the links at read time.
+
+Linking collections merges their chains with one UPDATE. Unlinking or
+deleting collections may split a chain, so the members of the affected chains
+are regrouped from their remaining links. The m2m_changed and post_delete
+receivers in ``signals`` keep the chains current.
+"""
+
+from django.db.models import Q
+
+from .models import Collection
+
+
+def _chain_members(collection_ids):
+    """Primary keys of the collections and of every member of their chains."""
+    chain_ids = Collection.objects.filter(
+        pk__in=collection_ids, version_chain_id__isnull=False
+    ).values("version_chain_id")
+    return set(
+        Collection.objects.filter(
+            Q(pk__in=collection_ids) | Q(version_chain_id__in=chain_ids)
+        ).values_list("pk", flat=True)
+    )
+
+
+def link_version_chains(collection_ids):
+    """Merge the chains of newly linked collections into one."""
+    member_ids = _chain_members({pk for pk in collection_ids if pk is not None})
+    if len(member_ids) < 2:
+        return
+    Collection.objects.filter(pk__in=member_ids).exclude(
+        version_chain_id=min(member_ids)
+    ).update(version_chain_id=min(member_ids))
+
+
+def rebuild_version_chains(collection_ids, chain_ids=()):
+    """Regroup the chains of the collections, and the given chains, by their links."""
+    collection_ids = {pk for pk in collection_ids if pk is not None}
+    member_ids = _chain_members(collection_ids) | set(
+        Collection.objects.filter(version_chain_id__in=list(chain_ids)).values_list(
+            "pk", flat=True
+        )
+    )
+    if not member_ids:
+        return
+
+    # Union-find over the links; links never leave a chain
+    parents = {pk: pk for pk in member_ids}
+
+    def find(pk):
+        while parents[pk] != pk:
+            parents[pk] = parents[parents[pk]]
+            pk = parents[pk]
+        return pk
+
+    links = Collection.predecessors.through.objects.filter(
+        from_collection_id__in=member_ids
+    ).values_list("from_collection_id", "to_collection_id")
+    for left_id, right_id in links:
+        parents.setdefault(right_id, right_id)
+        left_root, right_root = find(left_id), find(right_id)
+        if left_root != right_root:
+            parents[max(left_root, right_root)] = min(left_root, right_root)
+
+    chains = {}
+    for pk in parents:
+        chains.setdefault(find(pk), set()).add(pk)
+    for chain_id, chain_member_ids in chains.items():
+        Collection.objects.filter(pk__in=chain_member_ids).update(
+            version_chain_id=chain_id if len(chain_member_ids) > 1 else None
+        )
+
+
+def collection_version_chains(collection_ids):
+    """Map each collection to the primary keys of its whole version chain."""
+    selected_ids = {pk for pk in collection_ids if pk}
+    chains = {pk: {pk} for pk in selected_ids}
+    if not selected_ids:
+        return chains
+
+    chain_ids = Collection.objects.filter(
+        pk__in=selected_ids, version_chain_id__isnull=False
+    ).values("version_chain_id")
+    rows = Collection.objects.filter(
+        Q(pk__in=selected_ids) | Q(version_chain_id__in=chain_ids)
+    ).values_list("pk", "version_chain_id")
+
+    members = {}
+    selected_chain_ids = {}
+    for pk, chain_id in rows:
+        if chain_id is None:
+            continue
+        members.setdefault(chain_id, set()).add(pk)
+        if pk in selected_ids:
+            selected_chain_ids[pk] = chain_id
+    for pk, chain_id in selected_chain_ids.items():
+        chains[pk] = members[chain_id]
+    return chains
@@ -1,10 +1,11 @@
 import logging
+import re
 import time
 
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import connection, transaction
-from django.db.models import Exists, F, OuterRef, Prefetch, Q
+from django.db.models import Exists, OuterRef, Prefetch, Q
 from django.urls import reverse
 from django_filters import rest_framework as rf_filters
 from rest_framework import permissions, status, viewsets
@@ -18,9 +19,15 @@ from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
 
-from maps.db_functions import SimplifyPreserveTopology
-from maps.mixins import CachedGeoJSONMixin
-from maps.utils import build_collection_cache_key
+from maps.mixins import CachedGeoJSONMixin, MVTRenderer
+from maps.models import Catchment, GeoPolygon, Region
+from maps.pyramid import pyramid_geometry, pyramid_level_for_tolerance
+from maps.throttling import MVTAnonThrottle
+from maps.utils import (
+    build_collection_cache_key,
+    compute_collection_dataset_state,
+    get_stale_cache_key,
+)
 from sources.waste_collection.filters import CollectionFilterSet
 from sources.waste_collection.importers import CollectionImporter
 from sources.waste_collection.models import (
@@ -103,6 +110,15 @@ class CollectionViewSet(CachedGeoJSONMixin, UserCreatedObjectViewSet):
     queryset = Collection.objects.all()
     serializer_class = CollectionFlatSerializer
     geojson_serializer_class = WasteCollectionGeometrySerializer
+    pyramid_geopolygon_field = "catchment__region__borders"
+    mvt_geometry_field = "catchment__region__borders__geom"
+    mvt_throttle_classes = (MVTAnonThrottle,)
+    mvt_properties = {
+        "id": "pk",
+        "catchment": "catchment__name",
+        "waste_category": "waste_category__name",
+        "collection_system": "collection_system__name",
+    }
     filter_backends = (CollectionDjangoFilterBackend,)
     filterset_class = CollectionFilterSet
     pagination_class = CollectionListPagination
@@ -150,9 +166,10 @@ class CollectionViewSet(CachedGeoJSONMixin, UserCreatedObjectViewSet):
     def get_geojson_queryset(self):
         """Return optimized queryset for GeoJSON with simplified geometry.
 
-        Uses PostGIS ST_SimplifyPreserveTopology to reduce geometry complexity
-        while maintaining valid topology. This significantly reduces response
-        size and serialization time.
+        Reads the precomputed pyramid level matching GEOMETRY_SIMPLIFY_TOLERANCE
+        and only simplifies on the fly (ST_SimplifyPreserveTopology) for
+        geometries whose pyramid has not been built yet. A `zoom` or
+        `tolerance` query param replaces this default level.
         """
         qs = self.get_queryset().select_related(
             "catchment",
@@ -163,9 +180,9 @@ class CollectionViewSet(CachedGeoJSONMixin, UserCreatedObjectViewSet):
         )
         # Add simplified geometry annotation
         qs = qs.annotate(
-            simplified_geom=SimplifyPreserveTopology(
-                F("catchment__region__borders__geom"),
-                GEOMETRY_SIMPLIFY_TOLERANCE,
+            simplified_geom=pyramid_geometry(
+                self.pyramid_geopolygon_field,
+                pyramid_level_for_tolerance(GEOMETRY_SIMPLIFY_TOLERANCE),
             )
         )
         return qs
@@ -228,7 +245,7 @@ class CollectionViewSet(CachedGeoJSONMixin, UserCreatedObjectViewSet):
         API endpoints do not render filter widgets, so they can skip
         expensive min/max slider calculations performed during filterset init.
         """
-        if getattr(self, "action", None) in {"geojson", "list", "version"}:
+        if getattr(self, "action", None) in {"geojson", "list", "tiles", "version"}:
             return {"skip_min_max": True}
         return {}
 
@@ -293,6 +310,22 @@ class CollectionViewSet(CachedGeoJSONMixin, UserCreatedObjectViewSet):
             )
         return response
 
+    def get_dataset_state(self, request):
+        """Version the dataset by the change counters of the requested scope."""
+        scope = (request.query_params.get("scope") or "published").lower()
+        return compute_collection_dataset_state(scope, getattr(request, "user", None))
+
+    def get_geojson_stale_cache_key(self, request, cache_key):
+        """Share the previous GeoJSON across versions, for public data only.
+
+        Private and review keys are only user-specific through their dataset
+        version, so dropping it would mix the objects of different users.
+        """
+        scope = (request.query_params.get("scope") or "published").lower()
+        if scope != "published":
+            return None
+        return get_stale_cache_key(re.sub(r":dv:[^:]+", "", cache_key))
+
     def get_cache_key(self, request):
         """Build a deterministic cache key including filters and dataset version.
 
@@ -1417,6 +1450,18 @@ class CollectionViewSet(CachedGeoJSONMixin, UserCreatedObjectViewSet):
         self._enforce_authenticated_non_public_scope(request)
         return super().geojson(request, *args, **kwargs)
 
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path=r"tiles/(?P<z>\d+)/(?P<x>\d+)/(?P<y>\d+)\.mvt",
+        permission_classes=[permissions.AllowAny],
+        renderer_classes=[MVTRenderer],
+    )
+    def tiles(self, request, *args, **kwargs):
+        """Vector tile endpoint with the same scope rules as the GeoJSON one."""
+        self._enforce_authenticated_non_public_scope(request)
+        return super().tiles(request, *args, **kwargs)
+
 
 class CollectorViewSet(CachedGeoJSONMixin, viewsets.ReadOnlyModelViewSet):
     """
@@ -1430,6 +1475,12 @@ class CollectorViewSet(CachedGeoJSONMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = CollectorGeometrySerializer
     permission_classes = [permissions.AllowAny]
     filterset_fields = ["id", "catchment__region__country"]
+    dataset_version_models = (Collector, Catchment, Region, GeoPolygon)
+    geojson_cache_tag_fields = {
+        "pk": Collector,
+        "catchment_id": Catchment,
+        "catchment__region_id": Region,
+    }
 
     def get_queryset(self):
         """
@@ -1,3 +1,5 @@
+import importlib
+
 from django.apps import AppConfig
 
 
@@ -8,3 +10,6 @@ class WasteAtlasConfig(AppConfig):
     name = "sources.waste_collection.waste_atlas"
     label = "waste_atlas"
     verbose_name = "Waste Atlas"
+
+    def ready(self):
+        importlib.import_module("sources.waste_collection.waste_atlas.signals")
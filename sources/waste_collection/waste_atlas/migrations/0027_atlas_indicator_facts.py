@@ -0,0 +1,150 @@
+# Generated by Django 6.0.5 on 2026-10-17 14:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("waste_atlas", "0026_add_organic_ratio_no_collection"),
+        ("waste_collection", "0006_rename_connection_type_to_participation_policy"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AtlasFactScope",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("country", models.CharField(max_length=56)),
+                ("year", models.PositiveSmallIntegerField()),
+                (
+                    "visibility",
+                    models.CharField(
+                        choices=[("public", "Public"), ("staff", "Staff")],
+                        max_length=10,
+                    ),
+                ),
+                ("built_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("country", "year", "visibility"),
+                        name="unique_atlas_fact_scope",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="AtlasIndicatorFact",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.PositiveSmallIntegerField()),
+                (
+                    "category",
+                    models.CharField(
+                        choices=[
+                            ("biowaste", "Biowaste"),
+                            ("residual", "Residual waste"),
+                            ("green_waste", "Green waste"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "visibility",
+                    models.CharField(
+                        choices=[("public", "Public"), ("staff", "Staff")],
+                        max_length=10,
+                    ),
+                ),
+                ("is_stale", models.BooleanField(default=False)),
+                (
+                    "collection_system",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                ("priority", models.PositiveSmallIntegerField(default=99)),
+                (
+                    "frequency_type",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                ("fee_system", models.CharField(blank=True, max_length=255, null=True)),
+                ("allowed_material_ids", models.JSONField(default=list)),
+                ("forbidden_material_ids", models.JSONField(default=list)),
+                ("has_door_to_door", models.BooleanField(default=False)),
+                ("min_bin_size", models.FloatField(blank=True, null=True)),
+                ("required_bin_capacity", models.FloatField(blank=True, null=True)),
+                (
+                    "required_bin_capacity_reference",
+                    models.CharField(blank=True, max_length=40, null=True),
+                ),
+                (
+                    "collection_count",
+                    models.PositiveIntegerField(blank=True, null=True),
+                ),
+                ("has_seasonal_variation", models.BooleanField(default=False)),
+                ("amount", models.FloatField(blank=True, null=True)),
+                (
+                    "amount_source",
+                    models.CharField(blank=True, max_length=10, null=True),
+                ),
+                (
+                    "acpv_group_key",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "catchment",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="atlas_facts",
+                        to="waste_collection.collectioncatchment",
+                    ),
+                ),
+                (
+                    "collection",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="waste_collection.collection",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["year", "visibility", "category", "catchment"],
+                        name="atlas_fact_scope_idx",
+                    ),
+                    models.Index(
+                        fields=["catchment", "year"],
+                        name="atlas_fact_catchment_idx",
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("catchment", "year", "category", "visibility"),
+                        name="unique_atlas_indicator_fact",
+                    )
+                ],
+            },
+        ),
+    ]
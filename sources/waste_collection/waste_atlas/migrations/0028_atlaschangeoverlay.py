@@ -0,0 +1,40 @@
+# Generated by Django 6.0.5 on 2026-10-17 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("waste_atlas", "0027_atlas_indicator_facts"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AtlasChangeOverlay",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fingerprint", models.CharField(max_length=40, unique=True)),
+                ("selection", models.CharField(db_index=True, max_length=40)),
+                ("from_year", models.PositiveSmallIntegerField()),
+                ("to_year", models.PositiveSmallIntegerField()),
+                (
+                    "visibility",
+                    models.CharField(
+                        choices=[("public", "Public"), ("staff", "Staff")],
+                        max_length=10,
+                    ),
+                ),
+                ("geojson", models.JSONField()),
+                ("uses_legacy_geometry", models.BooleanField(default=False)),
+                ("computed_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.5 on 2026-10-17 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("waste_atlas", "0028_atlaschangeoverlay"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="atlasindicatorfact",
+            name="stale_generation",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 6.0.5 on 2026-10-17 17:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("waste_atlas", "0029_atlasindicatorfact_stale_generation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="atlaschangeoverlay",
+            name="last_read_at",
+            field=models.DateTimeField(
+                db_index=True, default=django.utils.timezone.now
+            ),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator, RegexValidator
 from django.db import models
+from django.utils import timezone
 
 from .legend import AUTO, COLUMN_FLOW, EXPORT_LEGEND_ITEM_FLOW_CHOICES
 
@@ -364,3 +365,155 @@ class WasteAtlasRenderingSettings(models.Model):
             "itemFlow": self.export_legend_item_flow,
             "maxWidthFraction": self.export_legend_width_fraction,
         }
+
+
+class AtlasFactCategory(models.TextChoices):
+    """Waste category groups the atlas maps are drawn for."""
+
+    BIOWASTE = "biowaste", "Biowaste"
+    RESIDUAL = "residual", "Residual waste"
+    GREEN_WASTE = "green_waste", "Green waste"
+
+
+# Waste categories of the collections the facts of each category group are computed from
+ATLAS_FACT_WASTE_CATEGORIES = {
+    AtlasFactCategory.BIOWASTE: ("Biowaste", "Food waste"),
+    AtlasFactCategory.RESIDUAL: ("Residual waste",),
+    AtlasFactCategory.GREEN_WASTE: ("Green waste",),
+}
+
+
+class AtlasFactVisibility(models.TextChoices):
+    """Publication scope the facts were computed for, see ``_visible_statuses``."""
+
+    PUBLIC = "public", "Public"
+    STAFF = "staff", "Staff"
+
+
+class AtlasFactScope(models.Model):
+    """Marks a country, atlas year and visibility whose facts have been built.
+
+    Facts of a built scope are kept current row by row; a scope without a
+    marker is built as a whole on its first read.
+    """
+
+    country = models.CharField(max_length=56)
+    year = models.PositiveSmallIntegerField()
+    visibility = models.CharField(max_length=10, choices=AtlasFactVisibility.choices)
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["country", "year", "visibility"],
+                name="unique_atlas_fact_scope",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.country} {self.year} ({self.visibility})"
+
+
+class AtlasIndicatorFact(models.Model):
+    """Denormalized indicator values of one catchment, atlas year and category group.
+
+    Holds the primary collection picked by ``_select_primary_collections`` and
+    the indicators the atlas maps derive from the collections of the
+    catchment. Rows are computed by ``build_atlas_facts`` and flagged stale by
+    the signal handlers in ``waste_atlas.signals`` when their inputs change;
+    stale rows are recomputed on the next read of their scope.
+    """
+
+    catchment = models.ForeignKey(
+        "waste_collection.CollectionCatchment",
+        on_delete=models.CASCADE,
+        related_name="atlas_facts",
+    )
+    year = models.PositiveSmallIntegerField()
+    category = models.CharField(max_length=20, choices=AtlasFactCategory.choices)
+    visibility = models.CharField(max_length=10, choices=AtlasFactVisibility.choices)
+    is_stale = models.BooleanField(default=False)
+    # Counts the markings, so a rebuild only replaces rows not marked meanwhile
+    stale_generation = models.PositiveIntegerField(default=0)
+
+    # Primary collection
+    collection = models.ForeignKey(
+        "waste_collection.Collection",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    collection_system = models.CharField(max_length=255, blank=True, null=True)
+    priority = models.PositiveSmallIntegerField(default=99)
+    frequency_type = models.CharField(max_length=255, blank=True, null=True)
+    fee_system = models.CharField(max_length=255, blank=True, null=True)
+    allowed_material_ids = models.JSONField(default=list)
+    forbidden_material_ids = models.JSONField(default=list)
+
+    # Door-to-door collections of the catchment, not only the primary one
+    has_door_to_door = models.BooleanField(default=False)
+    min_bin_size = models.FloatField(blank=True, null=True)
+    required_bin_capacity = models.FloatField(blank=True, null=True)
+    required_bin_capacity_reference = models.CharField(
+        max_length=40, blank=True, null=True
+    )
+    collection_count = models.PositiveIntegerField(blank=True, null=True)
+    has_seasonal_variation = models.BooleanField(default=False)
+
+    # Specific amount in kg/(cap.*a), see ``_amounts_for_year``
+    amount = models.FloatField(blank=True, null=True)
+    amount_source = models.CharField(max_length=10, blank=True, null=True)
+    acpv_group_key = models.CharField(max_length=255, blank=True, null=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["catchment", "year", "category", "visibility"],
+                name="unique_atlas_indicator_fact",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["year", "visibility", "category", "catchment"],
+                name="atlas_fact_scope_idx",
+            ),
+            models.Index(
+                fields=["catchment", "year"],
+                name="atlas_fact_catchment_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.catchment_id} {self.year} {self.category} ({self.visibility})"
+
+
+class AtlasChangeOverlay(models.Model):
+    """Precomputed change overlay of the catchments of two atlas years.
+
+    Overlays are computed by Celery tasks (see ``waste_atlas.tasks``), for every
+    map set and pair of adjacent years when a catchment revision is approved,
+    and for other selections when they are first requested. ``fingerprint``
+    identifies the catchments, years, visibility and boundary version an overlay
+    was computed for; ``selection`` leaves the boundary version out, so that the
+    last overlay of a selection can be served while its successor is computed.
+    Overlays that are not read for a while are pruned, see
+    ``prune_change_overlays``.
+    """
+
+    fingerprint = models.CharField(max_length=40, unique=True)
+    selection = models.CharField(max_length=40, db_index=True)
+    from_year = models.PositiveSmallIntegerField()
+    to_year = models.PositiveSmallIntegerField()
+    visibility = models.CharField(max_length=10, choices=AtlasFactVisibility.choices)
+    geojson = models.JSONField()
+    # Legacy Region geometry carries no timestamp to version the fingerprint by
+    uses_legacy_geometry = models.BooleanField(default=False)
+    computed_at = models.DateTimeField(auto_now=True)
+    # Refreshed when the overlay is served, at most once an hour
+    last_read_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.from_year} → {self.to_year} ({self.visibility})"
@@ -30,6 +30,7 @@ from .viewsets import (
     FoodWasteCategoryViewSet,
     GreenWasteCollectionAmountViewSet,
     GreenWasteCollectionSystemCountViewSet,
+    MapSetBundleViewSet,
     MinBinSizeRatioViewSet,
     OrgaLevelViewSet,
     OrganicCollectionAmountViewSet,
@@ -305,3 +306,8 @@ router.register(
     WeeklyBpAccessDaysViewSet,
     basename="api-waste-atlas-weekly-bp-access-days",
 )
+router.register(
+    "map-set-bundle",
+    MapSetBundleViewSet,
+    basename="api-waste-atlas-map-set-bundle",
+)
@@ -0,0 +1,288 @@
+"""Flag Waste Atlas indicator facts stale when their inputs change.
+
+Marking is a single UPDATE per change; the stale facts are recomputed on the
+next read of their scope (see ``viewsets._atlas_facts``). A saved collection
+also gets stale placeholder facts for its catchment and year, so that
+catchments without facts yet are picked up by that refresh as well. Every
+marking bumps the dataset version of the facts, which versions the cached
+map set bundles.
+
+Approving a catchment revision schedules the precomputation of the change
+overlays of all map sets (see ``waste_atlas.tasks``).
+"""
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils.dateparse import parse_date
+
+from maps.models import Catchment, CatchmentRevision, Region, RegionAttributeValue
+from maps.population.models import PopulationObservation
+from maps.versioning import (
+    bump_dataset_version,
+    dataset_version_key,
+    register_versioned_model,
+)
+
+from ..derived_values import derived_values_written
+from ..models import (
+    AggregatedCollectionPropertyValue,
+    Collection,
+    CollectionCatchment,
+    CollectionCountOptions,
+    CollectionFrequency,
+    CollectionPropertyValue,
+)
+from .map_selection import MAP_SELECTION_YEARS
+from .models import (
+    ATLAS_FACT_WASTE_CATEGORIES,
+    AtlasFactVisibility,
+    AtlasIndicatorFact,
+    WasteAtlasMapConfiguration,
+)
+
+# Configurations name the endpoint a theme is drawn from
+register_versioned_model(WasteAtlasMapConfiguration)
+
+
+def _mark_stale(condition, year=None):
+    facts = AtlasIndicatorFact.objects.filter(condition)
+    if year is not None:
+        facts = facts.filter(year=year)
+    # Rows already stale are marked again, as a rebuild may be reading their
+    # inputs right now
+    facts.update(is_stale=True, stale_generation=F("stale_generation") + 1)
+    # Inputs of catchments without facts change atlas data all the same
+    bump_dataset_version(dataset_version_key(AtlasIndicatorFact))
+
+
+def mark_atlas_facts_stale(catchment_ids, year=None):
+    """Flag the facts of catchments stale, of one year or of all years."""
+    catchment_ids = [pk for pk in catchment_ids if pk is not None]
+    if catchment_ids:
+        _mark_stale(Q(catchment_id__in=catchment_ids), year)
+
+
+def mark_collection_facts_stale(collection_ids, year=None):
+    """Flag the facts of the catchments of collections stale."""
+    if collection_ids:
+        _mark_stale(Q(catchment__collections__in=list(collection_ids)), year)
+
+
+def mark_region_facts_stale(region_ids, year=None):
+    """Flag the facts of the catchments of regions stale."""
+    if region_ids:
+        _mark_stale(Q(catchment__region_id__in=list(region_ids)), year)
+
+
+def _fact_category(collection):
+    name = getattr(collection.waste_category, "name", None)
+    for category, names in ATLAS_FACT_WASTE_CATEGORIES.items():
+        if name in names:
+            return category
+    return None
+
+
+def _add_placeholder_facts(collection):
+    valid_from = collection.valid_from
+    if isinstance(valid_from, str):
+        valid_from = parse_date(valid_from)
+    if (
+        collection.catchment_id is None
+        or valid_from is None
+        or str(valid_from.year) not in MAP_SELECTION_YEARS
+    ):
+        return
+    category = _fact_category(collection)
+    if category is None:
+        return
+    AtlasIndicatorFact.objects.bulk_create(
+        [
+            AtlasIndicatorFact(
+                catchment_id=collection.catchment_id,
+                year=valid_from.year,
+                category=category,
+                visibility=visibility,
+                is_stale=True,
+            )
+            for visibility in AtlasFactVisibility.values
+        ],
+        ignore_conflicts=True,
+    )
+
+
+@receiver(pre_save, sender=Collection)
+def remember_previous_catchment(sender, instance, **kwargs):
+    if instance.pk is None:
+        instance._previous_catchment_id = None
+        return
+    instance._previous_catchment_id = (
+        Collection.objects.filter(pk=instance.pk)
+        .values_list("catchment_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Collection)
+def mark_facts_of_saved_collection_stale(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    _add_placeholder_facts(instance)
+    mark_atlas_facts_stale(
+        [instance.catchment_id, getattr(instance, "_previous_catchment_id", None)]
+    )
+
+
+@receiver(post_delete, sender=Collection)
+def mark_facts_of_deleted_collection_stale(sender, instance, **kwargs):
+    mark_atlas_facts_stale([instance.catchment_id])
+
+
+@receiver(post_save, sender=CollectionPropertyValue)
+@receiver(post_delete, sender=CollectionPropertyValue)
+def mark_facts_of_property_value_stale(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    mark_collection_facts_stale([instance.collection_id], instance.year)
+
+
+@receiver(derived_values_written)
+def mark_facts_of_derived_values_stale(sender, collection_ids, **kwargs):
+    mark_collection_facts_stale(collection_ids)
+
+
+@receiver(post_save, sender=AggregatedCollectionPropertyValue)
+@receiver(pre_delete, sender=AggregatedCollectionPropertyValue)
+def mark_facts_of_aggregated_value_stale(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    mark_collection_facts_stale(
+        list(instance.collections.values_list("pk", flat=True)), instance.year
+    )
+
+
+@receiver(m2m_changed, sender=AggregatedCollectionPropertyValue.collections.through)
+def mark_facts_of_aggregated_collections_stale(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if reverse:
+        # The instance is a collection, whose aggregated values changed
+        if action in ("post_add", "post_remove", "post_clear"):
+            mark_atlas_facts_stale([instance.catchment_id])
+    elif action in ("post_add", "post_remove"):
+        mark_collection_facts_stale(pk_set, instance.year)
+    elif action == "pre_clear":
+        mark_collection_facts_stale(
+            list(instance.collections.values_list("pk", flat=True)), instance.year
+        )
+
+
+@receiver(m2m_changed, sender=Collection.allowed_materials.through)
+@receiver(m2m_changed, sender=Collection.forbidden_materials.through)
+def mark_facts_of_materials_stale(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            mark_atlas_facts_stale([instance.catchment_id])
+    elif action in ("post_add", "post_remove"):
+        mark_collection_facts_stale(pk_set)
+    elif action == "pre_clear":
+        # The instance is a material; its collections are about to be removed
+        related = (
+            "allowed_in_collections"
+            if sender is Collection.allowed_materials.through
+            else "forbidden_in_collections"
+        )
+        mark_collection_facts_stale(
+            list(getattr(instance, related).values_list("pk", flat=True))
+        )
+
+
+@receiver(post_save, sender=CollectionFrequency)
+def mark_facts_of_frequency_stale(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    mark_collection_facts_stale(list(instance.collections.values_list("pk", flat=True)))
+
+
+@receiver(post_save, sender=CollectionCountOptions)
+@receiver(post_delete, sender=CollectionCountOptions)
+def mark_facts_of_count_options_stale(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    mark_collection_facts_stale(
+        list(
+            Collection.objects.filter(frequency_id=instance.frequency_id).values_list(
+                "pk", flat=True
+            )
+        )
+    )
+
+
+# Catchments are edited through ``maps`` as ``Catchment``; post_save is sent with
+# the class of the saved instance, so the proxy needs its own registration
+@receiver(post_save, sender=Catchment)
+@receiver(post_save, sender=CollectionCatchment)
+def mark_facts_of_catchment_stale(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return
+    mark_atlas_facts_stale([instance.pk])
+
+
+def _with_composing_regions(region_id):
+    """The region and the custom regions composed of it, whose population it feeds."""
+    return [
+        region_id,
+        *Region.objects.filter(composed_of=region_id).values_list("pk", flat=True),
+    ]
+
+
+@receiver(post_save, sender=PopulationObservation)
+@receiver(post_delete, sender=PopulationObservation)
+def mark_facts_of_population_stale(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    mark_region_facts_stale(_with_composing_regions(instance.region_id), instance.year)
+
+
+@receiver(post_save, sender=RegionAttributeValue)
+@receiver(post_delete, sender=RegionAttributeValue)
+def mark_facts_of_region_attribute_stale(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # Legacy population values are matched to years by their date, or not at all
+    mark_region_facts_stale(_with_composing_regions(instance.region_id))
+
+
+@receiver(m2m_changed, sender=Region.composed_of.through)
+def mark_facts_of_composition_stale(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            mark_region_facts_stale([instance.pk])
+    elif action in ("post_add", "post_remove"):
+        mark_region_facts_stale(pk_set)
+    elif action == "pre_clear":
+        mark_region_facts_stale(
+            list(instance.composing_regions.values_list("pk", flat=True))
+        )
+
+
+@receiver(post_save, sender=CatchmentRevision)
+def precompute_change_overlays_of_approved_revision(
+    sender, instance, created=False, raw=False, update_fields=None, **kwargs
+):
+    if raw or instance.publication_status != instance.STATUS_PUBLISHED:
+        return
+    if not created and update_fields and "publication_status" not in update_fields:
+        return
+    from .tasks import schedule_change_overlay_precomputation
+
+    transaction.on_commit(schedule_change_overlay_precomputation)
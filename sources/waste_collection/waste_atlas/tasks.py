@@ -0,0 +1,104 @@
+import logging
+
+from brit.celery import app
+from maps.signals import get_geojson_cache
+
+from .viewsets import (
+    build_change_overlay,
+    precompute_change_overlays,
+    prune_change_overlays,
+)
+
+logger = logging.getLogger(__name__)
+
+# Approvals within this many seconds are precomputed by a single run
+CHANGE_OVERLAY_PRECOMPUTE_DEBOUNCE = 60
+# Upper bound for computing one overlay; a lost worker frees its selection then
+CHANGE_OVERLAY_COMPUTE_TIMEOUT = 600
+
+_PRECOMPUTE_LOCK_KEY = "waste_atlas_change_overlay:precompute:scheduled"
+
+
+def _compute_lock_key(fingerprint):
+    return f"waste_atlas_change_overlay:compute:{fingerprint}"
+
+
+@app.task(name="precompute_waste_atlas_change_overlays")
+def precompute_waste_atlas_change_overlays():
+    """Compute the change overlays of all map sets that are not stored yet."""
+    logger.info("Starting Waste Atlas change overlay precomputation")
+    try:
+        computed = precompute_change_overlays()
+    except Exception as e:
+        logger.exception("Failed to precompute Waste Atlas change overlays: %s", e)
+        return {"status": "error", "error": str(e)}
+    logger.info("Precomputed %d Waste Atlas change overlays", computed)
+    return {"status": "success", "computed": computed}
+
+
+@app.task(name="compute_waste_atlas_change_overlay")
+def compute_waste_atlas_change_overlay(
+    from_ids, from_year, to_ids, to_year, visibility, fingerprint
+):
+    """Compute the change overlay of one selection, see ``build_change_overlay``."""
+    try:
+        overlay = build_change_overlay(from_ids, from_year, to_ids, to_year, visibility)
+    finally:
+        get_geojson_cache().delete(_compute_lock_key(fingerprint))
+    return {"status": "success", "fingerprint": overlay.fingerprint}
+
+
+@app.task(name="prune_waste_atlas_change_overlays")
+def prune_waste_atlas_change_overlays():
+    """Delete the change overlays that were not read for a while."""
+    deleted = prune_change_overlays()
+    logger.info("Pruned %d Waste Atlas change overlays", deleted)
+    return {"status": "success", "deleted": deleted}
+
+
+def schedule_change_overlay_precomputation():
+    """Schedule a precomputation run, unless one is scheduled already."""
+    cache = get_geojson_cache()
+    if not cache.add(
+        _PRECOMPUTE_LOCK_KEY, True, timeout=CHANGE_OVERLAY_PRECOMPUTE_DEBOUNCE
+    ):
+        logger.debug("Change overlay precomputation already scheduled; skipping")
+        return
+    try:
+        precompute_waste_atlas_change_overlays.apply_async(
+            countdown=CHANGE_OVERLAY_PRECOMPUTE_DEBOUNCE
+        )
+    except Exception as e:
+        logger.warning("Failed to schedule change overlay precomputation: %s", e)
+        cache.delete(_PRECOMPUTE_LOCK_KEY)
+
+
+def schedule_change_overlay(
+    from_ids, from_year, to_ids, to_year, visibility, fingerprint
+):
+    """Hand the overlay of a selection to a worker, unless one computes it already."""
+    cache = get_geojson_cache()
+    lock_key = _compute_lock_key(fingerprint)
+    if not cache.add(lock_key, True, timeout=CHANGE_OVERLAY_COMPUTE_TIMEOUT):
+        return
+    try:
+        compute_waste_atlas_change_overlay.delay(
+            sorted(from_ids),
+            from_year,
+            sorted(to_ids),
+            to_year,
+            visibility,
+            fingerprint,
+        )
+    except Exception as e:
+        logger.warning("Failed to schedule change overlay computation: %s", e)
+        cache.delete(lock_key)
+
+
+__all__ = [
+    "compute_waste_atlas_change_overlay",
+    "precompute_waste_atlas_change_overlays",
+    "prune_waste_atlas_change_overlays",
+    "schedule_change_overlay",
+    "schedule_change_overlay_precomputation",
+]
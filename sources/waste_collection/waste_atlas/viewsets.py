@@ -1,11 +1,18 @@
+import copy
+import functools
 import hashlib
 import json
-from datetime import date
+import threading
+from contextlib import contextmanager
+from datetime import date, timedelta
+from types import SimpleNamespace
+from urllib.parse import urlsplit
 
 from django.conf import settings
 from django.contrib.gis.db.models import MultiPolygonField
 from django.contrib.gis.geos import GeometryCollection, MultiPolygon, Polygon
 from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
 from django.db.models import (
     Case,
     CharField,
@@ -22,23 +29,36 @@ from django.db.models import (
     When,
 )
 from django.db.models.functions import Coalesce
-from rest_framework import permissions, viewsets
+from django.http import QueryDict
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.throttling import ScopedRateThrottle
+from rest_framework.utils.encoders import JSONEncoder
 
 from maps.db_functions import SimplifyPreserveTopology
-from maps.mixins import get_unbounded_geojson_rejection_response
+from maps.mixins import (
+    get_not_modified_response,
+    get_unbounded_geojson_rejection_response,
+    set_conditional_headers,
+)
 from maps.models import (
     CatchmentRevision,
+    GeoPolygon,
     LauRegion,
     NutsRegion,
+    Region,
     RegionAttributeValue,
     RegionProperty,
 )
-from maps.population.services import population_values_by_region
+from maps.population.models import PopulationObservation
+from maps.population.services import PopulationResolver
 from maps.throttling import GeoJSONAnonThrottle
-from maps.utils import get_or_set_cache
+from maps.utils import get_stale_cache_key, single_flight_cache, single_flight_lock
+from maps.versioning import dataset_version_key, get_dataset_version_state
 from sources.waste_collection.derived_values import (
     convert_total_to_specific,
     get_derived_property_config,
@@ -47,12 +67,24 @@ from sources.waste_collection.models import (
     AggregatedCollectionPropertyValue,
     Collection,
     CollectionCatchment,
+    CollectionCountOptions,
+    CollectionFrequency,
     CollectionPropertyValue,
     Collector,
 )
+from sources.waste_collection.version_chains import collection_version_chains
 from utils.object_management.models import UserCreatedObject
 
-from .map_selection import MAP_SELECTION_YEARS
+from .map_selection import MAP_SELECTION_YEARS, MAP_SET_REGION_SCOPES
+from .models import (
+    ATLAS_FACT_WASTE_CATEGORIES,
+    AtlasChangeOverlay,
+    AtlasFactScope,
+    AtlasFactVisibility,
+    AtlasIndicatorFact,
+    WasteAtlasMapConfiguration,
+)
+from .pages import MAP_PAGES, MAP_SET_COUNTRIES
 from .serializers import (
     CatchmentAccessControlSerializer,
     CatchmentBinConfigurationSerializer,
@@ -188,10 +220,133 @@ POPULATION_ATTRIBUTE_ID = 3
 POPULATION_DENSITY_ATTRIBUTE_ID = 2
 
 
+# Query params the atlas indicator endpoints are parameterized by
+ATLAS_CACHE_PARAMS = ("country", "year", "nuts_prefix")
+# Countries of the map sets; responses for others are computed, not cached
+_ATLAS_CACHE_COUNTRIES = frozenset(MAP_SET_COUNTRIES.values())
+# Bounded lifetime for cached responses: the key carries the atlas data
+# version, but the legacy Region-geometry fallback carries no timestamp.
+_ATLAS_RESPONSE_CACHE_TIMEOUT = 3600
+
+
+class _UncachedResponse(Exception):
+    """Carries a response that must not be cached out of the cache generator."""
+
+    def __init__(self, response):
+        super().__init__(response.status_code)
+        self.response = response
+
+
+def _atlas_cache_params(request, names):
+    """Return the normalized query params of a cacheable request, or ``None``.
+
+    Requests with params outside *names*, for other countries than those of
+    the map sets or for years outside the atlas range are not cached, which
+    bounds the keys anonymous clients can create.
+    """
+    if set(request.query_params) - set(names):
+        return None
+    country, year = _parse_country_year(request)
+    if country not in _ATLAS_CACHE_COUNTRIES or not (
+        MIN_ATLAS_YEAR <= year <= MAX_ATLAS_YEAR
+    ):
+        return None
+    params = {
+        "country": country,
+        "year": year,
+        "nuts_prefix": ",".join(sorted(set(_parse_nuts_prefixes(request)))),
+    }
+    for name in names:
+        if name not in params:
+            params[name] = request.query_params.get(name, "").strip()
+    return params
+
+
+def cached_atlas_response(method):
+    """Cache the responses of an atlas endpoint per params, visibility and data version.
+
+    The key holds the normalized params (see :func:`_atlas_cache_params`),
+    the staff/public visibility and the atlas data version (see
+    :func:`_atlas_data_state`), which the signal handlers of the involved
+    models bump on every change, so identical requests are served from the
+    GeoJSON cache until the atlas data changes. Responses carry matching
+    ETags. Only successful responses are cached, and none that were built
+    from indicator facts still flagged stale.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        params = _atlas_cache_params(request, self.cache_params)
+        if params is None:
+            return method(self, request, *args, **kwargs)
+
+        data_version, last_modified = _atlas_data_state(request.user)
+        digest = hashlib.sha1(
+            json.dumps(params, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:16]
+        selection = ":".join(
+            (
+                "waste_atlas_response",
+                type(self).__name__,
+                method.__name__,
+                "staff" if _is_staff(request.user) else "public",
+                digest,
+            )
+        )
+        cache_key = f"{selection}:{data_version}"
+        version = hashlib.sha1(cache_key.encode("utf-8")).hexdigest()[:12]
+        not_modified = get_not_modified_response(request, version, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        def generate():
+            with _track_stale_fact_reads() as reads:
+                response = method(self, request, *args, **kwargs)
+            if (
+                response.status_code != status.HTTP_200_OK
+                or not hasattr(response, "data")
+                or reads.stale
+            ):
+                raise _UncachedResponse(response)
+            # Plain JSON types, so that the cache can pickle them
+            return json.loads(json.dumps(response.data, cls=JSONEncoder))
+
+        try:
+            result = single_flight_cache(
+                cache_key,
+                generate,
+                timeout=_ATLAS_RESPONSE_CACHE_TIMEOUT,
+                stale_key=get_stale_cache_key(selection),
+                version=version,
+            )
+        except _UncachedResponse as uncached:
+            return uncached.response
+        response = Response(result.data)
+        if result.status == "STALE":
+            return response
+        return set_conditional_headers(response, version, last_modified)
+
+    return wrapper
+
+
 class WasteAtlasViewSet(viewsets.ViewSet):
+    """Base of the atlas indicator endpoints.
+
+    The ``list`` action of every subclass is wrapped in
+    :func:`cached_atlas_response`, unless ``cache_list_responses`` is unset.
+    ``cache_params`` names the query params a subclass reads.
+    """
+
     permission_classes = [permissions.AllowAny]
     throttle_classes = [ScopedRateThrottle]
     throttle_scope = "waste_atlas"
+    cache_list_responses = True
+    cache_params = ATLAS_CACHE_PARAMS
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.cache_list_responses and "list" in cls.__dict__:
+            cls.list = cached_atlas_response(cls.__dict__["list"])
 
 
 class WasteAtlasReadOnlyModelViewSet(viewsets.ReadOnlyModelViewSet):
@@ -263,6 +418,14 @@ def _resolved_population_attribute_id():
         )
 
 
+def _population_resolver():
+    """Return a population resolver for the fallbacks of one request.
+
+    Composed catchment regions are resolved as sums of their components.
+    """
+    return PopulationResolver(legacy_attribute_id=_resolved_population_attribute_id())
+
+
 def _resolved_population_density_attribute_id():
     try:
         return _resolve_property_id_from_settings(
@@ -466,39 +629,218 @@ def _union_geometries(snapshots):
 _CHANGE_OVERLAY_ACTIONS = frozenset(
     {"collection_change_geojson", "collector_change_geojson"}
 )
-# Bounded lifetime for cached overlays: the cache key versions revision edits,
-# but the legacy Region-geometry fallback carries no timestamp to version.
-_CHANGE_OVERLAY_CACHE_TIMEOUT = 3600
+# Overlays computed from the legacy Region geometry, which carries no timestamp
+# to version the fingerprint by, are recomputed once they are older than this
+_CHANGE_OVERLAY_LEGACY_MAX_AGE = 3600
+# Seconds a client waits before asking again for an overlay still being computed
+_CHANGE_OVERLAY_RETRY_AFTER = 10
+# Served overlays refresh their last read time at most this often (seconds)
+_CHANGE_OVERLAY_READ_INTERVAL = 3600
+# Any client can request overlays of arbitrary selections, so the number of
+# stored overlays is capped; the least recently read ones are evicted first
+CHANGE_OVERLAY_MAX_STORED = getattr(
+    settings, "WASTE_ATLAS_CHANGE_OVERLAY_MAX_STORED", 2000
+)
+# Overlays not read for this many days are pruned by a periodic task
+CHANGE_OVERLAY_RETENTION_DAYS = getattr(
+    settings, "WASTE_ATLAS_CHANGE_OVERLAY_RETENTION_DAYS", 30
+)
 
 
-def _change_overlay_cache_key(from_ids, from_year, to_ids, to_year, user=None):
-    """Cache key for one change overlay, invalidated by boundary edits.
+def _change_overlay_selection(from_ids, from_year, to_ids, to_year, visibility):
+    """Digest of the catchments, years and visibility of a change overlay."""
+    selection = ":".join(
+        (
+            ",".join(str(pk) for pk in sorted(from_ids)),
+            ",".join(str(pk) for pk in sorted(to_ids)),
+            str(from_year),
+            str(to_year),
+            visibility,
+        )
+    )
+    return hashlib.sha1(selection.encode("utf-8")).hexdigest()
+
 
-    The involved catchments plus the number and latest modification of their
-    revisions version the key, so editing, adding or removing a snapshot yields
-    a different key instead of serving a stale overlay.  Visibility only depends
-    on whether the requester is staff, so the key does not need the user.
+def _change_overlay_fingerprint(from_ids, from_year, to_ids, to_year, visibility):
+    """Identify a change overlay by its selection and the version of its boundaries.
 
-    Geometry taken from the legacy Region fallback cannot be versioned this way,
-    which is why cached overlays also expire after
-    ``_CHANGE_OVERLAY_CACHE_TIMEOUT``.
+    The number of visible revisions of the involved catchments and their latest
+    modification and approval version the fingerprint, so editing, adding,
+    approving or archiving a snapshot yields a different fingerprint instead of
+    serving a stale overlay. Approving a revision only updates its status, which
+    is why the approval time is part of the version as well.
     """
-    catchment_ids = sorted(set(from_ids) | set(to_ids))
+    user = _visibility_user(visibility)
     versions = CatchmentRevision.objects.filter(
-        catchment_id__in=catchment_ids
-    ).aggregate(count=Count("pk"), latest=Max("lastmodified_at"))
-    latest = versions["latest"]
+        catchment_id__in=set(from_ids) | set(to_ids)
+    ).aggregate(
+        count=Count("pk", filter=Q(publication_status__in=_visible_statuses(user))),
+        latest=Max("lastmodified_at"),
+        approved=Max("approved_at"),
+    )
     fingerprint = ":".join(
         (
-            ",".join(str(pk) for pk in sorted(from_ids)),
-            ",".join(str(pk) for pk in sorted(to_ids)),
+            _change_overlay_selection(from_ids, from_year, to_ids, to_year, visibility),
             str(versions["count"] or 0),
-            str(int(latest.timestamp()) if latest else 0),
+            *(
+                str(int(moment.timestamp()) if moment else 0)
+                for moment in (versions["latest"], versions["approved"])
+            ),
+        )
+    )
+    return hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()
+
+
+def build_change_overlay(from_ids, from_year, to_ids, to_year, visibility):
+    """Compute and store the change overlay of a selection, replacing older ones.
+
+    Runs in Celery workers, see ``waste_atlas.tasks``. The fingerprint is taken
+    before the boundaries are read, so a revision edited meanwhile leaves the
+    stored overlay outdated rather than mislabelled.
+    """
+    from_ids = set(from_ids)
+    to_ids = set(to_ids)
+    user = _visibility_user(visibility)
+    selection = _change_overlay_selection(
+        from_ids, from_year, to_ids, to_year, visibility
+    )
+    fingerprint = _change_overlay_fingerprint(
+        from_ids, from_year, to_ids, to_year, visibility
+    )
+    from_snapshots = _revision_snapshots(from_ids, from_year, user)
+    to_snapshots = _revision_snapshots(to_ids, to_year, user)
+    geojson = json.loads(
+        json.dumps(
+            _build_change_geometry(from_snapshots, to_snapshots), cls=JSONEncoder
         )
     )
-    digest = hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:16]
-    scope = "staff" if _is_staff(user) else "public"
-    return f"waste_atlas_change_overlay:{from_year}:{to_year}:{scope}:{digest}"
+    uses_legacy_geometry = any(
+        snapshot["revision_id"] is None
+        for snapshot in (*from_snapshots.values(), *to_snapshots.values())
+    )
+    with transaction.atomic():
+        overlay, _created = AtlasChangeOverlay.objects.update_or_create(
+            fingerprint=fingerprint,
+            defaults={
+                "selection": selection,
+                "from_year": from_year,
+                "to_year": to_year,
+                "visibility": visibility,
+                "geojson": geojson,
+                "uses_legacy_geometry": uses_legacy_geometry,
+                "last_read_at": timezone.now(),
+            },
+        )
+        AtlasChangeOverlay.objects.filter(selection=selection).exclude(
+            pk=overlay.pk
+        ).delete()
+        evicted = AtlasChangeOverlay.objects.order_by("-last_read_at", "-pk").values(
+            "pk"
+        )[CHANGE_OVERLAY_MAX_STORED:]
+        AtlasChangeOverlay.objects.filter(pk__in=evicted).delete()
+    return overlay
+
+
+def prune_change_overlays():
+    """Delete the overlays not read within the retention period.
+
+    Map set overlays are computed again on the next approval or request.
+    Returns the number of deleted overlays.
+    """
+    cutoff = timezone.now() - timedelta(days=CHANGE_OVERLAY_RETENTION_DAYS)
+    deleted, _per_model = AtlasChangeOverlay.objects.filter(
+        last_read_at__lt=cutoff
+    ).delete()
+    return deleted
+
+
+def _is_current_overlay(overlay, fingerprint):
+    if overlay.fingerprint != fingerprint:
+        return False
+    if not overlay.uses_legacy_geometry:
+        return True
+    age = timezone.now() - overlay.computed_at
+    return age.total_seconds() < _CHANGE_OVERLAY_LEGACY_MAX_AGE
+
+
+def _stored_change_overlay(selection):
+    """The last overlay computed for a selection, whatever its boundary version."""
+    return (
+        AtlasChangeOverlay.objects.filter(selection=selection)
+        .order_by("-computed_at", "-pk")
+        .first()
+    )
+
+
+def _mark_change_overlay_read(overlay):
+    """Keep a served overlay from being pruned, with at most one write an hour."""
+    now = timezone.now()
+    if (now - overlay.last_read_at).total_seconds() < _CHANGE_OVERLAY_READ_INTERVAL:
+        return
+    AtlasChangeOverlay.objects.filter(pk=overlay.pk).update(last_read_at=now)
+
+
+def _atlas_geojson_state(user=None):
+    """Return ``(version, last_modified)`` of an atlas catchment GeoJSON response.
+
+    Besides the catchments themselves, the features depend on their boundary
+    revisions, their legacy Region geometry and the collections they link to,
+    so the change counters of all of them version the response. Visibility
+    only depends on whether the requester is staff, which is why the version
+    is namespaced by that instead of the user.
+    """
+    return get_dataset_version_state(
+        (
+            dataset_version_key(model)
+            for model in (
+                CollectionCatchment,
+                CatchmentRevision,
+                Region,
+                GeoPolygon,
+                Collection,
+            )
+        ),
+        prefix="staff" if _is_staff(user) else "public",
+    )
+
+
+def _atlas_data_state(user=None):
+    """Return ``(version, last_modified)`` of the atlas indicator data.
+
+    Extends :func:`_atlas_geojson_state` by the inputs of the indicators:
+    collectors, property values and aggregated values, frequencies, population
+    observations, the counter that ``waste_atlas.signals`` bump whenever
+    indicator facts turn stale, and the stored map configurations, which
+    name the endpoint of each theme.
+
+    Counters restart when a database is rebuilt or restored, so the time of
+    the last bump is part of the version to keep such generations apart in a
+    shared cache.
+    """
+    counters, last_modified = get_dataset_version_state(
+        (
+            dataset_version_key(model)
+            for model in (
+                CollectionCatchment,
+                CatchmentRevision,
+                Region,
+                GeoPolygon,
+                Collection,
+                Collector,
+                CollectionPropertyValue,
+                AggregatedCollectionPropertyValue,
+                CollectionFrequency,
+                CollectionCountOptions,
+                PopulationObservation,
+                AtlasIndicatorFact,
+                WasteAtlasMapConfiguration,
+            )
+        ),
+        prefix="staff" if _is_staff(user) else "public",
+    )
+    stamp = last_modified.isoformat() if last_modified else ""
+    version = hashlib.sha1(f"{counters}:{stamp}".encode()).hexdigest()[:12]
+    return version, last_modified
 
 
 def _polygonal_part(geom):
@@ -724,7 +1066,7 @@ def _filter_by_waste_categories(queryset, categories):
     return queryset.filter(waste_category__name__in=categories)
 
 
-def _select_primary_collections(
+def _compute_primary_collections(
     country,
     year,
     waste_categories,
@@ -734,6 +1076,7 @@ def _select_primary_collections(
     extra_filters=None,
     user=None,
 ):
+    """Compute the primary collection per catchment from the collections of *year*."""
     qs = _collection_qs(user).filter(
         _country_filter_q("catchment__", country),
         valid_from__year=year,
@@ -769,55 +1112,462 @@ def _select_primary_collections(
     return best
 
 
-def _collection_version_chains(collection_ids):
-    selected_ids = {collection_id for collection_id in collection_ids if collection_id}
-    chains = {collection_id: {collection_id} for collection_id in selected_ids}
-    if not selected_ids:
-        return chains
-
-    through = Collection.predecessors.through
-    seen_ids = set(selected_ids)
-    frontier_ids = set(selected_ids)
-    edges = set()
-
-    while frontier_ids:
-        relation_rows = through.objects.filter(
-            Q(from_collection_id__in=frontier_ids)
-            | Q(to_collection_id__in=frontier_ids)
-        ).values_list("from_collection_id", "to_collection_id")
-
-        next_frontier_ids = set()
-        for left_id, right_id in relation_rows:
-            edges.add((left_id, right_id))
-            if left_id not in seen_ids:
-                next_frontier_ids.add(left_id)
-            if right_id not in seen_ids:
-                next_frontier_ids.add(right_id)
-
-        seen_ids.update(next_frontier_ids)
-        frontier_ids = next_frontier_ids
-
-    adjacency = {collection_id: set() for collection_id in seen_ids}
-    for left_id, right_id in edges:
-        adjacency.setdefault(left_id, set()).add(right_id)
-        adjacency.setdefault(right_id, set()).add(left_id)
-
-    for selected_id in selected_ids:
-        chain_ids = set()
-        stack = [selected_id]
-        while stack:
-            collection_id = stack.pop()
-            if collection_id in chain_ids:
-                continue
-            chain_ids.add(collection_id)
-            stack.extend(adjacency.get(collection_id, ()))
-        chains[selected_id] = chain_ids
+_selection_memo = threading.local()
+
+
+@contextmanager
+def shared_primary_selection():
+    """Share primary collection selections between the indicators of a block.
+
+    Inside the block, each selection of a country, year, waste categories and
+    scope is computed or read once, however many indicators ask for it, as
+    when one map set bundle serves all themes of a map set. Results are
+    dropped when the outermost block exits.
+    """
+    outermost = getattr(_selection_memo, "results", None) is None
+    if outermost:
+        _selection_memo.results = {}
+    try:
+        yield
+    finally:
+        if outermost:
+            _selection_memo.results = None
+
+
+_stale_fact_reads = threading.local()
+
+
+@contextmanager
+def _track_stale_fact_reads():
+    """Record whether facts still flagged stale were read inside the block.
+
+    Responses built from them belong to no data version: the refresh that
+    replaces the facts does not bump it again.
+    """
+    outer = getattr(_stale_fact_reads, "tracker", None)
+    tracker = SimpleNamespace(stale=False)
+    _stale_fact_reads.tracker = tracker
+    try:
+        yield tracker
+    finally:
+        _stale_fact_reads.tracker = outer
+        if outer is not None and tracker.stale:
+            outer.stale = True
+
+
+def _shared_selection(key, compute):
+    results = getattr(_selection_memo, "results", None)
+    if results is None:
+        return compute()
+    if key not in results:
+        results[key] = compute()
+    return results[key]
 
-    return chains
+
+def _select_primary_collections(
+    country,
+    year,
+    waste_categories,
+    nuts_prefixes=(),
+    *,
+    extra_fields=(),
+    extra_filters=None,
+    user=None,
+):
+    """Return the primary collection per catchment, ``{catchment_id: row}``.
+
+    Served from the indicator facts for the atlas category groups and years,
+    computed from the collections otherwise (see
+    :func:`_compute_primary_collections`).
+    """
+    if extra_filters or _atlas_fact_category(waste_categories, year) is None:
+        key = (
+            "primary",
+            country,
+            year,
+            None if waste_categories is None else tuple(waste_categories),
+            tuple(nuts_prefixes),
+            tuple(extra_fields),
+            tuple(sorted((extra_filters or {}).items())),
+            _fact_visibility(user),
+        )
+        best = _shared_selection(
+            key,
+            lambda: _compute_primary_collections(
+                country,
+                year,
+                waste_categories,
+                nuts_prefixes,
+                extra_fields=extra_fields,
+                extra_filters=extra_filters,
+                user=user,
+            ),
+        )
+        return {cid: dict(row) for cid, row in best.items()}
+    facts = _indicator_facts(country, year, waste_categories, nuts_prefixes, user=user)
+    return _primary_collection_rows(facts, extra_fields)
+
+
+# ---------------------------------------------------------------------------
+# Indicator facts
+# ---------------------------------------------------------------------------
+
+# Fields of the primary collection stored on the facts, by collection lookup
+_ATLAS_FACT_FIELDS = {
+    "frequency__type": "frequency_type",
+    "fee_system__name": "fee_system",
+}
+
+
+class _StaffScope:
+    """Stands in for a staff user when computing the facts of the staff visibility."""
+
+    is_staff = True
+
+
+def _fact_visibility(user=None):
+    if _is_staff(user):
+        return AtlasFactVisibility.STAFF
+    return AtlasFactVisibility.PUBLIC
+
+
+def _visibility_user(visibility):
+    """The user to compute data of a visibility as, see ``_visible_statuses``."""
+    return _StaffScope() if visibility == AtlasFactVisibility.STAFF else None
+
+
+def _atlas_fact_category(waste_categories, year):
+    """Return the fact category group of *waste_categories*, or ``None`` if there is none."""
+    if waste_categories is None or not MIN_ATLAS_YEAR <= year <= MAX_ATLAS_YEAR:
+        return None
+    requested = set(waste_categories)
+    for category, names in ATLAS_FACT_WASTE_CATEGORIES.items():
+        if requested == set(names):
+            return category
+    return None
+
+
+def _catchment_amounts(year, waste_categories, catchment_ids, user=None):
+    """Specific amounts of catchments, looked up across all their collections (any year)."""
+    all_col_rows = _filter_by_waste_categories(
+        _collection_qs(user).filter(
+            catchment_id__in=catchment_ids,
+        ),
+        waste_categories,
+    ).values_list("id", "catchment_id")
+
+    col_to_cid: dict[int, int] = {}
+    for col_id, cid in all_col_rows:
+        col_to_cid[col_id] = cid
+
+    return _amounts_for_year(
+        year,
+        set(col_to_cid),
+        col_to_cid,
+        catchment_ids,
+        include_metadata=True,
+    )
+
+
+def _compute_atlas_facts(
+    country,
+    year,
+    waste_categories,
+    nuts_prefixes=(),
+    *,
+    category="",
+    visibility="",
+    catchment_ids=None,
+    user=None,
+):
+    """Compute the indicator facts of the catchments with collections of *waste_categories*.
+
+    Returns unsaved :class:`AtlasIndicatorFact` instances ordered by
+    catchment. *catchment_ids* restricts the computation to these
+    catchments.
+    """
+    waste_categories = list(waste_categories)
+    best = _compute_primary_collections(
+        country,
+        year,
+        waste_categories,
+        nuts_prefixes,
+        extra_fields=tuple(_ATLAS_FACT_FIELDS),
+        extra_filters=(
+            {"catchment_id__in": catchment_ids} if catchment_ids is not None else None
+        ),
+        user=user,
+    )
+    if not best:
+        return []
+    scoped_ids = list(best)
+
+    # Bin sizes and collection counts cover all door-to-door collections of
+    # the catchment, not only its primary collection.
+    door_to_door = _filter_by_waste_categories(
+        _collection_qs(user).filter(
+            catchment_id__in=scoped_ids,
+            valid_from__year=year,
+            collection_system__name="Door to door",
+        ),
+        waste_categories,
+    )
+    bins = {}
+    for cid, size, capacity, reference in door_to_door.order_by(
+        "catchment_id", "id"
+    ).values_list(
+        "catchment_id",
+        "min_bin_size",
+        "required_bin_capacity",
+        "required_bin_capacity_reference",
+    ):
+        bins.setdefault(cid, (size, capacity, reference))
+    counts: dict[int, list[int]] = {}
+    for cid, standard in door_to_door.filter(frequency__isnull=False).values_list(
+        "catchment_id", "frequency__collectioncountoptions__standard"
+    ):
+        if standard is not None:
+            counts.setdefault(cid, []).append(standard)
+
+    amounts, value_sources, acpv_group_keys = _catchment_amounts(
+        year, waste_categories, scoped_ids, user=user
+    )
+
+    primary_ids = [row["collection_id"] for row in best.values()]
+    allowed: dict[int, list[int]] = {}
+    for (
+        collection_id,
+        material_id,
+    ) in Collection.allowed_materials.through.objects.filter(
+        collection_id__in=primary_ids
+    ).values_list("collection_id", "material_id"):
+        allowed.setdefault(collection_id, []).append(material_id)
+    forbidden: dict[int, list[int]] = {}
+    for (
+        collection_id,
+        material_id,
+    ) in Collection.forbidden_materials.through.objects.filter(
+        collection_id__in=primary_ids
+    ).values_list("collection_id", "material_id"):
+        forbidden.setdefault(collection_id, []).append(material_id)
+
+    facts = []
+    for cid, row in best.items():
+        size, capacity, reference = bins.get(cid, (None, None, None))
+        options = counts.get(cid)
+        facts.append(
+            AtlasIndicatorFact(
+                catchment_id=cid,
+                year=year,
+                category=category,
+                visibility=visibility,
+                collection_id=row["collection_id"],
+                collection_system=row["collection_system"],
+                priority=row["priority"],
+                frequency_type=row["frequency__type"],
+                fee_system=row["fee_system__name"],
+                allowed_material_ids=sorted(allowed.get(row["collection_id"], ())),
+                forbidden_material_ids=sorted(forbidden.get(row["collection_id"], ())),
+                has_door_to_door=cid in bins,
+                min_bin_size=float(size) if size is not None else None,
+                required_bin_capacity=(
+                    float(capacity) if capacity is not None else None
+                ),
+                required_bin_capacity_reference=reference or None,
+                collection_count=sum(options) if options else None,
+                has_seasonal_variation=bool(options) and len(set(options)) > 1,
+                amount=amounts.get(cid),
+                amount_source=value_sources.get(cid),
+                acpv_group_key=acpv_group_keys.get(cid),
+            )
+        )
+    return facts
+
+
+# Everything but the key and the marking generation of a stored fact
+_ATLAS_FACT_UPDATE_FIELDS = [
+    field.name
+    for field in AtlasIndicatorFact._meta.concrete_fields
+    if not field.primary_key
+    and field.name
+    not in ("catchment", "year", "category", "visibility", "stale_generation")
+]
+
+
+def build_atlas_facts(country, year, visibility, catchment_ids=None):
+    """(Re)build the stored indicator facts of a country, atlas year and visibility.
+
+    With *catchment_ids*, only the facts of these catchments are replaced,
+    e.g. the ones flagged stale by ``waste_atlas.signals``. Otherwise the
+    whole scope is replaced and marked as built. Returns the new facts.
+
+    Stored rows are updated in place, and only if they were not marked stale
+    again while their facts were computed; such rows keep their marking and
+    are rebuilt by the next read.
+    """
+    user = _visibility_user(visibility)
+    replaced = AtlasIndicatorFact.objects.filter(year=year, visibility=visibility)
+    if catchment_ids is None:
+        replaced = replaced.filter(_country_filter_q("catchment__", country))
+    else:
+        replaced = replaced.filter(catchment_id__in=catchment_ids)
+    stored = {
+        (catchment_id, category): (pk, generation)
+        for pk, catchment_id, category, generation in replaced.values_list(
+            "pk", "catchment_id", "category", "stale_generation"
+        )
+    }
+
+    facts = []
+    for category, names in ATLAS_FACT_WASTE_CATEGORIES.items():
+        facts.extend(
+            _compute_atlas_facts(
+                country,
+                year,
+                names,
+                category=category,
+                visibility=visibility,
+                catchment_ids=catchment_ids,
+                user=user,
+            )
+        )
+
+    with transaction.atomic():
+        # Locking the rows makes concurrent markings wait for this transaction
+        # and then mark the updated rows again
+        generations = dict(
+            AtlasIndicatorFact.objects.select_for_update()
+            .filter(pk__in=[pk for pk, _generation in stored.values()])
+            .values_list("pk", "stale_generation")
+        )
+        unchanged = {
+            pk
+            for pk, generation in stored.values()
+            if generations.get(pk) == generation
+        }
+        now = timezone.now()
+        created, updated = [], []
+        for fact in facts:
+            pk, _generation = stored.pop((fact.catchment_id, fact.category), (None, 0))
+            if pk is None:
+                created.append(fact)
+            elif pk in unchanged:
+                fact.pk, fact.updated_at = pk, now
+                updated.append(fact)
+        AtlasIndicatorFact.objects.bulk_update(
+            updated, _ATLAS_FACT_UPDATE_FIELDS, batch_size=500
+        )
+        # Concurrent builds of the same scope insert the same rows
+        AtlasIndicatorFact.objects.bulk_create(created, ignore_conflicts=True)
+        AtlasIndicatorFact.objects.filter(
+            pk__in=[pk for pk, _generation in stored.values() if pk in unchanged]
+        ).delete()
+        # Arbitrary country codes of anonymous requests must not leave markers
+        if catchment_ids is None and facts:
+            AtlasFactScope.objects.update_or_create(
+                country=country, year=year, visibility=visibility
+            )
+    return facts
+
+
+def _atlas_facts(country, year, category, nuts_prefixes=(), user=None):
+    """Read the stored facts of a category group, refreshing stale rows first."""
+    visibility = _fact_visibility(user)
+    scope = AtlasIndicatorFact.objects.filter(
+        _country_filter_q("catchment__", country),
+        year=year,
+        visibility=visibility,
+    )
+    built = AtlasFactScope.objects.filter(
+        country=country, year=year, visibility=visibility
+    )
+    lock_name = f"atlas_facts:{country}:{year}:{visibility}"
+    if not built.exists():
+        # Concurrent first reads wait for one build; they only build the
+        # scope themselves if it is still missing after the lock wait
+        with single_flight_lock(lock_name) as leader:
+            if leader or not built.exists():
+                build_atlas_facts(country, year, visibility)
+    elif scope.filter(is_stale=True).exists():
+        # Readers that find a refresh running serve the stale values instead
+        with single_flight_lock(lock_name, wait=0) as leader:
+            if leader:
+                stale_ids = set(
+                    scope.filter(is_stale=True).values_list("catchment_id", flat=True)
+                )
+                build_atlas_facts(country, year, visibility, catchment_ids=stale_ids)
+            else:
+                tracker = getattr(_stale_fact_reads, "tracker", None)
+                if tracker is not None:
+                    tracker.stale = True
+    facts = _apply_nuts_prefix_filter(
+        scope.filter(category=category), nuts_prefixes, catchment_path="catchment__"
+    )
+    return list(facts.order_by("catchment_id"))
+
+
+def _indicator_facts(country, year, waste_categories, nuts_prefixes=(), user=None):
+    """Return the indicator facts of the catchments, ordered by catchment.
+
+    Read from the fact table for the atlas category groups and years,
+    computed in memory for other categories and years.
+    """
+    category = _atlas_fact_category(waste_categories, year)
+    key = (
+        "facts",
+        country,
+        year,
+        tuple(waste_categories),
+        tuple(nuts_prefixes),
+        _fact_visibility(user),
+    )
+    if category is None:
+        return _shared_selection(
+            key,
+            lambda: _compute_atlas_facts(
+                country, year, waste_categories, nuts_prefixes, user=user
+            ),
+        )
+    return _shared_selection(
+        key, lambda: _atlas_facts(country, year, category, nuts_prefixes, user=user)
+    )
+
+
+def _primary_collection_rows(facts, extra_fields=()):
+    """Turn facts into the rows returned by :func:`_select_primary_collections`."""
+    fetched = [field for field in extra_fields if field not in _ATLAS_FACT_FIELDS]
+    values = {}
+    if fetched:
+        values = {
+            row[0]: row[1:]
+            for row in Collection.objects.filter(
+                pk__in=[fact.collection_id for fact in facts]
+            ).values_list("id", *fetched)
+        }
+    best = {}
+    for fact in facts:
+        selected = {
+            "collection_id": fact.collection_id,
+            "catchment_id": fact.catchment_id,
+            "collection_system": fact.collection_system,
+            "priority": fact.priority,
+        }
+        for field in extra_fields:
+            if field in _ATLAS_FACT_FIELDS:
+                selected[field] = getattr(fact, _ATLAS_FACT_FIELDS[field])
+        selected.update(
+            zip(
+                fetched,
+                values.get(fact.collection_id, (None,) * len(fetched)),
+                strict=True,
+            )
+        )
+        best[fact.catchment_id] = selected
+    return best
 
 
 def _latest_connection_rate_values(collection_ids):
-    version_chains = _collection_version_chains(collection_ids)
+    version_chains = collection_version_chains(collection_ids)
     if not version_chains:
         return {}
 
@@ -867,7 +1617,7 @@ def _latest_property_values(
     user=None,
 ):
     """Return the latest matching value from each selected collection's chain."""
-    version_chains = _collection_version_chains(collection_ids)
+    version_chains = collection_version_chains(collection_ids)
     if not version_chains:
         return {}
 
@@ -937,6 +1687,80 @@ def _active_collector_scope(country, year, nuts_prefixes, user=None):
     return _apply_nuts_prefix_filter(qs, nuts_prefixes, catchment_path="catchment__")
 
 
+def _scoped_catchment_ids(country, year, nuts_prefixes=(), user=None):
+    """Return the ids of the catchments with visible collections of an atlas year."""
+    qs = CollectionCatchment.objects.filter(
+        _country_filter_q("", country),
+        _publication_q(user, prefix="collections__"),
+        collections__valid_from__year=year,
+    ).distinct()
+    return _apply_nuts_prefix_filter(qs, nuts_prefixes).values_list("pk", flat=True)
+
+
+# Catchment sets the change overlays compare: those of the collections of a
+# year, or those covered by active collectors
+_CHANGE_OVERLAY_KINDS = ("collection", "collector")
+
+
+def _change_overlay_catchment_ids(kind, country, year, nuts_prefixes=(), user=None):
+    """Return the ids of the catchments an overlay of *kind* covers in a year."""
+    if kind == "collector":
+        return (
+            _active_collector_scope(country, year, nuts_prefixes, user=user)
+            .values_list("catchment_id", flat=True)
+            .distinct()
+        )
+    return _scoped_catchment_ids(country, year, nuts_prefixes, user)
+
+
+def precompute_change_overlays():
+    """Compute the missing overlays of every map set and pair of adjacent years.
+
+    Covers both visibilities and both overlay kinds; selections whose current
+    overlay is stored already are skipped, and so is the second kind when both
+    cover the same catchments. Returns the number of overlays computed.
+    """
+    years = sorted(int(year) for year in MAP_SELECTION_YEARS)
+    scopes = {
+        (scope["country"], scope["nuts_prefix"])
+        for scope in MAP_SET_REGION_SCOPES.values()
+    }
+    computed = 0
+    for country, nuts_prefix in sorted(scopes):
+        nuts_prefixes = [p.strip() for p in nuts_prefix.split(",") if p.strip()]
+        for from_year, to_year in zip(years, years[1:], strict=False):
+            for visibility in AtlasFactVisibility.values:
+                user = _visibility_user(visibility)
+                for kind in _CHANGE_OVERLAY_KINDS:
+                    from_ids = set(
+                        _change_overlay_catchment_ids(
+                            kind, country, from_year, nuts_prefixes, user
+                        )
+                    )
+                    to_ids = set(
+                        _change_overlay_catchment_ids(
+                            kind, country, to_year, nuts_prefixes, user
+                        )
+                    )
+                    if not from_ids and not to_ids:
+                        continue
+                    fingerprint = _change_overlay_fingerprint(
+                        from_ids, from_year, to_ids, to_year, visibility
+                    )
+                    overlay = AtlasChangeOverlay.objects.filter(
+                        fingerprint=fingerprint
+                    ).first()
+                    if overlay is not None and _is_current_overlay(
+                        overlay, fingerprint
+                    ):
+                        continue
+                    build_change_overlay(
+                        from_ids, from_year, to_ids, to_year, visibility
+                    )
+                    computed += 1
+    return computed
+
+
 class CatchmentViewSet(WasteAtlasReadOnlyModelViewSet):
     """Read-only viewset returning GeoJSON for catchments that have waste collections.
 
@@ -990,21 +1814,15 @@ class CatchmentViewSet(WasteAtlasReadOnlyModelViewSet):
         from_year, to_year = _parse_change_years(request)
         nuts_prefixes = _parse_nuts_prefixes(request)
 
-        def catchment_ids(year):
-            qs = CollectionCatchment.objects.filter(
-                _country_filter_q("", country),
-                _publication_q(request.user, prefix="collections__"),
-                collections__valid_from__year=year,
-            ).distinct()
-            return _apply_nuts_prefix_filter(qs, nuts_prefixes).values_list(
-                "pk", flat=True
-            )
-
         return self._change_geojson_response(
             request,
-            catchment_ids(from_year),
+            _change_overlay_catchment_ids(
+                "collection", country, from_year, nuts_prefixes, request.user
+            ),
             from_year,
-            catchment_ids(to_year),
+            _change_overlay_catchment_ids(
+                "collection", country, to_year, nuts_prefixes, request.user
+            ),
             to_year,
         )
 
@@ -1015,18 +1833,15 @@ class CatchmentViewSet(WasteAtlasReadOnlyModelViewSet):
         from_year, to_year = _parse_change_years(request)
         nuts_prefixes = _parse_nuts_prefixes(request)
 
-        def catchment_ids(year):
-            return (
-                _active_collector_scope(country, year, nuts_prefixes, user=request.user)
-                .values_list("catchment_id", flat=True)
-                .distinct()
-            )
-
         return self._change_geojson_response(
             request,
-            catchment_ids(from_year),
+            _change_overlay_catchment_ids(
+                "collector", country, from_year, nuts_prefixes, request.user
+            ),
             from_year,
-            catchment_ids(to_year),
+            _change_overlay_catchment_ids(
+                "collector", country, to_year, nuts_prefixes, request.user
+            ),
             to_year,
         )
 
@@ -1045,15 +1860,31 @@ class CatchmentViewSet(WasteAtlasReadOnlyModelViewSet):
 
     @staticmethod
     def _change_geojson_response(request, from_ids, from_year, to_ids, to_year):
-        """Overlay two atlas years, refusing unbounded country-wide requests.
+        """Serve the precomputed overlay of two atlas years.
 
         The overlay unions, intersects and differences every involved geometry,
-        so the same feature ceiling as the plain geometry endpoints applies to
-        the union of both years.  The result is cached per boundary version, so
-        repeated requests for the same overlay do not recompute it.
+        so it is never computed on the request thread. Overlays of the map sets
+        are precomputed when catchment revisions are approved; any other
+        selection, or one whose boundaries changed since, is handed to a Celery
+        worker while the last overlay of the selection is served, if there is
+        one, or ``202 Accepted`` with an empty collection otherwise. The same
+        feature ceiling as the plain geometry endpoints applies to the union of
+        both years.
         """
+        from .tasks import schedule_change_overlay
+
         from_ids = set(from_ids)
         to_ids = set(to_ids)
+        visibility = _fact_visibility(request.user)
+        fingerprint = _change_overlay_fingerprint(
+            from_ids, from_year, to_ids, to_year, visibility
+        )
+        # The fingerprint already versions the overlay, so it doubles as ETag.
+        version = fingerprint[:12]
+        not_modified = get_not_modified_response(request, version)
+        if not_modified is not None:
+            return not_modified
+
         rejection_response = get_unbounded_geojson_rejection_response(
             request,
             len(from_ids | to_ids),
@@ -1062,21 +1893,37 @@ class CatchmentViewSet(WasteAtlasReadOnlyModelViewSet):
         if rejection_response is not None:
             return rejection_response
 
-        payload, _hit = get_or_set_cache(
-            _change_overlay_cache_key(
-                from_ids, from_year, to_ids, to_year, request.user
-            ),
-            lambda: _build_change_geometry(
-                _revision_snapshots(from_ids, from_year, request.user),
-                _revision_snapshots(to_ids, to_year, request.user),
-            ),
-            timeout=_CHANGE_OVERLAY_CACHE_TIMEOUT,
+        selection = _change_overlay_selection(
+            from_ids, from_year, to_ids, to_year, visibility
         )
-        return Response(payload)
+        overlay = _stored_change_overlay(selection)
+        if overlay is None or not _is_current_overlay(overlay, fingerprint):
+            schedule_change_overlay(
+                from_ids, from_year, to_ids, to_year, visibility, fingerprint
+            )
+            # Eager task execution, or a worker, may have stored it meanwhile
+            overlay = _stored_change_overlay(selection)
+
+        if overlay is None:
+            return Response(
+                _build_feature_collection([]),
+                status=status.HTTP_202_ACCEPTED,
+                headers={"Retry-After": str(_CHANGE_OVERLAY_RETRY_AFTER)},
+            )
+        _mark_change_overlay_read(overlay)
+        response = Response(overlay.geojson)
+        if not _is_current_overlay(overlay, fingerprint):
+            return response
+        return set_conditional_headers(response, version)
 
     def _geojson_response(self, request, queryset):
         _country, year = _parse_country_year(request)
         queryset = _with_catchment_revision(queryset, year, request.user)
+        version, last_modified = _atlas_geojson_state(request.user)
+        not_modified = get_not_modified_response(request, version, last_modified)
+        if not_modified is not None:
+            return not_modified
+
         rejection_response = get_unbounded_geojson_rejection_response(
             request,
             queryset.count(),
@@ -1085,6 +1932,13 @@ class CatchmentViewSet(WasteAtlasReadOnlyModelViewSet):
         if rejection_response is not None:
             return rejection_response
 
+        return self._serialized_geojson_response(
+            request, queryset, version, last_modified
+        )
+
+    def _serialized_geojson_response(
+        self, request, queryset, version=None, last_modified=None
+    ):
         queryset = queryset.annotate(
             simplified_geom=SimplifyPreserveTopology(
                 F("atlas_geom"),
@@ -1093,7 +1947,9 @@ class CatchmentViewSet(WasteAtlasReadOnlyModelViewSet):
         )
         queryset = self._with_atlas_collection(request, queryset)
         serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return set_conditional_headers(
+            Response(serializer.data), version, last_modified
+        )
 
     @staticmethod
     def _with_atlas_collection(request, queryset):
@@ -1155,6 +2011,11 @@ class CatchmentViewSet(WasteAtlasReadOnlyModelViewSet):
             .select_related("region", "region__borders")
         )
         queryset = _with_catchment_revision(queryset, year, request.user)
+        version, last_modified = _atlas_geojson_state(request.user)
+        not_modified = get_not_modified_response(request, version, last_modified)
+        if not_modified is not None:
+            return not_modified
+
         rejection_response = get_unbounded_geojson_rejection_response(
             request,
             queryset.count(),
@@ -1163,15 +2024,9 @@ class CatchmentViewSet(WasteAtlasReadOnlyModelViewSet):
         if rejection_response is not None:
             return rejection_response
 
-        queryset = queryset.annotate(
-            simplified_geom=SimplifyPreserveTopology(
-                F("atlas_geom"),
-                geometry_simplify_tolerance(),
-            )
+        return self._serialized_geojson_response(
+            request, queryset, version, last_modified
         )
-        queryset = self._with_atlas_collection(request, queryset)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
 
 
 class OrgaLevelViewSet(WasteAtlasViewSet):
@@ -1558,7 +2413,7 @@ def _get_material_status(country, year, material_id, nuts_prefixes=(), user=None
     one of ``'allowed'``, ``'forbidden'``, ``'No separate collection'``,
     or ``'no_data'``.
     """
-    best = _select_primary_collections(
+    facts = _indicator_facts(
         country,
         year,
         ["Biowaste", "Food waste"],
@@ -1566,40 +2421,17 @@ def _get_material_status(country, year, material_id, nuts_prefixes=(), user=None
         user=user,
     )
 
-    collection_ids = [
-        row["collection_id"]
-        for row in best.values()
-        if row["collection_id"] is not None
-    ]
-
-    # Step 2: batch-fetch allowed / forbidden sets for the target material
-    allowed_collections = set(
-        Collection.objects.filter(
-            id__in=collection_ids,
-            allowed_materials__id=material_id,
-        ).values_list("id", flat=True)
-    )
-    forbidden_collections = set(
-        Collection.objects.filter(
-            id__in=collection_ids,
-            forbidden_materials__id=material_id,
-        ).values_list("id", flat=True)
-    )
-
-    # Step 3: classify
     data = []
-    for cid, row in best.items():
-        collection_id = row["collection_id"]
-        system = row["collection_system"]
-        if system == "No separate collection":
+    for fact in facts:
+        if fact.collection_system == "No separate collection":
             status = "No separate collection"
-        elif collection_id in allowed_collections:
+        elif material_id in fact.allowed_material_ids:
             status = "allowed"
-        elif collection_id in forbidden_collections:
+        elif material_id in fact.forbidden_material_ids:
             status = "forbidden"
         else:
             status = "no_data"
-        data.append({"catchment_id": cid, "status": status})
+        data.append({"catchment_id": fact.catchment_id, "status": status})
     return data
 
 
@@ -1617,57 +2449,28 @@ def _get_collection_count(
     across all seasons.  Also flags whether the counts vary by season.
     Non-door-to-door catchments are excluded (they have no frequency data).
     """
-    qs = _filter_by_waste_categories(
-        _collection_qs(user).filter(
-            _country_filter_q("catchment__", country),
-            valid_from__year=year,
-            collection_system__name="Door to door",
-            frequency__isnull=False,
-        ),
-        waste_categories,
-    )
-    qs = _apply_nuts_prefix_filter(qs, nuts_prefixes, catchment_path="catchment__")
-    rows = qs.values_list(
-        "catchment_id",
-        "frequency__collectioncountoptions__standard",
-    )
-
-    # Gather per-catchment option counts.
-    catchment_options: dict[int, list[int]] = {}
-    for cid, std in rows:
-        if std is None:
-            continue
-        catchment_options.setdefault(cid, []).append(std)
-
-    data = []
-    for cid, options in catchment_options.items():
-        data.append(
+    facts = _indicator_facts(country, year, waste_categories, nuts_prefixes, user=user)
+    data = [
+        {
+            "catchment_id": fact.catchment_id,
+            "collection_count": fact.collection_count,
+            "has_seasonal_variation": fact.has_seasonal_variation,
+            "is_door_to_door": True,
+        }
+        for fact in facts
+        if fact.collection_count is not None
+    ]
+    if include_missing_primary:
+        data.extend(
             {
-                "catchment_id": cid,
-                "collection_count": sum(options),
-                "has_seasonal_variation": len(set(options)) > 1,
-                "is_door_to_door": True,
+                "catchment_id": fact.catchment_id,
+                "collection_count": None,
+                "has_seasonal_variation": False,
+                "is_door_to_door": fact.collection_system == "Door to door",
             }
+            for fact in facts
+            if fact.collection_count is None
         )
-    if include_missing_primary:
-        existing_ids = {row["catchment_id"] for row in data}
-        best_system = _select_primary_collections(
-            country,
-            year,
-            waste_categories,
-            nuts_prefixes,
-            user=user,
-        )
-        for cid, row in best_system.items():
-            if cid not in existing_ids:
-                data.append(
-                    {
-                        "catchment_id": cid,
-                        "collection_count": None,
-                        "has_seasonal_variation": False,
-                        "is_door_to_door": row["collection_system"] == "Door to door",
-                    }
-                )
     return data
 
 
@@ -2205,75 +3008,23 @@ def _get_collection_amount(
     year) so that values attached to an earlier collection version are
     still found.
     """
-    # ------------------------------------------------------------------
-    # Step 1: pick primary collection system per catchment
-    # ------------------------------------------------------------------
-    best = _select_primary_collections(
-        country,
-        year,
-        waste_categories,
-        nuts_prefixes,
-        user=user,
-    )
-
-    catchment_ids = list(best.keys())
-
-    # ------------------------------------------------------------------
-    # Step 2: map catchments → all collection IDs (any year)
-    # ------------------------------------------------------------------
-    all_col_rows = _filter_by_waste_categories(
-        _collection_qs(user).filter(
-            catchment_id__in=catchment_ids,
-        ),
-        waste_categories,
-    ).values_list("id", "catchment_id")
-
-    cid_to_cols: dict[int, set[int]] = {}
-    all_collection_ids: set[int] = set()
-    for col_id, cid in all_col_rows:
-        cid_to_cols.setdefault(cid, set()).add(col_id)
-        all_collection_ids.add(col_id)
+    facts = _indicator_facts(country, year, waste_categories, nuts_prefixes, user=user)
 
-    col_to_cid: dict[int, int] = {}
-    for cid, col_ids in cid_to_cols.items():
-        for col_id in col_ids:
-            col_to_cid[col_id] = cid
-
-    # ------------------------------------------------------------------
-    # Step 3: look up amounts (strategy depends on year)
-    # ------------------------------------------------------------------
-    amounts, value_sources, acpv_group_keys = _amounts_for_year(
-        year,
-        all_collection_ids,
-        col_to_cid,
-        catchment_ids,
-        include_metadata=True,
-    )
-
-    # ------------------------------------------------------------------
-    # Step 4: build result list
-    # ------------------------------------------------------------------
     data = []
-    for cid, row in best.items():
-        system = row["collection_system"]
-        no_collection = system == "No separate collection"
-        amount = None if no_collection else amounts.get(cid)
+    for fact in facts:
+        no_collection = fact.collection_system == "No separate collection"
         data.append(
             {
-                "catchment_id": cid,
-                "amount": amount,
+                "catchment_id": fact.catchment_id,
+                "amount": None if no_collection else fact.amount,
                 "no_collection": no_collection,
                 **(
-                    {"value_source": None if no_collection else value_sources.get(cid)}
+                    {"value_source": None if no_collection else fact.amount_source}
                     if include_value_source
                     else {}
                 ),
                 **(
-                    {
-                        "acpv_group_key": None
-                        if no_collection
-                        else acpv_group_keys.get(cid)
-                    }
+                    {"acpv_group_key": None if no_collection else fact.acpv_group_key}
                     if include_acpv_group_key
                     else {}
                 ),
@@ -2387,10 +3138,8 @@ def _amounts_for_year(
             id__in=list(total_by_catchment.keys()),
         ).values_list("id", "region_id")
     )
-    region_pop = population_values_by_region(
-        {region_id for region_id in catchment_regions.values() if region_id},
-        year,
-        legacy_attribute_id=_resolved_population_attribute_id(),
+    region_pop = _population_resolver().values(
+        {region_id for region_id in catchment_regions.values() if region_id}, year
     )
     for cid, total_mg in total_by_catchment.items():
         region_id = catchment_regions.get(cid)
@@ -2632,10 +3381,9 @@ def _get_green_waste_collection_amount(country, year, nuts_prefixes=(), user=Non
                     id__in=list(total_by_catchment.keys()),
                 ).values_list("id", "region_id")
             )
-            region_pop = population_values_by_region(
+            region_pop = _population_resolver().values(
                 {region_id for region_id in catchment_regions.values() if region_id},
                 year,
-                legacy_attribute_id=_resolved_population_attribute_id(),
             )
             for cid, total_mg in total_by_catchment.items():
                 region_id = catchment_regions.get(cid)
@@ -2779,42 +3527,27 @@ def _get_min_bin_size(
     ``_COLLECTION_SYSTEM_PRIORITY`` and returns its ``min_bin_size`` value.
     Only door-to-door collections carry meaningful bin size data.
     """
-    qs = _filter_by_waste_categories(
-        _collection_qs(user).filter(
-            _country_filter_q("catchment__", country),
-            valid_from__year=year,
-            collection_system__name="Door to door",
-        ),
-        waste_categories,
-    )
-    qs = _apply_nuts_prefix_filter(qs, nuts_prefixes, catchment_path="catchment__")
-    rows = qs.values_list("catchment_id", "min_bin_size")
-
-    best: dict[int, tuple[float | None, bool]] = {}
-    for cid, size in rows:
-        if cid not in best:
-            best[cid] = (float(size) if size is not None else None, True)
-
-    if include_missing_primary:
-        best_system = _select_primary_collections(
-            country,
-            year,
-            waste_categories,
-            nuts_prefixes,
-            user=user,
-        )
-        for cid, row in best_system.items():
-            if cid not in best:
-                best[cid] = (None, row["collection_system"] == "Door to door")
-
-    return [
+    facts = _indicator_facts(country, year, waste_categories, nuts_prefixes, user=user)
+    data = [
         {
-            "catchment_id": cid,
-            "min_bin_size": size,
-            "is_door_to_door": is_door_to_door,
+            "catchment_id": fact.catchment_id,
+            "min_bin_size": fact.min_bin_size,
+            "is_door_to_door": True,
         }
-        for cid, (size, is_door_to_door) in best.items()
+        for fact in facts
+        if fact.has_door_to_door
     ]
+    if include_missing_primary:
+        data.extend(
+            {
+                "catchment_id": fact.catchment_id,
+                "min_bin_size": None,
+                "is_door_to_door": fact.collection_system == "Door to door",
+            }
+            for fact in facts
+            if not fact.has_door_to_door
+        )
+    return data
 
 
 def _get_required_bin_capacity(
@@ -2831,45 +3564,29 @@ def _get_required_bin_capacity(
     ``required_bin_capacity_reference`` (person / household / property /
     not_specified) for the primary door-to-door collection per catchment.
     """
-    qs = _filter_by_waste_categories(
-        _collection_qs(user).filter(
-            _country_filter_q("catchment__", country),
-            valid_from__year=year,
-            collection_system__name="Door to door",
-        ),
-        waste_categories,
-    )
-    qs = _apply_nuts_prefix_filter(qs, nuts_prefixes, catchment_path="catchment__")
-    rows = qs.values_list(
-        "catchment_id", "required_bin_capacity", "required_bin_capacity_reference"
-    )
-
-    best: dict[int, tuple[float | None, str | None, bool]] = {}
-    for cid, cap, ref in rows:
-        if cid not in best:
-            best[cid] = (float(cap) if cap is not None else None, ref or None, True)
-
-    if include_missing_primary:
-        best_system = _select_primary_collections(
-            country,
-            year,
-            waste_categories,
-            nuts_prefixes,
-            user=user,
-        )
-        for cid, row in best_system.items():
-            if cid not in best:
-                best[cid] = (None, None, row["collection_system"] == "Door to door")
-
-    return [
+    facts = _indicator_facts(country, year, waste_categories, nuts_prefixes, user=user)
+    data = [
         {
-            "catchment_id": cid,
-            "required_bin_capacity": cap,
-            "required_bin_capacity_reference": ref,
-            "is_door_to_door": is_door_to_door,
+            "catchment_id": fact.catchment_id,
+            "required_bin_capacity": fact.required_bin_capacity,
+            "required_bin_capacity_reference": fact.required_bin_capacity_reference,
+            "is_door_to_door": True,
         }
-        for cid, (cap, ref, is_door_to_door) in best.items()
+        for fact in facts
+        if fact.has_door_to_door
     ]
+    if include_missing_primary:
+        data.extend(
+            {
+                "catchment_id": fact.catchment_id,
+                "required_bin_capacity": None,
+                "required_bin_capacity_reference": None,
+                "is_door_to_door": fact.collection_system == "Door to door",
+            }
+            for fact in facts
+            if not fact.has_door_to_door
+        )
+    return data
 
 
 class BiowasteMinBinSizeViewSet(WasteAtlasViewSet):
@@ -3717,6 +4434,7 @@ class BiowasteImpurityViewSet(WasteAtlasViewSet):
     """
 
     permission_classes = [permissions.AllowAny]
+    cache_params = (*ATLAS_CACHE_PARAMS, "collection_year")
 
     def list(self, request):
         """Return a JSON array of {catchment_id, impurity_rate, no_collection}."""
@@ -3986,6 +4704,7 @@ class CollectionConflictViewSet(WasteAtlasViewSet):
     """
 
     permission_classes = [permissions.AllowAny]
+    cache_params = (*ATLAS_CACHE_PARAMS, "theme")
 
     def list(self, request):
         """Return catchments with conflicting theme values."""
@@ -4007,3 +4726,196 @@ class CollectionConflictViewSet(WasteAtlasViewSet):
 
         serializer = CatchmentConflictSerializer(conflicts, many=True)
         return Response(serializer.data)
+
+
+# ---------------------------------------------------------------------------
+# Map set bundles
+# ---------------------------------------------------------------------------
+
+# Bounded lifetime for cached bundles: the key carries the atlas data version,
+# but the legacy Region-geometry fallback carries no timestamp to version.
+_MAP_SET_BUNDLE_CACHE_TIMEOUT = 3600
+
+
+def _build_map_set_themes():
+    """Map each map set to its themes and their configuration keys."""
+    themes = {}
+    for page in MAP_PAGES:
+        if page["selector_set"]:
+            themes.setdefault(page["selector_set"], {}).setdefault(
+                page["theme"], page["config_key"]
+            )
+    return themes
+
+
+MAP_SET_THEMES = _build_map_set_themes()
+
+
+def _theme_view(data_url):
+    """Return the atlas view serving *data_url* and its URL kwargs, or ``None``.
+
+    Only list routes of the atlas viewsets qualify, whatever a stored
+    configuration names.
+    """
+    try:
+        match = resolve(urlsplit(data_url).path)
+    except Resolver404:
+        return None
+    view = match.func
+    view_class = getattr(view, "cls", None)
+    if (
+        view_class is None
+        or not issubclass(
+            view_class, (WasteAtlasViewSet, WasteAtlasReadOnlyModelViewSet)
+        )
+        or getattr(view, "actions", {}).get("get") != "list"
+    ):
+        return None
+    return view, match.kwargs
+
+
+def _theme_data(request, view, kwargs, params):
+    """Run the list view of a theme in-process with the query params of a bundle.
+
+    The bundle request has been authenticated and throttled already, so the
+    viewset is called directly rather than dispatched again.
+    """
+    http_request = copy.copy(request._request)
+    http_request.GET = QueryDict(mutable=True)
+    http_request.GET.update(params)
+    theme_request = Request(http_request)
+    theme_request.user = request.user
+
+    viewset = view.cls(**view.initkwargs)
+    viewset.action_map = view.actions
+    viewset.action = "list"
+    viewset.request = theme_request
+    viewset.args = ()
+    viewset.kwargs = kwargs
+    viewset.format_kwarg = None
+    viewset.headers = {}
+    response = viewset.list(theme_request, **kwargs)
+    if response.status_code != status.HTTP_200_OK:
+        return None
+    # Plain JSON types, so that the bundle can be cached as a whole
+    return json.loads(json.dumps(response.data, cls=JSONEncoder))
+
+
+def _build_map_set_bundle(request, map_set, year, themes):
+    """Collect the scoped catchments and the indicator arrays of *themes*."""
+    scope = MAP_SET_REGION_SCOPES[map_set]
+    country = scope["country"]
+    nuts_prefixes = [p.strip() for p in scope["nuts_prefix"].split(",") if p.strip()]
+    params = {"country": country, "year": str(year)}
+    if nuts_prefixes:
+        params["nuts_prefix"] = ",".join(nuts_prefixes)
+
+    configurations = dict(
+        WasteAtlasMapConfiguration.objects.filter(
+            key__in=set(themes.values())
+        ).values_list("key", "configuration")
+    )
+    indicators = {}
+    by_url = {}
+    with shared_primary_selection():
+        for theme, config_key in themes.items():
+            data_url = (configurations.get(config_key) or {}).get("dataUrl")
+            if not data_url:
+                continue
+            if data_url not in by_url:
+                target = _theme_view(data_url)
+                by_url[data_url] = (
+                    _theme_data(request, *target, params) if target else None
+                )
+            if by_url[data_url] is not None:
+                indicators[theme] = by_url[data_url]
+
+    return {
+        "map_set": map_set,
+        "country": country,
+        "nuts_prefix": params.get("nuts_prefix", ""),
+        "year": year,
+        "catchment_ids": sorted(
+            _scoped_catchment_ids(country, year, nuts_prefixes, request.user)
+        ),
+        "indicators": indicators,
+    }
+
+
+class MapSetBundleViewSet(WasteAtlasViewSet):
+    """Return the catchments and the indicator arrays of the themes of a map set.
+
+    Switching themes within a map set then needs no further requests: the
+    ``indicators`` hold the data of each theme's endpoint for the map set's
+    country and NUTS scope, keyed by theme. ``themes`` narrows the bundle to
+    a comma-separated selection, all themes of the map set by default.
+    Primary collections are selected once per waste category for all themes,
+    and bundles are cached per map set, year, themes, visibility and atlas
+    data version.
+
+    Example::
+
+        GET /waste_collection/api/waste-atlas/map-set-bundle/?map_set=DE-BW&year=2024&themes=paper_bags,biowaste_collection_amount
+    """
+
+    permission_classes = [permissions.AllowAny]
+    # Bundles are cached as a whole, under their own key
+    cache_list_responses = False
+
+    def list(self, request):
+        map_set = request.query_params.get("map_set", "")
+        if map_set not in MAP_SET_THEMES:
+            return Response(
+                {"detail": f"Unknown map set: {map_set!r}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        # Clamped, since the year is part of the cache key
+        try:
+            year = int(request.query_params.get("year", MAX_ATLAS_YEAR))
+        except (TypeError, ValueError):
+            year = MAX_ATLAS_YEAR
+        year = min(max(year, MIN_ATLAS_YEAR), MAX_ATLAS_YEAR)
+
+        available = MAP_SET_THEMES[map_set]
+        requested = {
+            theme.strip()
+            for theme in request.query_params.get("themes", "").split(",")
+            if theme.strip()
+        }
+        themes = {
+            theme: config_key
+            for theme, config_key in sorted(available.items())
+            if not requested or theme in requested
+        }
+
+        data_version, last_modified = _atlas_data_state(request.user)
+        visibility = _fact_visibility(request.user)
+        digest = hashlib.sha1(",".join(themes).encode("utf-8")).hexdigest()[:16]
+        selection = f"waste_atlas_bundle:{map_set}:{year}:{visibility}:{digest}"
+        cache_key = f"{selection}:{data_version}"
+        version = hashlib.sha1(cache_key.encode("utf-8")).hexdigest()[:12]
+        not_modified = get_not_modified_response(request, version, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        def generate():
+            with _track_stale_fact_reads() as reads:
+                bundle = _build_map_set_bundle(request, map_set, year, themes)
+            if reads.stale:
+                raise _UncachedResponse(Response(bundle))
+            return bundle
+
+        try:
+            result = single_flight_cache(
+                cache_key,
+                generate,
+                timeout=_MAP_SET_BUNDLE_CACHE_TIMEOUT,
+                stale_key=get_stale_cache_key(selection),
+                version=version,
+            )
+        except _UncachedResponse as uncached:
+            return uncached.response
+        response = Response(result.data)
+        if result.status == "STALE":
+            return response
+        return set_conditional_headers(response, version, last_modified)